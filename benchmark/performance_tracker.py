@@ -6,14 +6,20 @@ Measures execution times, API calls, and logs performance metrics.
 import time
 import json
 import logging
+import contextvars
+import itertools
+import random
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 import threading
 import os
 
+from benchmark.streaming_histogram import StreamingHistogram
+
 
 @dataclass
 class PerformanceMetric:
@@ -23,6 +29,10 @@ class PerformanceMetric:
     timestamp: str
     thread_id: int
     details: Dict[str, Any] = None
+    span_id: int = None          # Unique within the process
+    parent_id: int = None        # Enclosing measurement, possibly on another thread
+    start_us: float = None       # Start offset from the session start
+    cpu_ms: float = None
 
 
 @dataclass
@@ -40,24 +50,252 @@ class RouteOptimizationSession:
     toll_networks: List[str]
     optimization_result: Dict[str, Any]
     errors: List[str] = None
+    component_stats: Dict[str, Dict[str, Any]] = None
+    dropped_metrics: int = 0
+    measurement_mode: str = "full"
+    sample_rate: float = 1.0
+    operation_histograms: Dict[str, Dict[str, Any]] = None
+    recorded_values: Dict[str, Dict[str, Dict[str, Any]]] = None
+
+
+METRICS_BUFFER_SIZE = 20000   # Metrics kept per thread and per session (oldest dropped first)
+ERRORS_BUFFER_SIZE = 200      # Errors kept per session
+MEASUREMENT_MODES = ("full", "light")
+# full: one PerformanceMetric per measurement (timestamp, details) plus histograms
+# light: histograms only (monotonic ns + thread CPU ns), optionally sampled
+
+
+def _merge_histograms(target: Dict[str, tuple], source: Dict[str, tuple]):
+    """Add {operation: (wall, cpu)} histograms into target"""
+    for operation, (wall, cpu) in list(source.items()):
+        if operation not in target:
+            target[operation] = (StreamingHistogram(), StreamingHistogram())
+        target[operation][0].merge(wall)
+        target[operation][1].merge(cpu)
+    return target
+
+
+def _merge_values(target: Dict[str, Dict[str, StreamingHistogram]], source: Dict[str, Dict[str, StreamingHistogram]]):
+    """Add {group: {name: histogram}} into target"""
+    for group, histograms in list(source.items()):
+        merged = target.setdefault(group, {})
+        for name, histogram in list(histograms.items()):
+            merged.setdefault(name, StreamingHistogram()).merge(histogram)
+    return target
+
+
+def _merge_counts(target: Dict[str, int], source: Dict[str, int]):
+    for name, count in list(source.items()):
+        target[name] = target.get(name, 0) + count
+    return target
+
+
+class _ThreadBuffer:
+    """Append-only metrics of one thread in one session (written by that thread only)"""
+
+    __slots__ = ("metrics", "api_calls", "dropped", "histograms", "values")
+
+    def __init__(self, size: int):
+        self.metrics = deque(maxlen=size)
+        self.api_calls: Dict[str, int] = {}
+        self.dropped = 0
+        self.histograms: Dict[str, tuple] = {}
+        self.values: Dict[str, Dict[str, StreamingHistogram]] = {}
+
+    def append(self, metric: PerformanceMetric):
+        if len(self.metrics) == self.metrics.maxlen:
+            self.dropped += 1
+        self.metrics.append(metric)
+
+    def observe(self, operation: str, wall_ns: int, cpu_ns: int):
+        """Record one measurement in the operation's (wall, cpu) histograms"""
+        pair = self.histograms.get(operation)
+        if pair is None:
+            pair = self.histograms[operation] = (StreamingHistogram(), StreamingHistogram())
+        pair[0].record(wall_ns)
+        pair[1].record(cpu_ns)
+
+    def record_values(self, group: str, values: Dict[str, int]):
+        histograms = self.values.get(group)
+        if histograms is None:
+            histograms = self.values[group] = {}
+        for name, value in values.items():
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = StreamingHistogram()
+            histogram.record(value)
+
+
+class _ActiveSession:
+    """Live state of a session: one buffer per thread, merged when the session ends"""
+
+    def __init__(self, session: Optional[RouteOptimizationSession], buffer_size: int):
+        self.session = session
+        self.buffer_size = buffer_size
+        self.started = time.perf_counter()
+        self.started_ns = time.perf_counter_ns()
+        self.errors = deque(maxlen=ERRORS_BUFFER_SIZE)
+        self.api_call_counter = itertools.count(1)
+        self.token = None
+        self._buffers: Dict[int, _ThreadBuffer] = {}
+        self._lock = threading.Lock()
+
+    def buffer(self) -> _ThreadBuffer:
+        """Buffer of the calling thread (the lock is only taken the first time)"""
+        thread_id = threading.get_ident()
+        buffer = self._buffers.get(thread_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(thread_id, _ThreadBuffer(self.buffer_size))
+        return buffer
+
+    def merged(self):
+        """(metrics sorted by start time, api call counts, dropped metrics) across all threads"""
+        with self._lock:
+            buffers = list(self._buffers.values())
+        metrics, dropped = [], 0
+        for buffer in buffers:
+            metrics.extend(list(buffer.metrics))
+            dropped += buffer.dropped
+        metrics.sort(key=lambda metric: metric.timestamp)
+        return metrics, self.merged_api_calls(), dropped
+
+    def merged_api_calls(self) -> Dict[str, int]:
+        """API call counts across all threads"""
+        with self._lock:
+            buffers = list(self._buffers.values())
+        api_calls = {}
+        for buffer in buffers:
+            _merge_counts(api_calls, buffer.api_calls)
+        return api_calls
+
+    def merged_histograms(self) -> Dict[str, tuple]:
+        """{operation: (wall histogram, cpu histogram)} across all threads"""
+        with self._lock:
+            buffers = list(self._buffers.values())
+        histograms = {}
+        for buffer in buffers:
+            _merge_histograms(histograms, buffer.histograms)
+        return histograms
+
+    def merged_values(self) -> Dict[str, Dict[str, StreamingHistogram]]:
+        """{group: {name: histogram}} of recorded values across all threads"""
+        with self._lock:
+            buffers = list(self._buffers.values())
+        values = {}
+        for buffer in buffers:
+            _merge_values(values, buffer.values)
+        return values
+
+
+def _as_dict(metric) -> Dict[str, Any]:
+    return metric if isinstance(metric, dict) else vars(metric)
+
+
+def critical_path(metrics: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Chain of spans that bounds the session: the longest root span, then at each
+    level the child that finishes last. Accepts PerformanceMetric objects or dicts.
+    """
+    spans = [_as_dict(m) for m in metrics if _as_dict(m).get("span_id") is not None]
+    ids = {span["span_id"] for span in spans}
+    children: Dict[Any, List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+    
+    path, level = [], children.get(None, [])
+    if level:
+        level = [max(level, key=lambda span: span["duration_ms"])]
+    while level:
+        span = max(level, key=lambda span: span["start_us"] + span["duration_ms"] * 1000)
+        path.append(span)
+        level = children.get(span["span_id"], [])
+    return path
+
+
+def chrome_trace_events(session: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Chrome trace-event / Perfetto JSON for a saved session (`asdict(session)`).
+    
+    Each span is a complete ("X") event on its thread; children started on
+    another thread are linked to their parent with flow ("s"/"f") events.
+    """
+    spans = [m for m in session.get("metrics", []) if m.get("start_us") is not None]
+    by_id = {span["span_id"]: span for span in spans}
+    threads = list(dict.fromkeys(span["thread_id"] for span in sorted(spans, key=lambda s: s["start_us"])))
+    
+    events = [{"ph": "M", "name": "process_name", "pid": 1, "args": {"name": session.get("session_id", "session")}}]
+    for index, thread_id in enumerate(threads):
+        name = "request" if index == 0 else f"worker {index}"
+        events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": thread_id, "args": {"name": name}})
+    if threads:
+        events.append({
+            "name": f"{session.get('origin')} -> {session.get('destination')}", "cat": "session", "ph": "X",
+            "ts": 0, "dur": session.get("total_duration_ms", 0) * 1000, "pid": 1, "tid": threads[0],
+            "args": {"api_calls": session.get("api_calls", {}), "result_status": (session.get("optimization_result") or {}).get("status")}
+        })
+    
+    for span in spans:
+        args = dict(span.get("details") or {}, span_id=span["span_id"], parent_id=span["parent_id"], cpu_ms=span["cpu_ms"])
+        events.append({
+            "name": span["operation"], "cat": "operation", "ph": "X", "ts": span["start_us"],
+            "dur": span["duration_ms"] * 1000, "pid": 1, "tid": span["thread_id"], "args": args
+        })
+        parent = by_id.get(span["parent_id"])
+        if parent and parent["thread_id"] != span["thread_id"]:
+            flow = {"name": "submit", "cat": "flow", "id": span["span_id"], "ts": span["start_us"], "pid": 1}
+            events.append(dict(flow, ph="s", tid=parent["thread_id"]))
+            events.append(dict(flow, ph="f", bp="e", tid=span["thread_id"]))
+    
+    return {"traceEvents": events, "displayTimeUnit": "ms",
+            "otherData": {"session_id": session.get("session_id"), "dropped_metrics": session.get("dropped_metrics", 0)}}
 
 
 class PerformanceTracker:
     """
     Performance tracking system with file logging and real-time monitoring.
-    Thread-safe for concurrent operations.
+    
+    Sessions are bound to the request through a context variable: concurrent
+    requests each get their own session, and worker threads started with
+    `contextvars.copy_context()` report into the session of the request that
+    submitted them. Measurements outside any session go to a bounded background buffer.
+    
+    In full mode each measurement is a span: its parent is the measurement
+    enclosing it in the current context (worker threads inherit it through
+    `contextvars.copy_context()`), so a session can be exported as a Chrome
+    trace-event / Perfetto flame chart (`export_chrome_trace`).
+    
+    Every measurement feeds per-operation streaming histograms of wall time and
+    thread CPU time. In "light" mode only the histograms are kept (no timestamp,
+    no metric object), and `sample_rate` < 1 measures a random fraction of calls,
+    so instrumentation can stay enabled in production.
     """
     
-    def __init__(self, log_dir: str = "benchmark/logs"):
+    def __init__(self, log_dir: str = "benchmark/logs", buffer_size: int = METRICS_BUFFER_SIZE,
+                 mode: str = None, sample_rate: float = None):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Thread-safe storage
+        self.buffer_size = buffer_size
+        self.set_mode(mode or os.getenv("PERFORMANCE_TRACKER_MODE", "full"),
+                      float(os.getenv("PERFORMANCE_SAMPLE_RATE", "1")) if sample_rate is None else sample_rate)
         self._lock = threading.Lock()
-        self._current_session: Optional[RouteOptimizationSession] = None
-        self._metrics: List[PerformanceMetric] = []
-        self._api_calls: Dict[str, int] = {}
-        self._errors: List[str] = []
+        self._session_var = contextvars.ContextVar(f"performance_session_{id(self)}", default=None)
+        self._span_var = contextvars.ContextVar(f"performance_span_{id(self)}", default=None)
+        self._span_ids = itertools.count(1)
+        self.export_traces = os.getenv("PERFORMANCE_TRACE_EXPORT", "0") == "1"
+        self._background = _ActiveSession(None, buffer_size)
+        self._stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        
+        # Process-wide totals, fed once per ended session (read by the metrics exporter)
+        self._total_histograms: Dict[str, tuple] = {}
+        self._total_api_calls: Dict[str, int] = {}
+        self._total_values: Dict[str, Dict[str, StreamingHistogram]] = {}
+        self._result_statuses: Dict[str, int] = {}
+        self._errors_total = 0
+        self._sessions_started = 0
+        self._sessions_active = 0
         
         # Setup logging
         self._setup_logging()
@@ -74,7 +312,8 @@ class PerformanceTracker:
             self.logger.removeHandler(handler)
         
         # File handler
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # delay: the file is only created when something is logged
+        file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
         file_handler.setLevel(logging.INFO)
         
         # Console handler for real-time monitoring
@@ -91,135 +330,242 @@ class PerformanceTracker:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
     
+    def set_mode(self, mode: str, sample_rate: float = 1.0):
+        """Switch between "full" and "light" measurement (sample_rate in (0, 1])"""
+        if mode not in MEASUREMENT_MODES:
+            raise ValueError(f"Unknown measurement mode: {mode}")
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1]: {sample_rate}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+    
+    def _active(self) -> _ActiveSession:
+        """Session of the current request, or the background buffer"""
+        return self._session_var.get() or self._background
+    
     def start_optimization_session(self, origin: str, destination: str, 
                                  route_distance_km: float = 0) -> str:
-        """Start a new route optimization session"""
+        """Start a new route optimization session bound to the current context"""
+        session_id = f"route_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{threading.get_ident() % 10000:04d}"
+        active = _ActiveSession(RouteOptimizationSession(
+            session_id=session_id,
+            start_time=datetime.now().isoformat(),
+            end_time="",
+            total_duration_ms=0,
+            origin=origin,
+            destination=destination,
+            route_distance_km=route_distance_km,
+            metrics=[],
+            api_calls={},
+            toll_networks=[],
+            optimization_result={},
+            measurement_mode=self.mode,
+            sample_rate=self.sample_rate
+        ), self.buffer_size)
+        active.token = self._session_var.set(active)
         with self._lock:
-            session_id = f"route_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-            
-            self._current_session = RouteOptimizationSession(
-                session_id=session_id,
-                start_time=datetime.now().isoformat(),
-                end_time="",
-                total_duration_ms=0,
-                origin=origin,
-                destination=destination,
-                route_distance_km=route_distance_km,
-                metrics=[],
-                api_calls={},
-                toll_networks=[],
-                optimization_result={}
-            )
-            
-            # Reset session-specific tracking
-            self._metrics = []
-            self._api_calls = {}
-            self._errors = []
-            
-            self.logger.info(f"Started optimization session {session_id}: {origin} -> {destination}")
-            return session_id
+            self._sessions_started += 1
+            self._sessions_active += 1
+        
+        self.logger.info(f"Started optimization session {session_id}: {origin} -> {destination}")
+        return session_id
     
     def end_optimization_session(self, result: Dict[str, Any] = None):
-        """End the current optimization session and save results"""
+        """End the current context's optimization session and save results"""
+        active = self._session_var.get()
+        if active is None:
+            self.logger.warning("No active session to end")
+            return
+        try:
+            self._session_var.reset(active.token)
+        except ValueError:
+            # Ended from another context than the one that started it
+            self._session_var.set(None)
+        
+        session = active.session
+        session.end_time = datetime.now().isoformat()
+        session.total_duration_ms = (time.perf_counter() - active.started) * 1000
+        session.metrics, session.api_calls, session.dropped_metrics = active.merged()
+        histograms = active.merged_histograms()
+        session.operation_histograms = {
+            operation: {"wall_ms": wall.summary(), "cpu_ms": cpu.summary()}
+            for operation, (wall, cpu) in histograms.items()
+        }
+        values = active.merged_values()
+        session.recorded_values = {
+            group: {name: histogram.summary(scale=1) for name, histogram in sorted(histograms_by_name.items())}
+            for group, histograms_by_name in values.items()
+        }
+        session.optimization_result = result or {}
+        session.errors = list(active.errors)
+        session.component_stats = self._collect_component_stats()
+        
+        result_data = session.optimization_result
+        if not result_data:
+            status = "NO_RESULT"
+        else:
+            status = str(result_data.get("status", "UNKNOWN")) if isinstance(result_data, dict) else "UNKNOWN"
         with self._lock:
-            if not self._current_session:
-                self.logger.warning("No active session to end")
-                return
-            
-            # Calculate total duration
-            start_time = datetime.fromisoformat(self._current_session.start_time)
-            end_time = datetime.now()
-            total_duration = (end_time - start_time).total_seconds() * 1000
-            
-            # Update session
-            self._current_session.end_time = end_time.isoformat()
-            self._current_session.total_duration_ms = total_duration
-            self._current_session.metrics = self._metrics.copy()
-            self._current_session.api_calls = self._api_calls.copy()
-            self._current_session.optimization_result = result or {}
-            self._current_session.errors = self._errors.copy()
-            
-            # Save to file
-            self._save_session()
-            
-            # Log summary
-            self._log_session_summary()
-            
-            session_id = self._current_session.session_id
-            self._current_session = None
-            return session_id
+            self._sessions_active -= 1
+            _merge_histograms(self._total_histograms, histograms)
+            _merge_counts(self._total_api_calls, session.api_calls)
+            _merge_values(self._total_values, values)
+            self._result_statuses[status] = self._result_statuses.get(status, 0) + 1
+        
+        # Save to file
+        self._save_session(session)
+        
+        # Log summary
+        self._log_session_summary(session)
+        return session.session_id
     
     def count_api_call(self, api_name: str):
-        """Increment API call counter with immediate logging"""
-        with self._lock:
-            self._api_calls[api_name] = self._api_calls.get(api_name, 0) + 1
-            total_calls = sum(self._api_calls.values())
+        """Increment API call counter with periodic progress logging"""
+        active = self._active()
+        calls = active.buffer().api_calls
+        calls[api_name] = calls.get(api_name, 0) + 1
+        total_calls = next(active.api_call_counter)
         
         # Log every 10 calls for progress tracking
         if total_calls % 10 == 0:
-            self.logger.info(f"API Progress: {total_calls} total calls | Latest: {api_name} (#{self._api_calls[api_name]})")
+            self.logger.info(f"API Progress: {total_calls} total calls | Latest: {api_name}")
 
     @contextmanager
     def measure_operation(self, operation: str, details: Dict[str, Any] = None):
         """Context manager to measure operation duration with progress info"""
-        start_time = time.perf_counter()
-        start_timestamp = datetime.now().isoformat()
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            yield
+            return
+        light = self.mode == "light"
+        if not light:
+            start_timestamp = datetime.now().isoformat()
+            span_id = next(self._span_ids)
+            parent_id = self._span_var.get()
+            span_token = self._span_var.set(span_id)
+        start_ns = time.perf_counter_ns()
+        start_cpu = time.thread_time_ns()
         
         try:
             yield
         finally:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            
-            metric = PerformanceMetric(
-                operation=operation,
-                duration_ms=duration_ms,
-                timestamp=start_timestamp,
-                thread_id=threading.get_ident(),
-                details=details or {}
-            )
+            cpu_ns = time.thread_time_ns() - start_cpu
+            wall_ns = time.perf_counter_ns() - start_ns
+            active = self._active()
+            buffer = active.buffer()
+            buffer.observe(operation, wall_ns, cpu_ns)
+            duration_ms = wall_ns / 1e6
             
-            with self._lock:
-                self._metrics.append(metric)
-            
-            total_api_calls = sum(self._api_calls.values())
+            if not light:
+                try:
+                    self._span_var.reset(span_token)
+                except ValueError:
+                    # Closed from another context (e.g. a generator resumed elsewhere)
+                    self._span_var.set(parent_id)
+                buffer.append(PerformanceMetric(
+                    operation=operation,
+                    duration_ms=duration_ms,
+                    timestamp=start_timestamp,
+                    thread_id=threading.get_ident(),
+                    details=details or {},
+                    span_id=span_id,
+                    parent_id=parent_id,
+                    start_us=(start_ns - active.started_ns) / 1000,
+                    cpu_ms=cpu_ns / 1e6
+                ))
             
             # Log slow operations immediately
             if duration_ms > 5000:  # 5 seconds
-                self.logger.warning(f"Slow operation: {operation} took {duration_ms:.2f}ms | Total API calls: {total_api_calls}")
+                self.logger.warning(f"Slow operation: {operation} took {duration_ms:.2f}ms")
             elif duration_ms > 1000:  # 1 second
-                self.logger.info(f"Operation: {operation} took {duration_ms:.2f}ms | Total API calls: {total_api_calls}")
+                self.logger.info(f"Operation: {operation} took {duration_ms:.2f}ms")
+
+    def record_values(self, group: str, values: Dict[str, int]):
+        """
+        Record integer measurements (durations in µs, byte sizes, counts...) into
+        per-group streaming histograms, e.g. the network breakdown of one ORS call.
+        Names ending in "_us" are durations and are compared in the session summary.
+        """
+        self._active().buffer().record_values(group, values)
+
+    def register_stats_provider(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """Register a component (cache, pool...) whose stats are snapshotted with each session"""
+        with self._lock:
+            self._stats_providers[name] = provider
+
+    def _collect_component_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot the stats of every registered component"""
+        snapshot = {}
+        for name, provider in list(self._stats_providers.items()):
+            try:
+                snapshot[name] = provider()
+            except Exception as e:
+                snapshot[name] = {"error": str(e)}
+        return snapshot
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Process-wide cumulative metrics: ended sessions plus measurements outside any session.
+        Safe to call from any thread; the returned histograms are private copies.
+        """
+        with self._lock:
+            histograms = _merge_histograms({}, self._total_histograms)
+            api_calls = dict(self._total_api_calls)
+            values = _merge_values({}, self._total_values)
+            snapshot = {
+                "result_statuses": dict(self._result_statuses),
+                "errors": self._errors_total,
+                "sessions_started": self._sessions_started,
+                "sessions_active": self._sessions_active,
+            }
+        snapshot["operations"] = _merge_histograms(histograms, self._background.merged_histograms())
+        snapshot["api_calls"] = _merge_counts(api_calls, self._background.merged_api_calls())
+        snapshot["values"] = _merge_values(values, self._background.merged_values())
+        snapshot["component_stats"] = self._collect_component_stats()
+        return snapshot
 
     def log_error(self, error_msg: str):
         """Log an error during optimization"""
+        self._active().errors.append(f"{datetime.now().isoformat()}: {error_msg}")
         with self._lock:
-            self._errors.append(f"{datetime.now().isoformat()}: {error_msg}")
+            self._errors_total += 1
         self.logger.error(error_msg)
     
     def set_toll_networks(self, networks: List[str]):
         """Set the toll networks used in current session"""
-        if self._current_session:
-            self._current_session.toll_networks = networks
+        active = self._session_var.get()
+        if active:
+            active.session.toll_networks = networks
     
-    def _save_session(self):
-        """Save session data to JSON file"""
-        if not self._current_session:
-            return
-        
-        filename = f"session_{self._current_session.session_id}.json"
+    def _save_session(self, session: RouteOptimizationSession):
+        """Save session data to JSON file (and its Chrome trace if PERFORMANCE_TRACE_EXPORT=1)"""
+        filename = f"session_{session.session_id}.json"
         filepath = self.log_dir / filename
         
         try:
+            data = asdict(session)
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(asdict(self._current_session), f, indent=2, ensure_ascii=False)
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            if self.export_traces and session.metrics:
+                self._write_trace(data)
         except Exception as e:
             self.logger.error(f"Failed to save session data: {e}")
     
-    def _log_session_summary(self):
+    def _write_trace(self, session_data: Dict[str, Any]) -> Path:
+        filepath = self.log_dir / f"trace_{session_data['session_id']}.json"
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(chrome_trace_events(session_data), f, ensure_ascii=False)
+        return filepath
+    
+    def export_chrome_trace(self, session_file: str) -> Path:
+        """
+        Convert a saved session (session_*.json in log_dir) to a trace file that
+        chrome://tracing or ui.perfetto.dev opens as a flame chart.
+        """
+        with open(self.log_dir / session_file, 'r', encoding='utf-8') as f:
+            return self._write_trace(json.load(f))
+    
+    def _log_session_summary(self, session: RouteOptimizationSession):
         """Log a comprehensive summary of the optimization session"""
-        if not self._current_session:
-            return
-        
-        session = self._current_session
         total_api_calls = sum(session.api_calls.values())
         
         summary = f"""
@@ -228,7 +574,8 @@ ROUTE OPTIMIZATION SESSION SUMMARY - {session.session_id}
 Route: {session.origin} -> {session.destination}
 Distance: {session.route_distance_km:.1f} km
 Total Duration: {session.total_duration_ms:.2f}ms ({session.total_duration_ms/1000:.1f}s)
-Operations Measured: {len(session.metrics)}
+Operations Measured: {sum(h['wall_ms']['count'] for h in (session.operation_histograms or {}).values())}{f' ({session.dropped_metrics} dropped)' if session.dropped_metrics else ''}
+Measurement Mode: {session.measurement_mode}{f' (sampling 1 in {1 / session.sample_rate:.0f})' if session.sample_rate < 1 else ''}
 Total API Calls: {total_api_calls}
 Toll Networks: {', '.join(session.toll_networks) if session.toll_networks else 'None'}
 Errors: {len(session.errors)}
@@ -245,17 +592,15 @@ API CALLS BREAKDOWN:
         
         summary += "\nPERFORMANCE BY OPERATION:\n"
         
-        # Group metrics by operation
+        # Per-operation stats from the histograms (complete even when metrics were dropped)
         operation_stats = {}
-        for metric in session.metrics:
-            op = metric.operation
-            if op not in operation_stats:
-                operation_stats[op] = {'count': 0, 'total_ms': 0, 'max_ms': 0, 'min_ms': float('inf')}
-            
-            operation_stats[op]['count'] += 1
-            operation_stats[op]['total_ms'] += metric.duration_ms
-            operation_stats[op]['max_ms'] = max(operation_stats[op]['max_ms'], metric.duration_ms)
-            operation_stats[op]['min_ms'] = min(operation_stats[op]['min_ms'], metric.duration_ms)
+        for op, histograms in (session.operation_histograms or {}).items():
+            wall, cpu = histograms['wall_ms'], histograms['cpu_ms']
+            if wall['count']:
+                operation_stats[op] = {'count': wall['count'], 'total_ms': wall['total'],
+                                       'max_ms': wall['max'], 'min_ms': wall['min'],
+                                       'p50_ms': wall['p50'], 'p99_ms': wall['p99'],
+                                       'cpu_ms': cpu['total']}
         
         # Sort by total time consumed
         sorted_ops = sorted(operation_stats.items(), key=lambda x: x[1]['total_ms'], reverse=True)
@@ -268,7 +613,10 @@ API CALLS BREAKDOWN:
             summary += f"    Executions: {stats['count']}x\n"
             summary += f"    Total Time: {stats['total_ms']:.2f}ms ({percentage:.1f}% of total)\n"
             summary += f"    Average: {avg_ms:.2f}ms\n"
-            summary += f"    Min/Max: {stats['min_ms']:.2f}ms / {stats['max_ms']:.2f}ms\n\n"
+            summary += f"    Min/Max: {stats['min_ms']:.2f}ms / {stats['max_ms']:.2f}ms\n"
+            summary += f"    p50/p99: {stats['p50_ms']:.2f}ms / {stats['p99_ms']:.2f}ms\n"
+            cpu_share = (stats['cpu_ms'] / stats['total_ms'] * 100) if stats['total_ms'] > 0 else 0
+            summary += f"    CPU/Wait: {stats['cpu_ms']:.2f}ms CPU ({cpu_share:.1f}%) / {max(stats['total_ms'] - stats['cpu_ms'], 0):.2f}ms waiting\n\n"
         
         # Performance analysis
         summary += "PERFORMANCE ANALYSIS:\n"
@@ -301,6 +649,34 @@ API CALLS BREAKDOWN:
                     for warning in warnings:
                         summary += f"    - {warning}\n"
         
+        for group, values in (session.recorded_values or {}).items():
+            summary += f"\n{group.upper()} BREAKDOWN:\n"
+            durations_us = sum(stats['total'] for name, stats in values.items() if name.endswith('_us'))
+            for name, stats in values.items():
+                if not stats['count']:
+                    continue
+                if name.endswith('_us'):
+                    share = (stats['total'] / durations_us * 100) if durations_us > 0 else 0
+                    summary += (f"  {name[:-3]}: {stats['total'] / 1000:.2f}ms total ({share:.1f}%), "
+                                f"p50 {stats['p50'] / 1000:.2f}ms, p99 {stats['p99'] / 1000:.2f}ms\n")
+                else:
+                    summary += f"  {name}: {stats['total']:.0f} total, mean {stats['mean']:.0f}, max {stats['max']:.0f}\n"
+        
+        path = critical_path(session.metrics)
+        if path:
+            summary += "\nCRITICAL PATH:\n"
+            for depth, span in enumerate(path[:15]):
+                summary += f"  {'  ' * depth}{span['operation']}: {span['duration_ms']:.2f}ms (CPU {span['cpu_ms']:.2f}ms)\n"
+            if len(path) > 15:
+                summary += f"  ... {len(path) - 15} more levels\n"
+        
+        if session.component_stats:
+            summary += "\nCOMPONENT STATS:\n"
+            for name, stats in session.component_stats.items():
+                details = ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                                    for key, value in stats.items())
+                summary += f"  {name}: {details}\n"
+        
         if session.errors:
             summary += f"\nERRORS ({len(session.errors)}):\n"
             for i, error in enumerate(session.errors[-5:], 1):  # Show last 5 errors
@@ -314,37 +690,42 @@ API CALLS BREAKDOWN:
     
     def get_current_stats(self) -> Dict[str, Any]:
         """Get current session statistics with real-time display"""
-        with self._lock:
-            if not self._current_session:
-                return {}
-            
-            stats = {
-                'session_id': self._current_session.session_id,
-                'operations_count': len(self._metrics),
-                'api_calls': self._api_calls.copy(),
-                'errors_count': len(self._errors),
-                'elapsed_time_ms': (datetime.now() - datetime.fromisoformat(self._current_session.start_time)).total_seconds() * 1000
-            }
-            
-            # Affichage temps réel des stats importantes
-            total_api_calls = sum(self._api_calls.values())
-            print(f"\n📊 STATS TEMPS RÉEL:")
-            print(f"   Opérations: {len(self._metrics)}")
-            print(f"   Appels API: {total_api_calls}")
-            for api, count in self._api_calls.items():
-                print(f"     - {api}: {count}")
-            print(f"   Erreurs: {len(self._errors)}")
-            print(f"   Temps écoulé: {stats['elapsed_time_ms']/1000:.1f}s\n")
-            
-            return stats
+        active = self._session_var.get()
+        if not active:
+            return {}
+        
+        _, api_calls, dropped = active.merged()
+        operations_count = sum(wall.count for wall, _ in active.merged_histograms().values())
+        stats = {
+            'session_id': active.session.session_id,
+            'operations_count': operations_count,
+            'dropped_metrics': dropped,
+            'api_calls': api_calls,
+            'errors_count': len(active.errors),
+            'elapsed_time_ms': (time.perf_counter() - active.started) * 1000
+        }
+        
+        # Affichage temps réel des stats importantes
+        total_api_calls = sum(api_calls.values())
+        print(f"\n📊 STATS TEMPS RÉEL:")
+        print(f"   Opérations: {operations_count}")
+        print(f"   Appels API: {total_api_calls}")
+        for api, count in api_calls.items():
+            print(f"     - {api}: {count}")
+        print(f"   Erreurs: {len(active.errors)}")
+        print(f"   Temps écoulé: {stats['elapsed_time_ms']/1000:.1f}s\n")
+        
+        return stats
     
     def analyze_performance_bottlenecks(self, session_file: str = None) -> Dict[str, Any]:
         """Analyze performance bottlenecks from session data"""
         if session_file:
             with open(self.log_dir / session_file, 'r', encoding='utf-8') as f:
                 session_data = json.load(f)
-        elif self._current_session:
-            session_data = asdict(self._current_session)
+        elif self._session_var.get():
+            active = self._session_var.get()
+            metrics, api_calls, _ = active.merged()
+            session_data = dict(asdict(active.session), metrics=[asdict(m) for m in metrics], api_calls=api_calls)
         else:
             return {}
         
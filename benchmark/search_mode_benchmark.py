@@ -0,0 +1,181 @@
+"""
+Search mode benchmark for toll-limit and budget optimizations.
+Compares solution quality against ORS calls for the "exhaustive", "greedy"
+and "beam" avoidance search modes on the same routes.
+
+Usage:
+    python -m benchmark.search_mode_benchmark [--beam-width 3] [--max-comb-size 2]
+                                              [--output benchmark/logs/search_modes.json]
+
+Requires ORS_API_KEY (real ORS calls are counted, not simulated).
+"""
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.services.ors_service import ORSService
+from src.services.ors_payload_builder import ORSPayloadBuilder
+from src.services.toll_strategies import TollRouteOptimizer
+from src.services.budget_strategies import BudgetRouteOptimizer
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+
+
+# [lon, lat] pairs on toll-dense corridors
+DEFAULT_ROUTES = {
+    "lyon-dijon": [[4.8357, 45.7640], [5.0415, 47.3220]],
+    "paris-lille": [[2.3522, 48.8566], [3.0573, 50.6292]],
+    "marseille-montpellier": [[5.3698, 43.2965], [3.8767, 43.6108]],
+    "bordeaux-toulouse": [[-0.5792, 44.8378], [1.4442, 43.6047]],
+}
+
+# (label, kind, parameters)
+DEFAULT_CONSTRAINTS = [
+    ("max_tolls=2", "tolls", {"max_tolls": 2}),
+    ("max_tolls=3", "tolls", {"max_tolls": 3}),
+    ("budget=50%", "budget", {"max_price_percent": 0.5}),
+]
+
+
+class CountingORSService:
+    """
+    Enveloppe d'un ORSService comptant chaque appel directions.
+
+    Composition plutôt qu'héritage : le service enveloppé garde sa propre
+    configuration. Les méthodes utilisées par les optimiseurs construisent leur
+    payload ici pour passer par call_ors (et donc par le compteur) ; le reste
+    (URL, test_all_set...) est délégué tel quel.
+    """
+
+    def __init__(self, ors_service: ORSService):
+        """
+        Args:
+            ors_service: Service ORS réellement appelé
+        """
+        self._delegate = ors_service
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def __getattr__(self, name):
+        # Appelé seulement pour les attributs absents de l'enveloppe
+        return getattr(self._delegate, name)
+
+    def call_ors(self, payload):
+        """Compte l'appel puis le transmet au service enveloppé."""
+        with self._lock:
+            self.calls += 1
+        return self._delegate.call_ors(payload)
+
+    def get_base_route(self, coordinates, include_tollways=True):
+        """Route de base (appel compté)."""
+        return self.call_ors(ORSPayloadBuilder.build_base_payload(coordinates, include_tollways))
+
+    def get_route_avoiding_polygons(self, coordinates, polygons, include_tollways=True):
+        """Route évitant des polygones (appel compté)."""
+        return self.call_ors(ORSPayloadBuilder.build_avoid_polygons_payload(coordinates, polygons, include_tollways))
+
+    def get_route_avoid_tollways(self, coordinates):
+        """Route évitant les autoroutes à péage (appel compté)."""
+        return self.call_ors(ORSPayloadBuilder.build_avoid_tollways_payload(coordinates))
+
+
+def _summarize(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keep the comparable figures of an optimization result."""
+    result = result or {}
+    summary = {"status": result.get("status")}
+    for criterion in ("fastest", "cheapest", "min_tolls"):
+        route = result.get(criterion) or {}
+        summary[criterion] = {
+            "cost": route.get("cost"),
+            "duration_s": route.get("duration"),
+            "toll_count": route.get("toll_count"),
+        }
+    return summary
+
+
+def _gap(value: Optional[float], reference: Optional[float]) -> Optional[float]:
+    """Relative gap to the exhaustive reference (0.0 = same quality)."""
+    if value is None or reference is None:
+        return None
+    if reference == 0:
+        return 0.0 if value == 0 else float("inf")
+    return (value - reference) / reference
+
+
+def run_case(coordinates, kind, params, search, beam_width, max_comb_size) -> Dict[str, Any]:
+    """Run one optimization and return its quality and cost figures."""
+    ors = CountingORSService(ORSService())
+    start = time.perf_counter()
+    if kind == "tolls":
+        result = TollRouteOptimizer(ors).compute_route_with_toll_limit(
+            coordinates, params["max_tolls"], Config.DEFAULT_VEH_CLASS, max_comb_size, search, beam_width
+        )
+    else:
+        result = BudgetRouteOptimizer(ors).compute_route_with_budget_limit(
+            coordinates, params.get("max_price"), params.get("max_price_percent"),
+            Config.DEFAULT_VEH_CLASS, max_comb_size, search, beam_width
+        )
+    return {
+        "search": search,
+        "ors_calls": ors.calls,
+        "wall_time_s": round(time.perf_counter() - start, 3),
+        **_summarize(result),
+    }
+
+
+def run_benchmark(routes: Dict[str, List[List[float]]], beam_width: int, max_comb_size: int) -> List[Dict[str, Any]]:
+    """Run every route x constraint x search mode and attach quality gaps."""
+    rows = []
+    for route_name, coordinates in routes.items():
+        for label, kind, params in DEFAULT_CONSTRAINTS:
+            runs = {
+                search: run_case(coordinates, kind, params, search, beam_width, max_comb_size)
+                for search in Config.SEARCH_MODES
+            }
+            reference = runs["exhaustive"]
+            for search, run in runs.items():
+                run.update({
+                    "route": route_name,
+                    "constraint": label,
+                    "cheapest_cost_gap": _gap(run["cheapest"]["cost"], reference["cheapest"]["cost"]),
+                    "fastest_duration_gap": _gap(run["fastest"]["duration_s"], reference["fastest"]["duration_s"]),
+                    "call_ratio": run["ors_calls"] / reference["ors_calls"] if reference["ors_calls"] else None,
+                })
+                rows.append(run)
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]):
+    """Print a compact comparison table."""
+    header = f"{'route':<24}{'constraint':<14}{'search':<12}{'calls':>6}{'ratio':>8}{'cheap gap':>11}{'fast gap':>10}  status"
+    print(header)
+    print("-" * len(header))
+    fmt = lambda v: "-" if v is None else f"{v:+.1%}"
+    for row in rows:
+        ratio = "-" if row["call_ratio"] is None else f"{row['call_ratio']:.2f}"
+        print(f"{row['route']:<24}{row['constraint']:<14}{row['search']:<12}{row['ors_calls']:>6}{ratio:>8}"
+              f"{fmt(row['cheapest_cost_gap']):>11}{fmt(row['fastest_duration_gap']):>10}  {row['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare avoidance search modes (quality vs ORS calls)")
+    parser.add_argument("--beam-width", type=int, default=Config.DEFAULT_BEAM_WIDTH)
+    parser.add_argument("--max-comb-size", type=int, default=Config.DEFAULT_MAX_COMB_SIZE)
+    parser.add_argument("--output", help="Optional JSON output file")
+    args = parser.parse_args()
+
+    rows = run_benchmark(DEFAULT_ROUTES, args.beam_width, args.max_comb_size)
+    print_report(rows)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, default=str)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
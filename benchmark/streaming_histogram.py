@@ -0,0 +1,115 @@
+"""
+Streaming latency histogram with bounded relative error (HDR-style).
+
+Values (integers, typically nanoseconds) are counted in log-linear buckets:
+every power of two is split into 2**(SUB_BUCKET_BITS - 1) linear sub-buckets,
+so any recorded value is known within 1 / 2**(SUB_BUCKET_BITS - 1) of its true
+value (~3% with the default 5 bits) whatever its magnitude. Memory depends on
+the dynamic range, not on the number of samples.
+
+A histogram is not thread-safe: each thread records into its own instance and
+readers merge them.
+"""
+
+from typing import Dict, Iterable, Optional
+
+SUB_BUCKET_BITS = 5
+
+
+class StreamingHistogram:
+    """Log-linear histogram of non-negative integer values"""
+
+    __slots__ = ("sub_bits", "_half", "counts", "count", "total", "min", "max")
+
+    def __init__(self, sub_bits: int = SUB_BUCKET_BITS):
+        self.sub_bits = sub_bits
+        self._half = 1 << (sub_bits - 1)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        if value < (self._half << 1):
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return shift * self._half + (value >> shift)
+
+    def _bounds(self, index: int):
+        """(lowest, highest) value of a bucket"""
+        if index < (self._half << 1):
+            return index, index
+        shift = index // self._half - 1
+        mantissa = index - shift * self._half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        """Record a value (negative values are clamped to 0)"""
+        value = max(int(value), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "StreamingHistogram"):
+        """Add another histogram's counts to this one (same resolution)"""
+        for index, count in list(other.counts.items()):
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable["StreamingHistogram"], sub_bits: int = SUB_BUCKET_BITS):
+        """New histogram combining several ones"""
+        result = cls(sub_bits)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Highest value of the bucket holding the q-quantile (0 <= q <= 1), capped at max"""
+        if not self.count:
+            return None
+        threshold = max(q * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._bounds(index)[1], self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def buckets(self):
+        """Sorted (highest value, cumulative count) pairs, for cumulative exports"""
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            yield self._bounds(index)[1], seen
+
+    def summary(self, scale: float = 1e-6) -> Dict[str, float]:
+        """Count, total, mean, min, p50/p90/p99 and max, scaled (default: ns -> ms)"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": round(self.total * scale, 3),
+            "mean": round(self.mean * scale, 3),
+            "min": round(self.min * scale, 3),
+            "p50": round(self.percentile(0.5) * scale, 3),
+            "p90": round(self.percentile(0.9) * scale, 3),
+            "p99": round(self.percentile(0.99) * scale, 3),
+            "max": round(self.max * scale, 3),
+        }
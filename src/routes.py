@@ -1,21 +1,199 @@
 import json
 import os
-from flask import jsonify, request
+import threading
+from flask import jsonify, request, Response, g
 from flask_cors import CORS
 from pathlib import Path
 from src.services.tolls_finder import find_tolls_on_route
 from src.services.smart_route import SmartRouteService
+from src.services.job_manager import JobManager, JobQueueFullError
+from src.services.admission_controller import admission_controller, AdmissionRejected
+from src.services.geocode_proxy import geocode_proxy
+from src.services.toll_search_index import get_toll_search_index, DEFAULT_LIMIT, MAX_LIMIT
 from src.services.toll_locator import locate_tolls
+from src.services.metrics_exporter import http_metrics, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 import requests
 from dotenv import load_dotenv
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from src.services.ors_payload_builder import ORSPayloadBuilder
+from src.services.common.common_validator import CommonRouteValidator
+from src.services.common.iterative_avoidance import resolve_search_mode
+from src.services.common.pareto_archive import resolve_alternatives
+from src.services.common.progress_events import stream_optimization, STREAM_FORMATS
+from src.services.toll_cost import add_marginal_cost_by_class
+from benchmark.performance_tracker import performance_tracker
 
 load_dotenv()
 
 # Initialisation du service de routage intelligent
 smart_route_service = SmartRouteService()
+# Jobs asynchrones pour les optimisations longues
+job_manager = JobManager()
+performance_tracker.register_stats_provider("admission", admission_controller.get_stats)
+performance_tracker.register_stats_provider("geocode_proxy", geocode_proxy.get_stats)
+
+def parse_vehicle_classes(value, default="c1"):
+    """
+    Normalise le paramètre `vehicle_class` : une classe ou une liste de classes.
+
+    Returns:
+        tuple: (liste de classes sans doublon, True si une liste a été fournie)
+
+    Raises:
+        ValueError: Si une classe est invalide
+    """
+    if value is None:
+        value = default
+    is_list = isinstance(value, list)
+    classes = list(dict.fromkeys(value)) if is_list else [value]
+    if not classes:
+        raise ValueError("La liste des classes de véhicule est vide")
+    for veh_class in classes:
+        CommonRouteValidator.validate_vehicle_class(veh_class)
+    return classes, is_list
+
+def require_json_object(data):
+    """
+    Vérifie que le corps de requête est un objet JSON.
+
+    Raises:
+        ValueError: Si le corps est absent ou n'est pas un objet
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Le corps de la requête doit être un objet JSON")
+    return data
+
+def parse_max_tolls(value, default=99):
+    """
+    Normalise le paramètre `max_tolls` (entier ou chaîne numérique).
+
+    Raises:
+        ValueError: Si la valeur n'est pas un entier positif ou nul
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"max_tolls doit être un entier: {value!r}")
+    max_tolls = int(value)
+    CommonRouteValidator.validate_optimization_params(max_tolls=max_tolls)
+    return max_tolls
+
+def build_toll_computation(data, overrides=None):
+    """
+    Prépare le calcul /api/smart-route/tolls à partir du corps de requête.
+
+    Args:
+        data: Corps de la requête
+        overrides: Paramètres imposés par le niveau de qualité (contrôle d'admission)
+
+    Returns:
+        tuple: (fonction sans argument exécutant l'optimisation, paramètres canoniques)
+
+    Raises:
+        ValueError: Si un paramètre est invalide
+    """
+    require_json_object(data)
+    coords = data.get("coordinates")
+    max_tolls = parse_max_tolls(data.get("max_tolls"))
+    veh_classes, multi_class = parse_vehicle_classes(data.get("vehicle_class"))
+    search, beam_width = resolve_search_mode(data.get("search"), data.get("beam_width"))
+    alternatives = resolve_alternatives(data.get("alternatives"))
+    params = {"max_tolls": max_tolls, "vehicle_class": veh_classes if multi_class else veh_classes[0],
+              "search": search, "beam_width": beam_width, "alternatives": alternatives}
+    # Le niveau de qualité peut imposer un mode de recherche ou une largeur de faisceau réduits
+    options = {"search": search, "beam_width": beam_width, "alternatives": alternatives, **(overrides or {})}
+    if multi_class:
+        return lambda: smart_route_service.compute_route_with_toll_limit_by_class(
+            coords, max_tolls, veh_classes, **options
+        ), params
+    return lambda: smart_route_service.compute_route_with_toll_limit(
+        coords, max_tolls, veh_classes[0], **options
+    ), params
+
+def build_budget_computation(data, overrides=None):
+    """
+    Prépare le calcul /api/smart-route/budget à partir du corps de requête.
+
+    Args:
+        data: Corps de la requête
+        overrides: Paramètres imposés par le niveau de qualité (contrôle d'admission)
+
+    Returns:
+        tuple: (fonction sans argument exécutant l'optimisation, paramètres canoniques)
+
+    Raises:
+        ValueError: Si un paramètre est invalide
+    """
+    require_json_object(data)
+    coords = data.get("coordinates")
+    max_price = data.get("max_price")
+    max_price_percent = data.get("max_price_percent")
+    CommonRouteValidator.validate_optimization_params(max_price=max_price, max_price_percent=max_price_percent)
+    veh_classes, multi_class = parse_vehicle_classes(data.get("vehicle_class"))
+    search, beam_width = resolve_search_mode(data.get("search"), data.get("beam_width"))
+    alternatives = resolve_alternatives(data.get("alternatives"))
+    params = {"max_price": max_price, "max_price_percent": max_price_percent,
+              "vehicle_class": veh_classes if multi_class else veh_classes[0], "search": search, "beam_width": beam_width,
+              "alternatives": alternatives}
+    # Le niveau de qualité peut imposer un mode de recherche ou une largeur de faisceau réduits
+    options = {"search": search, "beam_width": beam_width, "alternatives": alternatives, **(overrides or {})}
+    if multi_class:
+        return lambda: smart_route_service.compute_route_with_budget_limit_by_class(
+            coords,
+            veh_classes,
+            max_price=max_price,
+            max_price_percent=max_price_percent,
+            **options
+        ), params
+    return lambda: smart_route_service.compute_route_with_budget_limit(
+        coords,
+        max_price=max_price,
+        max_price_percent=max_price_percent,
+        veh_class=veh_classes[0],
+        **options
+    ), params
+
+def admit_computation(kind, data, build_computation, params):
+    """
+    Soumet une optimisation au contrôle d'admission (coût estimé en appels ORS).
+
+    Returns:
+        function: Calcul à exécuter, au niveau de qualité permis par la charge ;
+        un résultat dégradé porte le champ `quality_tier`
+
+    Raises:
+        AdmissionRejected: Si le budget ORS ne permet pas de l'exécuter rapidement
+    """
+    admission = admission_controller.admit(kind, data.get("coordinates"), params)
+    compute, _ = build_computation(data, admission.overrides)
+    if not admission.overrides:
+        return compute
+
+    def degraded():
+        result = compute()
+        if isinstance(result, dict):
+            result["quality_tier"] = admission.tier
+        return result
+    return degraded
+
+def rejected_response(error):
+    """Réponse 429 avec le délai de nouvel essai."""
+    return jsonify({"error": str(error)}), 429, {"Retry-After": str(error.retry_after)}
+
+JOB_COMPUTATIONS = {
+    "tolls": build_toll_computation,
+    "budget": build_budget_computation,
+}
+
+def stream_format(req):
+    """Format du flux demandé : `?format=ndjson` ou en-tête Accept, SSE par défaut."""
+    fmt = req.args.get("format")
+    if fmt is None:
+        fmt = "ndjson" if STREAM_FORMATS["ndjson"] in req.headers.get("Accept", "") else "sse"
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Format de flux invalide: {fmt} (attendu: {', '.join(STREAM_FORMATS)})")
+    return fmt
 
 def register_routes(app):
     CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})  # Autorise uniquement le frontend
@@ -26,6 +204,25 @@ def register_routes(app):
         default_limits=[]
     )
 
+    # Index des gares construit en arrière-plan : la première recherche n'attend pas le chargement des CSV
+    threading.Thread(target=get_toll_search_index, daemon=True).start()
+
+    @app.before_request
+    def count_request_started():
+        http_metrics.request_started()
+        g.metrics_in_flight = True
+
+    @app.after_request
+    def count_response(response):
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        http_metrics.record_response(endpoint, request.method, response.status_code)
+        return response
+
+    @app.teardown_request
+    def count_request_finished(exc):
+        if g.pop("metrics_in_flight", False):
+            http_metrics.request_finished()
+
     @app.route('/')
     def index():
         return jsonify({"message": "Welcome to the Flask API!"})
@@ -73,6 +270,21 @@ def register_routes(app):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
         
+    @app.route('/api/tolls/search', methods=['GET'])
+    def search_tolls():
+        text = request.args.get('text')
+        if not text:
+            return jsonify({"error": "Missing text parameter"}), 400
+        try:
+            limit = int(request.args.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return jsonify({"error": "limit doit être un entier"}), 400
+        if not 1 <= limit <= MAX_LIMIT:
+            return jsonify({"error": f"limit doit être compris entre 1 et {MAX_LIMIT}"}), 400
+        open_only = request.args.get('open', '').lower() in ("1", "true", "yes")
+        results = get_toll_search_index().search(text, limit, open_only=open_only)
+        return jsonify({"query": text, "results": results})
+
     @app.route('/api/route/', methods=['POST'])
     def api_route_post():
         ors_base_url = os.environ.get("ORS_BASE_URL")
@@ -80,6 +292,10 @@ def register_routes(app):
         print("Received data:", data)
         if not data or 'coordinates' not in data:
             return jsonify({"error": "Missing coordinates"}), 400
+        try:
+            veh_classes, multi_class = parse_vehicle_classes(data.get("vehicle_class"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Utilise le builder pour inclure "language": "fr" et demander GeoJSON
         payload = ORSPayloadBuilder.build_custom_payload(
@@ -112,92 +328,145 @@ def register_routes(app):
                     "features": [ors_result["features"][0]]
                 }
             cost = None
+            costs = None
             toll_count = None
             if route_geojson:
                 csv_path = os.path.join(os.path.dirname(__file__), "../data/barriers.csv")
                 tolls_dict = locate_tolls(route_geojson, csv_path, buffer_m=120)
-                from src.services.toll_cost import add_marginal_cost
-                tolls = add_marginal_cost(tolls_dict["on_route"], veh_class="c1")
-                cost = sum(t.get("cost", 0) for t in tolls)
+                # 2. Un seul passage sur la table tarifaire pour toutes les classes
+                tolls = tolls_dict["on_route"]
+                costs = add_marginal_cost_by_class(tolls, veh_classes)
+                cost = costs[veh_classes[0]]
                 toll_count = len(tolls)
             # Réponse enrichie
-            return jsonify({
+            response = {
                 **ors_result,
                 "cost": cost,
                 "toll_count": toll_count
-            })
+            }
+            if multi_class:
+                response["costs"] = costs
+            return jsonify(response)
         except requests.RequestException as e:
             return jsonify({"error": str(e)}), 500   
         
-    @app.route('/api/smart-route/tolls', methods=['POST'])
-    def smart_route_tolls():
+    def cached_response(kind, build_computation):
+        """Réponse servie depuis le cache inter-requêtes (en-tête X-Cache: HIT/MISS)."""
         data = request.get_json()
-        coords = data.get("coordinates")
-        max_tolls = int(data.get("max_tolls", 99))
-        veh_class = data.get("vehicle_class", "c1")
         try:
-            res = smart_route_service.compute_route_with_toll_limit(coords, max_tolls, veh_class)
-            return jsonify(res)
+            _, params = build_computation(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            # Admission seulement si le cache ne répond pas : un HIT ne coûte aucun appel ORS
+            body, hit = smart_route_service.compute_cached(
+                kind, data.get("coordinates"), params,
+                lambda: admit_computation(kind, data, build_computation, params)()
+            )
+            return Response(body, mimetype="application/json", headers={"X-Cache": "HIT" if hit else "MISS"})
+        except AdmissionRejected as e:
+            return rejected_response(e)
         except Exception as e:
-            return jsonify({"error": str(e)}), 500    
+            return jsonify({"error": str(e)}), 500
+
+    @app.route('/api/smart-route/tolls', methods=['POST'])
+    def smart_route_tolls():
+        return cached_response("tolls", build_toll_computation)
         
     @app.route('/api/smart-route/budget', methods=['POST'])
     def smart_route_budget():
+        return cached_response("budget", build_budget_computation)
+
+    def stream_response(kind, build_computation):
+        """Flux SSE / NDJSON : route de base, améliorations, puis résumé final."""
         data = request.get_json()
-        coords = data.get("coordinates")
-        veh_class = data.get("vehicle_class", "c1")
-        max_price = data.get("max_price")
-        max_price_percent = data.get("max_price_percent")
         try:
-            res = smart_route_service.compute_route_with_budget_limit(
-                coords,
-                max_price=max_price,
-                max_price_percent=max_price_percent,
-                veh_class=veh_class
-            )
-            return jsonify(res)
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            _, params = build_computation(data)
+            fmt = stream_format(request)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            compute = admit_computation(kind, data, build_computation, params)
+        except AdmissionRejected as e:
+            return rejected_response(e)
+        return Response(
+            stream_optimization(compute, fmt),
+            mimetype=STREAM_FORMATS[fmt],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
 
-    @app.route('/api/geocode/search', methods=['GET'])
-    @limiter.limit("6 per minute")
-    def geocode_search():
+    @app.route('/api/smart-route/tolls/stream', methods=['POST'])
+    def smart_route_tolls_stream():
+        return stream_response("tolls", build_toll_computation)
+
+    @app.route('/api/smart-route/budget/stream', methods=['POST'])
+    def smart_route_budget_stream():
+        return stream_response("budget", build_budget_computation)
+
+    @app.route('/api/smart-route/jobs', methods=['POST'])
+    def create_smart_route_job():
+        data = request.get_json()
+        kind = data.get("type") if isinstance(data, dict) else None
+        if kind not in JOB_COMPUTATIONS:
+            return jsonify({"error": f"Type de job invalide: {kind} (attendu: {', '.join(JOB_COMPUTATIONS)})"}), 400
+        build_computation = JOB_COMPUTATIONS[kind]
+        try:
+            _, params = build_computation(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            # Même contrôle d'admission (et même dégradation) que les appels synchrones
+            compute = admit_computation(kind, data, build_computation, params)
+        except AdmissionRejected as e:
+            return rejected_response(e)
+        try:
+            job_id = job_manager.submit(kind, compute, params=data)
+        except JobQueueFullError as e:
+            return jsonify({"error": str(e)}), 503
+        return jsonify({
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/smart-route/jobs/{job_id}"
+        }), 202
+
+    @app.route('/api/smart-route/jobs/<job_id>', methods=['GET'])
+    def get_smart_route_job(job_id):
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job inconnu ou expiré"}), 404
+        return jsonify(job)
+
+    def geocode_response(endpoint):
+        """Géocodage via le proxy en cache (en-tête X-Cache: HIT/MISS)."""
         api_key = os.environ.get("ORS_API_KEY")
         text = request.args.get('text')
         if not api_key or not text:
             return jsonify({"error": "Missing ORS_API_KEY or text parameter"}), 400
-        url = "https://api.openrouteservice.org/geocode/search"
-        params = {
-            "api_key": api_key,
-            "text": text,
-            "boundary.country": "FR"
-        }
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return jsonify(response.json())
+            data, hit = geocode_proxy.get(endpoint, text, api_key)
+            return jsonify(data), 200, {"X-Cache": "HIT" if hit else "MISS"}
         except requests.RequestException as e:
             return jsonify({"error": str(e)}), 500
 
+    def geocode_cache_miss(response):
+        """Seuls les appels effectifs au service externe consomment la limite de débit."""
+        return response.headers.get("X-Cache") != "HIT"
+
+    @app.route('/api/geocode/search', methods=['GET'])
+    @limiter.limit("6 per minute", deduct_when=geocode_cache_miss)
+    def geocode_search():
+        return geocode_response("search")
+
     @app.route('/api/geocode/autocomplete', methods=['GET'])
-    @limiter.limit("6 per minute")
+    @limiter.limit("6 per minute", deduct_when=geocode_cache_miss)
     def geocode_autocomplete():
-        api_key = os.environ.get("ORS_API_KEY")
-        text = request.args.get('text')
-        if not api_key or not text:
-            return jsonify({"error": "Missing ORS_API_KEY or text parameter"}), 400
-        url = "https://api.openrouteservice.org/geocode/autocomplete"
-        params = {
-            "api_key": api_key,
-            "text": text,
-            "boundary.country": "FR"
-        }
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return jsonify(response.json())
-        except requests.RequestException as e:
-            return jsonify({"error": str(e)}), 500
+        return geocode_response("autocomplete")
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Métriques cumulées au format OpenMetrics (Prometheus)."""
+        body = render_metrics(performance_tracker.metrics_snapshot(), http_metrics.snapshot())
+        return Response(body, content_type=METRICS_CONTENT_TYPE)
 
     @app.route("/health", methods=["GET"])
     def health():
@@ -0,0 +1,198 @@
+"""
+admission_controller.py
+-----------------------
+
+Contrôle d'admission des optimisations smart-route selon leur coût estimé.
+Responsabilité unique : protéger ORS des rafales de recherches coûteuses.
+
+- Coût d'une requête : nombre d'appels ORS estimé à partir du nombre de péages
+  probable (longueur à vol d'oiseau) et de la taille des combinaisons testées
+- Budget global en seau à jetons (rafale ADMISSION_BUDGET, débit ADMISSION_REFILL_PER_S)
+- Sous charge, la requête passe à un niveau de qualité moins coûteux
+  (combinaisons plus petites, faisceau de largeur 1 au lieu d'un faisceau large,
+  puis évitement péage par péage sans recherche de péage ouvert dans tout le réseau) ;
+  un niveau dont l'estimation n'est pas inférieure au précédent est ignoré
+- Si même le niveau le moins coûteux ne passe pas, la requête attend brièvement
+  (réservation de jetons, donc file FIFO) ou est refusée avec un délai de nouvel essai
+"""
+import math
+import threading
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+from src.utils.route_utils import haversine_m
+
+
+# Niveaux de qualité, du plus complet au moins coûteux : (nom, paramètres imposés)
+QUALITY_TIERS = (
+    ("full", {}),
+    ("reduced", {"max_comb_size": 1, "beam_width": 1}),
+    ("minimal", {"search": "exhaustive", "max_comb_size": 1, "network_search": False}),
+)
+
+
+class AdmissionRejected(Exception):
+    """Budget ORS épuisé : la requête doit être retentée plus tard."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Serveur saturé, réessayez dans {retry_after} s")
+        self.retry_after = retry_after
+
+
+class Admission(NamedTuple):
+    """Décision d'admission."""
+    tier: str            # Niveau de qualité retenu
+    overrides: Dict      # Paramètres imposés par ce niveau
+    cost: float          # Jetons consommés (appels ORS estimés)
+    waited_s: float      # Attente imposée avant l'exécution
+
+
+def _route_length_km(coordinates) -> float:
+    """Longueur à vol d'oiseau du trajet (0 si les coordonnées sont invalides)."""
+    try:
+        return sum(float(haversine_m(a[0], a[1], b[0], b[1])) for a, b in zip(coordinates, coordinates[1:])) / 1000
+    except (TypeError, IndexError, ValueError):
+        return 0.0
+
+
+def estimate_ors_calls(kind: str, coordinates, params: Dict, overrides: Dict = None) -> int:
+    """
+    Estime le nombre d'appels ORS d'une optimisation.
+
+    Args:
+        kind: Type d'optimisation ("tolls", "budget")
+        coordinates: Liste de points [lon, lat]
+        params: Paramètres canoniques de la requête (max_tolls, search, beam_width...)
+        overrides: Paramètres imposés par le niveau de qualité
+
+    Returns:
+        int: Appels ORS estimés (route de base et route sans péage comprises)
+    """
+    settings = {"max_comb_size": Config.DEFAULT_MAX_COMB_SIZE, "network_search": True}
+    settings.update(params)
+    settings.update(overrides or {})
+    toll_count = max(1, math.ceil(_route_length_km(coordinates or []) / Config.ADMISSION_KM_PER_TOLL))
+
+    calls = 2
+    if kind == "tolls" and settings.get("max_tolls") == 0:
+        return calls
+    if kind == "tolls" and settings.get("max_tolls") == 1:
+        # Deux demi-trajets par péage ouvert testé, à proximité puis dans le réseau
+        calls += 2 * Config.MAX_NEARBY_TOLLS_TO_TEST * (2 if settings["network_search"] else 1)
+
+    search = settings.get("search", Config.DEFAULT_SEARCH_MODE)
+    if search == "exhaustive":
+        max_size = min(settings["max_comb_size"], toll_count)
+        calls += sum(math.comb(toll_count, size) for size in range(1, max_size + 1))
+    else:
+        width = (settings.get("beam_width") or 1) if search == "beam" else 1
+        calls += width * toll_count * min(toll_count, Config.MAX_ITERATIVE_DEPTH)
+    return calls
+
+
+def quality_tiers(kind: str) -> List[Tuple[str, Dict]]:
+    """Niveaux de qualité applicables à un type d'optimisation (sans doublon)."""
+    tiers = []
+    for name, overrides in QUALITY_TIERS:
+        if kind != "tolls":
+            overrides = {k: v for k, v in overrides.items() if k != "network_search"}
+        if all(overrides != existing for _, existing in tiers):
+            tiers.append((name, overrides))
+    return tiers
+
+
+class AdmissionController:
+    """Seau à jetons partagé par les optimisations smart-route."""
+
+    def __init__(self, budget: float = Config.ADMISSION_BUDGET, refill_per_s: float = Config.ADMISSION_REFILL_PER_S,
+                 max_wait_s: float = Config.ADMISSION_MAX_WAIT_S, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            budget: Capacité du seau (appels ORS estimés admissibles en rafale)
+            refill_per_s: Jetons rendus par seconde
+            max_wait_s: Attente maximale avant refus
+            clock: Horloge monotone (secondes)
+            sleep: Fonction d'attente
+        """
+        self.budget = budget
+        self.refill_per_s = refill_per_s
+        self.max_wait_s = max_wait_s
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(budget)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._stats = {"admitted": {name: 0 for name, _ in QUALITY_TIERS}, "queued": 0, "rejected": 0, "wait_s": 0.0}
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.budget, self._tokens + (now - self._updated) * self.refill_per_s)
+        self._updated = now
+
+    def admit(self, kind: str, coordinates, params: Dict) -> Admission:
+        """
+        Admet une optimisation au niveau de qualité le plus complet que le budget permet.
+
+        Args:
+            kind: Type d'optimisation ("tolls", "budget")
+            coordinates: Liste de points [lon, lat]
+            params: Paramètres canoniques de la requête
+
+        Returns:
+            Admission: Niveau retenu, paramètres imposés, coût et attente
+
+        Raises:
+            AdmissionRejected: Si l'attente nécessaire dépasse max_wait_s
+        """
+        # Seuls les niveaux réellement moins coûteux que le précédent sont proposés
+        candidates, previous = [], None
+        for name, overrides in quality_tiers(kind):
+            estimate = estimate_ors_calls(kind, coordinates, params, overrides)
+            if previous is None or estimate < previous:
+                # Un coût supérieur à la capacité est plafonné : la requête passe quand le seau est plein
+                candidates.append((name, overrides, min(estimate, self.budget)))
+                previous = estimate
+        with self._lock:
+            self._refill()
+            for name, overrides, cost in candidates:
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    self._stats["admitted"][name] += 1
+                    return Admission(name, overrides, cost, 0.0)
+
+            name, overrides, cost = min(candidates, key=lambda candidate: candidate[2])
+            wait = (cost - self._tokens) / self.refill_per_s
+            if wait > self.max_wait_s:
+                self._stats["rejected"] += 1
+                raise AdmissionRejected(max(1, math.ceil(wait)))
+            # Réservation : les requêtes suivantes attendent derrière celle-ci
+            self._tokens -= cost
+            self._stats["admitted"][name] += 1
+            self._stats["queued"] += 1
+            self._stats["wait_s"] += wait
+        self._sleep(wait)
+        return Admission(name, overrides, cost, wait)
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne les statistiques d'admission.
+
+        Returns:
+            dict: Jetons disponibles, admissions par niveau, requêtes mises en attente et refusées
+        """
+        with self._lock:
+            self._refill()
+            stats = {
+                "tokens": round(self._tokens, 1),
+                "budget": self.budget,
+                "admitted": dict(self._stats["admitted"]),
+                "queued": self._stats["queued"],
+                "rejected": self._stats["rejected"],
+            }
+            stats["avg_wait_s"] = self._stats["wait_s"] / self._stats["queued"] if self._stats["queued"] else 0.0
+        return stats
+
+
+# Instance globale : le budget ORS est commun à toutes les requêtes du processus
+admission_controller = AdmissionController()
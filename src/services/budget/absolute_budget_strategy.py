@@ -15,9 +15,13 @@ from src.services.budget.error_handler import BudgetErrorHandler
 from src.services.ors_config_manager import ORSConfigManager
 from src.services.common.budget_messages import BudgetMessages
 from src.services.common.common_messages import CommonMessages
-from src.services.toll_locator import locate_tolls, get_all_open_tolls_by_proximity
 from src.services.toll_cost import add_marginal_cost, add_marginal_cost_cached
+from src.services.toll_cost_bounds import get_min_cost_index
 from src.utils.poly_utils import avoidance_multipolygon
+from src.utils.avoidance_shapes import avoidance_shapes
+from src.services.common.candidate_evaluator import CandidateEvaluationEngine
+from src.services.common.iterative_avoidance import IterativeAvoidanceSearch
+from src.services.common.progress_events import emit_progress
 from itertools import combinations
 
 
@@ -35,7 +39,8 @@ class AbsoluteBudgetStrategy:
         self.ors = ors_service
         self.route_calculator = BudgetRouteCalculator(ors_service)
     
-    def compute_absolute_budget_route(self, coordinates, max_price, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE):
+    def compute_absolute_budget_route(self, coordinates, max_price, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE,
+                                      search=Config.DEFAULT_SEARCH_MODE, beam_width=Config.DEFAULT_BEAM_WIDTH):
         """
         Calcule un itinéraire avec contrainte budgétaire absolue en euros.
         
@@ -44,6 +49,8 @@ class AbsoluteBudgetStrategy:
             max_price: Budget maximum en euros
             veh_class: Classe de véhicule
             max_comb_size: Limite pour les combinaisons de péages à éviter
+            search: Mode de recherche des péages à éviter ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
             
         Returns:
             dict: Résultat formaté ou erreur
@@ -68,6 +75,9 @@ class AbsoluteBudgetStrategy:
                 base_route = self.route_calculator.get_base_route_with_tracking(coordinates)
                   # 2) Calculer le coût de base
                 base_cost, base_duration, base_toll_count = self._get_base_metrics(base_route, veh_class)
+                emit_progress("base", route=ResultFormatter.format_route_result(
+                    base_route, base_cost, base_duration, base_toll_count
+                ))
                 print(BudgetMessages.BASE_ROUTE_COST.format(cost=base_cost))
                 print(BudgetMessages.BUDGET_LIMIT.format(limit=max_price))
                 
@@ -81,9 +91,21 @@ class AbsoluteBudgetStrategy:
                         route_result, Config.StatusCodes.BUDGET_ALREADY_SATISFIED
                     )
                 
-                # 4) Rechercher des alternatives moins chères
+                # 4) Budget sous le coût minimal des gares le long de la route de base : fallback direct
+                route_coordinates = base_route["features"][0]["geometry"]["coordinates"]
+                if get_min_cost_index().is_budget_infeasible(coordinates, max_price, veh_class, route_coordinates):
+                    print(f"🚫 Budget {max_price:.2f}€ inférieur au coût minimal du corridor - Fallback direct")
+                    base_route_data = ResultFormatter.format_route_result(
+                        base_route, base_cost, base_duration, base_toll_count
+                    )
+                    return ResultFormatter.format_optimization_results(
+                        fastest=base_route_data, cheapest=base_route_data, min_tolls=base_route_data,
+                        status=Config.StatusCodes.NO_ROUTE_WITHIN_BUDGET
+                    )
+                
+                # 5) Rechercher des alternatives moins chères
                 optimization_result = self._optimize_route_for_absolute_budget(
-                    coordinates, base_route, base_cost, max_price, veh_class, max_comb_size
+                    coordinates, base_route, base_cost, max_price, veh_class, max_comb_size, search, beam_width
                 )
                 
                 return optimization_result
@@ -106,27 +128,30 @@ class AbsoluteBudgetStrategy:
             
             return base_cost, base_duration, base_toll_count
     
-    def _optimize_route_for_absolute_budget(self, coordinates, base_route, base_cost, max_price, veh_class, max_comb_size):
+    def _optimize_route_for_absolute_budget(self, coordinates, base_route, base_cost, max_price, veh_class, max_comb_size,
+                                            search=Config.DEFAULT_SEARCH_MODE, beam_width=Config.DEFAULT_BEAM_WIDTH):
         """Optimise la route pour respecter la contrainte budgétaire absolue."""
         with performance_tracker.measure_operation(Config.Operations.OPTIMIZE_ABSOLUTE_BUDGET):
             
             # Initialiser le gestionnaire de résultats avec la route de base
             result_manager = RouteResultManager()
+            tolls_dict = self.route_calculator.locate_and_cost_tolls(
+                base_route, veh_class, Config.Operations.LOCATE_TOLLS_ABSOLUTE_BUDGET
+            )
             base_route_data = ResultFormatter.format_route_result(
                 base_route, base_cost, 
                 base_route["features"][0]["properties"]["summary"]["duration"],
-                len(locate_tolls(base_route, Config.get_barriers_csv_path())["on_route"])
+                len(tolls_dict["on_route"])
             )
             result_manager.update_with_route(base_route_data, float('inf'))
             
-            # Localiser tous les péages disponibles pour optimisation
-            tolls_dict = locate_tolls(base_route, Config.get_barriers_csv_path())
+            # Péages disponibles pour optimisation (déjà localisés pour la route de base)
             tolls_on_route = tolls_dict["on_route"]
             tolls_nearby = tolls_dict["nearby"]
             
             # Enrichir avec les péages à proximité
             max_distance_m = Config.MAX_DISTANCE_SEARCH_M
-            all_tolls_nearby = get_all_open_tolls_by_proximity(base_route, Config.get_barriers_csv_path(), max_distance_m)
+            all_tolls_nearby = self.route_calculator.get_open_tolls_by_proximity(base_route, max_distance_m)
             if not all_tolls_nearby:
                 all_tolls_nearby = []
             # Combiner tous les péages et calculer leurs coûts avec cache
@@ -148,77 +173,104 @@ class AbsoluteBudgetStrategy:
             budget_gap = base_cost - max_price
             print(BudgetMessages.BUDGET_GAP.format(gap=budget_gap))
             
+            # Modes itératifs : évitement pas à pas des péages de la route courante
+            if search != "exhaustive":
+                self._test_iterative_avoidance(
+                    coordinates, base_route_data, tolls_on_route, max_price, veh_class, beam_width, result_manager
+                )
+                return self._build_absolute_budget_result(result_manager, max_price)
+            
+            # Moteur partagé : un péage déjà testé n'est pas réévalué d'une phase à l'autre
+            engine = CandidateEvaluationEngine()
+            
             # Optimisation intelligente : d'abord cibler les péages qui peuvent combler l'écart
             promising_tolls = [t for t in all_tolls_sorted if t.get("cost", 0) >= budget_gap * 0.5]
             if promising_tolls:
                 print(BudgetMessages.PROMISING_TOLLS.format(count=len(promising_tolls)))
                 # Tester d'abord les péages les plus prometteurs
                 self._test_promising_toll_avoidance(
-                    coordinates, promising_tolls, max_price, veh_class, result_manager
+                    coordinates, promising_tolls, max_price, veh_class, result_manager, engine
                 )
             
             # Tester l'évitement des péages individuellement
             if not self._has_budget_compliant_route(result_manager, max_price):
                 self._test_individual_toll_avoidance(
-                    coordinates, all_tolls_sorted, max_price, veh_class, result_manager
+                    coordinates, all_tolls_sorted, max_price, veh_class, result_manager, engine
                 )
             
             # Tester des combinaisons de péages si nécessaire
             if not self._has_budget_compliant_route(result_manager, max_price):
                 self._test_toll_combinations(
-                    coordinates, all_tolls_sorted, max_price, veh_class, max_comb_size, result_manager
+                    coordinates, all_tolls_sorted, max_price, veh_class, max_comb_size, result_manager, engine
                 )
             
             # Construire le résultat final
             return self._build_absolute_budget_result(result_manager, max_price)
     
-    def _test_promising_toll_avoidance(self, coordinates, promising_tolls, max_price, veh_class, result_manager):
+    def _test_promising_toll_avoidance(self, coordinates, promising_tolls, max_price, veh_class, result_manager, engine):
         """Teste en priorité l'évitement des péages les plus prometteurs."""
         with performance_tracker.measure_operation(Config.Operations.TEST_PROMISING_TOLLS_ABSOLUTE):
             print(CommonMessages.TESTING_PROMISING_TOLLS)
             
-            for toll in promising_tolls:
-                if toll.get("cost", 0) <= 0:
-                    continue
-                
-                print(CommonMessages.TESTING_TOLL.format(toll_id=toll['id'], cost=toll.get('cost', 0)))
+            def candidates():
+                for toll in promising_tolls:
+                    if toll.get("cost", 0) <= 0:
+                        continue
+                    print(CommonMessages.TESTING_TOLL.format(toll_id=toll['id'], cost=toll.get('cost', 0)))
+                    yield (toll,)
+            
+            def merge(avoid_set, route_data):
+                if not route_data:
+                    return False
+                updated = result_manager.update_with_route(route_data, float('inf'))
                 
-                route_data = self._test_single_toll_avoidance(coordinates, toll, veh_class)
-                if route_data:
-                    updated = result_manager.update_with_route(route_data, float('inf'))
+                # Arrêt anticipé si on trouve une solution dans le budget
+                if updated and route_data["cost"] <= max_price:
+                    print(BudgetMessages.SOLUTION_WITHIN_BUDGET.format(cost=route_data['cost'], budget=max_price))
                     
-                    # Arrêt anticipé si on trouve une solution dans le budget
-                    if updated and route_data["cost"] <= max_price:
-                        print(BudgetMessages.SOLUTION_WITHIN_BUDGET.format(cost=route_data['cost'], budget=max_price))
-                        
-                        # Si c'est gratuit, on peut s'arrêter immédiatement
-                        if route_data["cost"] == 0:
-                            print(CommonMessages.FREE_ROUTE_FOUND)
-                            break
+                    # Si c'est gratuit, on peut s'arrêter immédiatement
+                    if route_data["cost"] == 0:
+                        print(CommonMessages.FREE_ROUTE_FOUND)
+                        return True
+                return False
+            
+            engine.run(
+                candidates(),
+                lambda avoid_set: self._test_single_toll_avoidance(coordinates, avoid_set[0], veh_class),
+                merge
+            )
     
-    def _test_individual_toll_avoidance(self, coordinates, all_tolls_sorted, max_price, veh_class, result_manager):
+    def _test_individual_toll_avoidance(self, coordinates, all_tolls_sorted, max_price, veh_class, result_manager, engine):
         """Teste l'évitement des péages individuellement."""
         with performance_tracker.measure_operation(Config.Operations.TEST_INDIVIDUAL_TOLLS_ABSOLUTE):
             print(CommonMessages.TESTING_INDIVIDUAL_TOLLS)
             
-            for toll in all_tolls_sorted:
-                if toll.get("cost", 0) <= 0:
-                    continue
+            def candidates():
+                for toll in all_tolls_sorted:
+                    if toll.get("cost", 0) <= 0:
+                        continue
+                    print(CommonMessages.TESTING_TOLL_AVOIDANCE.format(toll_id=toll['id'], cost=toll.get('cost', 0)))
+                    yield (toll,)
+            
+            def merge(avoid_set, route_data):
+                if not route_data:
+                    return False
+                updated = result_manager.update_with_route(route_data, float('inf'))
                 
-                print(CommonMessages.TESTING_TOLL_AVOIDANCE.format(toll_id=toll['id'], cost=toll.get('cost', 0)))
+                # Arrêt anticipé si on trouve une solution optimale
+                if updated and route_data["cost"] == 0:
+                    print(CommonMessages.FREE_ROUTE_FOUND)
+                    return True
                 
-                route_data = self._test_single_toll_avoidance(coordinates, toll, veh_class)
-                if route_data:
-                    updated = result_manager.update_with_route(route_data, float('inf'))
-                    
-                    # Arrêt anticipé si on trouve une solution optimale
-                    if updated and route_data["cost"] == 0:
-                        print(CommonMessages.FREE_ROUTE_FOUND)
-                        break
-                    
-                    # Arrêt anticipé si on a une bonne solution dans le budget
-                    if route_data["cost"] <= max_price:
-                        print(BudgetMessages.SOLUTION_WITHIN_BUDGET.format(cost=route_data['cost'], budget=max_price))
+                if route_data["cost"] <= max_price:
+                    print(BudgetMessages.SOLUTION_WITHIN_BUDGET.format(cost=route_data['cost'], budget=max_price))
+                return False
+            
+            engine.run(
+                candidates(),
+                lambda avoid_set: self._test_single_toll_avoidance(coordinates, avoid_set[0], veh_class),
+                merge
+            )
     
     def _test_single_toll_avoidance(self, coordinates, toll, veh_class):
         """Teste l'évitement d'un péage spécifique."""
@@ -242,9 +294,8 @@ class AbsoluteBudgetStrategy:
             
             # Vérifier que le péage est bien évité
             avoided_id = str(toll["id"]).strip().lower()
-            present_ids = set(str(t["id"]).strip().lower() for t in alt_tolls_on_route)
             
-            if avoided_id in present_ids:
+            if not avoidance_shapes.record_avoidance([toll], alt_tolls_on_route):
                 print(CommonMessages.TOLL_NOT_AVOIDED.format(toll_id=avoided_id))
                 return None
             
@@ -256,46 +307,48 @@ class AbsoluteBudgetStrategy:
             print(CommonMessages.TOLL_AVOIDANCE_ERROR.format(toll_id=toll['id'], error=str(e)))
             return None
     
-    def _test_toll_combinations(self, coordinates, all_tolls_sorted, max_price, veh_class, max_comb_size, result_manager):
+    def _test_toll_combinations(self, coordinates, all_tolls_sorted, max_price, veh_class, max_comb_size, result_manager, engine):
         """Teste des combinaisons de péages à éviter."""
         with performance_tracker.measure_operation(Config.Operations.TEST_COMBINATIONS_ABSOLUTE):
             print("Test des combinaisons de péages...")
             
-            seen_combinations = set()
-            
-            for k in range(2, min(len(all_tolls_sorted), max_comb_size, 5) + 1):
-                for to_avoid in combinations(all_tolls_sorted, k):
-                    # Éviter les doublons
-                    sig = tuple(sorted(t["id"] for t in to_avoid))
-                    if sig in seen_combinations:
-                        continue
-                    seen_combinations.add(sig)
-                      # Heuristique d'optimisation : calculer l'économie potentielle
-                    potential_saving = sum(t.get("cost", 0) for t in to_avoid)
-                    if potential_saving <= 0:
-                        continue
-                    
-                    # Pré-filtrage rentabilité : ignorer les économies négligeables (< 5% du budget)
-                    min_worthwhile_saving = max_price * 0.05
-                    if potential_saving < min_worthwhile_saving:
-                        continue
+            def candidates():
+                for k in range(2, min(len(all_tolls_sorted), max_comb_size, 5) + 1):
+                    # Arrêt anticipé si on a déjà une bonne solution
+                    if self._has_budget_compliant_route(result_manager, max_price):
+                        return
                     
-                    # Prioriser les combinaisons qui peuvent potentiellement résoudre le problème budgétaire
-                    current_best_cost = result_manager.get_results().get("cheapest", {}).get("cost", float('inf'))
-                    if current_best_cost - potential_saving > max_price:
-                        continue  # Cette combinaison ne peut pas résoudre le problème
-                    
-                    route_data = self._test_combination_avoidance(coordinates, to_avoid, veh_class)
-                    if route_data:
-                        updated = result_manager.update_with_route(route_data, float('inf'))
+                    for to_avoid in combinations(all_tolls_sorted, k):
+                        # Heuristique d'optimisation : calculer l'économie potentielle
+                        potential_saving = sum(t.get("cost", 0) for t in to_avoid)
+                        if potential_saving <= 0:
+                            continue
+                        
+                        # Pré-filtrage rentabilité : ignorer les économies négligeables (< 5% du budget)
+                        min_worthwhile_saving = max_price * 0.05
+                        if potential_saving < min_worthwhile_saving:
+                            continue
                         
-                        # Arrêt anticipé si solution optimale trouvée
-                        if updated and route_data["cost"] <= max_price and route_data["cost"] == 0:
-                            break
+                        # Prioriser les combinaisons qui peuvent potentiellement résoudre le problème budgétaire
+                        current_best_cost = result_manager.get_results().get("cheapest", {}).get("cost", float('inf'))
+                        if current_best_cost - potential_saving > max_price:
+                            continue  # Cette combinaison ne peut pas résoudre le problème
+                        
+                        yield to_avoid
+            
+            def merge(to_avoid, route_data):
+                if not route_data:
+                    return False
+                updated = result_manager.update_with_route(route_data, float('inf'))
                 
-                # Arrêt anticipé si on a déjà une bonne solution
-                if self._has_budget_compliant_route(result_manager, max_price):
-                    break
+                # Arrêt anticipé si solution optimale trouvée
+                return updated and route_data["cost"] == 0
+            
+            engine.run(
+                candidates(),
+                lambda to_avoid: self._test_combination_avoidance(coordinates, to_avoid, veh_class),
+                merge
+            )
     
     def _test_combination_avoidance(self, coordinates, to_avoid, veh_class):
         """Teste l'évitement d'une combinaison de péages."""
@@ -309,10 +362,7 @@ class AbsoluteBudgetStrategy:
             alt_tolls_on_route = alt_tolls_dict["on_route"]
             
             # Vérifier que les péages à éviter sont bien évités
-            avoided_ids = set(str(t["id"]).strip().lower() for t in to_avoid)
-            present_ids = set(str(t["id"]).strip().lower() for t in alt_tolls_on_route)
-            
-            if avoided_ids & present_ids:
+            if not avoidance_shapes.record_avoidance(to_avoid, alt_tolls_on_route):
                 return None
             
             cost = sum(t.get("cost", 0) for t in alt_tolls_on_route)
@@ -324,6 +374,37 @@ class AbsoluteBudgetStrategy:
         except Exception:
             return None
     
+    def _test_iterative_avoidance(self, coordinates, base_route_data, tolls_on_route, max_price, veh_class, beam_width, result_manager):
+        """Évite itérativement le péage le plus cher de la route courante (modes greedy/beam)."""
+        with performance_tracker.measure_operation(Config.Operations.TEST_ITERATIVE_ABSOLUTE, {
+            "beam_width": beam_width
+        }):
+            base_outcome = {"route_data": base_route_data, "crossed_tolls": tolls_on_route, **base_route_data}
+            
+            def evaluate(to_avoid):
+                alternative = self.route_calculator.calculate_alternative_avoiding_tolls(
+                    coordinates, list(to_avoid), max_price, "absolute", veh_class
+                )
+                if not alternative:
+                    return None
+                fully_avoided = alternative["successfully_avoided"] == len(to_avoid)
+                route_data = ResultFormatter.format_route_result(
+                    alternative["route"], alternative["cost"], alternative["duration"], alternative["toll_count"]
+                )
+                return {"route_data": route_data if fully_avoided else None, "crossed_tolls": alternative["tolls"], **route_data}
+            
+            def merge(to_avoid, outcome):
+                if not outcome or not outcome["route_data"]:
+                    return False
+                updated = result_manager.update_with_route(outcome["route_data"], float('inf'))
+                return updated and outcome["cost"] == 0
+            
+            IterativeAvoidanceSearch(beam_width).run(
+                base_outcome, evaluate, merge,
+                is_goal=lambda outcome: outcome["cost"] <= max_price,
+                rank=lambda outcome: (outcome["cost"], outcome["duration"])
+            )
+    
     def _has_budget_compliant_route(self, result_manager, max_price):
         """Vérifie si on a déjà une route qui respecte le budget."""
         if not result_manager.has_valid_results():
@@ -382,10 +463,12 @@ class AbsoluteBudgetStrategy:
             fastest=fastest_within_budget,
             cheapest=cheapest,
             min_tolls=min_tolls,
-            status=status
+            status=status,
+            alternatives=result_manager.get_alternatives()
         )
     
-    def handle_absolute_budget_route(self, coordinates, max_price, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE):
+    def handle_absolute_budget_route(self, coordinates, max_price, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE,
+                                     search=Config.DEFAULT_SEARCH_MODE, beam_width=Config.DEFAULT_BEAM_WIDTH):
         """
         Point d'entrée principal pour les routes avec contrainte de budget absolu.
         
@@ -393,4 +476,6 @@ class AbsoluteBudgetStrategy:
             dict: Résultat formaté avec fastest, cheapest, min_tolls, status
         """
         with performance_tracker.measure_operation(Config.Operations.COMPUTE_ROUTE_ABSOLUTE_BUDGET):
-            return self.compute_absolute_budget_route(coordinates, max_price, veh_class, max_comb_size)
\ No newline at end of file
+            return self.compute_absolute_budget_route(
+                coordinates, max_price, veh_class, max_comb_size, search, beam_width
+            )
\ No newline at end of file
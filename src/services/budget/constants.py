@@ -62,6 +62,8 @@ class BudgetOptimizationConfig(BaseOptimizationConfig):
         TEST_PROMISING_TOLLS_ABSOLUTE = "test_promising_tolls_absolute"
         TEST_INDIVIDUAL_TOLLS_ABSOLUTE = "test_individual_tolls_absolute"
         TEST_COMBINATIONS_ABSOLUTE = "test_combinations_absolute"
+        TEST_ITERATIVE_PERCENTAGE = "test_iterative_percentage"
+        TEST_ITERATIVE_ABSOLUTE = "test_iterative_absolute"
         
         # Analysis operations
         ANALYZE_ALTERNATIVE_PERCENTAGE = "analyze_alternative_percentage"
@@ -11,6 +11,8 @@ from src.services.budget.constants import BudgetOptimizationConfig as Config
 from src.services.budget.route_validator import BudgetRouteValidator
 from src.services.common.common_messages import CommonMessages
 from src.services.common.budget_messages import BudgetMessages
+from src.services.common.progress_events import emit_progress
+from src.services.common.pareto_archive import ParetoArchive
 
 
 class BudgetRouteResultManager:
@@ -29,6 +31,9 @@ class BudgetRouteResultManager:
         self.best_cheap = {"route": None, "cost": float('inf'), "duration": float('inf'), "toll_count": float('inf')}
         self.best_min_tolls = {"route": None, "cost": float('inf'), "duration": float('inf'), "toll_count": float('inf')}
         
+        # Front de Pareto de toutes les routes évaluées (alternatives)
+        self.archive = ParetoArchive()
+        
         # Contrainte budgétaire
         self.budget_limit = budget_limit
         self.budget_type = budget_type
@@ -52,6 +57,7 @@ class BudgetRouteResultManager:
             self.best_cheap = base_result.copy()
             self.best_fast = base_result.copy()
             self.best_min_tolls = base_result.copy()
+            self.archive.insert(base_result)
             self.routes_within_budget += 1
     
     def update_with_route(self, route_data, base_cost):
@@ -76,24 +82,27 @@ class BudgetRouteResultManager:
         if within_budget:
             self.routes_within_budget += 1
         
-        updated = False
+        improved = []
+        self.archive.insert(route_data)
         
         # Mise à jour de l'itinéraire avec le moins de péages (priorité aux routes dans le budget)
         if self._is_better_min_tolls(route_data, within_budget):
             self.best_min_tolls = route_data.copy()
-            updated = True
+            improved.append("min_tolls")
         
         # Mise à jour de l'itinéraire le moins cher (priorité aux routes dans le budget)
         if self._is_better_cheapest(route_data, within_budget):
             self.best_cheap = route_data.copy()
-            updated = True
+            improved.append("cheapest")
         
         # Mise à jour de l'itinéraire le plus rapide (priorité aux routes dans le budget)
         if self._is_better_fastest(route_data, within_budget):
             self.best_fast = route_data.copy()
-            updated = True
+            improved.append("fastest")
         
-        return updated
+        if improved:
+            emit_progress("improvement", criteria=improved, route=route_data, within_budget=within_budget)
+        return bool(improved)
     
     def _is_within_budget(self, cost):
         """Vérifie si un coût respecte la contrainte budgétaire."""
@@ -190,6 +199,15 @@ class BudgetRouteResultManager:
             "min_tolls": self.best_min_tolls
         }
     
+    def get_alternatives(self):
+        """
+        Retourne le front de Pareto des routes évaluées.
+        
+        Returns:
+            list: Routes non dominées (coût, durée, nombre de péages), triées par coût
+        """
+        return self.archive.front()
+    
     def get_budget_statistics(self):
         """Retourne les statistiques budgétaires."""
         return {
@@ -219,6 +237,8 @@ class BudgetRouteResultManager:
             
         if self.best_min_tolls["route"] is None:
             self.best_min_tolls = base_result.copy()
+        
+        self.archive.insert(base_result)
     
     def log_budget_results(self, base_toll_count, base_cost, base_duration):
         """
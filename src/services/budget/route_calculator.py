@@ -6,9 +6,10 @@ Utilitaires pour calculer des routes avec contraintes budgétaires.
 Responsabilité unique : gérer la logique de calcul et d'évitement avec focus budget.
 """
 
-from src.services.toll_locator import locate_tolls
+from src.services.toll_locator import locate_tolls, get_all_open_tolls_by_proximity
 from src.services.toll_cost import add_marginal_cost
 from src.utils.poly_utils import avoidance_multipolygon
+from src.utils.avoidance_shapes import avoidance_shapes
 from benchmark.performance_tracker import performance_tracker
 from src.services.budget.constants import BudgetOptimizationConfig as Config
 from src.services.budget.route_validator import BudgetRouteValidator
@@ -17,6 +18,7 @@ from src.services.budget.error_handler import BudgetErrorHandler
 from src.services.common.common_messages import CommonMessages
 from src.services.common.budget_messages import BudgetMessages
 from src.services.ors_payload_builder import ORSPayloadBuilder
+from src.services.common.route_context import current_route_context, prefetch_base_routes
 
 
 class BudgetRouteCalculator:
@@ -32,13 +34,33 @@ class BudgetRouteCalculator:
         self.ors = ors_service
     
     def get_base_route_with_tracking(self, coordinates):
-        """Appel ORS pour la route de base avec tracking spécialisé budget."""
+        """Appel ORS pour la route de base avec tracking spécialisé budget (une fois par requête)."""
+        fetch = lambda: self._fetch_base_route(coordinates)
+        context = current_route_context(coordinates)
+        return context.base_route(fetch) if context else fetch()
+    
+    def get_route_avoid_tollways_with_tracking(self, coordinates):
+        """Appel ORS pour éviter les péages avec tracking budget (une fois par requête)."""
+        fetch = lambda: self._fetch_route_avoid_tollways(coordinates)
+        context = current_route_context(coordinates)
+        return context.toll_free_route(fetch) if context else fetch()
+    
+    def prefetch_routes(self, coordinates):
+        """Lance en parallèle la route de base et la route sans péage (voir prefetch_base_routes)."""
+        prefetch_base_routes(
+            coordinates,
+            lambda: self._fetch_base_route(coordinates),
+            lambda: self._fetch_route_avoid_tollways(coordinates),
+        )
+    
+    def _fetch_base_route(self, coordinates):
+        """Appel ORS de la route de base."""
         with performance_tracker.measure_operation(Config.Operations.GET_BASE_ROUTE_FALLBACK):
             performance_tracker.count_api_call("ORS_base_route_budget")
             return self.ors.get_base_route(coordinates)
     
-    def get_route_avoid_tollways_with_tracking(self, coordinates):
-        """Appel ORS pour éviter les péages avec tracking budget."""
+    def _fetch_route_avoid_tollways(self, coordinates):
+        """Appel ORS de la route sans autoroute à péage."""
         with performance_tracker.measure_operation("get_route_avoid_tollways_budget"):
             performance_tracker.count_api_call("ORS_avoid_tollways_budget")
             return self.ors.get_route_avoid_tollways(coordinates)
@@ -50,13 +72,24 @@ class BudgetRouteCalculator:
             return self.ors.get_route_avoiding_polygons(coordinates, avoid_poly)
     
     def locate_and_cost_tolls(self, route, veh_class, operation_name="locate_tolls_budget"):
-        """Localise les péages et calcule leurs coûts avec tracking budget."""
+        """Localise les péages et calcule leurs coûts avec tracking budget (mémorisé par route dans le contexte)."""
+        def locate():
+            return locate_tolls(route, Config.get_barriers_csv_path())
         with performance_tracker.measure_operation(operation_name):
-            tolls_dict = locate_tolls(route, Config.get_barriers_csv_path())
-            tolls_on_route = tolls_dict["on_route"]
-            add_marginal_cost(tolls_on_route, veh_class)
+            context = current_route_context()
+            if context is not None:
+                return context.costed_tolls(route, veh_class, locate)
+            tolls_dict = locate()
+            add_marginal_cost(tolls_dict["on_route"], veh_class)
             return tolls_dict
     
+    def get_open_tolls_by_proximity(self, route, max_distance_m=Config.MAX_DISTANCE_SEARCH_M):
+        """Péages ouverts à proximité de la route (mémorisé pour les routes du contexte)."""
+        def compute():
+            return get_all_open_tolls_by_proximity(route, Config.get_barriers_csv_path(), max_distance_m)
+        context = current_route_context()
+        return context.nearby_open_tolls(route, max_distance_m, compute) if context else compute()
+    
     def calculate_route_with_budget_constraint(self, coordinates, budget_limit, budget_type, veh_class):
         """
         Calcule une route en respectant une contrainte budgétaire.
@@ -142,6 +175,7 @@ class BudgetRouteCalculator:
                     is_valid = True
                 
                 # Vérifier que les péages ont bien été évités
+                avoidance_shapes.record_avoidance(tolls_to_avoid, tolls_dict["on_route"])
                 avoided_ids = set(t["id"] for t in tolls_to_avoid)
                 present_ids = set(t["id"] for t in tolls_dict["on_route"])
                 
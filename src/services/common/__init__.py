@@ -14,6 +14,9 @@ from .budget_messages import BudgetMessages
 from .common_messages import CommonMessages
 from .common_validator import CommonRouteValidator
 from .operation_tracker import OperationTracker
+from .candidate_evaluator import CandidateEvaluationEngine
+from .iterative_avoidance import IterativeAvoidanceSearch, resolve_search_mode
+from .route_context import RouteContext, route_context, current_route_context
 
 __all__ = [
     'BaseOptimizationConfig',
@@ -24,5 +27,11 @@ __all__ = [
     'BudgetMessages',
     'CommonMessages',
     'CommonRouteValidator',
-    'OperationTracker'
+    'OperationTracker',
+    'CandidateEvaluationEngine',
+    'IterativeAvoidanceSearch',
+    'resolve_search_mode',
+    'RouteContext',
+    'route_context',
+    'current_route_context'
 ]
\ No newline at end of file
@@ -16,6 +16,41 @@ class BaseOptimizationConfig:
     # === Performance and progress thresholds ===
     COMBINATION_PROGRESS_INTERVAL = 10  # Affichage du progrès toutes les N combinaisons
     
+    # === Parallel candidate evaluation ===
+    MAX_PARALLEL_EVALUATIONS = 4  # Évaluations simultanées par optimisation
+    EVALUATION_POOL_SIZE = 8      # Threads partagés par toutes les optimisations
+    
+    # === Speculative route prefetch ===
+    PREFETCH_ROUTES = True       # Route de base et route sans péage demandées en parallèle dès l'entrée
+    PREFETCH_POOL_SIZE = 8       # Threads partagés pour les appels ORS anticipés
+    
+    # === Search modes ===
+    SEARCH_MODES = ("exhaustive", "greedy", "beam")  # Modes de recherche des péages à éviter
+    DEFAULT_SEARCH_MODE = "exhaustive"
+    DEFAULT_BEAM_WIDTH = 3     # États conservés par itération en mode "beam"
+    MAX_ITERATIVE_DEPTH = 10   # Itérations max (péages évités) en mode "greedy"/"beam"
+    
+    # === Pareto alternatives ===
+    MAX_ALTERNATIVES = 10    # Alternatives non dominées retournées au plus (`alternatives: k`)
+    
+    # === Asynchronous jobs ===
+    JOB_WORKERS = 4          # Optimisations exécutées simultanément en arrière-plan
+    JOB_MAX_PENDING = 100    # Jobs en attente ou en cours au-delà desquels on refuse
+    JOB_TTL_S = 3600         # Durée de conservation d'un job terminé (secondes)
+    
+    # === Admission control (smart-route endpoints) ===
+    ADMISSION_BUDGET = 400        # Jetons (appels ORS estimés) disponibles en rafale
+    ADMISSION_REFILL_PER_S = 8    # Jetons rendus par seconde (débit soutenable par ORS)
+    ADMISSION_MAX_WAIT_S = 2      # Attente maximale avant de refuser une requête (429)
+    ADMISSION_KM_PER_TOLL = 60    # Densité de péages supposée pour estimer le coût d'une requête
+    
+    # === Cross-request result cache ===
+    RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Taille cumulée max des réponses en cache
+    RESULT_CACHE_TTL_S = 900                   # Durée de vie d'une réponse en cache
+    RESULT_CACHE_SNAP_DECIMALS = None          # Coordonnées exactes ; 3 = arrondi ~100 m (approximatif, opt-in)
+    RESULT_CACHE_SNAP_GUARD_M = 50             # Distance max au point accroché par ORS
+    RESULT_CACHE_VERSION_RECHECK_S = 30        # Intervalle de relecture de la version des données de péages
+    
     # === File paths ===
     BARRIERS_CSV_PATH = "data/barriers.csv"  # Chemin vers les données de péages
     
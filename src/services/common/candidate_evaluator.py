@@ -0,0 +1,153 @@
+"""
+candidate_evaluator.py
+---------------------
+
+Moteur d'évaluation parallèle des ensembles de péages à éviter.
+Responsabilité unique : exécuter un flux de candidats sur un pool borné et
+fusionner les résultats de façon déterministe.
+
+Chaque candidat suit le même cycle (polygone → ORS → localisation → coût) ;
+seule la fusion dans le gestionnaire de résultats est sérialisée, dans
+l'ordre de soumission, pour que le résultat ne dépende pas du timing des
+appels ORS.
+"""
+
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+from src.services.common.progress_events import OptimizationCancelled, count_progress
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor():
+    """Pool de threads partagé par tous les moteurs (borné globalement)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=Config.EVALUATION_POOL_SIZE,
+                thread_name_prefix="candidate-eval"
+            )
+        return _EXECUTOR
+
+
+class CandidateEvaluationEngine:
+    """
+    Évalue un flux d'ensembles de péages à éviter.
+    
+    - Déduplication par signature (IDs triés), y compris entre plusieurs appels à `run`
+    - Au plus `max_in_flight` évaluations simultanées par moteur
+    - Fusion dans l'ordre de soumission (résultat déterministe)
+    - Arrêt anticipé dès que la fonction de fusion le demande
+    """
+    
+    def __init__(self, max_in_flight=Config.MAX_PARALLEL_EVALUATIONS):
+        """
+        Initialise le moteur.
+        
+        Args:
+            max_in_flight: Nombre maximum d'évaluations en cours pour ce moteur
+                           (1 = exécution strictement séquentielle)
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self._seen = set()
+        self.stats = {"submitted": 0, "duplicates": 0, "merged": 0, "failed": 0, "stopped_early": False}
+    
+    @staticmethod
+    def signature(avoid_set):
+        """Signature canonique d'un ensemble de péages à éviter."""
+        return tuple(sorted(str(t["id"]) for t in avoid_set))
+    
+    def run(self, candidates, evaluate, merge):
+        """
+        Évalue les candidats et fusionne leurs résultats.
+        
+        Les candidats sont consommés paresseusement : un générateur peut donc
+        s'appuyer sur l'état fusionné jusque-là pour filtrer les suivants.
+        
+        Args:
+            candidates: Itérable d'ensembles de péages à éviter
+            evaluate: Fonction(avoid_set) -> résultat, exécutée dans le pool
+            merge: Fonction(avoid_set, résultat) -> bool, exécutée dans le thread
+                   appelant ; True demande l'arrêt anticipé
+            
+        Returns:
+            bool: True si l'évaluation s'est arrêtée de façon anticipée
+            
+        Raises:
+            OptimizationCancelled: Si la requête est abandonnée (jamais traité comme un échec de candidat)
+        """
+        iterator = iter(candidates)
+        in_flight = deque()
+        exhausted = False
+        
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_in_flight:
+                    avoid_set = next(iterator, None)
+                    if avoid_set is None:
+                        exhausted = True
+                        break
+                    sig = self.signature(avoid_set)
+                    if sig in self._seen:
+                        self.stats["duplicates"] += 1
+                        continue
+                    self._seen.add(sig)
+                    self.stats["submitted"] += 1
+                    in_flight.append((avoid_set, self._submit(evaluate, avoid_set)))
+                
+                if not in_flight:
+                    return False
+                
+                avoid_set, future = in_flight.popleft()
+                try:
+                    outcome = future.result()
+                except OptimizationCancelled:
+                    # Abandon de la requête, pas un échec du candidat
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Échec de l'évaluation de {self.signature(avoid_set)}: {e}")
+                    self.stats["failed"] += 1
+                    outcome = None
+                
+                self.stats["merged"] += 1
+                count_progress("combinations_tested")
+                if merge(avoid_set, outcome):
+                    self.stats["stopped_early"] = True
+                    return True
+        finally:
+            # Arrêt anticipé, annulation ou erreur de fusion : rien ne doit rester en file
+            for _, pending in in_flight:
+                pending.cancel()
+    
+    def _submit(self, evaluate, avoid_set):
+        """Soumet une évaluation en propageant le contexte (session de suivi, etc.)."""
+        if self.max_in_flight == 1:
+            # Exécution en ligne : pas de thread pour le mode séquentiel
+            return _CompletedFuture(evaluate, avoid_set)
+        context = contextvars.copy_context()
+        return _get_executor().submit(context.run, evaluate, avoid_set)
+
+
+class _CompletedFuture:
+    """Future déjà résolu, pour l'exécution en ligne."""
+    
+    def __init__(self, fn, arg):
+        try:
+            self._result, self._error = fn(arg), None
+        except Exception as e:
+            self._result, self._error = None, e
+    
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._result
+    
+    def cancel(self):
+        return False
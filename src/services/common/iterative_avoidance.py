@@ -0,0 +1,114 @@
+"""
+iterative_avoidance.py
+---------------------
+
+Recherche itérative des péages à éviter (modes "greedy" et "beam").
+Responsabilité unique : construire l'ensemble à éviter pas à pas à partir de
+la route courante, au lieu d'énumérer toutes les combinaisons.
+
+À chaque itération, on évite en plus le péage le plus cher encore traversé par
+la route courante (les polygones s'accumulent), on recalcule la route, on
+relocalise les péages et on recommence jusqu'à respecter la contrainte.
+Le mode "beam" conserve les `beam_width` meilleurs états par itération et
+développe pour chacun ses `beam_width` péages les plus chers : O(péages) appels
+ORS au lieu de O(C(n, k)). "greedy" est un faisceau de largeur 1.
+"""
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+from src.services.common.candidate_evaluator import CandidateEvaluationEngine
+
+
+def resolve_search_mode(search=None, beam_width=None):
+    """
+    Valide et normalise le mode de recherche demandé.
+
+    Args:
+        search: "exhaustive", "greedy" ou "beam" (None = mode par défaut)
+        beam_width: Largeur du faisceau (mode "beam" uniquement)
+
+    Returns:
+        tuple: (mode, largeur de faisceau effective)
+
+    Raises:
+        ValueError: Si le mode ou la largeur est invalide
+    """
+    if search is not None and not isinstance(search, str):
+        raise ValueError(f"Mode de recherche invalide: {search!r} (chaîne attendue)")
+    mode = (search or Config.DEFAULT_SEARCH_MODE).strip().lower()
+    if mode not in Config.SEARCH_MODES:
+        raise ValueError(f"Mode de recherche invalide: {search} (attendu: {', '.join(Config.SEARCH_MODES)})")
+    if mode == "greedy":
+        return mode, 1
+    if beam_width is None:
+        width = Config.DEFAULT_BEAM_WIDTH
+    elif isinstance(beam_width, bool) or not isinstance(beam_width, (int, str)):
+        raise ValueError(f"beam_width doit être un entier: {beam_width!r}")
+    else:
+        width = int(beam_width)
+    if width < 1:
+        raise ValueError(f"beam_width doit être ≥ 1: {beam_width}")
+    return mode, width
+
+
+class IterativeAvoidanceSearch:
+    """Recherche gloutonne / en faisceau sur les péages traversés par la route courante."""
+
+    def __init__(self, beam_width=1, max_depth=Config.MAX_ITERATIVE_DEPTH, engine=None):
+        """
+        Initialise la recherche.
+
+        Args:
+            beam_width: États conservés et péages développés par itération
+            max_depth: Nombre maximum d'itérations (taille max de l'ensemble évité)
+            engine: Moteur d'évaluation (partagé avec d'autres phases si fourni)
+        """
+        self.beam_width = max(1, beam_width)
+        self.max_depth = max_depth
+        self.engine = engine or CandidateEvaluationEngine()
+        self.stats = {"iterations": 0, "evaluated": 0}
+
+    def _expand(self, avoid_set, outcome):
+        """Enfants d'un état : évitement en plus des péages traversés les plus chers."""
+        avoided_ids = set(str(t["id"]) for t in avoid_set)
+        remaining = [t for t in outcome["crossed_tolls"] if str(t["id"]) not in avoided_ids]
+        remaining.sort(key=lambda t: t.get("cost", 0) or 0, reverse=True)
+        return [tuple(avoid_set) + (toll,) for toll in remaining[:self.beam_width]]
+
+    def run(self, base_outcome, evaluate, merge, is_goal, rank):
+        """
+        Exécute la recherche à partir de la route de base.
+
+        Args:
+            base_outcome: Résultat de la route de base (doit contenir crossed_tolls)
+            evaluate: Fonction(avoid_set) -> résultat (avec crossed_tolls) ou None
+            merge: Fonction(avoid_set, résultat) -> bool ; True demande l'arrêt anticipé
+            is_goal: Fonction(résultat) -> bool ; un état qui respecte la contrainte n'est plus développé
+            rank: Fonction(résultat) -> clé de tri (plus petite = meilleure) pour le faisceau
+
+        Returns:
+            bool: True si la recherche s'est arrêtée de façon anticipée
+        """
+        beam = [((), base_outcome)]
+
+        for _ in range(self.max_depth):
+            children = [child for avoid_set, outcome in beam if not is_goal(outcome)
+                        for child in self._expand(avoid_set, outcome)]
+            if not children:
+                return False
+
+            self.stats["iterations"] += 1
+            evaluated = []
+
+            def collect(avoid_set, outcome):
+                if outcome:
+                    evaluated.append((avoid_set, outcome))
+                    self.stats["evaluated"] += 1
+                return merge(avoid_set, outcome)
+
+            if self.engine.run(children, evaluate, collect):
+                return True
+
+            evaluated.sort(key=lambda item: rank(item[1]))
+            beam = evaluated[:self.beam_width]
+
+        return False
@@ -0,0 +1,179 @@
+"""
+pareto_archive.py
+-----------------
+
+Archive des itinéraires non dominés sur (coût, durée, nombre de péages).
+Responsabilité unique : conserver le front de Pareto des candidats évalués pour
+proposer des alternatives (`alternatives: k`) au lieu des seuls trois gagnants.
+
+Une route en domine une autre si elle n'est pire sur aucun critère et meilleure
+sur au moins un. Les entrées sont triées lexicographiquement par objectifs : une
+route ne peut être dominée que par une entrée placée avant elle, et ne peut
+dominer que des entrées placées après, ce qui borne chaque insertion.
+"""
+import math
+from bisect import bisect_right
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+
+
+OBJECTIVES = ("cost", "duration", "toll_count")
+CRITERIA = ("fastest", "cheapest", "min_tolls")
+
+
+def _objectives(route_data):
+    """Vecteur (coût, durée, nombre de péages), ou None si la route n'est pas comparable."""
+    if not route_data or route_data.get("route") is None:
+        return None
+    try:
+        point = tuple(float(route_data[name]) for name in OBJECTIVES)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return None if any(math.isinf(v) or math.isnan(v) for v in point) else point
+
+
+def _covers(a, b):
+    """True si `a` domine `b` ou lui est égal (pas pire sur aucun critère)."""
+    return all(x <= y for x, y in zip(a, b))
+
+
+def resolve_alternatives(value):
+    """
+    Valide le nombre d'alternatives demandé.
+
+    Args:
+        value: Entier ≥ 0 (None = pas d'alternatives)
+
+    Returns:
+        int: Nombre d'alternatives à retourner (0 = champ absent)
+
+    Raises:
+        ValueError: Si la valeur n'est pas un entier entre 0 et MAX_ALTERNATIVES
+    """
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        raise ValueError(f"alternatives doit être un entier: {value}")
+    try:
+        k = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"alternatives doit être un entier: {value!r}") from None
+    if not 0 <= k <= Config.MAX_ALTERNATIVES:
+        raise ValueError(f"alternatives doit être compris entre 0 et {Config.MAX_ALTERNATIVES}: {value}")
+    return k
+
+
+def select_alternatives(routes, k):
+    """
+    Choisit au plus `k` routes réparties sur le front.
+
+    Les extrêmes (moins chère, plus rapide, moins de péages) sont retenus d'abord,
+    puis la route la plus éloignée (objectifs normalisés) de celles déjà retenues.
+
+    Args:
+        routes: Routes du front, triées par coût
+        k: Nombre de routes voulues
+
+    Returns:
+        list: Routes retenues, dans l'ordre d'entrée
+    """
+    if k >= len(routes):
+        return list(routes)
+    if k <= 0:
+        return []
+    points = [_objectives(route) for route in routes]
+    spans = [(max(p[i] for p in points) - min(p[i] for p in points)) or 1.0 for i in range(len(OBJECTIVES))]
+    normalized = [tuple(v / span for v, span in zip(p, spans)) for p in points]
+
+    chosen = []
+    for i in range(len(OBJECTIVES)):
+        extreme = min(range(len(points)), key=lambda j: (points[j][i], points[j]))
+        if extreme not in chosen and len(chosen) < k:
+            chosen.append(extreme)
+    while len(chosen) < k:
+        def spread(j):
+            return min(math.dist(normalized[j], normalized[c]) for c in chosen)
+        chosen.append(max((j for j in range(len(points)) if j not in chosen), key=spread))
+    return [routes[j] for j in sorted(chosen)]
+
+
+class ParetoArchive:
+    """Front de Pareto incrémental des routes évaluées."""
+
+    def __init__(self):
+        """Initialise une archive vide."""
+        self._points = []
+        self._routes = []
+
+    def __len__(self):
+        return len(self._routes)
+
+    def insert(self, route_data):
+        """
+        Ajoute une route si elle n'est dominée par aucune entrée.
+
+        Les entrées qu'elle domine sont retirées. Une route identique sur les trois
+        critères à une entrée existante n'est pas ajoutée (la première est conservée).
+
+        Args:
+            route_data: Route formatée (route, cost, duration, toll_count...)
+
+        Returns:
+            bool: True si la route fait partie du front après insertion
+        """
+        point = _objectives(route_data)
+        if point is None:
+            return False
+        position = bisect_right(self._points, point)
+        if any(_covers(other, point) for other in self._points[:position]):
+            return False
+        kept = [j for j in range(position, len(self._points)) if not _covers(point, self._points[j])]
+        self._points[position:] = [point] + [self._points[j] for j in kept]
+        self._routes[position:] = [route_data.copy()] + [self._routes[j] for j in kept]
+        return True
+
+    def front(self, k=None):
+        """
+        Routes non dominées, triées par coût puis durée.
+
+        Args:
+            k: Nombre maximum de routes (None = tout le front)
+
+        Returns:
+            list: Copies des routes du front
+        """
+        routes = [route.copy() for route in self._routes]
+        return routes if k is None else select_alternatives(routes, k)
+
+    @classmethod
+    def from_routes(cls, routes):
+        """Construit une archive à partir de routes quelconques (None ignorés)."""
+        archive = cls()
+        for route_data in routes:
+            if route_data:
+                archive.insert(route_data)
+        return archive
+
+
+def limit_alternatives(result, k):
+    """
+    Remplace le front complet attaché par les stratégies par au plus `k` alternatives.
+
+    Sans front (stratégie à solution unique, fallback), les alternatives sont
+    tirées des routes gagnantes du résultat.
+
+    Args:
+        result: Résultat d'optimisation (modifié sur place)
+        k: Nombre d'alternatives demandé (0 = champ retiré)
+
+    Returns:
+        dict: Le résultat
+    """
+    if not isinstance(result, dict):
+        return result
+    front = result.pop("alternatives", None)
+    if k:
+        if front is None:
+            front = ParetoArchive.from_routes(result.get(criterion) for criterion in CRITERIA).front()
+        result["alternatives"] = select_alternatives(front, k)
+    return result
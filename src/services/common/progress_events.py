@@ -0,0 +1,180 @@
+"""
+progress_events.py
+-----------------
+
+Diffusion des améliorations d'une optimisation en cours (mode "anytime").
+Responsabilité unique : relayer les événements de progression des stratégies
+vers un consommateur (flux SSE / NDJSON) sans modifier leurs signatures.
+
+Le consommateur est porté par une ContextVar : les gestionnaires de résultats
+émettent sans savoir s'il y a un abonné, et l'émission est un no-op hors d'un
+bloc `progress_sink`. Les fusions du moteur d'évaluation se faisant dans le
+thread appelant, les événements sortent dans l'ordre de fusion.
+
+Les compteurs (`count_progress`) complètent les événements pour les faits
+trop fréquents pour être diffusés un à un (combinaisons testées, appels ORS).
+
+Un abonné peut se retirer en cours de route (client du flux déconnecté) : ces
+deux points de passage lèvent alors OptimizationCancelled, ce qui arrête
+l'optimisation avant son prochain appel ORS.
+"""
+
+import json
+import queue
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+_SINK = contextvars.ContextVar("route_progress_sink", default=None)
+_COUNTERS_LOCK = threading.Lock()
+
+class OptimizationCancelled(Exception):
+    """Le consommateur des événements a abandonné l'optimisation."""
+
+
+STREAM_FORMATS = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@contextmanager
+def progress_sink(callback, counters=None, cancelled=None, **fields):
+    """
+    Abonne `callback(event)` aux événements émis dans le bloc.
+
+    Args:
+        callback: Fonction recevant chaque événement (dict)
+        counters: Dictionnaire incrémenté par `count_progress` (optionnel)
+        cancelled: threading.Event positionné quand l'abonné se retire (optionnel)
+        **fields: Champs ajoutés à chaque événement (ex: veh_class)
+    """
+    token = _SINK.set((callback, fields, counters if counters is not None else {}, cancelled))
+    try:
+        yield
+    finally:
+        _SINK.reset(token)
+
+
+@contextmanager
+def progress_fields(**fields):
+    """Ajoute des champs aux événements émis dans le bloc (no-op sans abonné)."""
+    sink = _SINK.get()
+    if sink is None:
+        yield
+        return
+    with progress_sink(sink[0], sink[2], sink[3], **{**sink[1], **fields}):
+        yield
+
+
+def has_progress_sink():
+    """True si un consommateur écoute les événements."""
+    return _SINK.get() is not None
+
+
+def _check_cancelled(sink):
+    cancelled = sink[3]
+    if cancelled is not None and cancelled.is_set():
+        raise OptimizationCancelled("Optimisation abandonnée par le client")
+
+
+def emit_progress(event_type, **payload):
+    """
+    Émet un événement vers le consommateur courant, s'il existe.
+
+    Args:
+        event_type: Type d'événement ("base", "improvement", ...)
+        **payload: Données de l'événement
+
+    Raises:
+        OptimizationCancelled: Si le consommateur s'est retiré
+    """
+    sink = _SINK.get()
+    if sink is None:
+        return
+    _check_cancelled(sink)
+    callback, fields = sink[0], sink[1]
+    callback({"event": event_type, **fields, **payload})
+
+
+def count_progress(name, amount=1):
+    """
+    Incrémente un compteur du consommateur courant, s'il existe.
+
+    Appelable depuis les threads du pool d'évaluation (contexte propagé).
+
+    Args:
+        name: Nom du compteur ("combinations_tested", "ors_calls", ...)
+        amount: Incrément
+
+    Raises:
+        OptimizationCancelled: Si le consommateur s'est retiré
+    """
+    sink = _SINK.get()
+    if sink is None:
+        return
+    _check_cancelled(sink)
+    counters = sink[2]
+    with _COUNTERS_LOCK:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def encode_event(event, fmt="sse"):
+    """
+    Encode un événement pour le flux HTTP.
+
+    Args:
+        event: Événement (dict avec une clé "event")
+        fmt: "sse" ou "ndjson"
+
+    Returns:
+        str: Fragment prêt à être envoyé
+    """
+    data = json.dumps(event, default=str, ensure_ascii=False)
+    if fmt == "ndjson":
+        return data + "\n"
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
+def stream_optimization(compute, fmt="sse"):
+    """
+    Exécute une optimisation dans un thread et produit ses événements au fil de l'eau.
+
+    Le flux se termine toujours par un événement "result" (résumé final, identique
+    à la réponse de l'endpoint non streamé) ou "error". Si le client se déconnecte
+    (générateur fermé), l'optimisation est annulée à son prochain événement ou appel ORS.
+
+    Args:
+        compute: Fonction sans argument retournant le résultat final
+        fmt: "sse" ou "ndjson"
+
+    Yields:
+        str: Événements encodés
+    """
+    events = queue.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def worker():
+        try:
+            with progress_sink(events.put, cancelled=cancelled):
+                result = compute()
+            events.put({"event": "result", "result": result})
+        except Exception as e:
+            events.put({"event": "error", "error": str(e)})
+        finally:
+            events.put(done)
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(worker,), name="route-stream", daemon=True).start()
+
+    try:
+        while True:
+            event = events.get()
+            if event is done:
+                return
+            yield encode_event(event, fmt)
+    finally:
+        # GeneratorExit (client déconnecté) : le calcul s'arrête au prochain point de passage
+        cancelled.set()
@@ -40,7 +40,7 @@ class ResultFormatter:
         return result
     
     @staticmethod
-    def format_optimization_results(fastest, cheapest, min_tolls, status):
+    def format_optimization_results(fastest, cheapest, min_tolls, status, alternatives=None):
         """
         Formate les résultats d'optimisation multi-critères.
         
@@ -49,16 +49,20 @@ class ResultFormatter:
             cheapest: Route la moins chère
             min_tolls: Route avec le minimum de péages
             status: Code de statut
+            alternatives: Front de Pareto des routes évaluées (optionnel)
             
         Returns:
             dict: Résultats formatés avec status
         """
-        return {
+        results = {
             "fastest": fastest,
             "cheapest": cheapest, 
             "min_tolls": min_tolls,
             "status": status
         }
+        if alternatives is not None:
+            results["alternatives"] = alternatives
+        return results
     
     @staticmethod
     def format_error_result(error_message, status_code, operation_name=None):
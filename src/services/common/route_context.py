@@ -0,0 +1,284 @@
+"""
+route_context.py
+----------------
+
+Contexte d'analyse de la route de base partagé pendant une requête.
+Responsabilité unique : calculer une seule fois, à la demande, ce que
+l'optimiseur, la stratégie choisie et le fallback lisent tous :
+    • la route de base et la route sans péage (appels ORS)
+    • les péages localisés de chaque route analysée (base, sans péage, alternatives),
+      chiffrés en un seul passage pour toutes les classes de véhicule de la requête
+    • les péages ouverts à proximité de la route de base
+
+Le contexte est porté par une ContextVar ouverte par les optimiseurs
+(`route_context`) ; les calculateurs de route le consultent et retombent sur
+un calcul direct hors contexte. Les threads du pool d'évaluation héritent du
+contexte (copie du contexte à la soumission).
+
+`prefetch` lance les appels ORS spéculativement dans un pool partagé : le premier
+accès attend l'appel en cours au lieu de le refaire ; un résultat jamais lu est
+simplement abandonné à la fin du contexte.
+"""
+
+import contextvars
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+from src.services.common.common_validator import CommonRouteValidator
+from src.services.toll_cost import add_marginal_cost_by_class
+
+
+_CURRENT = contextvars.ContextVar("route_context", default=None)
+_UNSET = object()
+
+_PREFETCH_EXECUTOR = None
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _get_prefetch_executor():
+    """Pool de threads partagé pour les appels ORS anticipés (borné globalement)."""
+    global _PREFETCH_EXECUTOR
+    with _PREFETCH_LOCK:
+        if _PREFETCH_EXECUTOR is None:
+            _PREFETCH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=Config.PREFETCH_POOL_SIZE,
+                thread_name_prefix="route-prefetch"
+            )
+        return _PREFETCH_EXECUTOR
+
+
+def _route_digest(route):
+    """Empreinte de la géométrie d'une route, ou None si elle n'en a pas."""
+    try:
+        coords = np.asarray(route["features"][0]["geometry"]["coordinates"], dtype=float)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+    return hashlib.blake2b(coords.tobytes(), digest_size=16).hexdigest()
+
+
+def _for_class(toll, veh_class):
+    """Copie d'un péage portant le coût d'une classe (champ `cost`, comme add_marginal_cost)."""
+    costs = toll.get("costs")
+    copy = {key: value for key, value in toll.items() if key != "costs"}
+    if costs is not None:
+        copy["cost"] = costs[veh_class]
+    return copy
+
+
+class RouteContext:
+    """Mémo paresseux de l'analyse de la route de base pour des coordonnées données."""
+
+    def __init__(self, coordinates, veh_classes=None):
+        """
+        Initialise un contexte vide.
+
+        Args:
+            coordinates: Coordonnées de la requête [départ, arrivée]
+            veh_classes: Classes de véhicule chiffrées ensemble (requête multi-classes)
+        """
+        self.coordinates = [list(point) for point in coordinates]
+        self.veh_classes = tuple(veh_classes or ())
+        self._values = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._pending = {}
+        self.stats = {"hits": 0, "misses": 0, "prefetched": 0}
+
+    def matches(self, coordinates):
+        """True si le contexte porte sur ces coordonnées."""
+        try:
+            return [list(point) for point in coordinates] == self.coordinates
+        except TypeError:
+            return False
+
+    def memo(self, key, compute):
+        """
+        Retourne la valeur mémorisée pour `key` ou la calcule une seule fois.
+
+        Les appels concurrents sur la même clé attendent le premier calcul.
+        Un appel anticipé (`prefetch`) en cours est attendu ; s'il n'a pas encore
+        démarré ou s'il a échoué, `compute()` est exécuté directement.
+        Un calcul en échec n'est pas mémorisé (l'exception est propagée).
+        """
+        with self._lock:
+            if key in self._values:
+                self.stats["hits"] += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    self.stats["hits"] += 1
+                    return self._values[key]
+                future = self._pending.pop(key, None)
+            value = self._await_prefetch(future)
+            if value is _UNSET:
+                value = compute()
+                counter = "misses"
+            else:
+                counter = "prefetched"
+            with self._lock:
+                self._values[key] = value
+                self.stats[counter] += 1
+            return value
+
+    @staticmethod
+    def _await_prefetch(future):
+        """Résultat d'un appel anticipé, ou _UNSET s'il faut calculer directement."""
+        if future is None or future.cancel():
+            # Pas d'appel anticipé, ou encore en file d'attente : plus rapide en direct
+            return _UNSET
+        try:
+            return future.result()
+        except Exception:
+            # L'appel anticipé a échoué : nouvel essai synchrone (erreur propagée à l'appelant)
+            return _UNSET
+
+    def prefetch(self, fetchers):
+        """
+        Lance en parallèle des appels dont le résultat sera probablement lu.
+
+        Args:
+            fetchers: Dict {"base_route" | "toll_free_route": fonction sans argument}
+        """
+        executor = _get_prefetch_executor()
+        for kind, fetch in fetchers.items():
+            key = (kind,)
+            with self._lock:
+                if key in self._values or key in self._pending:
+                    continue
+                # Contexte copié : session de suivi et compteurs de progression suivent l'appel
+                self._pending[key] = executor.submit(contextvars.copy_context().run, fetch)
+
+    def discard_prefetch(self):
+        """Abandonne les appels anticipés jamais lus (ceux non démarrés sont annulés)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.cancel()
+
+    def base_route(self, fetch):
+        """Route de base (appel ORS `fetch()` au premier accès)."""
+        return self.memo(("base_route",), fetch)
+
+    def toll_free_route(self, fetch):
+        """Route évitant les autoroutes à péage (appel ORS `fetch()` au premier accès)."""
+        return self.memo(("toll_free_route",), fetch)
+
+    def route_kind(self, route):
+        """"base_route" / "toll_free_route" si `route` est une route du contexte, sinon None."""
+        with self._lock:
+            for kind in ("base_route", "toll_free_route"):
+                if self._values.get((kind,)) is route:
+                    return kind
+        return None
+
+    def costed_tolls(self, route, veh_class, locate):
+        """
+        Péages localisés d'une route, chiffrés pour une classe de véhicule.
+
+        La localisation est faite une fois par route (base, sans péage ou alternative,
+        reconnue par sa géométrie) et les péages sur la route sont chiffrés en un seul
+        passage sur la table tarifaire pour toutes les classes du contexte : les classes
+        suivantes d'une requête multi-classes ne relisent que leur colonne.
+
+        Args:
+            route: Route GeoJSON ORS
+            veh_class: Classe de véhicule du chiffrage
+            locate: Fonction sans argument retournant {"on_route": [...], "nearby": [...]} (non chiffrés)
+
+        Returns:
+            dict: Copies des péages, champ `cost` à la classe demandée (l'appelant peut les enrichir)
+        """
+        classes = self.veh_classes if veh_class in self.veh_classes else (veh_class,)
+
+        def compute():
+            tolls_dict = locate()
+            add_marginal_cost_by_class(tolls_dict["on_route"], classes)
+            return tolls_dict
+
+        route_key = self.route_kind(route) or _route_digest(route)
+        tolls_dict = self.memo(("tolls", route_key, classes), compute) if route_key else compute()
+        return {name: [_for_class(t, veh_class) for t in tolls] for name, tolls in tolls_dict.items()}
+
+    def nearby_open_tolls(self, route, max_distance_m, compute):
+        """
+        Péages ouverts à proximité d'une route du contexte.
+
+        Returns:
+            list: Copies des péages triés par proximité
+        """
+        kind = self.route_kind(route)
+        if kind is None:
+            return compute()
+        return [dict(t) for t in self.memo(("open_tolls", kind, max_distance_m), compute)]
+
+
+def current_route_context(coordinates=None):
+    """
+    Contexte actif, éventuellement restreint à des coordonnées.
+
+    Returns:
+        RouteContext | None: Contexte courant s'il porte sur `coordinates` (ou s'il existe)
+    """
+    context = _CURRENT.get()
+    if context is None or (coordinates is not None and not context.matches(coordinates)):
+        return None
+    return context
+
+
+def prefetch_base_routes(coordinates, fetch_base_route, fetch_toll_free_route):
+    """
+    Lance en parallèle la route de base et la route sans péage dans le contexte de la requête.
+
+    Sans contexte actif, ou avec des coordonnées invalides, ne fait rien : la stratégie
+    appellera ORS (et signalera l'erreur) comme d'habitude.
+
+    Args:
+        coordinates: Coordonnées de la requête
+        fetch_base_route: Fonction sans argument appelant ORS pour la route de base
+        fetch_toll_free_route: Fonction sans argument appelant ORS pour la route sans péage
+    """
+    context = current_route_context(coordinates)
+    if context is None or not Config.PREFETCH_ROUTES:
+        return
+    try:
+        CommonRouteValidator.validate_coordinates(coordinates)
+    except ValueError:
+        return
+    context.prefetch({
+        "base_route": fetch_base_route,
+        "toll_free_route": fetch_toll_free_route,
+    })
+
+
+@contextmanager
+def route_context(coordinates, veh_classes=None):
+    """
+    Ouvre un contexte pour la requête, ou réutilise celui déjà ouvert sur les mêmes coordonnées
+    (ex. plusieurs classes de véhicule, fallback après la stratégie principale).
+
+    Args:
+        coordinates: Coordonnées de la requête
+        veh_classes: Classes de véhicule à chiffrer ensemble (contexte ouvert ici uniquement)
+
+    Yields:
+        RouteContext: Contexte actif
+    """
+    context = current_route_context(coordinates)
+    if context is not None:
+        yield context
+        return
+    context = RouteContext(coordinates, veh_classes)
+    token = _CURRENT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT.reset(token)
+        context.discard_prefetch()
@@ -17,6 +17,7 @@ class TollMessages:
     # Toll finding messages
     FOUND_OPEN_TOLLS_NEARBY = "Trouvé {count} péages ouverts à proximité immédiate"
     FOUND_OPEN_TOLLS_NETWORK = "Trouvé {count} péages ouverts dans un rayon de {distance:.1f} km"
+    OPEN_TOLLS_DETOUR_FILTERED = "{count} péages ouverts écartés (détour minimal > {factor}× la route directe)"
     
     NO_OPEN_TOLLS_NEARBY = "Aucune solution trouvée avec les péages ouverts à proximité. Test avec tous les péages ouverts du réseau..."
     NO_OPEN_TOLLS_IN_RADIUS = "Aucun péage à système ouvert trouvé dans un rayon de {distance:.1f} km"
@@ -38,6 +39,10 @@ class TollMessages:
     TOLLS_ON_ROUTE = "Péages sur l'itinéraire:"
     TOLLS_NEARBY = "Péages à proximité:"
     PROGRESS_COMBINATIONS = "Combinaisons testées: {count}"
+    BRANCH_AND_BOUND_STATS = ("Branch-and-bound: {yielded} évaluées, {pruned_bound} élaguées par borne, "
+                              "{pruned_dominated} dominées, {pruned_unavoidable} avec péage inévitable")
+    ITERATIVE_SEARCH_STATS = "Recherche itérative: {iterations} itérations, {evaluated} routes évaluées"
+    AVOIDANCE_CACHE_STATS = "Cache d'équivalence: {hits} combinaisons résolues sans appel ORS ({misses} appels)"
     
     # Error messages
     NO_ECONOMIC_ROUTE = "[RESULT] Pas d'itinéraire économique trouvé respectant la contrainte de max_tolls"
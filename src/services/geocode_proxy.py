@@ -0,0 +1,216 @@
+"""
+geocode_proxy.py
+----------------
+
+Proxy avec cache devant le géocodage ORS (search et autocomplete).
+Responsabilité unique : répondre aux recherches d'adresses en appelant le
+service externe le moins souvent possible.
+
+- Cache LRU + TTL par endpoint et texte normalisé (casse, accents, espaces)
+- Partage des préfixes : la saisie s'allonge lettre par lettre ; si la réponse
+  d'un préfixe déjà en cache était complète (moins de résultats que la taille
+  demandée), celle du texte plus long en est un sous-ensemble, obtenu par filtrage
+- Single-flight : des requêtes identiques simultanées partagent un seul appel
+- Session HTTP partagée (connexions réutilisées)
+
+L'URL du service est configurable (GEOCODE_BASE_URL) pour tester contre un
+serveur local.
+"""
+import copy
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_BASE_URL = "https://api.openrouteservice.org"
+GEOCODE_ENDPOINTS = ("search", "autocomplete")
+GEOCODE_CACHE_SIZE = 2048     # Réponses conservées
+GEOCODE_CACHE_TTL_S = 3600    # Durée de vie d'une réponse
+GEOCODE_RESULT_SIZE = 10      # Résultats demandés au service (taille Pelias par défaut)
+GEOCODE_MIN_PREFIX = 3        # Longueur minimale d'un préfixe réutilisable
+GEOCODE_TIMEOUT_S = 10
+GEOCODE_POOL_SIZE = 10        # Connexions conservées par la session
+
+
+def normalize_text(text: str) -> str:
+    """Texte de recherche canonique : minuscules, sans accents, espaces simples."""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(folded.split())
+
+
+def _words(text: str):
+    return re.findall(r"\w+", normalize_text(text))
+
+
+def _matches(feature: Dict, tokens) -> bool:
+    """True si chaque mot de la requête commence un mot du libellé du résultat."""
+    properties = feature.get("properties") or {}
+    words = _words(properties.get("label") or properties.get("name") or "")
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+class GeocodeProxy:
+    """Cache, partage de préfixes et single-flight devant le géocodage ORS."""
+
+    def __init__(self, base_url: Optional[str] = None, max_entries: int = GEOCODE_CACHE_SIZE,
+                 ttl_seconds: float = GEOCODE_CACHE_TTL_S, size: int = GEOCODE_RESULT_SIZE,
+                 min_prefix: int = GEOCODE_MIN_PREFIX, session: Optional[requests.Session] = None):
+        """
+        Args:
+            base_url: URL du service (défaut : GEOCODE_BASE_URL ou api.openrouteservice.org)
+            max_entries: Nombre de réponses en cache
+            ttl_seconds: Durée de vie d'une réponse
+            size: Nombre de résultats demandés au service
+            min_prefix: Longueur minimale d'un préfixe réutilisable
+            session: Session HTTP (une session avec pool de connexions par défaut)
+        """
+        self.base_url = (base_url or os.getenv("GEOCODE_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.size = size
+        self.min_prefix = min_prefix
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=GEOCODE_POOL_SIZE, pool_maxsize=GEOCODE_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        # (endpoint, texte normalisé) -> (expiration, réponse, complète)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict, bool]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "prefix_hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "errors": 0}
+
+    def get(self, endpoint: str, text: str, api_key: str) -> Tuple[Dict, bool]:
+        """
+        Résultat de géocodage pour un texte.
+
+        Args:
+            endpoint: "search" ou "autocomplete"
+            text: Texte saisi
+            api_key: Clé de l'API ORS
+
+        Returns:
+            tuple: (réponse GeoJSON, True si servie sans appel au service externe)
+
+        Raises:
+            ValueError: Si l'endpoint est inconnu
+            requests.RequestException: Si l'appel au service échoue
+        """
+        if endpoint not in GEOCODE_ENDPOINTS:
+            raise ValueError(f"Endpoint de géocodage inconnu: {endpoint}")
+        key = (endpoint, normalize_text(text))
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return copy.deepcopy(cached), True
+            derived = self._from_prefix(key)
+            if derived is not None:
+                self._stats["prefix_hits"] += 1
+                return copy.deepcopy(derived), True
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if leader:
+            try:
+                data = self._fetch(endpoint, text, api_key)
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                    del self._inflight[key]
+                future.set_exception(e)
+                raise
+            with self._lock:
+                self._store(key, data, len(data.get("features") or []) < self.size)
+                del self._inflight[key]
+            future.set_result(data)
+            return copy.deepcopy(data), False
+        # Requête identique en cours : même réponse, sans appel supplémentaire
+        return copy.deepcopy(future.result()), True
+
+    def _fetch(self, endpoint: str, text: str, api_key: str) -> Dict:
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+        response = self.session.get(
+            f"{self.base_url}/geocode/{endpoint}",
+            params={"api_key": api_key, "text": text, "boundary.country": "FR", "size": self.size},
+            timeout=GEOCODE_TIMEOUT_S,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _lookup(self, key) -> Optional[Dict]:
+        """Réponse en cache non expirée (verrou tenu)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _from_prefix(self, key) -> Optional[Dict]:
+        """Réponse dérivée du plus long préfixe en cache dont le résultat était complet (verrou tenu)."""
+        endpoint, text = key
+        tokens = _words(text)
+        if not tokens:
+            return None
+        for length in range(len(text) - 1, self.min_prefix - 1, -1):
+            prefix_key = (endpoint, text[:length].rstrip())
+            entry = self._entries.get(prefix_key)
+            if entry is None or not entry[2] or self._lookup(prefix_key) is None:
+                continue
+            features = [f for f in entry[1].get("features") or [] if _matches(f, tokens)]
+            if not features:
+                # Aucun résultat déduit : le service peut trouver mieux (correspondance approchée)
+                return None
+            derived = dict(entry[1], features=features)
+            self._store(key, derived, True)
+            return derived
+        return None
+
+    def _store(self, key, data: Dict, complete: bool) -> None:
+        """Ajoute une réponse au cache (verrou tenu)."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, data, complete)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne les statistiques du proxy.
+
+        Returns:
+            dict: Hits exacts et par préfixe, misses, requêtes fusionnées, appels au service
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        served = stats["hits"] + stats["prefix_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = (served - stats["misses"]) / served if served else 0.0
+        return stats
+
+
+# Instance globale partagée par les routes de géocodage
+geocode_proxy = GeocodeProxy()
@@ -0,0 +1,260 @@
+"""
+job_manager.py
+--------------
+
+Exécution asynchrone des optimisations longues (API de jobs).
+Responsabilité unique : soumettre une optimisation à un pool borné, suivre sa
+progression et conserver son résultat pendant une durée limitée.
+
+Deux points d'extension :
+    • JobStore : stockage de l'état des jobs (en mémoire par défaut)
+    • JobQueue : exécution des jobs (pool de threads du processus par défaut)
+Un backend partagé (Redis, base de données...) implémente ces deux interfaces
+pour répartir les jobs entre plusieurs processus.
+"""
+import copy
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+from src.services.common.progress_events import progress_sink
+
+
+PROGRESS_COUNTERS = ("combinations_tested", "ors_calls")
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed")
+
+
+class JobQueueFullError(Exception):
+    """Trop de jobs en attente ou en cours."""
+    pass
+
+
+class JobStore:
+    """Interface de stockage de l'état des jobs."""
+
+    def create(self, job, max_active=None):
+        """
+        Enregistre un nouveau job (dict avec une clé "id").
+
+        Le comptage des jobs actifs et l'insertion forment une seule opération atomique.
+
+        Args:
+            job: Job à enregistrer
+            max_active: Nombre maximum de jobs en attente ou en cours (None = illimité)
+
+        Raises:
+            JobQueueFullError: Si `max_active` jobs sont déjà en attente ou en cours
+        """
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Retourne une copie du job ou None."""
+        raise NotImplementedError
+
+    def update(self, job_id, updater):
+        """Applique `updater(job)` au job de façon atomique."""
+        raise NotImplementedError
+
+    def delete(self, job_id):
+        """Supprime un job."""
+        raise NotImplementedError
+
+    def purge(self, finished_before):
+        """Supprime les jobs terminés dont la dernière mise à jour précède `finished_before`."""
+        raise NotImplementedError
+
+    def all(self):
+        """Retourne une copie de tous les jobs."""
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """Stockage des jobs dans le processus (perdu au redémarrage)."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job, max_active=None):
+        with self._lock:
+            if max_active is not None:
+                active = sum(1 for existing in self._jobs.values() if existing["status"] in ACTIVE_STATUSES)
+                if active >= max_active:
+                    raise JobQueueFullError(f"Trop de jobs en cours ({active}), réessayez plus tard")
+            self._jobs[job["id"]] = job
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job is not None else None
+
+    def update(self, job_id, updater):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                updater(job)
+
+    def delete(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def purge(self, finished_before):
+        # Statut et date sont lus en place : aucun résultat n'est copié
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["status"] in FINISHED_STATUSES and job["updated_at"] < finished_before]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def all(self):
+        with self._lock:
+            return copy.deepcopy(list(self._jobs.values()))
+
+
+class JobQueue:
+    """Interface d'exécution des jobs."""
+
+    def submit(self, fn):
+        """Planifie l'exécution de `fn()`."""
+        raise NotImplementedError
+
+
+class ThreadPoolJobQueue(JobQueue):
+    """Pool de threads borné du processus."""
+
+    def __init__(self, max_workers=Config.JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="route-job")
+
+    def submit(self, fn):
+        self._executor.submit(fn)
+
+
+class JobManager:
+    """
+    Gestionnaire des jobs d'optimisation.
+
+    Cycle de vie : queued → running → done | failed. La progression (combinaisons
+    testées, appels ORS, meilleures routes) est alimentée par les événements de
+    progress_events ; les jobs terminés expirent après `ttl_s` secondes (ils ne
+    sont plus renvoyés, et sont supprimés du stockage à la soumission suivante).
+    """
+
+    def __init__(self, store=None, queue=None, ttl_s=Config.JOB_TTL_S, max_pending=Config.JOB_MAX_PENDING):
+        """
+        Initialise le gestionnaire.
+
+        Args:
+            store: Stockage des jobs (InMemoryJobStore par défaut)
+            queue: File d'exécution (ThreadPoolJobQueue par défaut)
+            ttl_s: Durée de conservation d'un job terminé
+            max_pending: Nombre maximum de jobs en attente ou en cours
+        """
+        self.store = store or InMemoryJobStore()
+        self.queue = queue or ThreadPoolJobQueue()
+        self.ttl_s = ttl_s
+        self.max_pending = max_pending
+        # Compteurs vivants des jobs exécutés par ce processus
+        self._counters = {}
+
+    def submit(self, kind, compute, params=None):
+        """
+        Crée un job et planifie son exécution.
+
+        Args:
+            kind: Type d'optimisation ("tolls", "budget")
+            compute: Fonction sans argument retournant le résultat final
+            params: Paramètres de la requête (renvoyés tels quels)
+
+        Returns:
+            str: Identifiant du job
+
+        Raises:
+            JobQueueFullError: Si trop de jobs sont en attente ou en cours
+        """
+        self.purge_expired()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self.store.create({
+            "id": job_id,
+            "kind": kind,
+            "params": params or {},
+            "status": "queued",
+            "created_at": now,
+            "updated_at": now,
+            "progress": {**dict.fromkeys(PROGRESS_COUNTERS, 0), "best": {}},
+            "result": None,
+            "error": None,
+        }, max_active=self.max_pending)
+        self.queue.submit(lambda: self._run(job_id, compute))
+        return job_id
+
+    def get(self, job_id):
+        """
+        Retourne l'état d'un job.
+
+        Returns:
+            dict: Job (id, status, progress, result, error...) ou None s'il est inconnu ou expiré
+        """
+        job = self.store.get(job_id)
+        if job is not None and self._is_expired(job):
+            return None
+        counters = self._counters.get(job_id)
+        if job is not None and counters is not None:
+            job["progress"].update(_snapshot(counters))
+        return job
+
+    def purge_expired(self):
+        """Supprime les jobs terminés depuis plus de `ttl_s` secondes."""
+        self.store.purge(time.time() - self.ttl_s)
+
+    def _is_expired(self, job):
+        return job["status"] in FINISHED_STATUSES and job["updated_at"] < time.time() - self.ttl_s
+
+    def _run(self, job_id, compute):
+        """Exécute un job en alimentant sa progression."""
+        counters = self._counters[job_id] = {}
+        self._set(job_id, status="running")
+        try:
+            with progress_sink(lambda event: self._on_event(job_id, event, counters), counters):
+                result = compute()
+            self._set(job_id, status="done", result=result, counters=counters)
+        except Exception as e:
+            self._set(job_id, status="failed", error=str(e), counters=counters)
+        finally:
+            self._counters.pop(job_id, None)
+
+    def _on_event(self, job_id, event, counters):
+        """Met à jour la progression d'un job à partir d'un événement."""
+        def updater(job):
+            progress = job["progress"]
+            progress.update(_snapshot(counters))
+            route = event.get("route")
+            if route is None:
+                return
+            best = progress["best"]
+            if "veh_class" in event:
+                best = best.setdefault(event["veh_class"], {})
+            summary = {key: route.get(key) for key in ("cost", "duration", "toll_count")}
+            if event["event"] == "base":
+                best["base"] = summary
+            for criterion in event.get("criteria", ()):
+                best[criterion] = summary
+            job["updated_at"] = time.time()
+        self.store.update(job_id, updater)
+
+    def _set(self, job_id, counters=None, **changes):
+        """Met à jour le statut / résultat d'un job."""
+        def updater(job):
+            job.update(changes)
+            if counters is not None:
+                job["progress"].update(_snapshot(counters))
+            job["updated_at"] = time.time()
+        self.store.update(job_id, updater)
+
+
+def _snapshot(counters):
+    """Valeurs courantes des compteurs de progression."""
+    return {name: counters.get(name, 0) for name in PROGRESS_COUNTERS}
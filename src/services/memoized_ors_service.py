@@ -0,0 +1,100 @@
+"""
+memoized_ors_service.py
+----------------------
+
+Service ORS mémorisant les réponses par payload pendant la durée d'une requête.
+Permet de rejouer une optimisation pour plusieurs classes véhicule sans
+répéter les appels ORS identiques.
+"""
+import json
+import threading
+from concurrent.futures import Future
+
+from src.services.ors_service import ORSService
+
+
+class MemoizedORSService(ORSService):
+    """
+    Enveloppe d'un ORSService : chaque payload distinct n'est envoyé qu'une fois.
+
+    À instancier par requête (le mémo n'a pas d'expiration) ; les réponses
+    sont partagées en lecture seule entre les appelants. Des appels simultanés
+    avec le même payload (moteur parallèle) attendent la réponse du premier.
+
+    La configuration (URL) reste celle du service enveloppé : ORSService.__init__
+    n'est pas appelé, les attributs et méthodes hors call_ors sont délégués.
+    Les méthodes de construction de payload (get_base_route, ...) sont héritées
+    et passent par call_ors, donc par le mémo.
+    """
+
+    def __init__(self, ors_service):
+        """
+        Initialise le mémo au-dessus d'un service ORS existant.
+
+        Args:
+            ors_service: Instance de ORSService réellement appelée
+        """
+        self._delegate = ors_service
+        self._responses = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def base_url(self):
+        return self._delegate.base_url
+
+    @property
+    def directions_url(self):
+        return self._delegate.directions_url
+
+    def test_all_set(self):
+        return self._delegate.test_all_set()
+
+    def get_route(self, start, end):
+        return self._delegate.get_route(start, end)
+
+    def call_ors(self, payload):
+        """
+        Appelle ORS ou renvoie la réponse obtenue (ou en cours d'obtention) pour un payload identique.
+
+        Args:
+            payload: Dictionnaire de la requête ORS
+
+        Returns:
+            dict: Résultat GeoJSON de l'itinéraire
+
+        Raises:
+            Exception: L'erreur du service enveloppé (non mémorisée, propagée aux appels en attente)
+        """
+        key = json.dumps(payload, sort_keys=True)
+        with self._lock:
+            if key in self._responses:
+                self.hits += 1
+                return self._responses[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            # Payload identique en cours d'envoi : même réponse, sans appel supplémentaire
+            return future.result()
+
+        try:
+            response = self._delegate.call_ors(payload)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._responses[key] = response
+            del self._inflight[key]
+        future.set_result(response)
+        return response
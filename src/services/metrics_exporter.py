@@ -0,0 +1,258 @@
+"""
+metrics_exporter.py
+-------------------
+
+Export des métriques au format texte OpenMetrics (Prometheus) pour GET /metrics.
+Responsabilité unique : traduire en séries les compteurs du PerformanceTracker,
+des composants enregistrés (caches, ordonnanceur ORS, admission) et des requêtes HTTP.
+
+Tout est cumulatif depuis le démarrage du processus : une collecte copie les compteurs
+sans les remettre à zéro, elle peut être répétée toutes les quelques secondes.
+Les mesures d'une optimisation sont comptées à la fin de sa session.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "sam"
+
+# Bornes des buckets de latence (secondes), fixes pour rester comparables d'une collecte à l'autre
+LATENCY_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ORS_CONTEXTS = ("toll", "budget")
+
+FALLBACK_STATUSES = {
+    Config.StatusCodes.FALLBACK_BASE_ROUTE_USED,
+    Config.StatusCodes.LIMITED_ALTERNATIVES_FOUND,
+    Config.StatusCodes.ONLY_BASE_ROUTE_AVAILABLE,
+    Config.StatusCodes.NO_TOLL_ALTERNATIVE_FOUND,
+    Config.StatusCodes.NO_ALTERNATIVE_FOUND,
+}
+ERROR_STATUSES = {
+    Config.StatusCodes.ORS_CONNECTION_ERROR,
+    Config.StatusCodes.CRITICAL_ERROR,
+    Config.StatusCodes.INVALID_MAX_PRICE,
+    Config.StatusCodes.INVALID_MAX_PRICE_PERCENT,
+    "NO_RESULT",
+}
+
+
+class HttpMetrics:
+    """Requêtes HTTP en cours et réponses par route, méthode et code."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+
+    def request_started(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def record_response(self, endpoint: str, method: str, status: int):
+        """
+        Compte une réponse.
+
+        Args:
+            endpoint: Règle de la route ("/api/smart-route/tolls"), pas l'URL : cardinalité bornée
+            method: Méthode HTTP
+            status: Code de statut HTTP
+        """
+        key = (endpoint, method, status)
+        with self._lock:
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"in_flight": self._in_flight, "responses": dict(self._responses)}
+
+
+# Instance globale alimentée par les hooks Flask
+http_metrics = HttpMetrics()
+
+
+def parse_ors_call(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Décompose un nom d'appel produit par OperationTracker.count_ors_call.
+
+    Args:
+        name: "ORS_<type>" ou "ORS_<type>_<contexte>"
+
+    Returns:
+        tuple: (type, contexte), ou None si ce n'est pas un appel ORS
+    """
+    if not name.startswith("ORS_"):
+        return None
+    api_type = name[len("ORS_"):]
+    for context in _ORS_CONTEXTS:
+        if api_type.endswith(f"_{context}"):
+            return api_type[:-len(context) - 1], context
+    return api_type, "global"
+
+
+def result_outcome(status: str) -> str:
+    """Catégorie d'un statut de résultat : "error", "fallback" ou "success"."""
+    if status in ERROR_STATUSES:
+        return "error"
+    if status in FALLBACK_STATUSES:
+        return "fallback"
+    return "success"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value and abs(value) != float("inf") else "NaN"
+    return str(int(value))
+
+
+def _flatten(stats: Dict, prefix: str = ""):
+    """(clé pointée, valeur) des statistiques numériques, dictionnaires imbriqués compris."""
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{name}.")
+        elif isinstance(value, (int, float)):
+            yield name, value
+
+
+class _Writer:
+    """Accumule les familles de métriques (en-têtes TYPE / UNIT / HELP puis échantillons)."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name: str, kind: str, help_text: str, unit: str = None):
+        self.lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+        if unit:
+            self.lines.append(f"# UNIT {PREFIX}_{name} {unit}")
+        self.lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+
+    def sample(self, metric: str, value, /, **labels):
+        self.lines.append(f"{PREFIX}_{metric}{_labels(**labels)} {_number(value)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines + ["# EOF"]) + "\n"
+
+
+def _write_latency(writer: _Writer, operations: Dict[str, tuple]):
+    writer.family("operation_duration_seconds", "histogram", "Durée des opérations mesurées", "seconds")
+    for operation in sorted(operations):
+        wall = operations[operation][0]
+        buckets = list(wall.buckets())  # (plus haute valeur en ns, effectif cumulé)
+        position, cumulative = 0, 0
+        for bound in LATENCY_BUCKETS_S:
+            bound_ns = bound * 1e9
+            while position < len(buckets) and buckets[position][0] <= bound_ns:
+                cumulative = buckets[position][1]
+                position += 1
+            writer.sample("operation_duration_seconds_bucket", cumulative, operation=operation, le=bound)
+        writer.sample("operation_duration_seconds_bucket", wall.count, operation=operation, le="+Inf")
+        writer.sample("operation_duration_seconds_count", wall.count, operation=operation)
+        writer.sample("operation_duration_seconds_sum", wall.total / 1e9, operation=operation)
+
+    writer.family("operation_cpu_seconds", "counter", "Temps CPU du thread pendant les opérations", "seconds")
+    for operation in sorted(operations):
+        writer.sample("operation_cpu_seconds_total", operations[operation][1].total / 1e9, operation=operation)
+
+
+def _write_values(writer: _Writer, values: Dict[str, Dict]):
+    """Valeurs enregistrées par PerformanceTracker.record_values (ex. découpage réseau ORS)."""
+    writer.family("recorded_value", "summary", "Valeurs enregistrées par groupe (durées en µs, tailles en octets)")
+    for group in sorted(values):
+        for name, histogram in sorted(values[group].items()):
+            for quantile in (0.5, 0.9, 0.99):
+                if histogram.count:
+                    writer.sample("recorded_value", histogram.percentile(quantile), group=group, name=name,
+                                  quantile=quantile)
+            writer.sample("recorded_value_count", histogram.count, group=group, name=name)
+            writer.sample("recorded_value_sum", histogram.total, group=group, name=name)
+
+
+def _write_calls(writer: _Writer, api_calls: Dict[str, int]):
+    ors_calls, other_calls = {}, {}
+    for name, count in api_calls.items():
+        parsed = parse_ors_call(name)
+        if parsed:
+            ors_calls[parsed] = ors_calls.get(parsed, 0) + count
+        else:
+            other_calls[name] = count
+
+    writer.family("ors_calls", "counter", "Appels ORS par type et contexte")
+    for (api_type, context), count in sorted(ors_calls.items()):
+        writer.sample("ors_calls_total", count, type=api_type, context=context)
+    if other_calls:
+        writer.family("api_calls", "counter", "Autres appels externes comptés")
+        for name, count in sorted(other_calls.items()):
+            writer.sample("api_calls_total", count, name=name)
+
+
+def _write_components(writer: _Writer, component_stats: Dict[str, Dict]):
+    writer.family("cache_hit_ratio", "gauge", "Taux de succès des caches depuis le démarrage")
+    for component, stats in sorted(component_stats.items()):
+        if isinstance(stats.get("hit_ratio"), (int, float)):
+            writer.sample("cache_hit_ratio", stats["hit_ratio"], cache=component)
+
+    scheduler = component_stats.get("ors_scheduler", {})
+    writer.family("ors_concurrency", "gauge", "Appels ORS en cours et en attente d'une place")
+    for state in ("running", "waiting"):
+        if state in scheduler:
+            writer.sample("ors_concurrency", scheduler[state], state=state)
+    if "max_concurrency" in scheduler:
+        writer.family("ors_concurrency_limit", "gauge", "Plafond d'appels ORS simultanés")
+        writer.sample("ors_concurrency_limit", scheduler["max_concurrency"])
+
+    writer.family("component_stat", "gauge", "Statistiques numériques des composants enregistrés")
+    for component, stats in sorted(component_stats.items()):
+        for stat, value in _flatten(stats):
+            writer.sample("component_stat", value, component=component, stat=stat)
+
+
+def render_metrics(snapshot: Dict, http: Dict) -> str:
+    """
+    Produit le texte OpenMetrics.
+
+    Args:
+        snapshot: PerformanceTracker.metrics_snapshot()
+        http: HttpMetrics.snapshot()
+
+    Returns:
+        str: Exposition terminée par "# EOF"
+    """
+    writer = _Writer()
+    _write_latency(writer, snapshot.get("operations", {}))
+    _write_values(writer, snapshot.get("values", {}))
+    _write_calls(writer, snapshot.get("api_calls", {}))
+
+    writer.family("optimization_results", "counter", "Optimisations terminées par statut de résultat")
+    for status, count in sorted(snapshot.get("result_statuses", {}).items()):
+        writer.sample("optimization_results_total", count, status=status, outcome=result_outcome(status))
+    writer.family("optimization_errors", "counter", "Erreurs signalées pendant les optimisations")
+    writer.sample("optimization_errors_total", snapshot.get("errors", 0))
+    writer.family("optimizations_in_flight", "gauge", "Sessions d'optimisation en cours")
+    writer.sample("optimizations_in_flight", snapshot.get("sessions_active", 0))
+
+    writer.family("http_requests_in_flight", "gauge", "Requêtes HTTP en cours de traitement")
+    writer.sample("http_requests_in_flight", http.get("in_flight", 0))
+    writer.family("http_responses", "counter", "Réponses HTTP par route, méthode et code")
+    for (endpoint, method, status), count in sorted(http.get("responses", {}).items()):
+        writer.sample("http_responses_total", count, endpoint=endpoint, method=method, code=status)
+
+    _write_components(writer, snapshot.get("component_stats", {}))
+    return writer.text()
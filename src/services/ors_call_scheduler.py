@@ -0,0 +1,152 @@
+"""
+ors_call_scheduler.py
+---------------------
+
+Ordonnanceur central des appels ORS entre requêtes concurrentes.
+Responsabilité unique : borner le nombre d'appels ORS simultanés et choisir
+quel appel en attente part dès qu'une place se libère.
+
+- Priorité (ORSConfigManager.get_request_priority, d'après les options du
+  payload) : routes sans option, dont la route de base ("high"), avant
+  l'évitement des autoroutes ("medium"), avant les évitements de polygones des
+  candidats ("low"). La route retenue n'est pas redemandée à ORS : sa géométrie
+  vient de l'appel qui l'a évaluée, à la priorité de cet appel
+- Équité : à priorité égale, les requêtes sont servies à tour de rôle ; une
+  grosse recherche budgétaire ne fait plus attendre le premier appel des autres
+- Une requête est identifiée par son RouteContext (partagé par les threads du
+  pool d'évaluation), à défaut par le thread appelant
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict
+
+from src.services.ors_config_manager import ORSConfigManager
+from src.services.common.route_context import current_route_context
+
+
+PRIORITIES = ("high", "medium", "low")
+
+
+class _Ticket:
+    """Appel en attente d'une place."""
+
+    __slots__ = ("granted", "enqueued_at")
+
+    def __init__(self):
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+def _current_requester():
+    """Identifiant de la requête appelante."""
+    context = current_route_context()
+    return ("context", id(context)) if context is not None else ("thread", threading.get_ident())
+
+
+class ORSCallScheduler:
+    """File d'attente à priorités et tourniquet par requête devant ORS."""
+
+    def __init__(self, max_concurrency: int = ORSConfigManager.MAX_CONCURRENT_CALLS):
+        """
+        Args:
+            max_concurrency: Appels ORS simultanés au plus (tous utilisateurs confondus)
+        """
+        self.max_concurrency = max_concurrency
+        self._cond = threading.Condition()
+        self._running = 0
+        # priorité -> {requête -> appels en attente}, dans l'ordre du tourniquet
+        self._queues: Dict[str, "OrderedDict[tuple, deque]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._waiting = 0
+        self._stats = {
+            "calls": 0, "queued": 0, "max_waiting": 0,
+            "wait_s": {p: 0.0 for p in PRIORITIES}, "waits": {p: 0 for p in PRIORITIES},
+        }
+
+    def run(self, payload: dict, call: Callable[[], object]):
+        """
+        Exécute `call()` quand une place est attribuée à cet appel.
+
+        Args:
+            payload: Payload ORS (détermine la priorité)
+            call: Fonction sans argument effectuant l'appel
+
+        Returns:
+            Le résultat de `call()`
+        """
+        priority = ORSConfigManager.get_request_priority(payload)
+        if priority not in self._queues:
+            priority = "low"
+        self._acquire(priority, _current_requester())
+        try:
+            return call()
+        finally:
+            self._release()
+
+    def _acquire(self, priority: str, requester: tuple) -> None:
+        """Attend une place (immédiate si personne n'attend et qu'une place est libre)."""
+        with self._cond:
+            self._stats["calls"] += 1
+            if self._running < self.max_concurrency and self._waiting == 0:
+                self._running += 1
+                return
+            ticket = _Ticket()
+            self._queues[priority].setdefault(requester, deque()).append(ticket)
+            self._waiting += 1
+            self._stats["queued"] += 1
+            self._stats["max_waiting"] = max(self._stats["max_waiting"], self._waiting)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+            self._stats["wait_s"][priority] += time.monotonic() - ticket.enqueued_at
+            self._stats["waits"][priority] += 1
+
+    def _release(self) -> None:
+        """Libère une place et l'attribue au prochain appel."""
+        with self._cond:
+            self._running -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Attribue les places libres : priorité la plus haute, puis requête suivante du tourniquet."""
+        granted = False
+        while self._running < self.max_concurrency and self._waiting:
+            queue = next(q for p, q in self._queues.items() if q)
+            requester, tickets = next(iter(queue.items()))
+            ticket = tickets.popleft()
+            if tickets:
+                queue.move_to_end(requester)
+            else:
+                del queue[requester]
+            ticket.granted = True
+            self._running += 1
+            self._waiting -= 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne les statistiques de l'ordonnanceur.
+
+        Returns:
+            dict: Appels, appels mis en attente, attente moyenne par priorité, occupation
+        """
+        with self._cond:
+            stats = {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "waiting": self._waiting,
+                "calls": self._stats["calls"],
+                "queued": self._stats["queued"],
+                "max_waiting": self._stats["max_waiting"],
+            }
+            stats["avg_wait_s"] = {
+                p: (self._stats["wait_s"][p] / self._stats["waits"][p]) if self._stats["waits"][p] else 0.0
+                for p in PRIORITIES
+            }
+        return stats
+
+
+# Instance globale : le plafond vaut pour tout le processus
+ors_scheduler = ORSCallScheduler()
@@ -17,6 +17,16 @@ class ORSConfigManager:
     COMPLEX_TIMEOUT = 20    # Timeout pour routes avec évitement
     MAX_TIMEOUT = 30        # Timeout maximum
     
+    # Timeouts appris des latences observées (ors_latency_model.py)
+    LEARNED_TIMEOUT_PERCENTILE = 0.99   # Quantile des latences servant de base
+    LEARNED_TIMEOUT_MARGIN = 1.5        # Marge multiplicative sur le quantile
+    LEARNED_TIMEOUT_FLOOR = 3           # Plancher : un appel bloqué échoue vite
+    LEARNED_TIMEOUT_CEILING = 60        # Plafond : un appel lent mais habituel n'est pas coupé
+    LEARNED_TIMEOUT_MIN_SAMPLES = 20    # Échantillons requis avant d'utiliser l'historique
+    
+    # Ordonnancement des appels (ors_call_scheduler.py)
+    MAX_CONCURRENT_CALLS = 8            # Appels ORS simultanés, toutes requêtes confondues
+    
     # Headers standards pour tous les appels
     STANDARD_HEADERS = {
         "Content-Type": "application/json; charset=utf-8",
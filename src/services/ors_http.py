@@ -0,0 +1,93 @@
+"""
+ors_http.py
+-----------
+
+Session HTTP partagée pour les appels ORS, avec mesure du temps d'établissement des connexions.
+Responsabilité unique : transporter les requêtes et isoler la part "connexion" de leur durée.
+
+Les connexions (TCP + TLS) sont réutilisées par le pool ; quand une connexion est ouverte,
+sa durée est cumulée pour le thread appelant et relevée par `take_connect_time()`.
+Le reste du découpage (serveur, téléchargement, parsing JSON) est mesuré par ORSService.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.services.ors_config_manager import ORSConfigManager
+
+
+_connect_time = threading.local()
+
+
+def take_connect_time() -> float:
+    """
+    Retourne puis remet à zéro le temps passé à ouvrir des connexions dans ce thread.
+
+    Returns:
+        float: Secondes (0 si la requête a réutilisé une connexion du pool)
+    """
+    elapsed = getattr(_connect_time, "seconds", 0.0)
+    _connect_time.seconds = 0.0
+    return elapsed
+
+
+def _timed_connect(connect):
+    def wrapper(self):
+        started = time.perf_counter()
+        try:
+            return connect(self)
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - started
+    return wrapper
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Adaptateur dont les pools mesurent l'ouverture de leurs connexions."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def create_ors_session(pool_size: int = ORSConfigManager.MAX_CONCURRENT_CALLS) -> requests.Session:
+    """
+    Crée une session dont le pool couvre le plafond d'appels ORS simultanés.
+
+    Args:
+        pool_size: Connexions conservées par hôte
+
+    Returns:
+        requests.Session: Session montée sur TimedHTTPAdapter
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Session globale partagée par tous les ORSService
+ors_http_session = create_ors_session()
@@ -0,0 +1,188 @@
+"""
+ors_latency_model.py
+--------------------
+
+Timeouts ORS appris à partir des latences observées.
+Responsabilité unique : tenir des histogrammes de latence des appels ORS réels
+et en déduire un timeout par type de requête.
+
+Les appels sont regroupés par opération (route de base, évitement des
+autoroutes à péage, route alternative), nombre de polygones évités et longueur
+à vol d'oiseau du trajet. Le timeout d'un groupe est un percentile élevé de ses
+latences, multiplié par une marge et borné par un plancher et un plafond : un
+appel bloqué échoue vite, un appel lent mais habituel n'est pas coupé. Tant
+qu'un groupe n'a pas assez d'échantillons, on se rabat sur le groupe de
+l'opération, puis sur le timeout statique d'ORSConfigManager.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.services.ors_config_manager import ORSConfigManager
+from src.utils.route_utils import haversine_m
+
+
+# Bornes des classes de l'histogramme : log-espacées de 50 ms à ~2 min
+_BIN_EDGES = tuple(0.05 * (1.25 ** i) for i in range(36))
+_POLYGON_BUCKETS = (0, 1, 2, 4, 8, 16)          # Bornes basses du nombre de polygones
+_LENGTH_BUCKETS_KM = (0, 50, 200, 500, 1000)    # Bornes basses de la longueur du trajet
+
+
+def _bucket(value, lower_bounds) -> int:
+    """Borne basse de la classe contenant `value`."""
+    selected = lower_bounds[0]
+    for bound in lower_bounds:
+        if value >= bound:
+            selected = bound
+    return selected
+
+
+class LatencyHistogram:
+    """Histogramme de latences à classes log-espacées, avec oubli progressif."""
+
+    def __init__(self, window: int = 500):
+        """
+        Args:
+            window: Nombre d'échantillons au-delà duquel les anciens comptes sont divisés par deux
+        """
+        self.window = window
+        self.counts = [0.0] * (len(_BIN_EDGES) + 1)
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Ajoute une latence (secondes)."""
+        index = len(_BIN_EDGES)
+        for i, edge in enumerate(_BIN_EDGES):
+            if seconds <= edge:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += 1
+        if self.total > self.window:
+            # Oubli : la distribution suit les changements de charge d'ORS
+            self.counts = [c / 2 for c in self.counts]
+            self.total /= 2
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Borne haute de la classe contenant le quantile `q` (estimation par excès)."""
+        if self.total <= 0:
+            return None
+        threshold = q * self.total
+        cumulative = 0.0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold and count > 0:
+                return round(_BIN_EDGES[i] if i < len(_BIN_EDGES) else _BIN_EDGES[-1] * 1.25, 3)
+        return round(_BIN_EDGES[-1] * 1.25, 3)
+
+
+class ORSLatencyModel:
+    """Histogrammes de latence ORS par groupe de requêtes et timeouts dérivés."""
+
+    def __init__(self, percentile: float = ORSConfigManager.LEARNED_TIMEOUT_PERCENTILE,
+                 margin: float = ORSConfigManager.LEARNED_TIMEOUT_MARGIN,
+                 floor_s: float = ORSConfigManager.LEARNED_TIMEOUT_FLOOR,
+                 ceiling_s: float = ORSConfigManager.LEARNED_TIMEOUT_CEILING,
+                 min_samples: int = ORSConfigManager.LEARNED_TIMEOUT_MIN_SAMPLES):
+        """
+        Args:
+            percentile: Quantile des latences servant de base au timeout
+            margin: Facteur multiplicatif appliqué au quantile
+            floor_s: Timeout minimal
+            ceiling_s: Timeout maximal
+            min_samples: Échantillons requis avant d'utiliser un histogramme
+        """
+        self.percentile = percentile
+        self.margin = margin
+        self.floor_s = floor_s
+        self.ceiling_s = ceiling_s
+        self.min_samples = min_samples
+        self._histograms: Dict[Tuple, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._stats = {"observations": 0, "timeouts": 0, "learned": 0, "static": 0}
+
+    @staticmethod
+    def request_key(payload: dict) -> Tuple[str, int, int]:
+        """
+        Groupe d'une requête : (opération, classe de polygones, classe de longueur en km).
+        """
+        operation = ORSConfigManager.get_operation_name(payload)
+        options = payload.get("options") or {}
+        polygons = options.get("avoid_polygons") or {}
+        if polygons.get("type") == "Polygon":
+            polygon_count = 1
+        else:
+            polygon_count = len(polygons.get("coordinates", []))
+
+        coordinates = payload.get("coordinates") or []
+        length_km = 0.0
+        try:
+            for a, b in zip(coordinates, coordinates[1:]):
+                length_km += float(haversine_m(a[0], a[1], b[0], b[1])) / 1000
+        except (TypeError, IndexError, ValueError):
+            length_km = 0.0
+        return operation, _bucket(polygon_count, _POLYGON_BUCKETS), _bucket(length_km, _LENGTH_BUCKETS_KM)
+
+    def observe(self, payload: dict, seconds: float, timed_out: bool = False) -> None:
+        """
+        Enregistre la durée d'un appel ORS.
+
+        Un appel interrompu par le timeout est compté à la durée du timeout
+        (échantillon censuré) : les timeouts suivants ne peuvent que s'allonger.
+        """
+        key = self.request_key(payload)
+        with self._lock:
+            for group in (key, key[:1]):
+                self._histograms.setdefault(group, LatencyHistogram()).add(seconds)
+            self._stats["observations"] += 1
+            self._stats["timeouts"] += int(timed_out)
+
+    def timeout_for(self, payload: dict, static_timeout: float) -> float:
+        """
+        Timeout à appliquer à une requête.
+
+        Args:
+            payload: Payload ORS
+            static_timeout: Timeout statique utilisé sans historique suffisant
+
+        Returns:
+            float: Timeout en secondes
+        """
+        key = self.request_key(payload)
+        with self._lock:
+            for group in (key, key[:1]):
+                histogram = self._histograms.get(group)
+                if histogram is not None and histogram.total >= self.min_samples:
+                    learned = histogram.percentile(self.percentile) * self.margin
+                    self._stats["learned"] += 1
+                    return round(min(max(learned, self.floor_s), self.ceiling_s), 2)
+            self._stats["static"] += 1
+        return static_timeout
+
+    def reset(self) -> None:
+        """Oublie toutes les latences observées."""
+        with self._lock:
+            self._histograms.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne les statistiques du modèle.
+
+        Returns:
+            dict: Observations, timeouts, décisions apprises / statiques, p50 / p99 par opération
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            operations = {
+                group[0]: {
+                    "samples": round(histogram.total, 1),
+                    "p50_s": histogram.percentile(0.5),
+                    "p99_s": histogram.percentile(self.percentile),
+                }
+                for group, histogram in self._histograms.items() if len(group) == 1
+            }
+        stats["operations"] = operations
+        return stats
+
+
+# Instance globale partagée par tous les ORSService
+ors_latency_model = ORSLatencyModel()
@@ -5,11 +5,48 @@ ors_service.py
 Service pour les appels à l'API OpenRouteService.
 """
 import os
+import time
 import requests
 import copy
+from urllib3.exceptions import ReadTimeoutError
 from src.services.ors_payload_builder import ORSPayloadBuilder
 from src.services.ors_config_manager import ORSConfigManager
+from src.services.ors_latency_model import ors_latency_model
+from src.services.ors_call_scheduler import ors_scheduler
+from src.services.ors_http import ors_http_session, take_connect_time
 from benchmark.performance_tracker import performance_tracker
+from src.services.common.progress_events import count_progress
+
+performance_tracker.register_stats_provider("ors_latency", ors_latency_model.get_stats)
+performance_tracker.register_stats_provider("ors_scheduler", ors_scheduler.get_stats)
+
+def _body_size(body) -> int:
+    """Taille en octets d'un corps de requête / réponse (0 si inconnu)."""
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return len(body) if isinstance(body, (bytes, bytearray)) else 0
+
+
+def _is_read_timeout(error) -> bool:
+    """
+    Indique si une ConnectionError provient d'un timeout de lecture du corps.
+
+    En streaming, requests signale un timeout pendant le téléchargement par une
+    ConnectionError enveloppant le ReadTimeoutError d'urllib3, pas par un Timeout.
+    """
+    cause = error.args[0] if error.args else None
+    return isinstance(cause, ReadTimeoutError) or isinstance(error.__context__, ReadTimeoutError)
+
+
+def _count_polygons(payload) -> int:
+    """Nombre de polygones à éviter dans le payload (Polygon ou MultiPolygon)."""
+    shape = payload.get("options", {}).get("avoid_polygons")
+    if not shape:
+        return 0
+    if shape.get("type") == "MultiPolygon":
+        return len(shape.get("coordinates", []))
+    return 1
+
 
 class ORSService:
     def __init__(self):
@@ -61,22 +98,66 @@ class ORSService:
         if not self.directions_url:
             raise ValueError("ORS_BASE_URL n'est pas défini dans les variables d'environnement")
         
-        # Calculer le timeout optimal
-        timeout = ORSConfigManager.calculate_timeout(payload)
+        # Timeout appris des latences observées (statique tant que l'historique est insuffisant)
+        timeout = ors_latency_model.timeout_for(payload, ORSConfigManager.calculate_timeout(payload))
         
-        # Tracking et métadonnées
+        # Tracking et métadonnées (le découpage réseau est ajouté aux détails de la mesure)
         operation_name = ORSConfigManager.get_operation_name(payload)
-        with performance_tracker.measure_operation(operation_name):
+        details = {}
+        # Avant la mesure : un flux abandonné par son client s'arrête ici, sans appel ORS
+        count_progress("ors_calls")
+        with performance_tracker.measure_operation(operation_name, details):
             performance_tracker.count_api_call(operation_name)
-            
-            r = requests.post(
+            # Place attribuée par l'ordonnanceur (plafond global, priorité, équité entre requêtes)
+            return ors_scheduler.run(payload, lambda: self._post(payload, timeout, details))
+    
+    def _post(self, payload, timeout, details=None):
+        """
+        Envoie la requête à ORS et enregistre sa latence (hors attente dans l'ordonnanceur).
+        
+        La durée est découpée en connexion, serveur (envoi jusqu'aux en-têtes de réponse),
+        téléchargement du corps et parsing JSON, avec les tailles échangées.
+        """
+        take_connect_time()
+        started = time.perf_counter()
+        try:
+            r = ors_http_session.post(
                 self.directions_url, 
                 json=payload, 
                 headers=ORSConfigManager.STANDARD_HEADERS, 
-                timeout=timeout
+                timeout=timeout,
+                stream=True
             )
-            r.raise_for_status()
-            return r.json()
+            headers_received = time.perf_counter()
+            content = r.content
+        except requests.exceptions.Timeout:
+            ors_latency_model.observe(payload, timeout, timed_out=True)
+            raise
+        except requests.exceptions.ConnectionError as e:
+            # Corps interrompu par le timeout de lecture : échantillon censuré lui aussi
+            if _is_read_timeout(e):
+                ors_latency_model.observe(payload, timeout, timed_out=True)
+            raise
+        downloaded = time.perf_counter()
+        r.raise_for_status()
+        ors_latency_model.observe(payload, downloaded - started)
+        data = r.json()
+        parsed = time.perf_counter()
+        
+        connect = min(take_connect_time(), headers_received - started)
+        breakdown = {
+            "connect_us": round(connect * 1e6),
+            "server_us": round((headers_received - started - connect) * 1e6),
+            "download_us": round((downloaded - headers_received) * 1e6),
+            "json_parse_us": round((parsed - downloaded) * 1e6),
+            "request_bytes": _body_size(getattr(r.request, "body", None)),
+            "response_bytes": _body_size(content),
+            "avoid_polygons": _count_polygons(payload),
+        }
+        performance_tracker.record_values("ors_network", breakdown)
+        if details is not None:
+            details.update(breakdown)
+        return data
     
     def get_base_route(self, coordinates, include_tollways=True):
         """
@@ -0,0 +1,315 @@
+"""
+route_result_cache.py
+---------------------
+
+Cache des résultats d'optimisation entre requêtes (trajets populaires, clics répétés).
+Responsabilité unique : mémoriser la réponse sérialisée d'une optimisation pour
+des entrées canonisées et la version des données de péages.
+
+Clé : type d'optimisation + coordonnées + paramètres + version des données.
+Par défaut les coordonnées sont exactes : seule une requête identique est servie.
+Des requêtes identiques simultanées ne lancent qu'une optimisation (les suivantes
+attendent la réponse de la première).
+
+L'arrondi (snapping, `snap_decimals`) est optionnel et approximatif. Il ne
+partage une entrée que si chaque point demandé est à moins de `snap_guard_m`
+du point où ORS a accroché la route mise en cache, mais deux points proches
+peuvent s'accrocher à des voies différentes (chaussées opposées d'une autoroute,
+bretelle) : la réponse servie peut alors différer de celle qu'aurait produite
+l'optimisation. À n'activer que si ce compromis est acceptable.
+"""
+import json
+import math
+import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), '../../data')
+DATASET_FILES = ("barriers.csv", "virtual_edges.csv")
+
+# Statuts d'échec : jamais mis en cache
+_UNCACHEABLE_STATUSES = {
+    Config.StatusCodes.CRITICAL_ERROR,
+    Config.StatusCodes.ORS_CONNECTION_ERROR,
+}
+
+EARTH_RADIUS_M = 6371000
+
+
+def dataset_version(files=DATASET_FILES, data_dir=_DATA_DIR) -> str:
+    """
+    Empreinte des données de péages (taille + date de modification des fichiers).
+
+    Returns:
+        str: Version courte, change dès qu'un fichier de données est remplacé
+    """
+    digest = hashlib.sha1()
+    for name in files:
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{name}:missing;".encode())
+    return digest.hexdigest()[:12]
+
+
+def _distance_m(a, b) -> float:
+    """Distance haversine entre deux points [lon, lat] en mètres."""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def _route_endpoints(result) -> Optional[Tuple[List[float], List[float]]]:
+    """Points de départ / arrivée accrochés par ORS, lus dans la première route du résultat."""
+    if not isinstance(result, dict):
+        return None
+    for criterion in ("fastest", "cheapest", "min_tolls"):
+        try:
+            line = result[criterion]["route"]["features"][0]["geometry"]["coordinates"]
+            return line[0], line[-1]
+        except (KeyError, IndexError, TypeError):
+            continue
+    for sub_result in (result.get("results") or {}).values():
+        endpoints = _route_endpoints(sub_result)
+        if endpoints:
+            return endpoints
+    return None
+
+
+def _valid_points(coordinates) -> bool:
+    """Coordonnées utilisables comme clé : liste de paires numériques."""
+    try:
+        return len(coordinates) >= 2 and all(len(p) == 2 and all(isinstance(v, (int, float)) for v in p)
+                                            for p in coordinates)
+    except TypeError:
+        return False
+
+
+def _is_cacheable(result) -> bool:
+    """Seuls les résultats réussis (y compris par classe de véhicule) sont mis en cache."""
+    if not isinstance(result, dict) or not result or "error" in result:
+        return False
+    if "quality_tier" in result:
+        # Résultat dégradé par le contrôle d'admission : la requête suivante mérite la qualité complète
+        return False
+    if "results" in result:
+        return all(_is_cacheable(sub_result) for sub_result in result["results"].values())
+    return result.get("status") not in _UNCACHEABLE_STATUSES
+
+
+class RouteResultCache:
+    """
+    Cache LRU des réponses d'optimisation sérialisées (bytes JSON).
+
+    - Éviction par taille totale (octets) et par TTL
+    - Snapping optionnel (approximatif) des coordonnées avec garde de distance
+    - Compteurs hits / misses / rejets de snapping / évictions
+    """
+
+    def __init__(self, max_bytes: int = Config.RESULT_CACHE_MAX_BYTES, ttl_seconds: int = Config.RESULT_CACHE_TTL_S,
+                 snap_decimals: Optional[int] = Config.RESULT_CACHE_SNAP_DECIMALS,
+                 snap_guard_m: float = Config.RESULT_CACHE_SNAP_GUARD_M,
+                 version_recheck_s: float = Config.RESULT_CACHE_VERSION_RECHECK_S):
+        """
+        Initialise le cache.
+
+        Args:
+            max_bytes: Taille maximale cumulée des réponses en cache
+            ttl_seconds: Durée de vie d'une entrée
+            snap_decimals: Décimales conservées pour la clé (None = coordonnées exactes ;
+                un arrondi peut servir la route d'un point voisin, voir l'en-tête du module)
+            snap_guard_m: Distance maximale entre un point demandé et le point accroché en cache
+            version_recheck_s: Intervalle minimal entre deux lectures de la version des données
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.snap_decimals = snap_decimals
+        self.snap_guard_m = snap_guard_m
+        self.version_recheck_s = version_recheck_s
+        self._lock = threading.Lock()
+        # clé -> (instant d'expiration, coordonnées demandées, points accrochés, réponse)
+        self._entries: "OrderedDict[Tuple, Tuple[float, list, Any, bytes]]" = OrderedDict()
+        # clé -> (réponse à venir, coordonnées de la requête qui la calcule)
+        self._inflight: Dict[Tuple, Tuple[Future, list]] = {}
+        self._size = 0
+        self._version: Optional[str] = None
+        self._version_checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "snap_rejections": 0, "evictions": 0,
+                       "expirations": 0}
+
+    def _dataset_version(self) -> str:
+        """Version des données, relue au plus toutes les `version_recheck_s` secondes."""
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.version_recheck_s:
+            self._version = dataset_version()
+            self._version_checked_at = now
+        return self._version
+
+    def _snapping(self, coordinates) -> bool:
+        """Le snapping ne s'applique qu'aux trajets départ → arrivée."""
+        return self.snap_decimals is not None and len(coordinates) == 2
+
+    def make_key(self, kind: str, coordinates, params: Dict[str, Any]) -> Tuple:
+        """
+        Clé canonique d'une requête.
+
+        Args:
+            kind: Type d'optimisation ("tolls", "budget")
+            coordinates: Liste de points [lon, lat]
+            params: Paramètres influant sur le résultat (max_tolls, budget, classes, mode...)
+
+        Returns:
+            tuple: Clé hashable
+        """
+        if self._snapping(coordinates):
+            points = tuple((round(lon, self.snap_decimals), round(lat, self.snap_decimals)) for lon, lat in coordinates)
+        else:
+            points = tuple((float(lon), float(lat)) for lon, lat in coordinates)
+        return (kind, points, json.dumps(params, sort_keys=True, default=str), self._dataset_version())
+
+    def get(self, kind: str, coordinates, params: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Retourne la réponse sérialisée en cache, ou None.
+
+        Returns:
+            bytes | None: Réponse JSON si l'entrée existe, n'a pas expiré et passe la garde de snapping
+        """
+        key = self.make_key(kind, coordinates, params)
+        with self._lock:
+            return self._lookup(key, coordinates)
+
+    def _lookup(self, key, coordinates) -> Optional[bytes]:
+        """Lecture d'une entrée avec expiration et garde de snapping (verrou déjà pris)."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._remove(key)
+            self._stats["expirations"] += 1
+            entry = None
+        if entry is not None and not self._same_snapped_route(coordinates, entry):
+            self._stats["snap_rejections"] += 1
+            entry = None
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[3]
+
+    def put(self, kind: str, coordinates, params: Dict[str, Any], result: Dict[str, Any]) -> bytes:
+        """
+        Sérialise un résultat et le met en cache s'il est réussi.
+
+        Returns:
+            bytes: Réponse sérialisée (mise en cache ou non)
+        """
+        body = json.dumps(result, default=str).encode("utf-8")
+        if not _is_cacheable(result) or len(body) > self.max_bytes:
+            return body
+
+        key = self.make_key(kind, coordinates, params)
+        entry = (time.monotonic() + self.ttl_seconds, [list(p) for p in coordinates], _route_endpoints(result), body)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats["evictions"] += 1
+        return body
+
+    def get_or_compute(self, kind: str, coordinates, params: Dict[str, Any],
+                       compute: Callable[[], Dict[str, Any]]) -> Tuple[bytes, bool]:
+        """
+        Sert la réponse depuis le cache ou exécute l'optimisation.
+
+        Une seule optimisation tourne par clé : une requête identique arrivant pendant
+        le calcul attend sa réponse (ou son erreur) au lieu de relancer ORS.
+
+        Returns:
+            tuple: (réponse JSON sérialisée, True si servie sans exécuter l'optimisation)
+        """
+        if not _valid_points(coordinates):
+            # Entrée invalide : l'optimisation produit sa propre erreur, rien à mettre en cache
+            return json.dumps(compute(), default=str).encode("utf-8"), False
+        key = self.make_key(kind, coordinates, params)
+        requested = [list(p) for p in coordinates]
+        with self._lock:
+            body = self._lookup(key, coordinates)
+            if body is not None:
+                return body, True
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = (Future(), requested)
+                self._inflight[key] = flight
+
+        future, leader_coordinates = flight
+        if not leader:
+            if leader_coordinates == requested:
+                body = future.result()
+                with self._lock:
+                    self._stats["coalesced"] += 1
+                return body, True
+            # Même clé par snapping : la garde de distance décide une fois l'entrée écrite
+            try:
+                future.result()
+            except Exception:
+                pass
+            return self.get_or_compute(kind, coordinates, params, compute)
+
+        try:
+            body = self.put(kind, coordinates, params, compute())
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+        future.set_result(body)
+        return body, False
+
+    def _same_snapped_route(self, coordinates, entry) -> bool:
+        """Garde de snapping : chaque point demandé est proche du point accroché en cache."""
+        _, cached_coordinates, endpoints, _ = entry
+        requested = [list(p) for p in coordinates]
+        if requested == cached_coordinates or not self._snapping(coordinates):
+            return True
+        if endpoints is None:
+            return False
+        return all(_distance_m(point, snapped) <= self.snap_guard_m for point, snapped in zip(requested, endpoints))
+
+    def _remove(self, key) -> None:
+        """Retire une entrée (verrou déjà pris)."""
+        entry = self._entries.pop(key)
+        self._size -= len(entry[3])
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            dict: Statistiques d'utilisation du cache
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"entries": len(self._entries), "size_bytes": self._size, "max_bytes": self.max_bytes})
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -17,8 +17,14 @@ Pipeline complet :
 """
 from __future__ import annotations
 from src.services.ors_service import ORSService
+from src.services.memoized_ors_service import MemoizedORSService
 from src.services.toll_strategies import TollRouteOptimizer
 from src.services.budget_strategies import BudgetRouteOptimizer
+from src.services.common.progress_events import progress_fields
+from src.services.common.route_context import route_context
+from src.services.common.pareto_archive import limit_alternatives
+from src.services.route_result_cache import RouteResultCache
+from benchmark.performance_tracker import performance_tracker
 
 class SmartRouteService:
     """
@@ -33,13 +39,34 @@ class SmartRouteService:
         self.ors_service = ORSService()
         self.toll_optimizer = TollRouteOptimizer(self.ors_service)
         self.budget_optimizer = BudgetRouteOptimizer(self.ors_service)
+        self.result_cache = RouteResultCache()
+        performance_tracker.register_stats_provider("route_result_cache", self.result_cache.get_stats)
+    
+    def compute_cached(self, kind: str, coordinates: list, params: dict, compute):
+        """
+        Sert une optimisation depuis le cache inter-requêtes ou l'exécute.
+        
+        Args:
+            kind: Type d'optimisation ("tolls", "budget")
+            coordinates: Liste de coordonnées [départ, arrivée]
+            params: Paramètres canoniques de la requête (hors coordonnées)
+            compute: Fonction sans argument exécutant l'optimisation
+            
+        Returns:
+            tuple: (réponse JSON sérialisée en bytes, True si servie depuis le cache)
+        """
+        return self.result_cache.get_or_compute(kind, coordinates, params, compute)
     
     def compute_route_with_toll_limit(
         self,
         coordinates: list,
         max_tolls: int,
         veh_class: str = "c1",
-        max_comb_size: int = 2
+        max_comb_size: int = 2,
+        search: str = "exhaustive",
+        beam_width: int = 3,
+        alternatives: int = 0,
+        network_search: bool = True
     ):
         """
         Calcule un itinéraire avec une limite sur le nombre de péages.
@@ -49,6 +76,10 @@ class SmartRouteService:
             max_tolls: Nombre maximum de péages autorisés
             veh_class: Classe de véhicule pour le calcul des coûts
             max_comb_size: Limite pour les combinaisons de péages à éviter
+            search: Mode de recherche ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
+            alternatives: Nombre de routes non dominées à retourner (0 = aucune)
+            network_search: Chercher un péage ouvert dans tout le réseau (cas max_tolls=1)
             
         Returns:
             dict: Résultats optimisés (fastest, cheapest, min_tolls, status)
@@ -66,9 +97,12 @@ class SmartRouteService:
                 coordinates,
                 max_tolls,
                 veh_class,
-                max_comb_size
+                max_comb_size,
+                search,
+                beam_width,
+                network_search
             )
-            return result        
+            return limit_alternatives(result, alternatives)
         finally:
             # TERMINER LA SESSION - Le résumé sera automatiquement loggé
             performance_tracker.end_optimization_session(result if 'result' in locals() else {})
@@ -79,7 +113,10 @@ class SmartRouteService:
         max_price: float = None,
         max_price_percent: float = None,
         veh_class: str = "c1",
-        max_comb_size: int = 2
+        max_comb_size: int = 2,
+        search: str = "exhaustive",
+        beam_width: int = 3,
+        alternatives: int = 0
     ):
         """
         Calcule un itinéraire avec une contrainte de budget maximum.
@@ -90,6 +127,9 @@ class SmartRouteService:
             max_price_percent: Pourcentage du coût de base (0.8 = 80%)
             veh_class: Classe de véhicule
             max_comb_size: Taille maximale des combinaisons de péages à tester
+            search: Mode de recherche ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
+            alternatives: Nombre de routes non dominées à retourner (0 = aucune)
             
         Returns:
             dict: Résultats optimisés (fastest, cheapest, status)
@@ -108,12 +148,114 @@ class SmartRouteService:
                 max_price,
                 max_price_percent,
                 veh_class,
-                max_comb_size
+                max_comb_size,
+                search,
+                beam_width
             )
-            return result
+            return limit_alternatives(result, alternatives)
         finally:
             # TERMINER LA SESSION - Le résumé sera automatiquement loggé
             performance_tracker.end_optimization_session(locals().get('result', {}))
 
+    def compute_route_with_toll_limit_by_class(
+        self,
+        coordinates: list,
+        max_tolls: int,
+        veh_classes: list,
+        max_comb_size: int = 2,
+        search: str = "exhaustive",
+        beam_width: int = 3,
+        alternatives: int = 0,
+        network_search: bool = True
+    ):
+        """
+        Calcule un itinéraire avec limite de péages pour plusieurs classes de véhicule.
+        
+        Les routes ORS (base, sans péage, alternatives) sont calculées une seule fois, et leurs
+        péages sont localisés une fois puis chiffrés pour toutes les classes en un seul passage
+        sur la table tarifaire ; seule la sélection (qui dépend des coûts) est rejouée par classe
+        sur ces candidats partagés.
+        
+        Args:
+            coordinates: Liste de coordonnées [départ, arrivée]
+            max_tolls: Nombre maximum de péages autorisés
+            veh_classes: Liste des classes de véhicule (c1…c5)
+            max_comb_size: Limite pour les combinaisons de péages à éviter
+            search: Mode de recherche ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
+            alternatives: Nombre de routes non dominées à retourner (0 = aucune)
+            network_search: Chercher un péage ouvert dans tout le réseau (cas max_tolls=1)
+            
+        Returns:
+            dict: {"vehicle_classes": [...], "results": {classe: résultat}}
+        """
+        optimizer = TollRouteOptimizer(MemoizedORSService(self.ors_service))
+        return self._compute_by_class(
+            coordinates,
+            veh_classes,
+            lambda veh_class: limit_alternatives(optimizer.compute_route_with_toll_limit(
+                coordinates, max_tolls, veh_class, max_comb_size, search, beam_width, network_search
+            ), alternatives)
+        )
+    
+    def compute_route_with_budget_limit_by_class(
+        self,
+        coordinates: list,
+        veh_classes: list,
+        max_price: float = None,
+        max_price_percent: float = None,
+        max_comb_size: int = 2,
+        search: str = "exhaustive",
+        beam_width: int = 3,
+        alternatives: int = 0
+    ):
+        """
+        Calcule un itinéraire avec contrainte de budget pour plusieurs classes de véhicule.
+        
+        Routes ORS et péages localisés sont partagés entre les classes, chiffrés en un seul
+        passage ; seule la sélection sous contrainte de budget est rejouée par classe.
+        
+        Args:
+            coordinates: Liste de coordonnées [départ, arrivée]
+            veh_classes: Liste des classes de véhicule (c1…c5)
+            max_price: Prix maximum en euros (absolu)
+            max_price_percent: Pourcentage du coût de base (0.8 = 80%)
+            max_comb_size: Taille maximale des combinaisons de péages à tester
+            search: Mode de recherche ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
+            alternatives: Nombre de routes non dominées à retourner (0 = aucune)
+            
+        Returns:
+            dict: {"vehicle_classes": [...], "results": {classe: résultat}}
+        """
+        optimizer = BudgetRouteOptimizer(MemoizedORSService(self.ors_service))
+        return self._compute_by_class(
+            coordinates,
+            veh_classes,
+            lambda veh_class: limit_alternatives(optimizer.compute_route_with_budget_limit(
+                coordinates, max_price, max_price_percent, veh_class, max_comb_size, search, beam_width
+            ), alternatives)
+        )
+    
+    def _compute_by_class(self, coordinates, veh_classes, compute_for_class):
+        """Exécute une optimisation par classe de véhicule dans une seule session de suivi."""
+        from benchmark.performance_tracker import performance_tracker
+        session_id = performance_tracker.start_optimization_session(
+            origin=f"{coordinates[0][1]:.3f},{coordinates[0][0]:.3f}",
+            destination=f"{coordinates[1][1]:.3f},{coordinates[1][0]:.3f}",
+            route_distance_km=0
+        )
+        
+        result = {"vehicle_classes": list(veh_classes), "results": {}}
+        try:
+            # Un seul contexte : routes et péages localisés une fois, chiffrés pour toutes les classes
+            with route_context(coordinates, veh_classes):
+                for veh_class in veh_classes:
+                    with progress_fields(veh_class=veh_class):
+                        result["results"][veh_class] = compute_for_class(veh_class)
+            return result
+        finally:
+            performance_tracker.end_optimization_session(result)
+
 # Les fonctions wrapper ont été supprimées car elles ne sont plus nécessaires
 # Le code utilisateur importe maintenant directement la classe SmartRouteService
@@ -0,0 +1,63 @@
+"""
+avoidance_cache.py
+-----------------
+
+Cache d'équivalence des ensembles de péages à éviter.
+Responsabilité unique : répondre sans appel ORS aux ensembles déjà couverts
+par un itinéraire connu.
+
+Éviter un péage A conduit souvent ORS sur une route qui évite aussi B et C.
+Si l'ensemble S a produit une route ne traversant aucun péage de T (avec
+S ⊆ T), élargir l'évitement de S à T ne change rien pour ORS : la route de S
+est la réponse de T. Chaque ensemble évalué est enregistré avec les péages
+effectivement traversés, et la route de base sert de point de départ (S = ∅).
+"""
+
+import threading
+
+
+class AvoidanceEquivalenceCache:
+    """Résultats d'évitement indexés par ensemble évité et péages traversés."""
+
+    def __init__(self):
+        """Initialise un cache vide (une instance par recherche)."""
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"entries": 0, "hits": 0, "misses": 0}
+
+    def record(self, avoid_ids, outcome):
+        """
+        Enregistre le résultat d'un ensemble évalué.
+
+        Args:
+            avoid_ids: IDs des péages évités
+            outcome: Résultat de l'évaluation (doit contenir crossed_ids)
+        """
+        if not outcome:
+            return
+        with self._lock:
+            self._entries[frozenset(str(i) for i in avoid_ids)] = outcome
+            self.stats["entries"] = len(self._entries)
+
+    def lookup(self, avoid_ids):
+        """
+        Cherche un résultat connu équivalent à l'évitement demandé.
+
+        Args:
+            avoid_ids: IDs des péages à éviter
+
+        Returns:
+            dict | None: Résultat de l'ensemble connu le plus proche (le plus grand
+                         sous-ensemble dont la route ne traverse aucun péage demandé)
+        """
+        target = frozenset(str(i) for i in avoid_ids)
+        with self._lock:
+            covering = [
+                (len(known), outcome) for known, outcome in self._entries.items()
+                if known <= target and not (outcome["crossed_ids"] & target)
+            ]
+            if not covering:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return max(covering, key=lambda item: item[0])[1]
@@ -0,0 +1,209 @@
+"""
+combination_search.py
+--------------------
+
+Recherche par séparation et évaluation (branch-and-bound) des ensembles de
+péages à éviter pour ManyTollsStrategy.
+Responsabilité unique : décider quel ensemble évaluer ensuite et quels
+sous-arbres abandonner, à partir des résultats déjà fusionnés.
+
+Chaque nœud est un ensemble de péages (indices croissants dans la liste triée
+par coût décroissant) ; ses enfants ajoutent un péage d'indice supérieur.
+  • Ordre : par taille croissante (la dominance porte sur les sur-ensembles),
+    puis meilleur d'abord selon l'économie optimiste et les péages de la route
+  • Borne : économie maximale atteignable dans le sous-arbre (somme des coûts
+    évités + meilleurs coûts restants), nombre de péages minimal atteignable et
+    durée minimale (éviter un péage de plus n'accélère pas la route : la durée
+    d'un sur-ensemble est minorée par celle de ses sous-ensembles évalués).
+    Une fois une route valide connue, on abandonne le sous-arbre qui ne peut
+    améliorer aucun des trois critères. Ces bornes ignorent les effets de bord
+    d'ORS, comme l'ancienne heuristique d'économie.
+  • Dominance : on saute un sur-ensemble d'un ensemble dont la route respecte
+    déjà la contrainte lorsqu'il ne peut rien retirer d'utile à cette route,
+    et tout ensemble contenant un péage prouvé inévitable (resté sur la route
+    alors qu'il devait être évité).
+"""
+
+import heapq
+from itertools import accumulate
+
+
+class BranchAndBoundCombinationSearch:
+    """Génère les ensembles de péages à éviter dans l'ordre du branch-and-bound."""
+
+    def __init__(self, tolls_sorted, on_route_ids, base_cost, base_duration, base_toll_count,
+                 max_tolls, max_comb_size):
+        """
+        Initialise la recherche.
+
+        Args:
+            tolls_sorted: Péages candidats triés par coût décroissant
+            on_route_ids: IDs des péages présents sur la route de base
+            base_cost: Coût de la route de base
+            base_duration: Durée de la route de base
+            base_toll_count: Nombre de péages de la route de base
+            max_tolls: Nombre maximum de péages autorisés
+            max_comb_size: Taille maximale d'un ensemble à éviter
+        """
+        self.tolls = list(tolls_sorted)
+        self.ids = [str(t["id"]) for t in self.tolls]
+        self.max_size = min(len(self.tolls), max_comb_size)
+        self.base_cost = base_cost
+        self.base_duration = base_duration
+        self.base_toll_count = base_toll_count
+        self.max_tolls = max_tolls
+
+        on_route_ids = set(str(i) for i in on_route_ids)
+        self.on_route = [toll_id in on_route_ids for toll_id in self.ids]
+        self.costs = [max(0.0, float(t.get("cost", 0) or 0)) for t in self.tolls]
+        self._cost_by_id = dict(zip(self.ids, self.costs))
+
+        # Sommes préfixes : coûts décroissants et nombre de péages de la route au-delà d'un indice
+        self._cost_prefix = [0.0] + list(accumulate(self.costs))
+        self._on_route_suffix = list(accumulate(reversed(self.on_route), initial=0))[::-1]
+
+        # État alimenté par record()
+        self.satisfying_sets = {}
+        self.unavoidable_ids = set()
+        self.best_cost = float('inf')
+        self.best_toll_count = float('inf')
+        self.best_duration = float('inf')
+        self.best_fast_cost = float('inf')
+        self.durations = {frozenset(): base_duration}
+        if base_toll_count <= max_tolls:
+            self.best_cost = base_cost
+            self.best_toll_count = base_toll_count
+            self.best_duration = base_duration
+            self.best_fast_cost = base_cost
+
+        self.stats = {"yielded": 0, "pruned_bound": 0, "pruned_dominated": 0, "pruned_unavoidable": 0}
+
+    # ------------------------------------------------------------------ bornes
+
+    def _saving(self, node):
+        """Économie optimiste d'un ensemble : coût des péages évités."""
+        return sum(self.costs[i] for i in node)
+
+    def _subtree_saving_bound(self, node):
+        """Économie maximale atteignable par le nœud et ses descendants."""
+        remaining = self.max_size - len(node)
+        start = node[-1] + 1
+        end = min(len(self.costs), start + remaining)
+        return self._saving(node) + (self._cost_prefix[end] - self._cost_prefix[start])
+
+    def _subtree_toll_count_bound(self, node):
+        """Nombre de péages minimal (optimiste) atteignable dans le sous-arbre."""
+        remaining = self.max_size - len(node)
+        removable = sum(1 for i in node if self.on_route[i])
+        removable += min(remaining, self._on_route_suffix[node[-1] + 1])
+        return max(0, self.base_toll_count - removable)
+
+    def _duration_bound(self, node):
+        """Durée minimale (optimiste) : la plus grande durée des sous-ensembles directs évalués."""
+        node_ids = [self.ids[i] for i in node]
+        known = [self.durations.get(frozenset(node_ids[:k] + node_ids[k + 1:])) for k in range(len(node_ids))]
+        return max((d for d in known if d is not None), default=self.base_duration)
+
+    def _can_improve(self, saving, toll_count_bound, duration_bound):
+        """Un ensemble (ou sous-arbre) ainsi borné peut-il améliorer un critère connu ?"""
+        if self.best_duration == float('inf'):
+            # Aucune route ne respecte encore la contrainte : pas d'élagage par borne
+            return True
+        optimistic_cost = max(0.0, self.base_cost - saving)
+        if optimistic_cost < self.best_cost or toll_count_bound < self.best_toll_count:
+            return True
+        return (duration_bound < self.best_duration or
+                (duration_bound == self.best_duration and optimistic_cost < self.best_fast_cost))
+
+    # ------------------------------------------------------------ dominance
+
+    def _is_dominated(self, node):
+        """
+        Un ensemble est dominé par un sous-ensemble S déjà valide si les péages
+        ajoutés ne peuvent améliorer ni le coût ni le nombre de péages de S
+        (la durée, elle, ne peut que se dégrader). Les péages ajoutés absents
+        de la route de S ne changent rien : la route serait identique.
+        """
+        node_ids = frozenset(self.ids[i] for i in node)
+        for satisfying_ids, outcome in self.satisfying_sets.items():
+            if not satisfying_ids <= node_ids:
+                continue
+            removable = (node_ids - satisfying_ids) & outcome["crossed_ids"]
+            optimistic_cost = outcome["cost"] - sum(self._cost_by_id[toll_id] for toll_id in removable)
+            optimistic_count = outcome["toll_count"] - len(removable)
+            if not (optimistic_cost < self.best_cost or optimistic_count < self.best_toll_count):
+                return True
+        return False
+
+    # ---------------------------------------------------------------- API
+
+    def _priority(self, node):
+        """Ordre : petits ensembles d'abord (dominance), puis meilleure économie optimiste."""
+        on_route_count = sum(1 for i in node if self.on_route[i])
+        return (len(node), -self._saving(node), -on_route_count, node)
+
+    def candidates(self):
+        """
+        Génère les ensembles à évaluer (tuples de dicts de péages).
+
+        Le générateur est consommé paresseusement : les élagages tiennent
+        compte de tous les résultats enregistrés via record() jusque-là.
+        """
+        heap = [self._priority((i,)) for i in range(len(self.tolls))] if self.max_size else []
+        heapq.heapify(heap)
+
+        while heap:
+            node = heapq.heappop(heap)[-1]
+
+            if self.unavoidable_ids.intersection(self.ids[i] for i in node):
+                # Tous les descendants contiennent ce péage : sous-arbre abandonné
+                self.stats["pruned_unavoidable"] += 1
+                continue
+
+            duration_bound = self._duration_bound(node)
+            if not self._can_improve(self._subtree_saving_bound(node), self._subtree_toll_count_bound(node),
+                                     duration_bound):
+                self.stats["pruned_bound"] += 1
+                continue
+
+            if len(node) < self.max_size:
+                for j in range(node[-1] + 1, len(self.tolls)):
+                    heapq.heappush(heap, self._priority(node + (j,)))
+
+            if self._is_dominated(node):
+                # Les descendants restent explorés : ils peuvent retirer d'autres péages de la route
+                self.stats["pruned_dominated"] += 1
+                continue
+
+            node_count_bound = max(0, self.base_toll_count - sum(1 for i in node if self.on_route[i]))
+            if not self._can_improve(self._saving(node), node_count_bound, duration_bound):
+                self.stats["pruned_bound"] += 1
+                continue
+
+            self.stats["yielded"] += 1
+            yield tuple(self.tolls[i] for i in node)
+
+    def record(self, avoid_set, outcome):
+        """
+        Enregistre le résultat d'une évaluation.
+
+        Args:
+            avoid_set: Ensemble de péages évités
+            outcome: dict avec crossed_ids, satisfied, cost, duration, toll_count
+                     (None si l'appel ORS a échoué)
+        """
+        if not outcome:
+            return
+
+        avoided_ids = frozenset(str(t["id"]) for t in avoid_set)
+        self.unavoidable_ids |= avoided_ids & outcome["crossed_ids"]
+        self.durations[avoided_ids] = outcome["duration"]
+
+        if outcome["satisfied"]:
+            self.satisfying_sets[avoided_ids] = outcome
+            self.best_cost = min(self.best_cost, outcome["cost"])
+            self.best_toll_count = min(self.best_toll_count, outcome["toll_count"])
+            if (outcome["duration"] < self.best_duration or
+                    (outcome["duration"] == self.best_duration and outcome["cost"] < self.best_fast_cost)):
+                self.best_duration = outcome["duration"]
+                self.best_fast_cost = outcome["cost"]
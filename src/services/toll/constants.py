@@ -15,6 +15,9 @@ class TollOptimizationConfig(BaseOptimizationConfig):
     # === Cost optimization ===
     EARLY_STOP_ZERO_COST = True  # Arrêt anticipé si coût nul trouvé
     UNLIMITED_BASE_COST = float('inf')  # Coût de base illimité pour certains cas
+    
+    # === Open toll candidates ===
+    MAX_DETOUR_FACTOR = 1.5  # Borne de détour (vol d'oiseau via le péage / route directe) au-delà de laquelle un péage ouvert est écarté
       # === Performance tracking operation names ===
     class Operations:
         """Noms standardisés des opérations pour le tracking de performance."""
@@ -41,6 +44,7 @@ class TollOptimizationConfig(BaseOptimizationConfig):
         PREPARE_TOLL_COMBINATIONS = "prepare_toll_combinations"
         TEST_TOLL_COMBINATIONS = "test_toll_combinations"
         TEST_SINGLE_COMBINATION = "test_single_combination"
+        TEST_ITERATIVE_AVOIDANCE = "test_iterative_avoidance"
         CREATE_AVOIDANCE_POLYGON = "create_avoidance_polygon"
         
         # Route analysis
@@ -57,4 +61,5 @@ class TollOptimizationConfig(BaseOptimizationConfig):
         # Utility operations
         FILTER_OPEN_TOLLS = "filter_open_tolls"
         GET_ALL_OPEN_TOLLS = "get_all_open_tolls"
+        RANK_OPEN_TOLLS_BY_DETOUR = "rank_open_tolls_by_detour"
         GET_BASE_METRICS = "get_base_metrics"
\ No newline at end of file
@@ -6,8 +6,8 @@ Stratégie pour calculer des itinéraires avec plusieurs péages autorisés.
 Responsabilité unique : optimiser les routes en testant des combinaisons de péages à éviter.
 """
 
-from itertools import combinations
 from src.utils.poly_utils import avoidance_multipolygon
+from src.utils.avoidance_shapes import avoidance_shapes
 from src.services.common.result_formatter import ResultFormatter
 from src.services.toll.result_manager import RouteResultManager
 from benchmark.performance_tracker import performance_tracker
@@ -17,6 +17,11 @@ from src.services.toll.route_validator import RouteValidator
 from src.services.toll.error_handler import TollErrorHandler
 from src.services.common.toll_messages import TollMessages
 from src.services.ors_config_manager import ORSConfigManager
+from src.services.common.candidate_evaluator import CandidateEvaluationEngine
+from src.services.toll.combination_search import BranchAndBoundCombinationSearch
+from src.services.toll.avoidance_cache import AvoidanceEquivalenceCache
+from src.services.common.iterative_avoidance import IterativeAvoidanceSearch
+from src.services.common.progress_events import emit_progress
 
 
 class ManyTollsStrategy:
@@ -35,7 +40,8 @@ class ManyTollsStrategy:
         self.ors = ors_service
         self.route_calculator = RouteCalculator(ors_service)  # Ajouter cette ligne
     
-    def compute_route_with_many_tolls(self, coordinates, max_tolls, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE):
+    def compute_route_with_many_tolls(self, coordinates, max_tolls, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE,
+                                      search=Config.DEFAULT_SEARCH_MODE, beam_width=Config.DEFAULT_BEAM_WIDTH):
         """
         Calcule des itinéraires avec un nombre de péages ≤ max_tolls (où max_tolls > 1).
         
@@ -44,6 +50,8 @@ class ManyTollsStrategy:
             max_tolls: Nombre maximum de péages autorisés
             veh_class: Classe de véhicule pour le calcul des coûts
             max_comb_size: Limite pour les combinaisons de péages à éviter
+            search: "exhaustive" (combinaisons, branch-and-bound) ou "greedy"/"beam" (itératif)
+            beam_width: Largeur du faisceau en mode "beam"
             
         Returns:
             dict: Les meilleures routes trouvées (fastest, cheapest, min_tolls)
@@ -56,7 +64,8 @@ class ManyTollsStrategy:
         
         with performance_tracker.measure_operation(Config.Operations.COMPUTE_ROUTE_MANY_TOLLS, {
             "max_tolls": max_tolls,
-            "max_comb_size": max_comb_size
+            "max_comb_size": max_comb_size,
+            "search": search
         }):
             print(TollMessages.SEARCH_MANY_TOLLS.format(max_tolls=max_tolls))
             
@@ -82,16 +91,33 @@ class ManyTollsStrategy:
             # 4) Initialisation du gestionnaire de résultats
             result_manager = RouteResultManager()
             base_metrics = self._get_base_metrics(base_route, veh_class)
+            emit_progress("base", route=ResultFormatter.format_route_result(
+                base_route, base_metrics["cost"], base_metrics["duration"], base_metrics["toll_count"]
+            ))
             result_manager.initialize_with_base_route(
                 base_route, base_metrics["cost"], base_metrics["duration"], 
                 base_metrics["toll_count"], max_tolls
             )
 
             # 5) Test des combinaisons de péages à éviter
-            self._test_toll_combinations(
-                coordinates, all_tolls_sorted, max_tolls, veh_class, max_comb_size, 
-                base_metrics["cost"], result_manager
-            )
+            base_outcome = self._create_base_outcome(base_route, tolls_on_route, base_metrics, max_tolls)
+            if search == "exhaustive":
+                combination_search = BranchAndBoundCombinationSearch(
+                    all_tolls_sorted, [t["id"] for t in tolls_on_route],
+                    base_metrics["cost"], base_metrics["duration"], base_metrics["toll_count"],
+                    max_tolls, max_comb_size
+                )
+                avoidance_cache = AvoidanceEquivalenceCache()
+                avoidance_cache.record((), base_outcome)
+                self._test_toll_combinations(
+                    coordinates, combination_search, avoidance_cache, max_tolls, veh_class,
+                    base_metrics["cost"], result_manager
+                )
+            else:
+                self._test_iterative_avoidance(
+                    coordinates, base_outcome, max_tolls, veh_class, beam_width,
+                    base_metrics["cost"], result_manager
+                )
 
             # 6) Application du fallback si nécessaire
             result_manager.apply_fallback_if_needed(
@@ -114,7 +140,8 @@ class ManyTollsStrategy:
                 fastest=results["fastest"],
                 cheapest=results["cheapest"],
                 min_tolls=results["min_tolls"],
-                status=Config.StatusCodes.MULTI_TOLL_SUCCESS
+                status=Config.StatusCodes.MULTI_TOLL_SUCCESS,
+                alternatives=result_manager.get_alternatives()
             )
     
     def _create_base_route_result(self, base_route):
@@ -144,54 +171,95 @@ class ManyTollsStrategy:
                 "toll_count": len(base_tolls)
             }
     
-    def _test_toll_combinations(self, coordinates, all_tolls_sorted, max_tolls, veh_class, 
-                              max_comb_size, base_cost, result_manager):
-        """Teste toutes les combinaisons de péages à éviter."""
+    def _create_base_outcome(self, base_route, tolls_on_route, base_metrics, max_tolls):
+        """Résultat d'évitement de la route de base (ensemble vide), pour le cache d'équivalence."""
+        satisfied = base_metrics["toll_count"] <= max_tolls
+        return {
+            "route_data": ResultFormatter.format_route_result(
+                base_route, base_metrics["cost"], base_metrics["duration"], base_metrics["toll_count"]
+            ) if satisfied else None,
+            "crossed_ids": frozenset(str(t["id"]) for t in tolls_on_route),
+            "crossed_tolls": tolls_on_route,
+            "satisfied": satisfied,
+            "cost": base_metrics["cost"],
+            "duration": base_metrics["duration"],
+            "toll_count": base_metrics["toll_count"]
+        }
+    
+    def _test_toll_combinations(self, coordinates, search, avoidance_cache, max_tolls, veh_class, 
+                              base_cost, result_manager):
+        """Teste les combinaisons de péages à éviter retenues par le branch-and-bound."""
         with performance_tracker.measure_operation(Config.Operations.TEST_TOLL_COMBINATIONS):
-            seen_polygons = set()
-            tested_combinations = set()
-            combination_count = 0
+            engine = CandidateEvaluationEngine()
+            merged_count = 0
+            # Réponses résolues par le cache au moment du tirage (thread appelant, donc déterministe)
+            resolved = {}
+            
+            def candidates():
+                for to_avoid in search.candidates():
+                    signature = CandidateEvaluationEngine.signature(to_avoid)
+                    known = avoidance_cache.lookup(signature)
+                    if known is not None:
+                        resolved[signature] = known
+                    yield to_avoid
+            
+            def evaluate(to_avoid):
+                known = resolved.get(CandidateEvaluationEngine.signature(to_avoid))
+                if known is not None:
+                    return known
+                return self._test_single_combination(coordinates, to_avoid, max_tolls, veh_class)
+            
+            def merge(to_avoid, outcome):
+                nonlocal merged_count
+                merged_count += 1
+                
+                # Affichage périodique des stats
+                if merged_count % Config.COMBINATION_PROGRESS_INTERVAL == 0:
+                    print(TollMessages.PROGRESS_COMBINATIONS.format(count=merged_count))
+                
+                search.record(to_avoid, outcome)
+                avoidance_cache.record(CandidateEvaluationEngine.signature(to_avoid), outcome)
+                if not outcome or not outcome["route_data"]:
+                    return False
+                route_data = outcome["route_data"]
+                updated = result_manager.update_with_route(route_data, base_cost)
+                
+                # Arrêt anticipé si coût nul trouvé
+                return Config.EARLY_STOP_ZERO_COST and updated and route_data["cost"] == 0
+            
+            engine.run(candidates(), evaluate, merge)
+            print(TollMessages.BRANCH_AND_BOUND_STATS.format(**search.stats))
+            print(TollMessages.AVOIDANCE_CACHE_STATS.format(**avoidance_cache.stats))
+    
+    def _test_iterative_avoidance(self, coordinates, base_outcome, max_tolls, veh_class, beam_width,
+                                  base_cost, result_manager):
+        """Évite itérativement le péage le plus cher de la route courante (modes greedy/beam)."""
+        with performance_tracker.measure_operation(Config.Operations.TEST_ITERATIVE_AVOIDANCE, {
+            "beam_width": beam_width
+        }):
+            iterative_search = IterativeAvoidanceSearch(beam_width)
             
-            for k in range(1, min(len(all_tolls_sorted), max_comb_size) + 1):
-                for to_avoid in combinations(all_tolls_sorted, k):
-                    combination_count += 1
-                    
-                    # Affichage périodique des stats
-                    if combination_count % Config.COMBINATION_PROGRESS_INTERVAL == 0:
-                        stats = performance_tracker.get_current_stats()
-                        print(TollMessages.PROGRESS_COMBINATIONS.format(count=combination_count))
-                    
-                    route_data = self._test_single_combination(
-                        coordinates, to_avoid, max_tolls, veh_class, combination_count, k,
-                        seen_polygons, tested_combinations, base_cost
-                    )
-                    
-                    if route_data:
-                        updated = result_manager.update_with_route(route_data, base_cost)
-                        
-                        # Arrêt anticipé si coût nul trouvé
-                        if Config.EARLY_STOP_ZERO_COST and updated and route_data["cost"] == 0:
-                            break
+            def merge(to_avoid, outcome):
+                if not outcome or not outcome["route_data"]:
+                    return False
+                route_data = outcome["route_data"]
+                updated = result_manager.update_with_route(route_data, base_cost)
+                return Config.EARLY_STOP_ZERO_COST and updated and route_data["cost"] == 0
+            
+            iterative_search.run(
+                base_outcome,
+                lambda to_avoid: self._test_single_combination(coordinates, to_avoid, max_tolls, veh_class),
+                merge,
+                is_goal=lambda outcome: outcome["toll_count"] <= max_tolls,
+                rank=lambda outcome: (outcome["toll_count"], outcome["cost"], outcome["duration"])
+            )
+            print(TollMessages.ITERATIVE_SEARCH_STATS.format(**iterative_search.stats))
     
-    def _test_single_combination(self, coordinates, to_avoid, max_tolls, veh_class, 
-                               combination_count, k, seen_polygons, tested_combinations, base_cost):
+    def _test_single_combination(self, coordinates, to_avoid, max_tolls, veh_class):
         """Teste une combinaison spécifique de péages à éviter."""
         with performance_tracker.measure_operation(Config.Operations.TEST_SINGLE_COMBINATION, {
-            "combination_size": k,
-            "combination_count": combination_count
+            "combination_size": len(to_avoid)
         }):
-            sig = tuple(sorted(t["id"] for t in to_avoid))
-            if sig in seen_polygons or sig in tested_combinations:
-                return None
-            
-            seen_polygons.add(sig)
-            tested_combinations.add(sig)
-
-            # Heuristique d'optimisation précoce
-            potential_saving = sum(t.get("cost", 0) for t in to_avoid)
-            if base_cost - potential_saving <= 0:
-                return None
-
             # Création du polygone d'évitement
             with performance_tracker.measure_operation(Config.Operations.CREATE_AVOIDANCE_POLYGON):
                 poly = avoidance_multipolygon(to_avoid)
@@ -200,7 +268,7 @@ class ManyTollsStrategy:
                 alt_route = self.route_calculator.get_route_avoiding_polygons_with_tracking(coordinates, poly)
             except Exception as e:
                 TollErrorHandler.log_operation_failure(
-                    f"test_combination_{combination_count}", 
+                    f"test_combination_{'_'.join(CandidateEvaluationEngine.signature(to_avoid))}", 
                     f"Impossible de calculer une route alternative: {e}"
                 )
                 return None
@@ -208,7 +276,13 @@ class ManyTollsStrategy:
             return self._analyze_alternative_route(alt_route, to_avoid, max_tolls, veh_class)
     
     def _analyze_alternative_route(self, alt_route, to_avoid, max_tolls, veh_class):
-        """Analyse un itinéraire alternatif et retourne les métriques."""
+        """
+        Analyse un itinéraire alternatif et retourne les métriques.
+        
+        Returns:
+            dict: route_data (None si contraintes non respectées), crossed_ids,
+                  crossed_tolls, satisfied, cost, duration et toll_count
+        """
         with performance_tracker.measure_operation(Config.Operations.ANALYZE_ALTERNATIVE_ROUTE):
             alt_tolls_dict = self.route_calculator.locate_and_cost_tolls(alt_route, veh_class, Config.Operations.ANALYZE_ALTERNATIVE_ROUTE)
             alt_tolls_on_route = alt_tolls_dict["on_route"]
@@ -216,15 +290,23 @@ class ManyTollsStrategy:
             cost = sum(t.get("cost", 0) for t in alt_tolls_on_route)
             duration = alt_route["features"][0]["properties"]["summary"]["duration"]
             toll_count = len(set(t["id"] for t in alt_tolls_on_route))
+            avoidance_shapes.record_avoidance(to_avoid, alt_tolls_on_route)
 
             # Validation complète avec le RouteValidator
-            if not RouteValidator.validate_all_constraints(
+            satisfied = RouteValidator.validate_all_constraints(
                 alt_tolls_on_route, 
                 toll_count, 
                 max_tolls, 
                 avoided_tolls=to_avoid,
                 operation_name="analyze_alternative_route"
-            ):
-                return None
+            )
                 
-            return ResultFormatter.format_route_result(alt_route, cost, duration, toll_count)
\ No newline at end of file
+            return {
+                "route_data": ResultFormatter.format_route_result(alt_route, cost, duration, toll_count) if satisfied else None,
+                "crossed_ids": frozenset(str(t["id"]) for t in alt_tolls_on_route),
+                "crossed_tolls": alt_tolls_on_route,
+                "satisfied": satisfied,
+                "cost": cost,
+                "duration": duration,
+                "toll_count": toll_count
+            }
\ No newline at end of file
@@ -6,8 +6,7 @@ Stratégie pour calculer des itinéraires passant par exactement un péage à sy
 Responsabilité unique : optimiser les routes avec un seul péage ouvert.
 """
 
-from src.services.toll_locator import get_all_open_tolls_by_proximity
-from src.utils.route_utils import is_toll_open_system, merge_routes
+from src.utils.route_utils import is_toll_open_system, merge_routes, rank_tolls_by_detour
 from src.services.toll.result_manager import RouteResultManager
 from benchmark.performance_tracker import performance_tracker
 from src.services.toll.route_calculator import RouteCalculator
@@ -19,6 +18,7 @@ from src.services.toll.error_handler import TollErrorHandler
 from src.services.common.result_formatter import ResultFormatter
 from src.services.common.toll_messages import TollMessages
 from src.services.ors_config_manager import ORSConfigManager
+from src.services.common.progress_events import emit_progress
 
 
 class OneOpenTollStrategy:
@@ -36,13 +36,14 @@ class OneOpenTollStrategy:
         self.ors = ors_service
         self.route_calculator = RouteCalculator(ors_service)  # Ajouter cette ligne
     
-    def compute_route_with_one_open_toll(self, coordinates, veh_class=Config.DEFAULT_VEH_CLASS):
+    def compute_route_with_one_open_toll(self, coordinates, veh_class=Config.DEFAULT_VEH_CLASS, network_search=True):
         """
         Calcule un itinéraire qui passe par exactement un péage à système ouvert.
         
         Args:
             coordinates: Liste de coordonnées [départ, arrivée]
             veh_class: Classe de véhicule pour le calcul des coûts
+            network_search: Chercher dans tout le réseau si aucun péage ouvert proche ne convient
               Returns:
             tuple: (route_data, status_code)
         """
@@ -67,10 +68,15 @@ class OneOpenTollStrategy:
                 tolls_on_route = tolls_dict["on_route"]
                 tolls_nearby = tolls_dict["nearby"]
                 local_tolls = tolls_on_route + tolls_nearby
+            emit_progress("base", route=ResultFormatter.format_route_result(
+                base_route, sum(t.get("cost", 0) for t in tolls_on_route),
+                base_route["features"][0]["properties"]["summary"]["duration"], len(tolls_on_route)
+            ))
             
             # 3) Filtrer pour ne garder que les péages à système ouvert à proximité
             with performance_tracker.measure_operation(Config.Operations.FILTER_OPEN_TOLLS):
                 nearby_open_tolls = [toll for toll in local_tolls if is_toll_open_system(toll["id"])]
+            nearby_open_tolls = self._rank_by_detour(coordinates, base_route, nearby_open_tolls)
             
             # 4) Initialiser le gestionnaire de résultats
             result_manager = RouteResultManager()
@@ -83,20 +89,21 @@ class OneOpenTollStrategy:
                     self._try_route_with_tolls(coordinates, nearby_open_tolls, veh_class, result_manager)
             
             # 6) Si aucun résultat avec les péages proches, tester avec tous les péages ouverts du réseau
-            if not result_manager.has_valid_results():
+            if not result_manager.has_valid_results() and network_search:
                 print(TollMessages.NO_OPEN_TOLLS_NEARBY)
                 
                 # 6.1) Récupérer tous les péages ouverts
                 max_distance_m = Config.MAX_DISTANCE_SEARCH_M
                 with performance_tracker.measure_operation(Config.Operations.GET_ALL_OPEN_TOLLS, {"max_distance_m": max_distance_m}):
-                    all_open_tolls = get_all_open_tolls_by_proximity(base_route, Config.get_barriers_csv_path(), max_distance_m)
+                    all_open_tolls = self.route_calculator.get_open_tolls_by_proximity(base_route, max_distance_m)
+                all_open_tolls = self._rank_by_detour(coordinates, base_route, all_open_tolls)
                 
                 if not all_open_tolls:
                     return TollErrorHandler.handle_no_open_toll_error(max_distance_m/1000)
                 
                 print(TollMessages.FOUND_OPEN_TOLLS_NETWORK.format(count=len(all_open_tolls), distance=max_distance_m/1000))
                 
-                # 6.2) Les tester dans l'ordre de proximité (limité aux 10 plus proches)
+                # 6.2) Les tester par détour croissant (limité aux 10 plus plausibles)
                 max_test = Config.MAX_NEARBY_TOLLS_TO_TEST
                 with performance_tracker.measure_operation("test_all_open_tolls", {"count": min(max_test, len(all_open_tolls))}):
                     self._try_route_with_tolls(coordinates, all_open_tolls[:max_test], veh_class, result_manager)
@@ -104,6 +111,32 @@ class OneOpenTollStrategy:
             # 7) Analyser les résultats et retourner la meilleure solution
             return self._analyze_final_results(result_manager)
     
+    def _rank_by_detour(self, coordinates, base_route, tolls):
+        """
+        Écarte les péages dont le passage impose un détour géométriquement déraisonnable
+        et classe les autres par détour croissant, avant tout appel ORS.
+        
+        Args:
+            coordinates: Liste de coordonnées [départ, arrivée]
+            base_route: Route de base (sa longueur sert de référence)
+            tolls: Péages ouverts candidats
+            
+        Returns:
+            list: Péages plausibles, du plus direct au moins direct
+        """
+        with performance_tracker.measure_operation(Config.Operations.RANK_OPEN_TOLLS_BY_DETOUR, {"count": len(tolls)}):
+            summary = base_route["features"][0]["properties"].get("summary", {})
+            ranked = rank_tolls_by_detour(
+                tolls, coordinates[0], coordinates[-1],
+                direct_distance_m=summary.get("distance"),
+                max_detour_factor=Config.MAX_DETOUR_FACTOR
+            )
+            if len(ranked) < len(tolls):
+                print(TollMessages.OPEN_TOLLS_DETOUR_FILTERED.format(
+                    count=len(tolls) - len(ranked), factor=Config.MAX_DETOUR_FACTOR
+                ))
+            return ranked
+    
     def _try_route_with_tolls(self, coordinates, tolls_to_try, veh_class, result_manager):
         """
         Fonction auxiliaire pour tester des itinéraires avec une liste de péages donnée.
@@ -237,17 +270,20 @@ class OneOpenTollStrategy:
         
         return None, Config.StatusCodes.NO_VALID_OPEN_TOLL_ROUTE
     
-    def handle_one_toll_route(self, coordinates, veh_class, max_comb_size):
+    def handle_one_toll_route(self, coordinates, veh_class, max_comb_size, network_search=True):
         """
         Gère le cas où un seul péage est autorisé.
         Point d'entrée principal pour les routes avec un péage.
         
+        Args:
+            network_search: Recherche des péages ouverts dans tout le réseau (désactivée en mode dégradé)
+        
         Returns:
             dict: Résultat formaté avec fastest, cheapest, min_tolls, status
         """
         with performance_tracker.measure_operation(Config.Operations.HANDLE_ONE_TOLL_ROUTE):
             # Essayer avec un péage ouvert (approche optimisée pour ce cas précis)
-            one_open_result, open_status = self.compute_route_with_one_open_toll(coordinates, veh_class)
+            one_open_result, open_status = self.compute_route_with_one_open_toll(coordinates, veh_class, network_search)
             
             # Si on a trouvé une solution avec un péage ouvert, on l'utilise directement
             if one_open_result and open_status == Config.StatusCodes.ONE_OPEN_TOLL_SUCCESS:
@@ -9,6 +9,8 @@ Responsabilité unique : gérer les critères d'optimisation (coût, durée, nom
 from src.services.common.result_formatter import ResultFormatter
 from src.services.toll.constants import TollOptimizationConfig as Config
 from src.services.common.toll_messages import TollMessages
+from src.services.common.progress_events import emit_progress
+from src.services.common.pareto_archive import ParetoArchive
 
 
 class RouteResultManager:
@@ -26,6 +28,8 @@ class RouteResultManager:
         self.best_cheap = self._create_empty_result()
         self.best_fast = self._create_empty_result()
         self.best_min_tolls = self._create_empty_result()
+        # Front de Pareto de toutes les routes évaluées (alternatives)
+        self.archive = ParetoArchive()
     
     def _create_empty_result(self):
         """Crée une structure de résultat vide."""
@@ -52,6 +56,7 @@ class RouteResultManager:
             self.best_cheap = base_result.copy()
             self.best_fast = base_result.copy()
             self.best_min_tolls = base_result.copy()
+            self.archive.insert(base_result)
     
     def update_with_route(self, route_data, base_cost):
         """
@@ -68,25 +73,29 @@ class RouteResultManager:
         duration = route_data["duration"]
         toll_count = route_data["toll_count"]
         
-        updated = False
+        improved = []
+        self.archive.insert(route_data)
         
         # Mise à jour de l'itinéraire avec le moins de péages
         if toll_count < self.best_min_tolls["toll_count"]:
             self.best_min_tolls = route_data.copy()
-            updated = True
+            improved.append("min_tolls")
         
         # Mise à jour de l'itinéraire le moins cher
         if cost < self.best_cheap["cost"]:
             self.best_cheap = route_data.copy()
-            updated = True
-          # Mise à jour du plus rapide (priorité à la durée plus faible, puis au coût)
+            improved.append("cheapest")
+        
+        # Mise à jour du plus rapide (priorité à la durée plus faible, puis au coût)
         if (duration < self.best_fast["duration"] or 
             (duration == self.best_fast["duration"] and cost < self.best_fast["cost"]) or
             self.best_fast["route"] is None):
             self.best_fast = route_data.copy()
-            updated = True
+            improved.append("fastest")
         
-        return updated
+        if improved:
+            emit_progress("improvement", criteria=improved, route=route_data)
+        return bool(improved)
     
     def apply_fallback_if_needed(self, base_route, base_cost, base_duration, base_toll_count, max_tolls):
         """
@@ -110,6 +119,8 @@ class RouteResultManager:
                 
             if self.best_min_tolls["route"] is None:
                 self.best_min_tolls = base_result.copy()
+            
+            self.archive.insert(base_result)
     
     def get_results(self):
         """
@@ -125,6 +136,15 @@ class RouteResultManager:
             "min_tolls": self.best_min_tolls.copy() if self.best_min_tolls["route"] is not None else None
         }
     
+    def get_alternatives(self):
+        """
+        Retourne le front de Pareto des routes évaluées.
+        
+        Returns:
+            list: Routes non dominées (coût, durée, nombre de péages), triées par coût
+        """
+        return self.archive.front()
+    
     def has_valid_results(self):
         """
         Vérifie si au moins un résultat valide a été trouvé.
@@ -6,15 +6,17 @@ Utilitaires pour calculer des routes avec contraintes de péages.
 Responsabilité unique : gérer la logique de calcul et d'évitement des péages.
 """
 
-from src.services.toll_locator import locate_tolls
+from src.services.toll_locator import locate_tolls, get_all_open_tolls_by_proximity
 from src.services.toll_cost import add_marginal_cost
 from src.utils.poly_utils import avoidance_multipolygon
+from src.utils.avoidance_shapes import avoidance_shapes
 from benchmark.performance_tracker import performance_tracker
 from src.services.toll.constants import TollOptimizationConfig as Config
 from src.services.toll.route_validator import RouteValidator
 from src.services.toll.exceptions import ORSConnectionError, RouteCalculationError
 from src.services.toll.error_handler import TollErrorHandler
 from src.services.ors_payload_builder import ORSPayloadBuilder
+from src.services.common.route_context import current_route_context, prefetch_base_routes
 
 
 class RouteCalculator:
@@ -53,6 +55,7 @@ class RouteCalculator:
             if unwanted_tolls:
                 route = self._avoid_tolls_and_recalculate(coordinates, unwanted_tolls, part_name)
                 tolls = self._locate_tolls_with_tracking(route, f"{part_name}_verify")
+                avoidance_shapes.record_avoidance(unwanted_tolls, tolls)
                 
                 # Vérification finale
                 if self._has_unwanted_tolls(tolls, target_toll_id, part_name):
@@ -93,17 +96,37 @@ class RouteCalculator:
         return not RouteValidator.validate_unwanted_tolls_avoided(tolls, target_toll_id, part_name)
 
     def get_route_avoid_tollways_with_tracking(self, coordinates):
-        """Appel ORS pour éviter les péages avec tracking."""
-        with performance_tracker.measure_operation(Config.Operations.ORS_AVOID_TOLLWAYS):
-            performance_tracker.count_api_call("ORS_avoid_tollways")
-            return self.ors.get_route_avoid_tollways(coordinates)
+        """Appel ORS pour éviter les péages avec tracking (une fois par requête)."""
+        fetch = lambda: self._fetch_route_avoid_tollways(coordinates)
+        context = current_route_context(coordinates)
+        return context.toll_free_route(fetch) if context else fetch()
 
     def get_base_route_with_tracking(self, coordinates):
-        """Appel ORS pour route de base avec tracking."""
+        """Appel ORS pour route de base avec tracking (une fois par requête)."""
+        fetch = lambda: self._fetch_base_route(coordinates)
+        context = current_route_context(coordinates)
+        return context.base_route(fetch) if context else fetch()
+
+    def prefetch_routes(self, coordinates):
+        """Lance en parallèle la route de base et la route sans péage (voir prefetch_base_routes)."""
+        prefetch_base_routes(
+            coordinates,
+            lambda: self._fetch_base_route(coordinates),
+            lambda: self._fetch_route_avoid_tollways(coordinates),
+        )
+
+    def _fetch_base_route(self, coordinates):
+        """Appel ORS de la route de base."""
         with performance_tracker.measure_operation(Config.Operations.ORS_BASE_ROUTE):
             performance_tracker.count_api_call("ORS_base_route")
             return self.ors.get_base_route(coordinates)
 
+    def _fetch_route_avoid_tollways(self, coordinates):
+        """Appel ORS de la route sans autoroute à péage."""
+        with performance_tracker.measure_operation(Config.Operations.ORS_AVOID_TOLLWAYS):
+            performance_tracker.count_api_call("ORS_avoid_tollways")
+            return self.ors.get_route_avoid_tollways(coordinates)
+
     def get_route_avoiding_polygons_with_tracking(self, coordinates, avoid_poly):
         """Appel ORS pour éviter des polygones avec tracking."""
         with performance_tracker.measure_operation(Config.Operations.ORS_ALTERNATIVE_ROUTE):
@@ -111,9 +134,20 @@ class RouteCalculator:
             return self.ors.get_route_avoiding_polygons(coordinates, avoid_poly)
 
     def locate_and_cost_tolls(self, route, veh_class, operation_name=Config.Operations.LOCATE_TOLLS):
-        """Localise les péages et calcule leurs coûts avec tracking."""
+        """Localise les péages et calcule leurs coûts avec tracking (mémorisé par route dans le contexte)."""
+        def locate():
+            return locate_tolls(route, Config.get_barriers_csv_path())
         with performance_tracker.measure_operation(operation_name):
-            tolls_dict = locate_tolls(route, Config.get_barriers_csv_path())
-            tolls_on_route = tolls_dict["on_route"]
-            add_marginal_cost(tolls_on_route, veh_class)
-            return tolls_dict
\ No newline at end of file
+            context = current_route_context()
+            if context is not None:
+                return context.costed_tolls(route, veh_class, locate)
+            tolls_dict = locate()
+            add_marginal_cost(tolls_dict["on_route"], veh_class)
+            return tolls_dict
+
+    def get_open_tolls_by_proximity(self, route, max_distance_m=Config.MAX_DISTANCE_SEARCH_M):
+        """Péages ouverts à proximité de la route (mémorisé pour les routes du contexte)."""
+        def compute():
+            return get_all_open_tolls_by_proximity(route, Config.get_barriers_csv_path(), max_distance_m)
+        context = current_route_context()
+        return context.nearby_open_tolls(route, max_distance_m, compute) if context else compute()
\ No newline at end of file
@@ -68,6 +68,58 @@ def add_marginal_cost(
         t["cost"] = float(cost)
     return tolls
 
+def _fare_keys(tolls: List[Dict]) -> List:
+    """
+    Associe à chaque péage la ligne tarifaire (entrée, sortie) qu'il déclenche,
+    selon les mêmes règles que `add_marginal_cost` (None si pas de paiement).
+    """
+    keys = []
+    prev_entry = None
+    for t in tolls:
+        rid = t["id"]
+        key = None
+        if rid.startswith("APRR_O"):
+            key = (rid, rid)
+            prev_entry = None
+        elif rid.startswith("APRR_F"):
+            if prev_entry is not None:
+                key = (prev_entry, rid)
+                prev_entry = None
+            else:
+                prev_entry = rid
+        keys.append(key)
+    return keys
+
+def add_marginal_cost_by_class(
+    tolls: List[Dict],
+    veh_classes: List[str],
+) -> Dict[str, float]:
+    """
+    Calcule en un seul passage sur la table tarifaire le coût de chaque
+    péage pour plusieurs classes véhicule.
+
+    Chaque dict reçoit un champ `costs` = {classe: coût} ; la ligne tarifaire
+    n'est lue qu'une fois par péage, quel que soit le nombre de classes.
+
+    Returns:
+        Dict[str, float]: Coût total de la séquence par classe véhicule
+    """
+    totals = {veh_class: 0.0 for veh_class in veh_classes}
+    for t, key in zip(tolls, _fare_keys(tolls)):
+        row = None
+        if key is not None:
+            try:
+                row = _EDGES.loc[key]
+            except KeyError:
+                row = None
+        costs = {}
+        for veh_class in veh_classes:
+            value = row[veh_class] if row is not None else 0.0
+            costs[veh_class] = 0.0 if pd.isna(value) else float(value)
+            totals[veh_class] += costs[veh_class]
+        t["costs"] = costs
+    return totals
+
 def rank_by_saving(
     tolls: List[Dict],
     max_keep: int,
@@ -86,163 +138,216 @@ def rank_by_saving(
 
 # === CACHE INTELLIGENT POUR OPTIMISATION PHASE 1 ===
 
-from typing import Dict, Tuple, Optional
-import hashlib
+from collections import OrderedDict
+from typing import Tuple, Optional
+import threading
 import time
 
+from benchmark.performance_tracker import performance_tracker
+
+
+class _CacheStripe:
+    """Segment du cache : LRU ordonné protégé par son propre verrou."""
+
+    __slots__ = ("lock", "entries")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # clé -> (instant d'expiration, vecteur des coûts par péage)
+        self.entries: "OrderedDict[Tuple, Tuple[float, Tuple[float, ...]]]" = OrderedDict()
+
+
 class TollCostCache:
     """
-    Cache intelligent pour les calculs de coûts de péages avec éviction basée sur l'usage.
-    Optimise les performances en évitant les recalculs coûteux.
+    Mémo des coûts marginaux par *séquence ordonnée* de péages.
+
+    Le coût d'un péage fermé dépend de l'entrée qui le précède : la clé est
+    donc la séquence exacte des IDs (et non un ensemble trié) plus la classe
+    véhicule, et la valeur est le vecteur des coûts péage par péage.
+
+    - Éviction LRU et expiration TTL en O(1) (OrderedDict par segment)
+    - Verrous segmentés (lock striping) pour les threads Flask concurrents
+    - Compteurs hits / misses / évictions / expirations
     """
-    
-    def __init__(self, max_size: int = 1000, ttl_seconds: int = 3600):
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: int = 3600, stripes: int = 8):
         """
         Initialise le cache avec une taille et durée de vie configurables.
-        
+
         Args:
-            max_size: Nombre maximum d'entrées en cache
+            max_size: Nombre maximum d'entrées en cache (réparti entre les segments)
             ttl_seconds: Durée de vie des entrées en secondes (1h par défaut)
+            stripes: Nombre de segments verrouillés indépendamment
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: Dict[str, Dict] = {}
-        self._access_times: Dict[str, float] = {}
-        self._creation_times: Dict[str, float] = {}
-    
-    def _generate_key(self, tolls_ids: Tuple[str, ...], veh_class: str) -> str:
+        self._stripes = [_CacheStripe() for _ in range(max(1, stripes))]
+        self._stripe_capacity = max(1, -(-max_size // len(self._stripes)))
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def _generate_key(tolls_ids: Tuple[str, ...], veh_class: str) -> Tuple:
         """
-        Génère une clé unique pour la combinaison péages + classe véhicule.
-        
+        Génère la clé de cache : séquence ordonnée des IDs + classe véhicule.
+
         Args:
             tolls_ids: Tuple ordonné des IDs de péages
             veh_class: Classe de véhicule (c1, c2, etc.)
-            
+
         Returns:
-            str: Clé de cache unique
+            tuple: Clé de cache hashable
         """
-        # Créer une signature basée sur les IDs triés et la classe véhicule
-        content = f"{sorted(tolls_ids)}_{veh_class}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
-    def get(self, tolls_ids: Tuple[str, ...], veh_class: str) -> Optional[float]:
+        return (veh_class, tuple(tolls_ids))
+
+    def _stripe_for(self, key: Tuple) -> _CacheStripe:
+        """Sélectionne le segment responsable d'une clé."""
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def _count(self, hits: int = 0, misses: int = 0, evictions: int = 0, expirations: int = 0) -> None:
+        """Met à jour les compteurs de statistiques."""
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+            self._expirations += expirations
+
+    def get(self, tolls_ids: Tuple[str, ...], veh_class: str) -> Optional[Tuple[float, ...]]:
         """
-        Récupère le coût total en cache pour une combinaison donnée.
-        
+        Récupère le vecteur des coûts en cache pour une séquence donnée.
+
         Args:
-            tolls_ids: Tuple des IDs de péages
+            tolls_ids: Tuple ordonné des IDs de péages
             veh_class: Classe de véhicule
-            
+
         Returns:
-            float | None: Coût total si trouvé en cache, None sinon
+            tuple[float] | None: Coût de chaque péage (même ordre) si trouvé, None sinon
         """
         key = self._generate_key(tolls_ids, veh_class)
-        current_time = time.time()
-        
-        if key in self._cache:
-            # Vérifier la fraîcheur
-            if current_time - self._creation_times[key] > self.ttl_seconds:
-                self._remove_entry(key)
-                return None
-            
-            # Mettre à jour le temps d'accès pour LRU
-            self._access_times[key] = current_time
-            return self._cache[key]["total_cost"]
-        
-        return None
-    
-    def put(self, tolls_ids: Tuple[str, ...], veh_class: str, total_cost: float) -> None:
+        stripe = self._stripe_for(key)
+        now = time.monotonic()
+
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del stripe.entries[key]
+                entry = None
+                expired = True
+            else:
+                expired = False
+            if entry is not None:
+                stripe.entries.move_to_end(key)
+
+        if entry is None:
+            self._count(misses=1, expirations=int(expired))
+            return None
+
+        self._count(hits=1)
+        return entry[1]
+
+    def put(self, tolls_ids: Tuple[str, ...], veh_class: str, costs: Tuple[float, ...]) -> None:
         """
-        Stocke un coût total en cache.
-        
+        Stocke le vecteur des coûts d'une séquence de péages.
+
         Args:
-            tolls_ids: Tuple des IDs de péages
-            veh_class: Classe de véhicule  
-            total_cost: Coût total à stocker
+            tolls_ids: Tuple ordonné des IDs de péages
+            veh_class: Classe de véhicule
+            costs: Coût de chaque péage, dans l'ordre de tolls_ids
         """
+        if len(costs) != len(tolls_ids):
+            raise ValueError("Le vecteur de coûts doit avoir la même longueur que la séquence de péages")
+
         key = self._generate_key(tolls_ids, veh_class)
-        current_time = time.time()
-        
-        # Éviction si cache plein
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            self._evict_oldest()
-        
-        self._cache[key] = {
-            "total_cost": total_cost,
-            "tolls_ids": tolls_ids,
-            "veh_class": veh_class
-        }
-        self._access_times[key] = current_time
-        self._creation_times[key] = current_time
-    
+        stripe = self._stripe_for(key)
+        now = time.monotonic()
+        evicted = expired = 0
+
+        with stripe.lock:
+            entries = stripe.entries
+            entries[key] = (now + self.ttl_seconds, tuple(costs))
+            entries.move_to_end(key)
+
+            # Purge des entrées expirées en tête (les moins récemment utilisées)
+            while len(entries) > 1:
+                oldest_key, (expires_at, _) = next(iter(entries.items()))
+                if expires_at > now or oldest_key == key:
+                    break
+                entries.popitem(last=False)
+                expired += 1
+
+            # Éviction LRU si le segment dépasse sa capacité
+            while len(entries) > self._stripe_capacity:
+                entries.popitem(last=False)
+                evicted += 1
+
+        if evicted or expired:
+            self._count(evictions=evicted, expirations=expired)
+
     def get_combination_cost(self, tolls_list: List[Dict], veh_class: str) -> Optional[float]:
         """
-        Récupère le coût pour une liste de péages avec leurs détails.
-        
+        Récupère le coût total pour une liste de péages avec leurs détails.
+
         Args:
-            tolls_list: Liste des dictionnaires de péages
+            tolls_list: Liste ordonnée des dictionnaires de péages
             veh_class: Classe de véhicule
-            
+
         Returns:
             float | None: Coût total si trouvé, None sinon
         """
-        tolls_ids = tuple(toll["id"] for toll in tolls_list)
-        return self.get(tolls_ids, veh_class)
-    
-    def put_combination_cost(self, tolls_list: List[Dict], veh_class: str, total_cost: float) -> None:
+        costs = self.get(tuple(toll["id"] for toll in tolls_list), veh_class)
+        return sum(costs) if costs is not None else None
+
+    def put_combination_cost(self, tolls_list: List[Dict], veh_class: str) -> None:
         """
-        Stocke le coût pour une liste de péages avec leurs détails.
-        
+        Stocke les coûts (champ `cost`) d'une liste de péages déjà calculée.
+
         Args:
-            tolls_list: Liste des dictionnaires de péages
+            tolls_list: Liste ordonnée des dictionnaires de péages avec `cost`
             veh_class: Classe de véhicule
-            total_cost: Coût total à stocker
         """
         tolls_ids = tuple(toll["id"] for toll in tolls_list)
-        self.put(tolls_ids, veh_class, total_cost)
-    
-    def _evict_oldest(self) -> None:
-        """Éviction LRU : supprime l'entrée la moins récemment utilisée."""
-        if not self._cache:
-            return
-        
-        oldest_key = min(self._access_times.keys(), key=lambda k: self._access_times[k])
-        self._remove_entry(oldest_key)
-    
-    def _remove_entry(self, key: str) -> None:
-        """Supprime une entrée du cache."""
-        self._cache.pop(key, None)
-        self._access_times.pop(key, None)
-        self._creation_times.pop(key, None)
-    
+        costs = tuple(float(toll.get("cost", 0.0)) for toll in tolls_list)
+        self.put(tolls_ids, veh_class, costs)
+
     def clear(self) -> None:
-        """Vide complètement le cache."""
-        self._cache.clear()
-        self._access_times.clear()
-        self._creation_times.clear()
-    
+        """Vide complètement le cache (les compteurs sont conservés)."""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
     def get_stats(self) -> Dict:
         """
         Retourne les statistiques du cache.
-        
+
         Returns:
             dict: Statistiques d'utilisation du cache
         """
-        current_time = time.time()
-        valid_entries = sum(
-            1 for key in self._cache.keys()
-            if current_time - self._creation_times[key] <= self.ttl_seconds
-        )
-        
+        total_entries = len(self)
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            evictions, expirations = self._evictions, self._expirations
+
+        lookups = hits + misses
         return {
-            "total_entries": len(self._cache),
-            "valid_entries": valid_entries,
+            "total_entries": total_entries,
             "max_size": self.max_size,
-            "usage_ratio": valid_entries / self.max_size if self.max_size > 0 else 0
+            "usage_ratio": total_entries / self.max_size if self.max_size > 0 else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": evictions,
+            "expirations": expirations,
         }
 
 # Instance globale du cache pour utilisation partagée
 _toll_cost_cache = TollCostCache()
+performance_tracker.register_stats_provider("toll_cost_cache", _toll_cost_cache.get_stats)
 
 def add_marginal_cost_cached(
     tolls: List[Dict],
@@ -261,26 +366,23 @@ def add_marginal_cost_cached(
     if not tolls:
         return tolls
     
-    # Vérifier le cache pour la combinaison complète
-    cached_cost = _toll_cost_cache.get_combination_cost(tolls, veh_class)
-    if cached_cost is not None:
-        # Appliquer les coûts depuis le cache
-        total_from_cache = 0
-        for i, toll in enumerate(tolls):
-            # Estimation basée sur la proportion (simplifiée)
-            toll["cost"] = cached_cost / len(tolls) if len(tolls) > 0 else 0.0
-            total_from_cache += toll["cost"]
+    # Vérifier le cache pour la séquence exacte
+    cached_costs = _toll_cost_cache.get(tuple(toll["id"] for toll in tolls), veh_class)
+    if cached_costs is not None:
+        # Appliquer le coût mémorisé de chaque péage
+        for toll, cost in zip(tolls, cached_costs):
+            toll["cost"] = cost
         
-        print(f"Cache hit pour {len(tolls)} péages (coût total: {cached_cost})")
+        print(f"Cache hit pour {len(tolls)} péages (coût total: {sum(cached_costs)})")
         return tolls
     
     # Calcul normal si pas en cache
     tolls_with_cost = add_marginal_cost(tolls, veh_class)
     
-    # Mettre en cache le résultat
-    total_cost = sum(toll.get("cost", 0) for toll in tolls_with_cost)
-    _toll_cost_cache.put_combination_cost(tolls_with_cost, veh_class, total_cost)
+    # Mettre en cache le vecteur des coûts
+    _toll_cost_cache.put_combination_cost(tolls_with_cost, veh_class)
     
+    total_cost = sum(toll.get("cost", 0) for toll in tolls_with_cost)
     print(f"Cache miss - Calcul et mise en cache pour {len(tolls)} péages (coût total: {total_cost})")
     return tolls_with_cost
 
@@ -0,0 +1,208 @@
+"""
+toll_cost_bounds.py
+-------------------
+
+Index précalculé des *coûts minimaux atteignables* par gare de péage,
+construit une seule fois à partir de `virtual_edges.csv` et `barriers.csv`.
+
+Pour chaque gare et chaque classe véhicule (c1…c5) on retient :
+  • gare 'O' : le tarif fixe (ligne entree==sortie)
+  • gare 'F' : le tarif du trajet entrée ➜ sortie le moins cher qui la touche
+
+Le coût minimal d'un corridor est le minimum sur les gares qu'il contient.
+Le corridor de référence est la bande de MAX_DISTANCE_SEARCH_M autour de la
+géométrie de la route de base : le périmètre où les stratégies cherchent les
+péages à éviter. C'est un minorant pour les itinéraires qui restent dans cette
+bande, pas pour tout itinéraire : une alternative qui s'en écarte peut passer
+par une gare moins chère. Sans géométrie, la boîte englobant les points élargie
+de la marge n'est qu'une estimation grossière.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+from src.services.common.base_constants import BaseOptimizationConfig as Config
+
+_VEH_CLASSES = ("c1", "c2", "c3", "c4", "c5")
+_DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+_METERS_PER_DEGREE = 111_320.0
+_SEGMENT_BLOCK = 256  # Segments traités ensemble par route_corridor_mask
+
+
+class MinimumCostIndex:
+    """Coûts minimaux par gare, interrogeables par corridor géographique."""
+
+    def __init__(self, edges: pd.DataFrame, barriers: pd.DataFrame):
+        """
+        Construit l'index.
+
+        Args:
+            edges: DataFrame virtual_edges (colonnes entree, sortie, c1…c5)
+            barriers: DataFrame barriers (colonnes id, role, x, y en Lambert-93)
+        """
+        edges = edges.dropna(subset=["entree", "sortie"])
+        l93_to_wgs = Transformer.from_crs("EPSG:2154", "EPSG:4326", always_xy=True)
+        lon, lat = l93_to_wgs.transform(barriers["x"].to_numpy(), barriers["y"].to_numpy())
+
+        self.ids = barriers["id"].to_numpy()
+        self.is_open = (barriers["role"] == "O").to_numpy()
+        self.lon = np.asarray(lon, dtype=float)
+        self.lat = np.asarray(lat, dtype=float)
+
+        open_edges = edges[edges["entree"] == edges["sortie"]].set_index("entree")
+        closed_edges = edges[edges["entree"] != edges["sortie"]]
+
+        self.min_cost: Dict[str, np.ndarray] = {}
+        for veh_class in _VEH_CLASSES:
+            # Trajet fermé le moins cher touchant chaque gare (en entrée ou en sortie)
+            by_entry = closed_edges.groupby("entree")[veh_class].min()
+            by_exit = closed_edges.groupby("sortie")[veh_class].min()
+            closed_min = pd.concat([by_entry, by_exit]).groupby(level=0).min()
+            open_cost = open_edges[veh_class]
+
+            costs = np.full(len(self.ids), np.inf)
+            for i, toll_id in enumerate(self.ids):
+                value = open_cost.get(toll_id) if self.is_open[i] else closed_min.get(toll_id)
+                if value is not None and not pd.isna(value):
+                    costs[i] = float(value)
+            self.min_cost[veh_class] = costs
+
+    def corridor_mask(self, coordinates: List[List[float]], margin_m: float = Config.MAX_DISTANCE_SEARCH_M) -> np.ndarray:
+        """
+        Sélectionne les gares situées dans le corridor des coordonnées.
+
+        Args:
+            coordinates: Liste de points [longitude, latitude]
+            margin_m: Marge autour de la boîte englobante, en mètres
+
+        Returns:
+            np.ndarray: Masque booléen sur les gares de l'index
+        """
+        lons = [c[0] for c in coordinates]
+        lats = [c[1] for c in coordinates]
+        mid_lat = math.radians((min(lats) + max(lats)) / 2)
+        lat_margin = margin_m / _METERS_PER_DEGREE
+        lon_margin = margin_m / (_METERS_PER_DEGREE * max(math.cos(mid_lat), 0.01))
+
+        return ((self.lon >= min(lons) - lon_margin) & (self.lon <= max(lons) + lon_margin) &
+                (self.lat >= min(lats) - lat_margin) & (self.lat <= max(lats) + lat_margin))
+
+    def route_corridor_mask(self, route_coordinates: List[List[float]],
+                            margin_m: float = Config.MAX_DISTANCE_SEARCH_M) -> np.ndarray:
+        """
+        Sélectionne les gares à moins de `margin_m` de la géométrie d'une route.
+
+        Args:
+            route_coordinates: Polyligne de la route [[longitude, latitude], ...]
+            margin_m: Distance maximale à la route, en mètres
+
+        Returns:
+            np.ndarray: Masque booléen sur les gares de l'index
+        """
+        mask = self.corridor_mask(route_coordinates, margin_m)
+        candidates = np.flatnonzero(mask)
+        points = np.asarray(route_coordinates, dtype=float)[:, :2]
+        if not candidates.size or len(points) < 2:
+            return mask
+
+        # Projection équirectangulaire locale (mètres), suffisante à l'échelle de la marge
+        lon_scale = _METERS_PER_DEGREE * max(math.cos(math.radians(points[:, 1].mean())), 0.01)
+        xy = np.column_stack((points[:, 0] * lon_scale, points[:, 1] * _METERS_PER_DEGREE))
+        starts, vectors = xy[:-1], xy[1:] - xy[:-1]
+        lengths = np.maximum((vectors ** 2).sum(axis=1), 1e-9)
+        stations = np.column_stack((self.lon[candidates] * lon_scale, self.lat[candidates] * _METERS_PER_DEGREE))
+
+        # Distance gare ➜ segment, calculée par blocs de segments pour borner la mémoire
+        nearest_sq = np.full(len(candidates), np.inf)
+        for first in range(0, len(starts), _SEGMENT_BLOCK):
+            block = slice(first, first + _SEGMENT_BLOCK)
+            offsets = stations[:, None, :] - starts[None, block, :]
+            t = np.clip((offsets * vectors[None, block, :]).sum(axis=2) / lengths[None, block], 0.0, 1.0)
+            gaps = offsets - vectors[None, block, :] * t[:, :, None]
+            nearest_sq = np.minimum(nearest_sq, (gaps ** 2).sum(axis=2).min(axis=1))
+
+        within = np.zeros(len(self.ids), dtype=bool)
+        within[candidates] = nearest_sq <= margin_m ** 2
+        return within
+
+    def corridor_bounds(self, coordinates: List[List[float]], veh_class: str = Config.DEFAULT_VEH_CLASS,
+                        margin_m: float = Config.MAX_DISTANCE_SEARCH_M,
+                        route_coordinates: Optional[List[List[float]]] = None) -> Dict:
+        """
+        Calcule les coûts minimaux atteignables dans le corridor.
+
+        Args:
+            coordinates: Liste de points [longitude, latitude]
+            veh_class: Classe de véhicule
+            margin_m: Marge autour de la route (ou de la boîte englobante), en mètres
+            route_coordinates: Géométrie de la route de base ; à défaut, boîte englobant `coordinates`
+
+        Returns:
+            dict: min_open_cost, min_closed_pair_cost, min_cost (None si aucun tarif connu)
+                  et stations_in_corridor
+        """
+        if route_coordinates:
+            mask = self.route_corridor_mask(route_coordinates, margin_m)
+        else:
+            mask = self.corridor_mask(coordinates, margin_m)
+        costs = self.min_cost.get(veh_class, self.min_cost[Config.DEFAULT_VEH_CLASS])
+
+        def _min(selection):
+            values = costs[selection]
+            return float(values.min()) if values.size and np.isfinite(values.min()) else None
+
+        min_open = _min(mask & self.is_open)
+        min_closed = _min(mask & ~self.is_open)
+        candidates = [v for v in (min_open, min_closed) if v is not None]
+        return {
+            "min_open_cost": min_open,
+            "min_closed_pair_cost": min_closed,
+            "min_cost": min(candidates) if candidates else None,
+            "stations_in_corridor": int(mask.sum()),
+        }
+
+    def minimum_cost(self, coordinates: List[List[float]], veh_class: str = Config.DEFAULT_VEH_CLASS,
+                     route_coordinates: Optional[List[List[float]]] = None) -> Optional[float]:
+        """
+        Coût minimal d'un itinéraire payant restant dans le corridor.
+
+        Returns:
+            float | None: Coût minimal, None si le corridor ne contient aucune gare tarifée
+        """
+        return self.corridor_bounds(coordinates, veh_class, route_coordinates=route_coordinates)["min_cost"]
+
+    def is_budget_infeasible(self, coordinates: List[List[float]], budget_limit: float,
+                             veh_class: str = Config.DEFAULT_VEH_CLASS,
+                             route_coordinates: Optional[List[List[float]]] = None) -> bool:
+        """
+        Indique si aucun itinéraire payant du corridor ne peut tenir dans le budget.
+
+        Args:
+            coordinates: Liste de points [longitude, latitude]
+            budget_limit: Budget en euros
+            veh_class: Classe de véhicule
+            route_coordinates: Géométrie de la route de base (corridor de référence)
+
+        Returns:
+            bool: True si le budget est inférieur au coût minimal du corridor
+        """
+        min_cost = self.minimum_cost(coordinates, veh_class, route_coordinates)
+        return min_cost is not None and budget_limit < min_cost
+
+
+_MIN_COST_INDEX: Optional[MinimumCostIndex] = None
+
+
+def get_min_cost_index() -> MinimumCostIndex:
+    """Retourne l'index global, construit au premier appel."""
+    global _MIN_COST_INDEX
+    if _MIN_COST_INDEX is None:
+        edges = pd.read_csv(os.path.join(_DATA_DIR, "virtual_edges.csv"))
+        barriers = pd.read_csv(os.path.join(_DATA_DIR, "barriers.csv"))
+        _MIN_COST_INDEX = MinimumCostIndex(edges, barriers)
+    return _MIN_COST_INDEX
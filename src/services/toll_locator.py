@@ -9,14 +9,22 @@ optimisé : STRtree + reprojection unique + ordre le long de l’axe.
 © SAM PEAGE ET COUT 2025
 """
 from __future__ import annotations
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict
+import hashlib
+import math
+import threading
 
+import numpy as np
 import pandas as pd
 from shapely.geometry import Point, LineString
 from shapely.strtree import STRtree
 from pyproj import Transformer
 
+from src.utils.avoidance_shapes import avoidance_shapes
+from benchmark.performance_tracker import performance_tracker
+
 # ────────────────────────────────────────────────────────────────────────────
 # Préparation des données (barriers.csv)
 # ────────────────────────────────────────────────────────────────────────────
@@ -39,6 +47,60 @@ def _ensure_barriers(csv_path):
     if _BARRIERS_DF is None:
         _BARRIERS_DF = _load_barriers(csv_path)
         _BARRIERS_TREE = STRtree(_BARRIERS_DF["_geom3857"].tolist())
+        _preload_avoidance_shapes(_BARRIERS_DF)
+
+def _preload_avoidance_shapes(df):
+    """Précalcule les formes d'évitement de toutes les barrières (une fois, au chargement)."""
+    to_wgs84 = Transformer.from_crs(_WEBM, _WGS84, always_xy=True).transform
+    lons, lats = to_wgs84(
+        np.array([g.x for g in df["_geom3857"]]), np.array([g.y for g in df["_geom3857"]])
+    )
+    avoidance_shapes.preload(
+        {"id": toll_id, "longitude": lon, "latitude": lat} for toll_id, lon, lat in zip(df["id"], lons, lats)
+    )
+
+performance_tracker.register_stats_provider("avoidance_shapes", avoidance_shapes.get_stats)
+
+def _road_bearing(route_3857: LineString, distance: float, half_window_m: float = 50) -> float:
+    """Direction de la route (degrés depuis le nord) autour d'une abscisse curviligne.
+
+    Web Mercator est conforme : les angles mesurés en projection sont ceux du terrain.
+    """
+    p1 = route_3857.interpolate(max(distance - half_window_m, 0))
+    p2 = route_3857.interpolate(min(distance + half_window_m, route_3857.length))
+    if p1.equals(p2):
+        return float("nan")
+    return math.degrees(math.atan2(p2.x - p1.x, p2.y - p1.y)) % 360
+
+# ────────────────────────────────────────────────────────────────────────────
+# Mémo géométrique : une même route n'est analysée qu'une fois
+# ────────────────────────────────────────────────────────────────────────────
+_GEOMETRY_MEMO_SIZE = 128
+_GEOMETRY_MEMO: "OrderedDict[tuple, object]" = OrderedDict()
+_GEOMETRY_MEMO_LOCK = threading.Lock()
+
+def _geometry_digest(ors_geojson: dict) -> str:
+    """Empreinte de la géométrie de la route (indépendante de l'objet Python)."""
+    coords = np.asarray(ors_geojson["features"][0]["geometry"]["coordinates"], dtype=float)
+    return hashlib.blake2b(coords.tobytes(), digest_size=16).hexdigest()
+
+def _memoized(key: tuple, compute):
+    """Retourne le résultat mémorisé pour `key` ou le calcule (LRU borné)."""
+    with _GEOMETRY_MEMO_LOCK:
+        if key in _GEOMETRY_MEMO:
+            _GEOMETRY_MEMO.move_to_end(key)
+            return _GEOMETRY_MEMO[key]
+    result = compute()
+    with _GEOMETRY_MEMO_LOCK:
+        _GEOMETRY_MEMO[key] = result
+        while len(_GEOMETRY_MEMO) > _GEOMETRY_MEMO_SIZE:
+            _GEOMETRY_MEMO.popitem(last=False)
+    return result
+
+def clear_geometry_memo() -> None:
+    """Vide le mémo des analyses géométriques."""
+    with _GEOMETRY_MEMO_LOCK:
+        _GEOMETRY_MEMO.clear()
 
 # ────────────────────────────────────────────────────────────────────────────
 # Fonction publique
@@ -52,11 +114,29 @@ def locate_tolls(
     Renvoie la liste *ordonnée le long de la route* des péages
     rencontrés dans un rayon de `buffer_m` mètres.
 
+    Le résultat est mémorisé par empreinte de géométrie : les appels répétés
+    sur une même route (plusieurs classes véhicule, stratégies successives)
+    ne refont pas le travail géométrique. Chaque appel reçoit des copies des
+    dictionnaires, que l'appelant peut enrichir (ex. champ `cost`).
+
     Résultat :  [
         {"id": "APRR_O012", "longitude": 7.21, "latitude": 48.05, "role": "O"},
         ...
     ]
     """
+    key = ("locate", _geometry_digest(ors_geojson), str(csv_path), buffer_m)
+    result = _memoized(key, lambda: _locate_tolls(ors_geojson, csv_path, buffer_m))
+    return {
+        "on_route": [dict(t) for t in result["on_route"]],
+        "nearby": [dict(t) for t in result["nearby"]],
+    }
+
+def _locate_tolls(
+    ors_geojson: dict,
+    csv_path: str | Path,
+    buffer_m: float,
+) -> Dict[str, List[Dict]]:
+    """Implémentation non mémorisée de `locate_tolls`."""
     from shapely.geometry import shape  # import léger
 
     # 1) Géométrie ORS → LineString WGS84
@@ -110,6 +190,8 @@ def locate_tolls(
         sel["longitude"], sel["latitude"] = zip(*coords)
     else:
         sel["longitude"], sel["latitude"] = [], []
+    # Direction de la chaussée au péage (alignement des formes d'évitement)
+    sel["road_bearing"] = [_road_bearing(route_3857, d) for d in sel["_proj"]]
 
     # Pour les péages proches (déjà convertis plus haut)
     nearby_list = []
@@ -126,7 +208,7 @@ def locate_tolls(
         nearby_list = df_nearby[["id", "longitude", "latitude", "role"]].to_dict(orient="records")
 
     return {
-        "on_route": sel[["id", "longitude", "latitude", "role"]].to_dict(orient="records"),
+        "on_route": sel[["id", "longitude", "latitude", "role", "road_bearing"]].to_dict(orient="records"),
         "nearby": nearby_list
     }
 
@@ -147,8 +229,17 @@ def get_all_open_tolls_by_proximity(
     Returns:
         List[Dict]: Liste des péages ouverts triés par proximité, à moins de max_distance_m mètres
     """
+    key = ("open_tolls", _geometry_digest(ors_geojson), str(csv_path), max_distance_m)
+    result = _memoized(key, lambda: _get_all_open_tolls_by_proximity(ors_geojson, csv_path, max_distance_m))
+    return [dict(t) for t in result]
+
+def _get_all_open_tolls_by_proximity(
+    ors_geojson: dict,
+    csv_path: str | Path,
+    max_distance_m: float,
+) -> List[Dict]:
+    """Implémentation non mémorisée de `get_all_open_tolls_by_proximity`."""
     from shapely.geometry import shape  # import léger
-    import re
 
     # Charger les données de péages
     _ensure_barriers(csv_path)
@@ -0,0 +1,205 @@
+"""
+toll_search_index.py
+--------------------
+
+Index de recherche des gares de péage par nom, en mémoire.
+Responsabilité unique : retrouver une gare à partir de quelques lettres saisies,
+sans appel au géocodeur externe.
+
+Sources :
+    • barriers.csv : barrières de péage (id, nom, gestionnaire, coordonnées Lambert-93)
+    • valid_tolls.csv : noms alternatifs des barrières (noms combinés / noms des gares)
+    • gares-peage-2024-with-id.csv : gares du réseau (échangeurs, pleines voies)
+
+Les noms sont normalisés par csv_utils.normalize (ASCII, majuscules). Deux index :
+    • préfixes de mots : chaque mot de la requête doit commencer un mot du nom
+    • trigrammes : rattrape les fautes de frappe quand aucun nom ne correspond
+"""
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import pandas as pd
+from pyproj import Transformer
+
+from src.utils.csv_utils import normalize, load_tolls_csv
+from src.utils.route_utils import is_toll_open_system
+
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), '../../data')
+BARRIERS_FILE = "barriers.csv"
+ALIASES_FILE = "valid_tolls.csv"
+STATIONS_FILE = "gares-peage-2024-with-id.csv"
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_TRIGRAM_SIMILARITY = 0.3
+_ABBREVIATIONS = {"ST": "SAINT", "STE": "SAINTE"}
+
+
+def _words(text: str, keep_last: bool = False, expand: bool = True) -> List[str]:
+    """
+    Mots normalisés (ASCII, majuscules) d'un texte, abréviations développées.
+
+    Args:
+        keep_last: Ne pas développer le dernier mot (saisie en cours : "ST" peut débuter "STRASBOURG")
+        expand: Développer les abréviations
+    """
+    words = [w for w in re.split(r"[^A-Z0-9]+", normalize(str(text))) if w]
+    last = (len(words) - 1 if keep_last else len(words)) if expand else 0
+    return [_ABBREVIATIONS.get(w, w) if i < last else w for i, w in enumerate(words)]
+
+
+def _trigrams(words: List[str]) -> set:
+    padded = f"  {' '.join(words)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _to_float(value) -> float:
+    """Nombre éventuellement écrit avec une virgule décimale."""
+    return float(str(value).replace(",", "."))
+
+
+class TollSearchIndex:
+    """Index préfixes + trigrammes des noms de gares de péage."""
+
+    def __init__(self, records: List[Dict]):
+        """
+        Args:
+            records: Gares (id, name, longitude, latitude...) ; la clé "aliases" liste les autres noms
+        """
+        self.records = []
+        self._names: List[List[List[str]]] = []           # Mots de chaque nom, par gare
+        self._prefixes: Dict[str, set] = defaultdict(set)  # Préfixe de mot -> gares
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)  # Trigramme -> noms
+        self._trigram_names: List[tuple] = []                      # Nom -> (gare, nombre de trigrammes)
+        for record in records:
+            # Noms développés ("SAINT AMAND") et tels qu'écrits ("ST AMAND")
+            texts = dict.fromkeys([record["name"], *record.get("aliases", [])])
+            names = [list(words) for words in dict.fromkeys(
+                tuple(_words(t, expand=expand)) for t in texts for expand in (True, False)
+            ) if words]
+            if not names:
+                continue
+            index = len(self.records)
+            self.records.append({k: v for k, v in record.items() if k != "aliases"})
+            self._names.append(names)
+            for words in names:
+                for word in words:
+                    for end in range(1, len(word) + 1):
+                        self._prefixes[word[:end]].add(index)
+                trigrams = _trigrams(words)
+                for trigram in trigrams:
+                    self._trigrams[trigram].append(len(self._trigram_names))
+                self._trigram_names.append((index, len(trigrams)))
+
+    def __len__(self):
+        return len(self.records)
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT, open_only: bool = False) -> List[Dict]:
+        """
+        Recherche des gares par nom.
+
+        Args:
+            text: Texte saisi (casse et accents indifférents)
+            limit: Nombre maximum de résultats
+            open_only: Ne retourner que les péages à système ouvert
+
+        Returns:
+            list: Gares triées par pertinence (copies, avec "score")
+        """
+        tokens = _words(text, keep_last=True)
+        if not tokens or limit <= 0:
+            return []
+        candidates = set.intersection(*(self._prefixes.get(t, set()) for t in tokens))
+        if open_only:
+            candidates = {i for i in candidates if is_toll_open_system(self.records[i]["id"])}
+        if candidates:
+            scored = [(self._prefix_score(i, tokens), i) for i in candidates]
+        else:
+            scored = self._fuzzy(tokens, open_only)
+        scored.sort(key=lambda item: (-item[0], self.records[item[1]]["source"] != "barrier",
+                                      len(self.records[item[1]]["name"]), self.records[item[1]]["name"]))
+        return [dict(self.records[i], score=round(score, 3)) for score, i in scored[:limit]]
+
+    def _prefix_score(self, index: int, tokens: List[str]) -> float:
+        """Nom identique > nom commençant par la requête > mots commençant par la requête."""
+        best = 0.0
+        for words in self._names[index]:
+            if words == tokens:
+                return 1.0
+            if words[:len(tokens) - 1] == tokens[:-1] and len(words) >= len(tokens) \
+                    and words[len(tokens) - 1].startswith(tokens[-1]):
+                best = max(best, 0.8)
+            else:
+                best = max(best, 0.5)
+        return best
+
+    def _fuzzy(self, tokens: List[str], open_only: bool) -> List:
+        """Similarité de Jaccard sur les trigrammes (fautes de frappe)."""
+        query = _trigrams(tokens)
+        shared = defaultdict(int)
+        for trigram in query:
+            for name in self._trigrams.get(trigram, ()):
+                shared[name] += 1
+        best = {}
+        for name, common in shared.items():
+            index, size = self._trigram_names[name]
+            similarity = common / (len(query) + size - common)
+            if similarity >= MIN_TRIGRAM_SIMILARITY and similarity > best.get(index, 0):
+                best[index] = similarity
+        return [(similarity * 0.5, i) for i, similarity in best.items()
+                if not open_only or is_toll_open_system(self.records[i]["id"])]
+
+    @classmethod
+    def from_data_dir(cls, data_dir: str = _DATA_DIR) -> "TollSearchIndex":
+        """Construit l'index à partir des jeux de données du dossier `data`."""
+        to_wgs84 = Transformer.from_crs("EPSG:2154", "EPSG:4326", always_xy=True).transform
+
+        # Noms alternatifs par (id, nom) : un même id peut désigner plusieurs barrières
+        aliases = defaultdict(list)
+        aliases_path = os.path.join(data_dir, ALIASES_FILE)
+        if os.path.exists(aliases_path):
+            for row in pd.read_csv(aliases_path).itertuples(index=False):
+                if isinstance(row.name_base_peages, str) and isinstance(row.name_base_combined, str):
+                    aliases[(str(row.id), normalize(row.name_base_peages))].append(row.name_base_combined)
+
+        records = []
+        barriers = pd.read_csv(os.path.join(data_dir, BARRIERS_FILE))
+        for row in barriers.itertuples(index=False):
+            lon, lat = to_wgs84(row.x, row.y)
+            records.append({
+                "id": row.id, "name": row.name_base, "operator": row.Gestionnaire,
+                "open_system": is_toll_open_system(row.id), "source": "barrier",
+                "longitude": round(lon, 6), "latitude": round(lat, 6),
+                "aliases": aliases.get((str(row.id), normalize(str(row.name_base))), []),
+            })
+
+        stations_path = os.path.join(data_dir, STATIONS_FILE)
+        if os.path.exists(stations_path):
+            stations = load_tolls_csv(stations_path)
+            # Une gare par nom et type (les lignes détaillent sens et voies)
+            for (name, kind), group in stations.groupby(["nomGare", "typeGare_lib"], sort=False):
+                lon, lat = to_wgs84(group["x"].map(_to_float).mean(), group["y"].map(_to_float).mean())
+                records.append({
+                    "id": f"GARE_{group['id'].iloc[0]}", "name": name, "operator": None,
+                    "open_system": False, "source": "station", "station_type": kind,
+                    "routes": sorted(set(group["route"].astype(str))),
+                    "longitude": round(lon, 6), "latitude": round(lat, 6),
+                })
+        return cls(records)
+
+
+_INDEX: Optional[TollSearchIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_toll_search_index() -> TollSearchIndex:
+    """Index partagé, construit au premier appel."""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = TollSearchIndex.from_data_dir()
+        return _INDEX
@@ -13,6 +13,7 @@ from src.services.toll.one_open_toll_strategy import OneOpenTollStrategy
 from src.services.toll.many_tolls_strategy import ManyTollsStrategy
 from src.services.toll.constants import TollOptimizationConfig as Config
 from src.services.toll.error_handler import TollErrorHandler
+from src.services.common.route_context import route_context
 
 class TollRouteOptimizer:
     """
@@ -32,7 +33,9 @@ class TollRouteOptimizer:
         self.one_open_toll_strategy = OneOpenTollStrategy(ors_service)
         self.many_tolls_strategy = ManyTollsStrategy(ors_service)
     
-    def compute_route_with_toll_limit(self, coordinates, max_tolls, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE):
+    def compute_route_with_toll_limit(self, coordinates, max_tolls, veh_class=Config.DEFAULT_VEH_CLASS, max_comb_size=Config.DEFAULT_MAX_COMB_SIZE,
+                                      search=Config.DEFAULT_SEARCH_MODE, beam_width=Config.DEFAULT_BEAM_WIDTH,
+                                      network_search=True):
         """
         Calcule un itinéraire avec une limite sur le nombre de péages.
         
@@ -41,6 +44,9 @@ class TollRouteOptimizer:
             max_tolls: Nombre maximum de péages autorisés
             veh_class: Classe de véhicule pour le calcul des coûts
             max_comb_size: Limite pour les combinaisons de péages à éviter
+            search: Mode de recherche des péages à éviter ("exhaustive", "greedy", "beam")
+            beam_width: Largeur du faisceau en mode "beam"
+            network_search: Chercher un péage ouvert dans tout le réseau (cas max_tolls=1)
             
         Returns:
             dict: Résultats optimisés (fastest, cheapest, min_tolls, status)
@@ -51,27 +57,33 @@ class TollRouteOptimizer:
             "compute_route_with_toll_limit",
             max_tolls=max_tolls,
             veh_class=veh_class,
-            max_comb_size=max_comb_size
+            max_comb_size=max_comb_size,
+            search=search
         )
         
-        with performance_tracker.measure_operation(Config.Operations.COMPUTE_ROUTE_WITH_TOLL_LIMIT, {
+        # Contexte de requête : route de base et analyses partagées entre stratégie et fallback
+        with route_context(coordinates), performance_tracker.measure_operation(Config.Operations.COMPUTE_ROUTE_WITH_TOLL_LIMIT, {
             "max_tolls": max_tolls,
             "veh_class": veh_class,
-            "max_comb_size": max_comb_size
+            "max_comb_size": max_comb_size,
+            "search": search
         }):
             print(f"=== Calcul d'itinéraire avec un maximum de {max_tolls} péages ===")
             
             try:                
+                # Route de base et route sans péage demandées en parallèle, lues plus tard
+                self.many_tolls_strategy.route_calculator.prefetch_routes(coordinates)
+                
                 # Cas spécial 1: Aucun péage autorisé
                 if max_tolls == 0:
                     result = self._handle_no_toll_route(coordinates, veh_class)
                 # Cas spécial 2: Un seul péage autorisé
                 elif max_tolls == 1:
-                    result = self._handle_one_toll_route(coordinates, veh_class, max_comb_size)
+                    result = self._handle_one_toll_route(coordinates, veh_class, max_comb_size, network_search)
                 # Cas général: Plusieurs péages autorisés
                 else:
                     result = self.many_tolls_strategy.compute_route_with_many_tolls(
-                        coordinates, max_tolls, veh_class, max_comb_size
+                        coordinates, max_tolls, veh_class, max_comb_size, search, beam_width
                     )
                 
                 # Fallback automatique si échec ou si statut indique que le fallback est nécessaire
@@ -97,9 +109,9 @@ class TollRouteOptimizer:
         """Délègue à la stratégie spécialisée"""
         return self.no_toll_strategy.handle_no_toll_route(coordinates, veh_class)
 
-    def _handle_one_toll_route(self, coordinates, veh_class, max_comb_size):
+    def _handle_one_toll_route(self, coordinates, veh_class, max_comb_size, network_search=True):
         """Délègue à la stratégie spécialisée"""
-        return self.one_open_toll_strategy.handle_one_toll_route(coordinates, veh_class, max_comb_size)
+        return self.one_open_toll_strategy.handle_one_toll_route(coordinates, veh_class, max_comb_size, network_search)
 
     def _get_fallback_route(self, coordinates, veh_class, status):
         """Délègue à la stratégie de fallback"""
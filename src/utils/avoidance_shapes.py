@@ -0,0 +1,232 @@
+"""
+avoidance_shapes.py
+-------------------
+
+Bibliothèque des formes d'évitement des péages (`avoid_polygons` ORS).
+
+Chaque péage est couvert par un octogone calculé en mètres puis converti en
+degrés avec la correction de latitude (un disque tamponné directement en degrés
+est écrasé d'est en ouest d'un facteur cos(latitude) : ~136 m au lieu de 200 m
+en France, ce qui laisse passer ORS par la chaussée parallèle).
+
+- Formes à 8 sommets (au lieu des 65 d'un buffer shapely) précalculées au
+  chargement du jeu de péages
+- Alignement optionnel sur la chaussée : quand la direction de la route au
+  péage est connue (`road_bearing`), l'octogone est élargi en travers de la
+  route pour couvrir les deux sens de circulation
+- Unions des ensembles fréquents mises en cache (LRU)
+- Statistiques : taux de succès de l'évitement et taille des payloads
+"""
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from shapely.geometry import Polygon, mapping
+from shapely.ops import unary_union
+
+
+AVOIDANCE_RADIUS_M = 200      # Rayon couvert autour de chaque péage
+SHAPE_VERTICES = 8            # Sommets par forme (octogone circonscrit au disque)
+ACROSS_ROAD_FACTOR = 1.5      # Élargissement en travers de la chaussée (forme alignée)
+BEARING_STEP_DEG = 15         # Pas de quantification de la direction de la route
+UNION_CACHE_SIZE = 512        # Unions d'ensembles de péages conservées
+
+METERS_PER_DEGREE_LAT = 111320
+
+
+def _toll_key(toll: Dict) -> str:
+    """Identifiant stable d'un péage (ID, ou coordonnées à défaut)."""
+    toll_id = toll.get("id")
+    if toll_id is not None:
+        return str(toll_id).strip().lower()
+    return f"{float(toll['longitude']):.6f},{float(toll['latitude']):.6f}"
+
+
+def _bearing_bucket(toll: Dict) -> Optional[int]:
+    """Direction de la route au péage, quantifiée modulo 180° (la forme est symétrique)."""
+    bearing = toll.get("road_bearing")
+    if bearing is None:
+        return None
+    try:
+        bearing = float(bearing)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(bearing):
+        return None
+    return int(round(bearing / BEARING_STEP_DEG) * BEARING_STEP_DEG) % 180
+
+
+def build_shape(lon: float, lat: float, radius_m: float = AVOIDANCE_RADIUS_M, vertices: int = SHAPE_VERTICES,
+                bearing_deg: Optional[float] = None, across_factor: float = ACROSS_ROAD_FACTOR) -> Polygon:
+    """
+    Polygone d'évitement autour d'un point.
+
+    Args:
+        lon, lat: Position du péage (WGS84)
+        radius_m: Rayon minimal couvert (le polygone contient le disque)
+        vertices: Nombre de sommets
+        bearing_deg: Direction de la route (degrés depuis le nord) ; None = forme régulière
+        across_factor: Élargissement en travers de la route si `bearing_deg` est fourni
+
+    Returns:
+        Polygon: Forme en degrés WGS84
+    """
+    # Polygone circonscrit : ses côtés restent à `radius_m` du centre
+    circumradius = radius_m / math.cos(math.pi / vertices)
+    along, across = circumradius, circumradius
+    if bearing_deg is None:
+        bearing_deg = 0.0
+    else:
+        across *= across_factor
+    theta = math.radians(bearing_deg)
+    along_axis = (math.sin(theta), math.cos(theta))     # (est, nord)
+    across_axis = (math.cos(theta), -math.sin(theta))
+
+    m_per_deg_lon = METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6)
+    points = []
+    for k in range(vertices):
+        angle = 2 * math.pi * (k + 0.5) / vertices
+        a, c = along * math.cos(angle), across * math.sin(angle)
+        east = a * along_axis[0] + c * across_axis[0]
+        north = a * along_axis[1] + c * across_axis[1]
+        points.append((lon + east / m_per_deg_lon, lat + north / METERS_PER_DEGREE_LAT))
+    return Polygon(points)
+
+
+class AvoidanceShapeLibrary:
+    """Formes d'évitement par péage et unions mises en cache."""
+
+    def __init__(self, radius_m: float = AVOIDANCE_RADIUS_M, vertices: int = SHAPE_VERTICES,
+                 align_to_road: bool = True, union_cache_size: int = UNION_CACHE_SIZE):
+        """
+        Initialise une bibliothèque vide.
+
+        Args:
+            radius_m: Rayon couvert autour de chaque péage
+            vertices: Sommets par forme
+            align_to_road: Élargir la forme en travers de la route quand sa direction est connue
+            union_cache_size: Nombre d'unions conservées
+        """
+        self.radius_m = radius_m
+        self.vertices = vertices
+        self.align_to_road = align_to_road
+        self.union_cache_size = union_cache_size
+        self._shapes: Dict[Tuple[str, Optional[int]], Polygon] = {}
+        self._unions: "OrderedDict[Tuple, Tuple[dict, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "union_hits": 0, "union_misses": 0,
+            "payloads": 0, "payload_bytes": 0, "max_payload_bytes": 0,
+            "avoidance_attempts": 0, "avoidance_successes": 0,
+        }
+
+    def preload(self, tolls: Iterable[Dict]) -> int:
+        """
+        Précalcule les formes régulières d'un jeu de péages (au chargement des données).
+
+        Args:
+            tolls: Péages (id, longitude, latitude)
+
+        Returns:
+            int: Nombre de formes disponibles
+        """
+        shapes = {
+            (_toll_key(t), None): build_shape(float(t["longitude"]), float(t["latitude"]), self.radius_m, self.vertices)
+            for t in tolls
+        }
+        with self._lock:
+            self._shapes.update(shapes)
+            return len(self._shapes)
+
+    def shape(self, toll: Dict) -> Polygon:
+        """Forme d'évitement d'un péage (précalculée, ou calculée puis conservée)."""
+        bucket = _bearing_bucket(toll) if self.align_to_road else None
+        key = (_toll_key(toll), bucket)
+        with self._lock:
+            shape = self._shapes.get(key)
+        if shape is None:
+            shape = build_shape(float(toll["longitude"]), float(toll["latitude"]), self.radius_m, self.vertices,
+                                bearing_deg=bucket)
+            with self._lock:
+                self._shapes[key] = shape
+        return shape
+
+    def multipolygon(self, tolls: List[Dict]) -> dict:
+        """
+        Géométrie GeoJSON couvrant tous les péages à éviter.
+
+        Args:
+            tolls: Péages à éviter
+
+        Returns:
+            dict: Polygon ou MultiPolygon GeoJSON (copie, modifiable par l'appelant)
+        """
+        key = tuple(sorted({(_toll_key(t), _bearing_bucket(t) if self.align_to_road else None) for t in tolls},
+                           key=lambda k: (k[0], -1 if k[1] is None else k[1])))
+        with self._lock:
+            cached = self._unions.get(key)
+            if cached is not None:
+                self._unions.move_to_end(key)
+                self._stats["union_hits"] += 1
+        if cached is None:
+            geometry = mapping(unary_union([self.shape(t) for t in tolls]))
+            cached = (geometry, len(json.dumps(geometry)))
+            with self._lock:
+                self._stats["union_misses"] += 1
+                self._unions[key] = cached
+                while len(self._unions) > self.union_cache_size:
+                    self._unions.popitem(last=False)
+        geometry, size = cached
+        with self._lock:
+            self._stats["payloads"] += 1
+            self._stats["payload_bytes"] += size
+            self._stats["max_payload_bytes"] = max(self._stats["max_payload_bytes"], size)
+        return dict(geometry)
+
+    def record_avoidance(self, avoided_tolls: List[Dict], route_tolls: List[Dict]) -> bool:
+        """
+        Enregistre si une route calculée avec `avoid_polygons` a bien évité les péages visés.
+
+        Args:
+            avoided_tolls: Péages qu'on cherchait à éviter
+            route_tolls: Péages effectivement traversés par la route obtenue
+
+        Returns:
+            bool: True si aucun péage visé n'est traversé
+        """
+        avoided = {_toll_key(t) for t in avoided_tolls}
+        success = not (avoided & {_toll_key(t) for t in route_tolls})
+        with self._lock:
+            self._stats["avoidance_attempts"] += 1
+            self._stats["avoidance_successes"] += int(success)
+        return success
+
+    def clear(self) -> None:
+        """Vide les formes et les unions (les compteurs sont conservés)."""
+        with self._lock:
+            self._shapes.clear()
+            self._unions.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne les statistiques de la bibliothèque.
+
+        Returns:
+            dict: Formes, unions en cache, taux de succès de l'évitement, taille des payloads
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"shapes": len(self._shapes), "cached_unions": len(self._unions)})
+        lookups = stats["union_hits"] + stats["union_misses"]
+        stats["union_hit_ratio"] = stats["union_hits"] / lookups if lookups else 0.0
+        stats["avoidance_success_rate"] = (
+            stats["avoidance_successes"] / stats["avoidance_attempts"] if stats["avoidance_attempts"] else None
+        )
+        stats["avg_payload_bytes"] = stats["payload_bytes"] / stats["payloads"] if stats["payloads"] else 0
+        return stats
+
+
+# Instance globale partagée (préchargée par toll_locator au chargement des barrières)
+avoidance_shapes = AvoidanceShapeLibrary()
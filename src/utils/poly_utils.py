@@ -2,21 +2,24 @@
 poly_utils.py
 -------------
 
-Construction d’un MultiPolygon GeoJSON de petits disques (~200 m)
-centrés sur les péages à éviter.
+Construction d’un MultiPolygon GeoJSON de petites zones (~200 m) centrées
+sur les péages à éviter. Les formes viennent de la bibliothèque précalculée
+(`avoidance_shapes.py`) : octogones corrigés en latitude, alignés sur la
+chaussée quand sa direction est connue, unions mises en cache.
 """
 from typing import List, Dict
-from shapely.geometry import Point, mapping
+from shapely.geometry import mapping
 from shapely.ops import unary_union
 
+from src.utils.avoidance_shapes import avoidance_shapes, build_shape
+
 def avoidance_multipolygon(
     tolls_to_avoid: List[Dict],
     radius_m: float = 200,
 ) -> dict:
     print(f"Création d'un MultiPolygon pour {len(tolls_to_avoid)} péages à éviter.")
-    polys = [
-        Point(t["longitude"], t["latitude"]).buffer(radius_m / 111120)  # ≈ m ➜ °(lat)
-        for t in tolls_to_avoid
-    ]
-    union = unary_union(polys)
-    return mapping(union)  # GeoJSON-ready
+    if radius_m == avoidance_shapes.radius_m:
+        return avoidance_shapes.multipolygon(tolls_to_avoid)
+    # Rayon non standard : formes calculées à la volée, sans cache
+    polys = [build_shape(t["longitude"], t["latitude"], radius_m) for t in tolls_to_avoid]
+    return mapping(unary_union(polys))  # GeoJSON-ready
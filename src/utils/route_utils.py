@@ -6,6 +6,10 @@ Fonctions utilitaires communes pour les services de routage.
 """
 import copy
 
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+
 def is_toll_open_system(toll_id):
     """
     Détermine si un péage est à système ouvert à partir de son ID.
@@ -56,3 +60,51 @@ def merge_routes(route1, route2):
     }
     
     return merged
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """
+    Distance orthodromique en mètres (accepte des scalaires ou des tableaux numpy).
+    
+    Args:
+        lon1, lat1: Point(s) de départ en degrés
+        lon2, lat2: Point(s) d'arrivée en degrés
+        
+    Returns:
+        float | np.ndarray: Distance(s) en mètres
+    """
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+def rank_tolls_by_detour(tolls, start, end, direct_distance_m=None, max_detour_factor=None):
+    """
+    Classe des péages candidats par borne inférieure du détour qu'impose leur passage.
+    
+    Tout itinéraire départ → péage → arrivée est au moins aussi long que
+    haversine(départ, péage) + haversine(péage, arrivée) ; rapportée à la longueur
+    de la route directe, cette somme minore le facteur de détour. Les péages dont
+    la borne dépasse `max_detour_factor` ne peuvent pas donner une route raisonnable.
+    
+    Args:
+        tolls: Péages (dicts avec longitude / latitude)
+        start: Point de départ [lon, lat]
+        end: Point d'arrivée [lon, lat]
+        direct_distance_m: Longueur de la route directe (défaut : distance à vol d'oiseau)
+        max_detour_factor: Facteur de détour maximal (None = aucun filtre)
+        
+    Returns:
+        list: Péages retenus, triés par borne de détour croissante (champ "detour_factor" ajouté)
+    """
+    if not tolls:
+        return []
+    lons = np.array([t["longitude"] for t in tolls], dtype=float)
+    lats = np.array([t["latitude"] for t in tolls], dtype=float)
+    through_toll = haversine_m(start[0], start[1], lons, lats) + haversine_m(lons, lats, end[0], end[1])
+    direct = direct_distance_m or float(haversine_m(start[0], start[1], end[0], end[1]))
+    factors = through_toll / max(direct, 1.0)
+    
+    order = np.argsort(factors, kind="stable")
+    if max_detour_factor is not None:
+        order = order[factors[order] <= max_detour_factor]
+    return [{**tolls[i], "detour_factor": round(float(factors[i]), 3)} for i in order]
@@ -0,0 +1,166 @@
+"""
+Tests pour AdmissionController - Contrôle d'admission des optimisations selon leur coût.
+"""
+import pytest
+
+from src.services.admission_controller import (
+    AdmissionController, AdmissionRejected, estimate_ors_calls, quality_tiers
+)
+
+
+# Strasbourg → Lyon (~380 km à vol d'oiseau) : plusieurs péages probables
+LONG_TRIP = [[7.75, 48.57], [4.84, 45.76]]
+SHORT_TRIP = [[7.0, 48.0], [7.1, 48.05]]
+TOLL_PARAMS = {"max_tolls": 2, "search": "exhaustive", "beam_width": 3}
+
+
+class FakeClock:
+    """Horloge manuelle : sleep() fait avancer le temps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _controller(budget=100, refill_per_s=10, max_wait_s=2):
+    clock = FakeClock()
+    return AdmissionController(budget, refill_per_s, max_wait_s, clock=clock, sleep=clock.sleep), clock
+
+
+class TestEstimateORSCalls:
+    """Tests pour l'estimation du coût d'une requête."""
+
+    def test_no_toll_costs_two_calls(self):
+        """Test qu'une requête sans péage coûte la route de base et la route sans péage."""
+        assert estimate_ors_calls("tolls", LONG_TRIP, {"max_tolls": 0}) == 2
+
+    def test_cost_grows_with_distance_and_comb_size(self):
+        """Test que le coût croît avec la longueur du trajet et la taille des combinaisons."""
+        short = estimate_ors_calls("tolls", SHORT_TRIP, TOLL_PARAMS)
+        long = estimate_ors_calls("tolls", LONG_TRIP, TOLL_PARAMS)
+        reduced = estimate_ors_calls("tolls", LONG_TRIP, TOLL_PARAMS, {"max_comb_size": 1})
+
+        assert short < long
+        assert reduced < long
+
+    def test_network_search_only_counts_for_one_toll(self):
+        """Test que la recherche réseau des péages ouverts ne compte que pour max_tolls=1."""
+        one_toll = {"max_tolls": 1, "search": "exhaustive"}
+        full = estimate_ors_calls("tolls", LONG_TRIP, one_toll)
+        minimal = estimate_ors_calls("tolls", LONG_TRIP, one_toll, {"network_search": False})
+
+        assert minimal < full
+        assert estimate_ors_calls("tolls", LONG_TRIP, TOLL_PARAMS, {"network_search": False}) == \
+            estimate_ors_calls("tolls", LONG_TRIP, TOLL_PARAMS)
+
+    def test_invalid_coordinates(self):
+        """Test que des coordonnées invalides donnent une estimation minimale."""
+        assert estimate_ors_calls("budget", None, {}) >= 2
+
+    def test_budget_tiers_without_network_search(self):
+        """Test que les optimisations budgétaires n'ont pas de niveau « sans recherche réseau »."""
+        assert all("network_search" not in overrides for _, overrides in quality_tiers("budget"))
+        assert [name for name, _ in quality_tiers("tolls")] == ["full", "reduced", "minimal"]
+
+    def test_degraded_tiers_lower_iterative_search_cost(self):
+        """Test que les niveaux dégradés réduisent aussi le coût des recherches beam et greedy."""
+        for kind in ("tolls", "budget"):
+            beam = {"max_tolls": 2, "search": "beam", "beam_width": 3}
+            costs = [estimate_ors_calls(kind, LONG_TRIP, beam, overrides) for _, overrides in quality_tiers(kind)]
+            assert costs[0] > costs[1] > costs[2]
+
+            greedy = {"max_tolls": 2, "search": "greedy", "beam_width": 1}
+            full = estimate_ors_calls(kind, LONG_TRIP, greedy)
+            minimal = estimate_ors_calls(kind, LONG_TRIP, greedy, quality_tiers(kind)[-1][1])
+            assert minimal < full
+
+
+class TestAdmissionController:
+    """Tests pour le seau à jetons et la dégradation de qualité."""
+
+    def test_full_quality_when_idle(self):
+        """Test qu'une requête est admise en qualité complète quand le budget le permet."""
+        controller, _ = _controller()
+
+        admission = controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+
+        assert admission.tier == "full"
+        assert admission.overrides == {}
+        assert admission.waited_s == 0
+
+    def test_degrades_under_pressure(self):
+        """Test le passage à un niveau moins coûteux quand le budget est entamé."""
+        controller, _ = _controller()
+        full_cost = estimate_ors_calls("tolls", LONG_TRIP, TOLL_PARAMS)
+        controller.admit("tolls", LONG_TRIP, {"max_tolls": 2, "search": "beam", "beam_width": 10})
+
+        admission = controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+
+        assert admission.tier == "reduced"
+        assert admission.cost < full_cost
+
+    def test_degrades_greedy_search(self):
+        """Test qu'une recherche greedy est dégradée en évitement péage par péage."""
+        controller, clock = _controller()
+        greedy = {"max_tolls": 2, "search": "greedy", "beam_width": 1}
+        full_cost = estimate_ors_calls("budget", LONG_TRIP, greedy)
+        controller.admit("budget", LONG_TRIP, {**greedy, "search": "beam", "beam_width": 10})
+        clock.now += 2
+
+        admission = controller.admit("budget", LONG_TRIP, greedy)
+
+        # "reduced" (faisceau de largeur 1) coûte autant qu'une recherche greedy : ignoré
+        assert admission.tier == "minimal"
+        assert admission.overrides["search"] == "exhaustive"
+        assert admission.cost < full_cost
+        assert admission.waited_s == 0
+
+    def test_no_degradation_without_saving(self):
+        """Test qu'une requête dont aucun niveau n'est moins coûteux attend en qualité complète."""
+        controller, _ = _controller()
+        controller.admit("tolls", LONG_TRIP, {"max_tolls": 2, "search": "beam", "beam_width": 10})
+
+        admission = controller.admit("budget", SHORT_TRIP, {"search": "exhaustive"})
+
+        assert admission.tier == "full"
+        assert admission.overrides == {}
+
+    def test_queues_briefly_then_rejects(self):
+        """Test l'attente courte puis le refus avec délai de nouvel essai."""
+        controller, clock = _controller(budget=20, refill_per_s=5, max_wait_s=1)
+        controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+
+        queued = controller.admit("tolls", SHORT_TRIP, {"max_tolls": 0})
+        assert queued.waited_s > 0
+        assert clock.slept == [queued.waited_s]
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+        assert excinfo.value.retry_after == 2
+        assert controller.get_stats()["rejected"] == 1
+
+    def test_tokens_refill_over_time(self):
+        """Test que le budget se reconstitue avec le temps."""
+        controller, clock = _controller(budget=20, refill_per_s=5, max_wait_s=0)
+        controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+        with pytest.raises(AdmissionRejected):
+            controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+
+        clock.now += 4
+        assert controller.admit("tolls", LONG_TRIP, TOLL_PARAMS).tier == "full"
+
+    def test_oversized_request_capped_at_budget(self):
+        """Test qu'une requête plus coûteuse que le budget passe quand le seau est plein."""
+        controller, _ = _controller(budget=5)
+
+        admission = controller.admit("tolls", LONG_TRIP, TOLL_PARAMS)
+
+        assert admission.cost == 5
+        assert controller.get_stats()["tokens"] == 0
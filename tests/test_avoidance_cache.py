@@ -0,0 +1,57 @@
+"""
+Tests pour AvoidanceEquivalenceCache - Réponses sans appel ORS aux ensembles couverts.
+"""
+from src.services.toll.avoidance_cache import AvoidanceEquivalenceCache
+
+
+def _outcome(crossed, cost=0.0):
+    """Résultat d'évitement minimal."""
+    return {"crossed_ids": frozenset(crossed), "cost": cost}
+
+
+class TestAvoidanceEquivalenceCache:
+    """Tests pour le cache d'équivalence des évitements."""
+
+    def test_side_effect_covers_larger_sets(self):
+        """Test qu'éviter A en évitant aussi B et C répond à {A,B} et {A,C}."""
+        cache = AvoidanceEquivalenceCache()
+        outcome = _outcome({"D"})
+        cache.record(("A",), outcome)
+
+        assert cache.lookup(("A", "B")) is outcome
+        assert cache.lookup(("C", "A")) is outcome
+        assert cache.stats["hits"] == 2
+
+    def test_crossed_toll_is_not_covered(self):
+        """Test qu'un ensemble dont un péage reste traversé n'est pas couvert."""
+        cache = AvoidanceEquivalenceCache()
+        cache.record(("A",), _outcome({"B"}))
+
+        assert cache.lookup(("A", "B")) is None
+        assert cache.lookup(("B",)) is None
+        assert cache.stats["misses"] == 2
+
+    def test_base_route_answers_off_route_tolls(self):
+        """Test que la route de base répond à l'évitement de péages qu'elle ne traverse pas."""
+        cache = AvoidanceEquivalenceCache()
+        base = _outcome({"A", "B"}, cost=9.0)
+        cache.record((), base)
+
+        assert cache.lookup(("N1", "N2")) is base
+        assert cache.lookup(("A", "N1")) is None
+
+    def test_prefers_largest_covering_set(self):
+        """Test que l'ensemble connu le plus proche est retenu."""
+        cache = AvoidanceEquivalenceCache()
+        cache.record((), _outcome({"A"}))
+        closest = _outcome(set())
+        cache.record(("A",), closest)
+
+        assert cache.lookup(("A", "N1")) is closest
+
+    def test_failed_evaluation_not_recorded(self):
+        """Test qu'un échec d'évaluation n'est pas enregistré."""
+        cache = AvoidanceEquivalenceCache()
+        cache.record(("A",), None)
+
+        assert cache.stats["entries"] == 0
@@ -0,0 +1,93 @@
+"""
+Tests pour AvoidanceShapeLibrary - Formes d'évitement précalculées des péages.
+"""
+import json
+import math
+
+import pytest
+from shapely.geometry import Point, shape
+
+from src.utils.avoidance_shapes import AvoidanceShapeLibrary, build_shape, METERS_PER_DEGREE_LAT
+
+
+DIJON = {"id": "APRR_O001", "longitude": 5.04, "latitude": 47.32}
+BEAUNE = {"id": "APRR_F002", "longitude": 4.84, "latitude": 47.02}
+
+
+def _offset_east(toll, meters):
+    """Point situé `meters` mètres à l'est du péage."""
+    m_per_deg_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(toll["latitude"]))
+    return Point(toll["longitude"] + meters / m_per_deg_lon, toll["latitude"])
+
+
+class TestBuildShape:
+    """Tests pour la construction d'une forme."""
+
+    def test_low_vertex_shape(self):
+        """Test que la forme est un octogone."""
+        polygon = build_shape(DIJON["longitude"], DIJON["latitude"])
+        assert len(polygon.exterior.coords) == 9  # 8 sommets + fermeture
+
+    def test_radius_covered_east_west(self):
+        """Test que le rayon est couvert aussi d'est en ouest (correction de latitude)."""
+        polygon = build_shape(DIJON["longitude"], DIJON["latitude"], radius_m=200)
+        assert polygon.contains(_offset_east(DIJON, 190))
+        assert not polygon.contains(_offset_east(DIJON, 400))
+
+    def test_aligned_shape_wider_across_road(self):
+        """Test qu'une route nord-sud élargit la forme d'est en ouest."""
+        polygon = build_shape(DIJON["longitude"], DIJON["latitude"], radius_m=200, bearing_deg=0)
+        assert polygon.contains(_offset_east(DIJON, 280))
+
+
+class TestAvoidanceShapeLibrary:
+    """Tests pour la bibliothèque de formes."""
+
+    def test_preloaded_shape_is_reused(self):
+        """Test qu'une forme précalculée est servie telle quelle."""
+        library = AvoidanceShapeLibrary()
+        library.preload([DIJON])
+
+        assert library.shape(dict(DIJON)) is library.shape(dict(DIJON))
+        assert library.get_stats()["shapes"] == 1
+
+    def test_union_cached_independently_of_order(self):
+        """Test que l'union d'un même ensemble est servie depuis le cache."""
+        library = AvoidanceShapeLibrary()
+        first = library.multipolygon([DIJON, BEAUNE])
+        second = library.multipolygon([BEAUNE, DIJON])
+
+        assert first == second
+        stats = library.get_stats()
+        assert (stats["union_hits"], stats["union_misses"]) == (1, 1)
+
+    def test_geometry_covers_every_toll(self):
+        """Test que la géométrie GeoJSON couvre tous les péages."""
+        library = AvoidanceShapeLibrary()
+        geometry = shape(library.multipolygon([DIJON, BEAUNE]))
+
+        assert geometry.contains(Point(DIJON["longitude"], DIJON["latitude"]))
+        assert geometry.contains(Point(BEAUNE["longitude"], BEAUNE["latitude"]))
+
+    def test_payload_size_recorded(self):
+        """Test que la taille du payload est mesurée."""
+        library = AvoidanceShapeLibrary()
+        geometry = library.multipolygon([DIJON])
+
+        assert library.get_stats()["max_payload_bytes"] == len(json.dumps(geometry))
+
+    def test_avoidance_success_rate(self):
+        """Test le taux de succès de l'évitement."""
+        library = AvoidanceShapeLibrary()
+
+        assert library.record_avoidance([DIJON], [BEAUNE])
+        assert not library.record_avoidance([DIJON], [{"id": " aprr_o001 "}])
+        assert library.get_stats()["avoidance_success_rate"] == pytest.approx(0.5)
+
+    def test_alignment_can_be_disabled(self):
+        """Test que la direction de la route est ignorée si l'alignement est désactivé."""
+        library = AvoidanceShapeLibrary(align_to_road=False)
+        library.preload([DIJON])
+
+        aligned_toll = {**DIJON, "road_bearing": 10.0}
+        assert library.shape(aligned_toll) is library.shape(DIJON)
@@ -0,0 +1,136 @@
+"""
+Tests pour CandidateEvaluationEngine - Évaluation parallèle des candidats.
+"""
+import random
+import threading
+import time
+
+import pytest
+
+from src.services.common.candidate_evaluator import CandidateEvaluationEngine
+from src.services.common.progress_events import OptimizationCancelled
+
+
+def _sets(*groups):
+    """Construit des ensembles de péages à partir de listes d'IDs."""
+    return [tuple({"id": toll_id} for toll_id in group) for group in groups]
+
+
+class TestCandidateEvaluationEngine:
+    """Tests pour le moteur d'évaluation des ensembles à éviter."""
+
+    def test_merges_in_submission_order(self):
+        """Test fusion déterministe malgré des durées d'évaluation aléatoires."""
+        engine = CandidateEvaluationEngine(max_in_flight=4)
+        candidates = _sets(*[[f"T{i}"] for i in range(12)])
+        merged = []
+
+        def evaluate(avoid_set):
+            time.sleep(random.uniform(0, 0.01))
+            return avoid_set[0]["id"]
+
+        engine.run(candidates, evaluate, lambda avoid_set, outcome: merged.append(outcome))
+
+        assert merged == [f"T{i}" for i in range(12)]
+
+    def test_deduplicates_signatures_across_runs(self):
+        """Test déduplication par IDs triés, y compris entre deux phases."""
+        engine = CandidateEvaluationEngine(max_in_flight=2)
+        evaluated = []
+
+        def evaluate(avoid_set):
+            evaluated.append(CandidateEvaluationEngine.signature(avoid_set))
+
+        engine.run(_sets(["A", "B"], ["B", "A"], ["C"]), evaluate, lambda s, o: False)
+        engine.run(_sets(["C"], ["D"]), evaluate, lambda s, o: False)
+
+        assert sorted(evaluated) == [("A", "B"), ("C",), ("D",)]
+        assert engine.stats["duplicates"] == 2
+
+    def test_early_stop(self):
+        """Test arrêt anticipé demandé par la fusion."""
+        engine = CandidateEvaluationEngine(max_in_flight=1)
+        merged = []
+
+        def merge(avoid_set, outcome):
+            merged.append(outcome)
+            return outcome == 0
+
+        stopped = engine.run(_sets(["A"], ["B"], ["C"]), lambda s: {"A": 5, "B": 0, "C": 3}[s[0]["id"]], merge)
+
+        assert stopped is True
+        assert merged == [5, 0]
+        assert engine.stats["stopped_early"] is True
+
+    def test_failed_evaluation_merged_as_none(self):
+        """Test qu'une évaluation en erreur est fusionnée comme un échec."""
+        engine = CandidateEvaluationEngine(max_in_flight=2)
+        merged = []
+
+        def evaluate(avoid_set):
+            if avoid_set[0]["id"] == "B":
+                raise RuntimeError("ORS indisponible")
+            return avoid_set[0]["id"]
+
+        engine.run(_sets(["A"], ["B"], ["C"]), evaluate, lambda s, o: merged.append(o))
+
+        assert merged == ["A", None, "C"]
+        assert engine.stats["failed"] == 1
+
+    def test_candidates_pulled_lazily(self):
+        """Test qu'un générateur voit l'état fusionné avant de produire la suite."""
+        engine = CandidateEvaluationEngine(max_in_flight=1)
+        state = {"best": None}
+
+        def candidates():
+            for toll_id in ["A", "B", "C"]:
+                if state["best"] == "A":
+                    return
+                yield ({"id": toll_id},)
+
+        def merge(avoid_set, outcome):
+            state["best"] = outcome
+
+        engine.run(candidates(), lambda s: s[0]["id"], merge)
+
+        assert engine.stats["submitted"] == 1
+
+    def test_cancellation_is_not_a_candidate_failure(self):
+        """Test que l'abandon de la requête interrompt l'évaluation au lieu d'être fusionné."""
+        engine = CandidateEvaluationEngine(max_in_flight=2)
+        merged = []
+
+        def evaluate(avoid_set):
+            if avoid_set[0]["id"] == "B":
+                raise OptimizationCancelled()
+            return avoid_set[0]["id"]
+
+        with pytest.raises(OptimizationCancelled):
+            engine.run(_sets(["A"], ["B"], ["C"]), evaluate, lambda s, o: merged.append(o))
+
+        assert merged == ["A"]
+        assert engine.stats["failed"] == 0
+
+    def test_merge_error_cancels_queued_evaluations(self):
+        """Test qu'une erreur de fusion annule les évaluations encore en file."""
+        engine = CandidateEvaluationEngine(max_in_flight=20)
+        release = threading.Event()
+        started = []
+
+        def evaluate(avoid_set):
+            started.append(avoid_set[0]["id"])
+            if avoid_set[0]["id"] != "T0":
+                release.wait(1)
+            return avoid_set[0]["id"]
+
+        def merge(avoid_set, outcome):
+            raise RuntimeError("fusion impossible")
+
+        groups = [[f"T{i}"] for i in range(20)]
+        with pytest.raises(RuntimeError):
+            engine.run(_sets(*groups), evaluate, merge)
+        release.set()
+        time.sleep(0.1)
+
+        # Seules les évaluations déjà prises par le pool (8 threads) ont tourné
+        assert len(started) < 20
@@ -0,0 +1,109 @@
+"""
+Tests pour BranchAndBoundCombinationSearch - Élagage des ensembles de péages à éviter.
+"""
+from itertools import combinations
+
+from src.services.toll.combination_search import BranchAndBoundCombinationSearch
+
+
+BASE_TOLLS = {"A": 6.0, "B": 4.0, "C": 2.0, "D": 1.0}
+NEARBY_TOLLS = {"N": 3.0}
+
+
+def _tolls():
+    """Péages candidats triés par coût décroissant (sur la route et à proximité)."""
+    tolls = [{"id": k, "cost": v} for k, v in {**BASE_TOLLS, **NEARBY_TOLLS}.items()]
+    return sorted(tolls, key=lambda t: t["cost"], reverse=True)
+
+
+def _simulate(avoid_set, max_tolls, unavoidable=()):
+    """Route simulée : chaque péage évité disparaît (sauf inévitable) et ajoute 10 min."""
+    avoided = {t["id"] for t in avoid_set}
+    crossed = {toll_id for toll_id in BASE_TOLLS if toll_id not in avoided or toll_id in unavoidable}
+    cost = sum(BASE_TOLLS[toll_id] for toll_id in crossed)
+    satisfied = len(crossed) <= max_tolls and not (avoided & crossed)
+    return {
+        "route_data": {"cost": cost} if satisfied else None,
+        "crossed_ids": frozenset(crossed),
+        "satisfied": satisfied,
+        "cost": cost,
+        "duration": 3600 + 600 * len(avoided),
+        "toll_count": len(crossed),
+    }
+
+
+def _run(max_tolls, max_comb_size=3, unavoidable=()):
+    """Exécute la recherche séquentiellement : (recherche, ensembles évalués, résultats valides)."""
+    search = BranchAndBoundCombinationSearch(
+        _tolls(), list(BASE_TOLLS), sum(BASE_TOLLS.values()), 3600, len(BASE_TOLLS),
+        max_tolls, max_comb_size
+    )
+    evaluated, valid = [], []
+    for avoid_set in search.candidates():
+        outcome = _simulate(avoid_set, max_tolls, unavoidable)
+        search.record(avoid_set, outcome)
+        evaluated.append(frozenset(t["id"] for t in avoid_set))
+        if outcome["satisfied"]:
+            valid.append(outcome)
+    return search, evaluated, valid
+
+
+def _best(outcomes):
+    """Meilleurs critères (coût, nombre de péages, durée) parmi des résultats valides."""
+    return (min(o["cost"] for o in outcomes),
+            min(o["toll_count"] for o in outcomes),
+            min(o["duration"] for o in outcomes))
+
+
+class TestBranchAndBoundCombinationSearch:
+    """Tests pour la recherche branch-and-bound."""
+
+    def test_same_optimum_as_exhaustive_search(self):
+        """Test que l'élagage conserve les meilleurs critères de la recherche exhaustive."""
+        yielded, exhaustive_count = 0, 0
+        for max_tolls in (1, 2, 3):
+            exhaustive = [
+                _simulate(avoid_set, max_tolls)
+                for k in range(1, 4) for avoid_set in combinations(_tolls(), k)
+            ]
+            search, _, valid = _run(max_tolls)
+
+            assert _best(valid) == _best([o for o in exhaustive if o["satisfied"]])
+            yielded += search.stats["yielded"]
+            exhaustive_count += len(exhaustive)
+
+        assert yielded < exhaustive_count
+
+    def test_unavoidable_toll_prunes_supersets(self):
+        """Test qu'un péage resté sur la route n'est plus jamais évité ensuite."""
+        search, evaluated, _ = _run(max_tolls=1, unavoidable={"A"})
+
+        assert [ids for ids in evaluated if "A" in ids] == [frozenset({"A"})]
+        assert search.stats["pruned_unavoidable"] > 0
+
+    def test_superset_without_route_tolls_is_dominated(self):
+        """Test qu'éviter en plus un péage absent de la route valide est inutile."""
+        # {A} satisfait déjà la contrainte ; {A, N} n'y retire rien
+        search, evaluated, _ = _run(max_tolls=3, max_comb_size=2)
+
+        assert frozenset({"A", "N"}) not in evaluated
+        assert search.stats["pruned_dominated"] > 0
+
+    def test_no_bound_pruning_before_valid_route(self):
+        """Test qu'aucun sous-arbre n'est abandonné tant qu'aucune route n'est valide."""
+        search = BranchAndBoundCombinationSearch(_tolls(), list(BASE_TOLLS), 13.0, 3600, 4, 0, 2)
+
+        candidates = list(search.candidates())
+
+        assert len(candidates) == 5 + 10
+        assert search.stats["pruned_bound"] == 0
+
+    def test_failed_evaluation_is_ignored(self):
+        """Test qu'un échec ORS n'alimente pas les élagages."""
+        search = BranchAndBoundCombinationSearch(_tolls(), list(BASE_TOLLS), 13.0, 3600, 4, 1, 1)
+        first = next(search.candidates())
+
+        search.record(first, None)
+
+        assert search.unavoidable_ids == set()
+        assert search.best_duration == float('inf')
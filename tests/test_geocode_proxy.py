@@ -0,0 +1,161 @@
+"""
+Tests pour GeocodeProxy - Cache et partage de préfixes devant le géocodage ORS.
+
+Le service externe est remplacé par un serveur HTTP local.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import requests
+
+from src.services.geocode_proxy import GeocodeProxy, normalize_text
+
+
+PLACES = ["Paris, France", "Parempuyre, France", "Pau, France", "Strasbourg, France",
+          "Saint-Étienne, France", "Saint-Malo, France"]
+
+
+class StandIn:
+    """Serveur de géocodage local : filtre PLACES par mot préfixe et compte les appels."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                stand_in.calls.append((urlparse(self.path).path, query["text"][0]))
+                time.sleep(stand_in.delay)
+                if query.get("api_key") != ["key"]:
+                    self.send_response(403)
+                    self.end_headers()
+                    return
+                tokens = normalize_text(query["text"][0]).replace("-", " ").replace(",", " ").split()
+                labels = [p for p in PLACES if all(
+                    any(w.startswith(t) for w in normalize_text(p).replace("-", " ").replace(",", " ").split())
+                    for t in tokens)]
+                size = int(query.get("size", ["10"])[0])
+                body = json.dumps({"type": "FeatureCollection", "features": [
+                    {"type": "Feature", "properties": {"label": label}} for label in labels[:size]
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    yield server
+    server.close()
+
+
+def _labels(data):
+    return [f["properties"]["label"] for f in data["features"]]
+
+
+class TestGeocodeProxy:
+    """Tests pour le proxy de géocodage."""
+
+    def test_normalize_text(self):
+        """Test la normalisation (casse, accents, espaces)."""
+        assert normalize_text("  Saint-ÉTIENNE   ") == "saint-etienne"
+
+    def test_exact_cache_hit(self, stand_in):
+        """Test qu'une requête répétée (casse ou espaces différents) est servie par le cache."""
+        proxy = GeocodeProxy(base_url=stand_in.url)
+
+        first, first_hit = proxy.get("search", "Strasbourg", "key")
+        second, second_hit = proxy.get("search", "  strasbourg ", "key")
+
+        assert (first_hit, second_hit) == (False, True)
+        assert second == first
+        assert len(stand_in.calls) == 1
+
+    def test_longer_query_from_complete_prefix(self, stand_in):
+        """Test que la saisie lettre par lettre est servie depuis le préfixe en cache."""
+        proxy = GeocodeProxy(base_url=stand_in.url)
+        proxy.get("autocomplete", "Par", "key")
+
+        data, hit = proxy.get("autocomplete", "Pari", "key")
+
+        assert hit is True
+        assert _labels(data) == ["Paris, France"]
+        assert len(stand_in.calls) == 1
+        assert proxy.get_stats()["prefix_hits"] == 1
+
+    def test_truncated_prefix_not_reused(self, stand_in):
+        """Test qu'une réponse tronquée (taille atteinte) ne sert pas aux requêtes plus longues."""
+        proxy = GeocodeProxy(base_url=stand_in.url, size=2)
+        proxy.get("autocomplete", "Par", "key")
+
+        _, hit = proxy.get("autocomplete", "Parem", "key")
+
+        assert hit is False
+        assert len(stand_in.calls) == 2
+
+    def test_prefix_is_per_endpoint(self, stand_in):
+        """Test que search et autocomplete ont des caches distincts."""
+        proxy = GeocodeProxy(base_url=stand_in.url)
+        proxy.get("autocomplete", "Saint", "key")
+
+        _, hit = proxy.get("search", "Saint-Malo", "key")
+
+        assert hit is False
+
+    def test_single_flight(self):
+        """Test que des requêtes identiques simultanées partagent un seul appel."""
+        server = StandIn(delay=0.2)
+        try:
+            proxy = GeocodeProxy(base_url=server.url)
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(proxy.get("search", "Pau", "key")))
+                       for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+            assert len(server.calls) == 1
+            assert len(results) == 5
+            assert sum(1 for _, hit in results if not hit) == 1
+            assert proxy.get_stats()["coalesced"] == 4
+        finally:
+            server.close()
+
+    def test_errors_not_cached(self, stand_in):
+        """Test qu'une erreur du service est propagée et non mise en cache."""
+        proxy = GeocodeProxy(base_url=stand_in.url)
+
+        with pytest.raises(requests.HTTPError):
+            proxy.get("search", "Pau", "wrong")
+        _, hit = proxy.get("search", "Pau", "key")
+
+        assert hit is False
+        assert len(stand_in.calls) == 2
+
+    def test_ttl_expiry(self, stand_in):
+        """Test qu'une réponse expirée est redemandée au service."""
+        proxy = GeocodeProxy(base_url=stand_in.url, ttl_seconds=0)
+        proxy.get("search", "Pau", "key")
+        proxy.get("search", "Pau", "key")
+
+        assert len(stand_in.calls) == 2
@@ -0,0 +1,110 @@
+"""
+Tests pour IterativeAvoidanceSearch - Modes de recherche "greedy" et "beam".
+"""
+import pytest
+
+from src.services.common.iterative_avoidance import IterativeAvoidanceSearch, resolve_search_mode
+from src.services.common.candidate_evaluator import CandidateEvaluationEngine
+
+
+TOLLS = {
+    "A": {"id": "A", "cost": 5.0},
+    "B": {"id": "B", "cost": 3.0},
+    "C": {"id": "C", "cost": 1.0},
+}
+
+
+def _outcome(crossed):
+    """Résultat minimal : péages encore traversés et coût total."""
+    tolls = [TOLLS[i] for i in crossed]
+    return {"crossed_tolls": tolls, "cost": sum(t["cost"] for t in tolls), "toll_count": len(tolls)}
+
+
+def _evaluate(avoid_set):
+    """Éviter un péage le retire de la route sans effet de bord."""
+    avoided = {t["id"] for t in avoid_set}
+    return _outcome([i for i in TOLLS if i not in avoided])
+
+
+def _engine():
+    return CandidateEvaluationEngine(max_in_flight=1)
+
+
+class TestResolveSearchMode:
+    """Tests pour la validation du mode de recherche."""
+
+    def test_default_mode(self):
+        """Test que le mode par défaut est exhaustif."""
+        assert resolve_search_mode() == ("exhaustive", 3)
+
+    def test_greedy_forces_width_one(self):
+        """Test que greedy est un faisceau de largeur 1."""
+        assert resolve_search_mode("Greedy", 5) == ("greedy", 1)
+
+    def test_beam_width(self):
+        """Test que la largeur du faisceau est respectée."""
+        assert resolve_search_mode("beam", 2) == ("beam", 2)
+
+    def test_invalid_values(self):
+        """Test que les valeurs invalides lèvent ValueError."""
+        with pytest.raises(ValueError):
+            resolve_search_mode("random")
+        with pytest.raises(ValueError):
+            resolve_search_mode("beam", 0)
+
+    def test_non_string_values(self):
+        """Test que les types JSON inattendus lèvent ValueError (400) et non AttributeError."""
+        for search in (5, True, ["beam"], {"mode": "beam"}):
+            with pytest.raises(ValueError):
+                resolve_search_mode(search)
+        for width in (True, [2], 2.5, "deux"):
+            with pytest.raises(ValueError):
+                resolve_search_mode("beam", width)
+
+
+class TestIterativeAvoidanceSearch:
+    """Tests pour la recherche itérative."""
+
+    def test_greedy_avoids_most_expensive_first(self):
+        """Test que greedy évite le péage le plus cher à chaque itération."""
+        search = IterativeAvoidanceSearch(beam_width=1, engine=_engine())
+        merged = []
+
+        search.run(_outcome(TOLLS), _evaluate, lambda s, o: merged.append(tuple(t["id"] for t in s)),
+                   is_goal=lambda o: o["toll_count"] <= 1, rank=lambda o: o["cost"])
+
+        assert merged == [("A",), ("A", "B")]
+        assert search.stats == {"iterations": 2, "evaluated": 2}
+
+    def test_beam_keeps_several_states(self):
+        """Test que le faisceau développe plusieurs états par itération."""
+        search = IterativeAvoidanceSearch(beam_width=2, engine=_engine())
+        merged = []
+
+        search.run(_outcome(TOLLS), _evaluate, lambda s, o: merged.append(tuple(t["id"] for t in s)),
+                   is_goal=lambda o: o["toll_count"] <= 1, rank=lambda o: o["cost"])
+
+        # {B, A} est déjà évalué via {A, B} : dédupliqué par le moteur
+        assert merged == [("A",), ("B",), ("A", "B"), ("A", "C"), ("B", "C")]
+        assert search.stats["iterations"] == 2
+
+    def test_base_route_satisfying_goal(self):
+        """Test qu'aucun appel n'est fait si la route de base respecte déjà la contrainte."""
+        search = IterativeAvoidanceSearch(beam_width=1, engine=_engine())
+        calls = []
+
+        stopped = search.run(_outcome(TOLLS), lambda s: calls.append(s), lambda s, o: False,
+                             is_goal=lambda o: True, rank=lambda o: o["cost"])
+
+        assert not stopped
+        assert calls == []
+
+    def test_early_stop(self):
+        """Test que merge peut interrompre la recherche."""
+        search = IterativeAvoidanceSearch(beam_width=1, engine=_engine())
+
+        stopped = search.run(_outcome(TOLLS), _evaluate, lambda s, o: True,
+                             is_goal=lambda o: False, rank=lambda o: o["cost"])
+
+        assert stopped
+        assert search.stats["iterations"] == 1
@@ -0,0 +1,133 @@
+"""
+Tests pour JobManager - Exécution asynchrone des optimisations.
+"""
+import threading
+
+import pytest
+
+from src.services.job_manager import JobManager, JobQueue, JobQueueFullError, InMemoryJobStore
+from src.services.common.progress_events import emit_progress, count_progress
+
+
+class ImmediateJobQueue(JobQueue):
+    """File exécutant les jobs immédiatement (tests déterministes)."""
+
+    def submit(self, fn):
+        fn()
+
+
+class HeldJobQueue(JobQueue):
+    """File qui conserve les jobs sans les exécuter."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn):
+        self.pending.append(fn)
+
+
+class NoCopyJobStore(InMemoryJobStore):
+    """Stockage qui interdit la copie de tous les jobs."""
+
+    def all(self):
+        raise AssertionError("copie complète des jobs")
+
+
+class TestJobManager:
+    """Tests pour le gestionnaire de jobs."""
+
+    def test_job_completes_with_progress(self):
+        """Test qu'un job terminé expose son résultat et sa progression."""
+        def compute():
+            emit_progress("base", route={"cost": 9.0, "duration": 100, "toll_count": 3})
+            count_progress("ors_calls", 2)
+            count_progress("combinations_tested")
+            emit_progress("improvement", criteria=["cheapest"], route={"cost": 4.0, "duration": 150, "toll_count": 2})
+            return {"status": "OK"}
+
+        manager = JobManager(queue=ImmediateJobQueue())
+        job = manager.get(manager.submit("tolls", compute))
+
+        assert job["status"] == "done"
+        assert job["result"] == {"status": "OK"}
+        assert job["progress"]["ors_calls"] == 2
+        assert job["progress"]["combinations_tested"] == 1
+        assert job["progress"]["best"]["base"]["cost"] == 9.0
+        assert job["progress"]["best"]["cheapest"] == {"cost": 4.0, "duration": 150, "toll_count": 2}
+
+    def test_job_failure(self):
+        """Test qu'une exception marque le job en échec."""
+        def compute():
+            raise RuntimeError("ORS indisponible")
+
+        manager = JobManager(queue=ImmediateJobQueue())
+        job = manager.get(manager.submit("budget", compute))
+
+        assert job["status"] == "failed"
+        assert job["error"] == "ORS indisponible"
+
+    def test_queued_job(self):
+        """Test qu'un job non démarré est en attente."""
+        queue = HeldJobQueue()
+        manager = JobManager(queue=queue)
+        job_id = manager.submit("tolls", lambda: {"status": "OK"})
+
+        assert manager.get(job_id)["status"] == "queued"
+        queue.pending[0]()
+        assert manager.get(job_id)["status"] == "done"
+
+    def test_max_pending(self):
+        """Test que les jobs sont refusés au-delà de la limite."""
+        manager = JobManager(queue=HeldJobQueue(), max_pending=1)
+        manager.submit("tolls", lambda: None)
+
+        with pytest.raises(JobQueueFullError):
+            manager.submit("tolls", lambda: None)
+
+    def test_finished_jobs_expire(self):
+        """Test que les jobs terminés expirent après le TTL."""
+        manager = JobManager(queue=ImmediateJobQueue(), ttl_s=-1)
+        job_id = manager.submit("tolls", lambda: {"status": "OK"})
+
+        assert manager.get(job_id) is None
+
+    def test_expired_jobs_purged_on_submit(self):
+        """Test que les jobs expirés sont supprimés du stockage à la soumission suivante."""
+        store = InMemoryJobStore()
+        manager = JobManager(store=store, queue=ImmediateJobQueue(), ttl_s=-1)
+        first = manager.submit("tolls", lambda: {"status": "OK"})
+        assert store.get(first) is not None
+
+        second = manager.submit("tolls", lambda: {"status": "OK"})
+        assert store.get(first) is None
+        assert store.get(second) is not None
+
+    def test_get_and_submit_do_not_copy_all_jobs(self):
+        """Test que la consultation et la purge ne copient pas tous les jobs (ni leurs résultats)."""
+        manager = JobManager(store=NoCopyJobStore(), queue=ImmediateJobQueue())
+        job_id = manager.submit("tolls", lambda: {"status": "OK"})
+        manager.submit("tolls", lambda: {"status": "OK"})
+
+        assert manager.get(job_id)["status"] == "done"
+
+    def test_max_pending_under_concurrent_submits(self):
+        """Test que des soumissions simultanées ne dépassent pas la limite."""
+        manager = JobManager(queue=HeldJobQueue(), max_pending=5)
+        accepted, rejected = [], []
+        barrier = threading.Barrier(20)
+
+        def submit():
+            barrier.wait()
+            try:
+                accepted.append(manager.submit("tolls", lambda: None))
+            except JobQueueFullError:
+                rejected.append(1)
+
+        threads = [threading.Thread(target=submit) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(accepted) == 5
+        assert len(rejected) == 15
@@ -0,0 +1,92 @@
+"""
+Tests du mémo ORS par requête (MemoizedORSService).
+"""
+
+import threading
+import time
+
+from src.services.memoized_ors_service import MemoizedORSService
+
+
+class SlowORS:
+    """Service ORS factice : compte les appels, répond après un délai."""
+
+    base_url = "http://ors.test"
+    directions_url = "http://ors.test/v2/directions/driving-car/geojson"
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def test_all_set(self):
+        return True
+
+    def call_ors(self, payload):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"features": [], "payload": payload}
+
+
+class TestMemoizedORSService:
+    def test_identical_payloads_hit_ors_once(self):
+        """Un payload déjà vu est servi par le mémo."""
+        ors = SlowORS()
+        memo = MemoizedORSService(ors)
+        first = memo.call_ors({"coordinates": [[1, 2], [3, 4]]})
+        second = memo.call_ors({"coordinates": [[1, 2], [3, 4]]})
+        assert first is second
+        assert ors.calls == 1
+        assert (memo.hits, memo.misses) == (1, 1)
+
+    def test_concurrent_identical_payloads_are_coalesced(self):
+        """Des appels simultanés avec le même payload attendent le premier."""
+        ors = SlowORS(delay=0.2)
+        memo = MemoizedORSService(ors)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(memo.call_ors({"a": 1})))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert ors.calls == 1
+        assert len(results) == 5 and all(r is results[0] for r in results)
+        assert (memo.hits, memo.misses) == (4, 1)
+
+    def test_error_is_propagated_and_not_memoized(self):
+        """Une erreur atteint les appels en attente et n'est pas conservée."""
+        ors = SlowORS(delay=0.1, error=RuntimeError("ORS indisponible"))
+        memo = MemoizedORSService(ors)
+        errors = []
+
+        def call():
+            try:
+                memo.call_ors({"a": 1})
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 3 and ors.calls == 1
+
+        ors.error = None
+        assert memo.call_ors({"a": 1})["payload"] == {"a": 1}
+        assert ors.calls == 2
+
+    def test_configuration_is_delegated(self):
+        """URL et vérification de configuration sont celles du service enveloppé."""
+        ors = SlowORS()
+        memo = MemoizedORSService(ors)
+        assert memo.base_url == ors.base_url
+        assert memo.directions_url == ors.directions_url
+        assert memo.test_all_set() is True
+        ors.base_url = "http://autre.test"
+        assert memo.base_url == "http://autre.test"
@@ -0,0 +1,97 @@
+"""
+Tests pour metrics_exporter - Exposition OpenMetrics des compteurs du tracker.
+"""
+import pytest
+
+from benchmark.performance_tracker import PerformanceTracker
+from src.services.metrics_exporter import HttpMetrics, parse_ors_call, render_metrics, result_outcome
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return PerformanceTracker(log_dir=str(tmp_path), mode="light")
+
+
+def _samples(text):
+    """{nom{labels}: valeur} des lignes d'échantillons."""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+class TestMetricsExporter:
+    """Tests pour le rendu des métriques."""
+
+    def test_parse_ors_call(self):
+        """Test la décomposition des noms produits par OperationTracker.count_ors_call."""
+        assert parse_ors_call("ORS_base_route_toll") == ("base_route", "toll")
+        assert parse_ors_call("ORS_avoid_tollways_budget") == ("avoid_tollways", "budget")
+        assert parse_ors_call("ORS_alternative_route") == ("alternative_route", "global")
+        assert parse_ors_call("geocode") is None
+
+    def test_result_outcome(self):
+        """Test la classification des statuts de résultat."""
+        assert result_outcome("CRITICAL_ERROR") == "error"
+        assert result_outcome("FALLBACK_BASE_ROUTE_USED") == "fallback"
+        assert result_outcome("MULTI_TOLL_SUCCESS") == "success"
+
+    def test_sessions_aggregated(self, tracker):
+        """Test que les sessions terminées sont cumulées (latences, appels, statuts)."""
+        for status in ("MULTI_TOLL_SUCCESS", "FALLBACK_BASE_ROUTE_USED"):
+            tracker.start_optimization_session("a", "b")
+            with tracker.measure_operation("ORS_base_route"):
+                tracker.count_api_call("ORS_base_route_toll")
+            tracker.end_optimization_session({"status": status})
+
+        samples = _samples(render_metrics(tracker.metrics_snapshot(), HttpMetrics().snapshot()))
+
+        assert samples['sam_operation_duration_seconds_count{operation="ORS_base_route"}'] == 2
+        assert samples['sam_operation_duration_seconds_bucket{operation="ORS_base_route",le="+Inf"}'] == 2
+        assert samples['sam_ors_calls_total{type="base_route",context="toll"}'] == 2
+        assert samples['sam_optimization_results_total{status="FALLBACK_BASE_ROUTE_USED",outcome="fallback"}'] == 1
+        assert samples["sam_optimizations_in_flight"] == 0
+
+    def test_buckets_cumulative(self, tracker):
+        """Test que les buckets sont cumulés et bornés par le total."""
+        for _ in range(3):
+            with tracker.measure_operation("op"):
+                pass
+
+        samples = _samples(render_metrics(tracker.metrics_snapshot(), HttpMetrics().snapshot()))
+        buckets = [v for k, v in samples.items() if k.startswith('sam_operation_duration_seconds_bucket{operation="op"')]
+
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == 3
+
+    def test_component_stats(self, tracker):
+        """Test l'export des taux de succès des caches et de l'occupation ORS."""
+        tracker.register_stats_provider("route_result_cache", lambda: {"hit_ratio": 0.25, "entries": 3})
+        tracker.register_stats_provider("ors_scheduler", lambda: {"running": 2, "waiting": 5, "max_concurrency": 8,
+                                                                  "avg_wait_s": {"high": 0.5}})
+
+        samples = _samples(render_metrics(tracker.metrics_snapshot(), HttpMetrics().snapshot()))
+
+        assert samples['sam_cache_hit_ratio{cache="route_result_cache"}'] == 0.25
+        assert samples['sam_ors_concurrency{state="waiting"}'] == 5
+        assert samples["sam_ors_concurrency_limit"] == 8
+        assert samples['sam_component_stat{component="ors_scheduler",stat="avg_wait_s.high"}'] == 0.5
+
+    def test_recorded_values(self, tracker):
+        """Test l'export des valeurs enregistrées (résumé avec quantiles)."""
+        tracker.start_optimization_session("a", "b")
+        tracker.record_values("ors_network", {"download_us": 1500, "response_bytes": 4096})
+        tracker.end_optimization_session()
+
+        samples = _samples(render_metrics(tracker.metrics_snapshot(), HttpMetrics().snapshot()))
+
+        assert samples['sam_recorded_value_count{group="ors_network",name="download_us"}'] == 1
+        assert samples['sam_recorded_value_sum{group="ors_network",name="response_bytes"}'] == 4096
+        assert samples['sam_recorded_value{group="ors_network",name="response_bytes",quantile="0.5"}'] == 4096
+
+    def test_label_escaping(self, tracker):
+        """Test l'échappement des valeurs de labels."""
+        http = HttpMetrics()
+        http.record_response('/a"b', "GET", 200)
+
+        text = render_metrics(tracker.metrics_snapshot(), http.snapshot())
+
+        assert 'endpoint="/a\\"b"' in text
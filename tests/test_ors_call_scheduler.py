@@ -0,0 +1,135 @@
+"""
+Tests pour ORSCallScheduler - Ordonnancement des appels ORS entre requêtes.
+"""
+import contextvars
+import threading
+import time
+
+from src.services.ors_call_scheduler import ORSCallScheduler
+from src.services.common.route_context import route_context
+
+
+BASE = {"coordinates": [[7.0, 48.0], [7.2, 48.1]]}
+AVOID_TOLLWAYS = {"coordinates": [[7.0, 48.0], [7.2, 48.1]], "options": {"avoid_features": ["tollways"]}}
+PROBE = {"coordinates": [[7.0, 48.0], [7.2, 48.1]], "options": {"avoid_polygons": {"type": "Polygon"}}}
+
+
+def _request_context(coordinates):
+    """Contexte d'exécution d'une requête (RouteContext partagé par ses threads)."""
+    with route_context(coordinates):
+        return contextvars.copy_context()
+
+
+class _Harness:
+    """Occupe l'unique place de l'ordonnanceur puis enregistre l'ordre de passage."""
+
+    def __init__(self):
+        self.scheduler = ORSCallScheduler(max_concurrency=1)
+        self.order = []
+        self.threads = []
+        self._release = threading.Event()
+        self._hold = self._start(BASE, "blocker", lambda: self._release.wait(5))
+        self._wait_for(lambda: self.scheduler.get_stats()["running"] == 1)
+
+    def _start(self, payload, label, body=None, context=None):
+        def call():
+            if body:
+                body()
+            self.order.append(label)
+        run = lambda: self.scheduler.run(payload, call)
+        thread = threading.Thread(target=(lambda: context.copy().run(run)) if context else run)
+        thread.start()
+        self.threads.append(thread)
+        return thread
+
+    def enqueue(self, payload, label, context=None):
+        """Ajoute un appel et attend qu'il soit en file."""
+        waiting = self.scheduler.get_stats()["waiting"]
+        self._start(payload, label, context=context)
+        self._wait_for(lambda: self.scheduler.get_stats()["waiting"] == waiting + 1)
+
+    def drain(self):
+        """Libère la place et attend la fin de tous les appels."""
+        self._release.set()
+        for thread in self.threads:
+            thread.join(5)
+        return self.order[1:]
+
+    @staticmethod
+    def _wait_for(condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+
+
+class TestORSCallScheduler:
+    """Tests pour l'ordonnanceur des appels ORS."""
+
+    def test_runs_immediately_when_idle(self):
+        """Test qu'un appel part sans attente quand une place est libre."""
+        scheduler = ORSCallScheduler(max_concurrency=2)
+
+        assert scheduler.run(BASE, lambda: "ok") == "ok"
+        stats = scheduler.get_stats()
+        assert stats["calls"] == 1
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+
+    def test_concurrency_cap(self):
+        """Test que le nombre d'appels simultanés ne dépasse pas le plafond."""
+        scheduler = ORSCallScheduler(max_concurrency=3)
+        lock = threading.Lock()
+        current, peak = [0], [0]
+
+        def call():
+            with lock:
+                current[0] += 1
+                peak[0] = max(peak[0], current[0])
+            time.sleep(0.01)
+            with lock:
+                current[0] -= 1
+
+        threads = [threading.Thread(target=scheduler.run, args=(PROBE, call)) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert peak[0] <= 3
+        assert scheduler.get_stats()["calls"] == 12
+
+    def test_priority_order(self):
+        """Test que les routes de base passent avant l'évitement et les sondes."""
+        harness = _Harness()
+        harness.enqueue(PROBE, "probe")
+        harness.enqueue(AVOID_TOLLWAYS, "avoid_tollways")
+        harness.enqueue(BASE, "base")
+
+        assert harness.drain() == ["base", "avoid_tollways", "probe"]
+
+    def test_round_robin_between_requests(self):
+        """Test qu'une requête avec beaucoup de sondes n'affame pas les autres."""
+        big = _request_context([[7.0, 48.0], [4.8, 45.7]])
+        small = _request_context([[2.3, 48.8], [2.4, 48.9]])
+        harness = _Harness()
+        for i in range(3):
+            harness.enqueue(PROBE, f"big{i}", context=big)
+        harness.enqueue(PROBE, "small", context=small)
+
+        assert harness.drain() == ["big0", "small", "big1", "big2"]
+
+    def test_slot_released_on_error(self):
+        """Test que la place est libérée si l'appel lève une exception."""
+        scheduler = ORSCallScheduler(max_concurrency=1)
+
+        def failing():
+            raise RuntimeError("ORS indisponible")
+
+        try:
+            scheduler.run(BASE, failing)
+        except RuntimeError:
+            pass
+
+        assert scheduler.get_stats()["running"] == 0
+        assert scheduler.run(BASE, lambda: "ok") == "ok"
@@ -0,0 +1,108 @@
+"""
+Tests pour ORSLatencyModel - Timeouts ORS appris des latences observées.
+"""
+import pytest
+import requests
+from unittest.mock import patch
+
+from src.services.ors_latency_model import ORSLatencyModel, LatencyHistogram
+from src.services.ors_config_manager import ORSConfigManager
+
+
+SHORT = {"coordinates": [[7.0, 48.0], [7.2, 48.1]]}
+LONG = {"coordinates": [[7.75, 48.57], [4.84, 45.76]]}
+AVOID = {"coordinates": [[7.0, 48.0], [7.2, 48.1]],
+         "options": {"avoid_polygons": {"type": "MultiPolygon", "coordinates": [[[]], [[]], [[]]]}}}
+
+
+def _model(**kwargs):
+    return ORSLatencyModel(min_samples=5, **kwargs)
+
+
+class TestLatencyHistogram:
+    """Tests pour l'histogramme de latences."""
+
+    def test_percentile_upper_bound(self):
+        """Test que le quantile est estimé par excès (borne haute de classe)."""
+        histogram = LatencyHistogram()
+        for seconds in [0.2] * 99 + [4.0]:
+            histogram.add(seconds)
+
+        assert 0.2 <= histogram.percentile(0.5) < 0.3
+        assert histogram.percentile(0.995) >= 4.0
+
+    def test_old_samples_fade(self):
+        """Test que les anciens échantillons sont progressivement oubliés."""
+        histogram = LatencyHistogram(window=10)
+        for _ in range(50):
+            histogram.add(1.0)
+
+        assert histogram.total <= 10
+
+
+class TestORSLatencyModel:
+    """Tests pour le calcul des timeouts."""
+
+    def test_static_timeout_without_history(self):
+        """Test que le timeout statique est utilisé sans historique."""
+        assert _model().timeout_for(SHORT, 10) == 10
+
+    def test_learned_timeout_from_high_percentile(self):
+        """Test que le timeout suit le quantile élevé avec la marge."""
+        model = _model(percentile=0.99, margin=2.0, floor_s=0.1)
+        for _ in range(10):
+            model.observe(SHORT, 1.0)
+
+        timeout = model.timeout_for(SHORT, 10)
+        assert 2.0 <= timeout < 2.6
+
+    def test_floor_and_ceiling(self):
+        """Test les bornes plancher et plafond."""
+        fast, slow = _model(floor_s=3, ceiling_s=60), _model(floor_s=3, ceiling_s=60)
+        for _ in range(10):
+            fast.observe(SHORT, 0.05)
+            slow.observe(SHORT, 100.0)
+
+        assert fast.timeout_for(SHORT, 10) == 3
+        assert slow.timeout_for(SHORT, 10) == 60
+
+    def test_groups_by_polygons_and_length(self):
+        """Test que les requêtes sont regroupées par opération, polygones et longueur."""
+        assert ORSLatencyModel.request_key(SHORT) == ("ORS_base_route", 0, 0)
+        assert ORSLatencyModel.request_key(LONG) == ("ORS_base_route", 0, 200)
+        assert ORSLatencyModel.request_key(AVOID) == ("ORS_alternative_route", 2, 0)
+
+    def test_operation_group_used_for_unseen_bucket(self):
+        """Test qu'un groupe sans historique se rabat sur celui de son opération."""
+        model = _model(floor_s=0.1, margin=1.0)
+        for _ in range(10):
+            model.observe(SHORT, 8.0)
+
+        assert model.timeout_for(LONG, 10) >= 8.0
+        assert model.timeout_for(AVOID, 10) == 10
+
+    def test_timeouts_only_lengthen(self):
+        """Test qu'un appel interrompu compte à la durée du timeout."""
+        model = _model(floor_s=0.1, margin=1.0)
+        for _ in range(10):
+            model.observe(SHORT, 12.0, timed_out=True)
+
+        assert model.timeout_for(SHORT, 10) >= 12.0
+        assert model.get_stats()["timeouts"] == 10
+
+
+@patch("src.services.ors_service.ors_http_session.post")
+def test_call_ors_feeds_latency_model(mock_post, monkeypatch):
+    """Test qu'un timeout ORS est enregistré comme échantillon censuré."""
+    from src.services import ors_service as module
+
+    monkeypatch.setenv("ORS_BASE_URL", "http://localhost:8082/ors")
+    model = _model()
+    monkeypatch.setattr(module, "ors_latency_model", model)
+    mock_post.side_effect = requests.exceptions.Timeout()
+
+    with pytest.raises(requests.exceptions.Timeout):
+        module.ORSService().call_ors(dict(SHORT))
+
+    assert model.get_stats()["timeouts"] == 1
+    assert mock_post.call_args.kwargs["timeout"] == ORSConfigManager.calculate_timeout(SHORT)
@@ -1,6 +1,12 @@
+import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import time
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
+from benchmark.performance_tracker import PerformanceTracker
 from src.services.ors_service import ORSService
 
 def test_test_all_set_env(monkeypatch):
@@ -37,7 +43,7 @@ def test_get_route_error(mock_get, monkeypatch):
     assert "error" in result
     assert "Connection error" in result["error"]
 
-@patch("src.services.ors_service.requests.post")
+@patch("src.services.ors_service.ors_http_session.post")
 def test_call_ors_success(mock_post, monkeypatch):
     """Test appel ORS personnalisé réussi."""
     monkeypatch.setenv("ORS_BASE_URL", "http://localhost:8082/ors")
@@ -61,7 +67,7 @@ def test_call_ors_success(mock_post, monkeypatch):
     assert kwargs["json"] == payload
     assert kwargs["timeout"] >= 10  # Timeout par défaut
 
-@patch("src.services.ors_service.requests.post")
+@patch("src.services.ors_service.ors_http_session.post")
 def test_get_base_route_success(mock_post, monkeypatch):
     """Test récupération route de base."""
     monkeypatch.setenv("ORS_BASE_URL", "http://localhost:8082/ors")
@@ -82,7 +88,7 @@ def test_get_base_route_success(mock_post, monkeypatch):
     payload = call_args[1]["json"]
     assert "tollways" in payload["extra_info"]
 
-@patch("src.services.ors_service.requests.post")
+@patch("src.services.ors_service.ors_http_session.post")
 def test_get_route_avoid_tollways_success(mock_post, monkeypatch):
     """Test récupération route évitant les péages."""
     monkeypatch.setenv("ORS_BASE_URL", "http://localhost:8082/ors")
@@ -102,4 +108,105 @@ def test_get_route_avoid_tollways_success(mock_post, monkeypatch):
     call_args = mock_post.call_args
     payload = call_args[1]["json"]
     assert "avoid_features" in payload["options"]
-    assert "tollways" in payload["options"]["avoid_features"]
\ No newline at end of file
+    assert "tollways" in payload["options"]["avoid_features"]
+
+@pytest.fixture
+def ors_stand_in():
+    """Serveur ORS local : renvoie un GeoJSON d'environ 200 Ko."""
+    body = json.dumps({"features": [{"geometry": {"coordinates": [[7.0, 48.0]] * 10000}}]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ors", len(body)
+    server.shutdown()
+    server.server_close()
+
+
+def test_call_ors_network_breakdown(ors_stand_in, monkeypatch, tmp_path):
+    """Test le découpage connexion / serveur / téléchargement / parsing et les tailles."""
+    from src.services import ors_service as module
+    url, response_size = ors_stand_in
+    monkeypatch.setenv("ORS_BASE_URL", url)
+    tracker = PerformanceTracker(log_dir=str(tmp_path))
+    monkeypatch.setattr(module, "performance_tracker", tracker)
+    payload = {
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "options": {"avoid_polygons": {"type": "MultiPolygon", "coordinates": [[[[7.0, 48.0]]], [[[7.5, 48.5]]]]}}
+    }
+
+    tracker.start_optimization_session("a", "b")
+    ors = ORSService()
+    ors.call_ors(payload)
+    ors.call_ors(payload)
+    tracker.end_optimization_session()
+
+    session = json.loads(next(tmp_path.glob("session_*.json")).read_text(encoding="utf-8"))
+    values = session["recorded_values"]["ors_network"]
+    assert values["response_bytes"]["total"] == 2 * response_size
+    assert values["request_bytes"]["min"] == len(json.dumps(payload))
+    assert values["avoid_polygons"]["max"] == 2
+    assert values["connect_us"]["min"] == 0  # Deuxième appel : connexion réutilisée
+    assert values["connect_us"]["max"] > 0
+    details = session["metrics"][0]["details"]
+    assert set(details) >= {"connect_us", "server_us", "download_us", "json_parse_us"}
+
+
+@pytest.fixture
+def stalling_ors_stand_in():
+    """Serveur ORS local : envoie les en-têtes et la moitié du corps, puis se bloque."""
+    body = json.dumps({"features": [{"geometry": {"coordinates": [[7.0, 48.0]] * 1000}}]}).encode()
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            release.wait(5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ors"
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_call_ors_body_timeout_is_censored(stalling_ors_stand_in, monkeypatch):
+    """Test qu'un timeout pendant le téléchargement du corps est enregistré comme échantillon censuré."""
+    from src.services import ors_service as module
+    from src.services.ors_latency_model import ORSLatencyModel
+    monkeypatch.setenv("ORS_BASE_URL", stalling_ors_stand_in)
+    model = ORSLatencyModel(min_samples=5)
+    monkeypatch.setattr(model, "timeout_for", lambda payload, default: 0.3)
+    monkeypatch.setattr(module, "ors_latency_model", model)
+
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        ORSService().call_ors({"coordinates": [[7.0, 48.0], [8.0, 49.0]]})
+
+    assert time.perf_counter() - started < 3
+    assert model.get_stats()["timeouts"] == 1
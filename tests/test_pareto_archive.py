@@ -0,0 +1,121 @@
+"""
+Tests pour ParetoArchive - Front des routes non dominées (alternatives).
+"""
+import pytest
+
+from src.services.common.pareto_archive import (
+    ParetoArchive, select_alternatives, limit_alternatives, resolve_alternatives
+)
+from src.services.toll.result_manager import RouteResultManager
+
+
+def _route(cost, duration, toll_count, name=None):
+    """Route formatée minimale."""
+    return {"route": name or f"{cost}-{duration}-{toll_count}", "cost": cost,
+            "duration": duration, "toll_count": toll_count}
+
+
+def _objectives(routes):
+    return [(r["cost"], r["duration"], r["toll_count"]) for r in routes]
+
+
+class TestParetoArchive:
+    """Tests pour l'insertion incrémentale."""
+
+    def test_dominated_route_is_rejected(self):
+        """Test qu'une route dominée n'entre pas dans le front."""
+        archive = ParetoArchive()
+        assert archive.insert(_route(5.0, 3600, 2))
+        assert not archive.insert(_route(6.0, 3600, 2))
+        assert not archive.insert(_route(5.0, 3600, 2, name="doublon"))
+        assert len(archive) == 1
+
+    def test_new_route_removes_dominated_entries(self):
+        """Test qu'une route meilleure retire les entrées qu'elle domine."""
+        archive = ParetoArchive()
+        archive.insert(_route(5.0, 4000, 2))
+        archive.insert(_route(3.0, 5000, 2))
+        archive.insert(_route(8.0, 3000, 3))
+
+        assert archive.insert(_route(3.0, 4000, 1))
+
+        assert _objectives(archive.front()) == [(3.0, 4000, 1), (8.0, 3000, 3)]
+
+    def test_front_keeps_trade_offs_sorted_by_cost(self):
+        """Test que les compromis non dominés sont tous conservés, triés par coût."""
+        archive = ParetoArchive()
+        for route in (_route(13.9, 3600, 4), _route(0, 6600, 0), _route(3.9, 4200, 3), _route(2.7, 4800, 2)):
+            archive.insert(route)
+
+        assert _objectives(archive.front()) == [(0, 6600, 0), (2.7, 4800, 2), (3.9, 4200, 3), (13.9, 3600, 4)]
+
+    def test_routes_without_geometry_are_ignored(self):
+        """Test que les résultats vides (route None, coût infini) sont ignorés."""
+        archive = ParetoArchive()
+        assert not archive.insert({"route": None, "cost": 0, "duration": 0, "toll_count": 0})
+        assert not archive.insert(_route(float('inf'), 100, 1))
+        assert len(archive) == 0
+
+
+class TestSelectAlternatives:
+    """Tests pour le choix de k alternatives."""
+
+    FRONT = [_route(0, 6600, 0), _route(1.0, 6000, 1), _route(2.7, 4800, 2),
+             _route(3.9, 4200, 3), _route(13.9, 3600, 4)]
+
+    def test_extremes_are_kept_first(self):
+        """Test que la moins chère et la plus rapide sont toujours retenues."""
+        selected = select_alternatives(self.FRONT, 2)
+        assert _objectives(selected) == [(0, 6600, 0), (13.9, 3600, 4)]
+
+    def test_selection_fills_largest_gap(self):
+        """Test que les routes suivantes comblent l'écart le plus grand."""
+        selected = select_alternatives(self.FRONT, 3)
+        assert len(selected) == 3
+        assert (13.9, 3600, 4) in _objectives(selected)
+        assert (0, 6600, 0) in _objectives(selected)
+
+    def test_small_front_returned_whole(self):
+        """Test qu'un front plus petit que k est retourné en entier."""
+        assert select_alternatives(self.FRONT[:2], 5) == self.FRONT[:2]
+
+
+class TestLimitAlternatives:
+    """Tests pour la mise en forme du champ `alternatives`."""
+
+    def test_front_removed_when_not_requested(self):
+        """Test que le front attaché par la stratégie est retiré si k = 0."""
+        result = {"fastest": None, "status": "OK", "alternatives": [_route(1, 1, 1)]}
+        assert "alternatives" not in limit_alternatives(result, 0)
+
+    def test_winners_used_without_front(self):
+        """Test qu'un résultat sans front (fallback) propose ses routes gagnantes."""
+        fast, cheap = _route(9.0, 3000, 3), _route(0, 5000, 0)
+        result = {"fastest": fast, "cheapest": cheap, "min_tolls": cheap, "status": "FALLBACK"}
+
+        assert _objectives(limit_alternatives(result, 3)["alternatives"]) == [(0, 5000, 0), (9.0, 3000, 3)]
+
+    @pytest.mark.parametrize("value", [-1, 99, "beaucoup", True, [], {}, [2]])
+    def test_invalid_values_rejected(self, value):
+        """Test que les valeurs hors limites ou mal typées sont refusées."""
+        with pytest.raises(ValueError):
+            resolve_alternatives(value)
+
+    def test_default_is_zero(self):
+        """Test qu'aucune alternative n'est demandée par défaut."""
+        assert resolve_alternatives(None) == 0
+        assert resolve_alternatives("3") == 3
+
+
+class TestResultManagerAlternatives:
+    """Tests pour l'alimentation du front par le gestionnaire de résultats."""
+
+    def test_every_evaluated_route_feeds_the_front(self):
+        """Test qu'un compromis qui ne gagne aucun critère reste une alternative."""
+        manager = RouteResultManager()
+        manager.initialize_with_base_route("base", 13.9, 3600, 4, max_tolls=5)
+        manager.update_with_route(_route(0, 6600, 0), 13.9)
+        manager.update_with_route(_route(3.9, 4200, 3), 13.9)
+
+        assert manager.get_results()["cheapest"]["cost"] == 0
+        assert _objectives(manager.get_alternatives()) == [(0, 6600, 0), (3.9, 4200, 3), (13.9, 3600, 4)]
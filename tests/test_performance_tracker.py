@@ -0,0 +1,217 @@
+"""
+Tests pour PerformanceTracker - Sessions par requête et agrégation entre threads.
+"""
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmark.performance_tracker import PerformanceTracker, chrome_trace_events, critical_path
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return PerformanceTracker(log_dir=str(tmp_path), buffer_size=50)
+
+
+def _saved_session(tracker, session_id):
+    with open(tracker.log_dir / f"session_{session_id}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _run_request(tracker, name, operations, barrier=None):
+    """Simule une requête : session, mesures, appels et travail délégué à un pool."""
+    session_id = tracker.start_optimization_session(name, "dest")
+    if barrier:
+        barrier.wait()
+    for _ in range(operations):
+        with tracker.measure_operation(f"{name}_op"):
+            tracker.count_api_call(f"{name}_call")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for _ in range(4):
+            pool.submit(contextvars.copy_context().run, _worker, tracker, name).result()
+    if barrier:
+        barrier.wait()
+    tracker.end_optimization_session({"status": name})
+    return session_id
+
+
+def _worker(tracker, name):
+    with tracker.measure_operation(f"{name}_worker"):
+        tracker.count_api_call(f"{name}_call")
+
+
+class TestPerformanceTrackerSessions:
+    """Tests pour l'isolation des sessions concurrentes."""
+
+    def test_concurrent_sessions_are_isolated(self, tracker):
+        """Test que deux requêtes simultanées gardent chacune leurs mesures."""
+        barrier = threading.Barrier(2)
+        ids = {}
+
+        def request(name, operations):
+            ids[name] = _run_request(tracker, name, operations, barrier)
+
+        threads = [threading.Thread(target=request, args=("a", 5)), threading.Thread(target=request, args=("b", 8))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        a, b = _saved_session(tracker, ids["a"]), _saved_session(tracker, ids["b"])
+        assert {m["operation"] for m in a["metrics"]} == {"a_op", "a_worker"}
+        assert {m["operation"] for m in b["metrics"]} == {"b_op", "b_worker"}
+        assert a["api_calls"] == {"a_call": 9}
+        assert b["api_calls"] == {"b_call": 12}
+        assert a["optimization_result"] == {"status": "a"}
+
+    def test_worker_threads_aggregated(self, tracker):
+        """Test que les mesures des threads du pool sont rattachées à la session."""
+        session_id = _run_request(tracker, "req", 1)
+
+        metrics = _saved_session(tracker, session_id)["metrics"]
+        assert sum(1 for m in metrics if m["operation"] == "req_worker") == 4
+
+    def test_ring_buffer_drops_oldest(self, tracker):
+        """Test que le buffer est borné et compte les mesures perdues."""
+        tracker.start_optimization_session("x", "y")
+        for i in range(80):
+            with tracker.measure_operation("op", {"i": i}):
+                pass
+        session_id = tracker.end_optimization_session()
+
+        session = _saved_session(tracker, session_id)
+        assert len(session["metrics"]) == 50
+        assert session["dropped_metrics"] == 30
+        assert session["metrics"][0]["details"] == {"i": 30}
+
+    def test_measurements_outside_session_bounded(self, tracker):
+        """Test que les mesures hors session ne s'accumulent pas sans limite."""
+        for _ in range(200):
+            with tracker.measure_operation("background"):
+                pass
+
+        assert tracker.get_current_stats() == {}
+        metrics, _, dropped = tracker._background.merged()
+        assert len(metrics) == 50
+        assert dropped == 150
+
+    def test_nested_session_restores_outer(self, tracker):
+        """Test qu'une session imbriquée rend la main à la session englobante."""
+        outer = tracker.start_optimization_session("outer", "dest")
+        tracker.start_optimization_session("inner", "dest")
+        tracker.end_optimization_session()
+
+        assert tracker.get_current_stats()["session_id"] == outer
+        tracker.end_optimization_session()
+        assert tracker.get_current_stats() == {}
+
+
+class TestPerformanceTrackerLightMode:
+    """Tests pour le mode de mesure léger (histogrammes seulement)."""
+
+    def test_light_mode_keeps_histograms_only(self, tmp_path):
+        """Test qu'en mode léger aucune métrique détaillée n'est conservée."""
+        tracker = PerformanceTracker(log_dir=str(tmp_path), mode="light")
+        session_id = _run_request(tracker, "req", 10)
+
+        session = _saved_session(tracker, session_id)
+        assert session["metrics"] == []
+        assert session["measurement_mode"] == "light"
+        assert session["operation_histograms"]["req_op"]["wall_ms"]["count"] == 10
+        assert session["operation_histograms"]["req_worker"]["wall_ms"]["count"] == 4
+        assert session["api_calls"] == {"req_call": 14}
+
+    def test_cpu_time_separated_from_wall(self, tracker):
+        """Test que l'attente (sleep) compte en temps réel mais pas en temps CPU."""
+        tracker.start_optimization_session("x", "y")
+        with tracker.measure_operation("wait"):
+            time.sleep(0.05)
+        with tracker.measure_operation("compute"):
+            sum(i * i for i in range(200000))
+        session_id = tracker.end_optimization_session()
+
+        histograms = _saved_session(tracker, session_id)["operation_histograms"]
+        assert histograms["wait"]["wall_ms"]["total"] >= 45
+        assert histograms["wait"]["cpu_ms"]["total"] < 10
+        assert histograms["compute"]["cpu_ms"]["total"] > 0
+
+    def test_sampling(self, tmp_path):
+        """Test que l'échantillonnage ne mesure qu'une fraction des appels."""
+        tracker = PerformanceTracker(log_dir=str(tmp_path), mode="light", sample_rate=0.1)
+        tracker.start_optimization_session("x", "y")
+        for _ in range(2000):
+            with tracker.measure_operation("op"):
+                pass
+        session_id = tracker.end_optimization_session()
+
+        count = _saved_session(tracker, session_id)["operation_histograms"]["op"]["wall_ms"]["count"]
+        assert 100 < count < 300
+
+    def test_invalid_mode(self, tracker):
+        """Test qu'un mode ou un taux invalide est refusé."""
+        with pytest.raises(ValueError):
+            tracker.set_mode("verbose")
+        with pytest.raises(ValueError):
+            tracker.set_mode("light", 0)
+
+
+def _nested_request(tracker):
+    """Stratégie -> (combinaison -> appel ORS) dans un thread du pool, puis post-traitement."""
+    tracker.start_optimization_session("a", "b")
+    with tracker.measure_operation("strategy"):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(contextvars.copy_context().run, _nested_worker, tracker).result()
+        with tracker.measure_operation("format"):
+            pass
+    return tracker.end_optimization_session({"status": "SUCCESS"})
+
+
+def _nested_worker(tracker):
+    with tracker.measure_operation("combination"):
+        with tracker.measure_operation("ors_call"):
+            time.sleep(0.01)
+
+
+class TestPerformanceTrackerSpans:
+    """Tests pour les spans hiérarchiques et l'export Chrome trace."""
+
+    def test_parent_propagated_to_worker_threads(self, tracker):
+        """Test que les mesures d'un thread du pool ont pour parent la mesure englobante."""
+        metrics = {m["operation"]: m for m in _saved_session(tracker, _nested_request(tracker))["metrics"]}
+
+        assert metrics["strategy"]["parent_id"] is None
+        assert metrics["combination"]["parent_id"] == metrics["strategy"]["span_id"]
+        assert metrics["ors_call"]["parent_id"] == metrics["combination"]["span_id"]
+        assert metrics["format"]["parent_id"] == metrics["strategy"]["span_id"]
+        assert metrics["combination"]["thread_id"] != metrics["strategy"]["thread_id"]
+
+    def test_critical_path(self, tracker):
+        """Test que le chemin critique suit l'enfant qui termine le plus tard."""
+        session = _saved_session(tracker, _nested_request(tracker))
+
+        assert [span["operation"] for span in critical_path(session["metrics"])] == ["strategy", "format"]
+
+    def test_chrome_trace_events(self, tracker):
+        """Test l'export : un événement complet par span et un flux vers le thread du pool."""
+        session = _saved_session(tracker, _nested_request(tracker))
+
+        events = chrome_trace_events(session)["traceEvents"]
+
+        spans = [e for e in events if e["ph"] == "X" and e["cat"] == "operation"]
+        assert {e["name"] for e in spans} == {"strategy", "combination", "ors_call", "format"}
+        ors_call = next(e for e in spans if e["name"] == "ors_call")
+        assert ors_call["dur"] >= 10000
+        assert [e["ph"] for e in events if e.get("cat") == "flow"] == ["s", "f"]
+
+    def test_export_chrome_trace_file(self, tracker):
+        """Test l'écriture du fichier de trace à partir d'une session enregistrée."""
+        session_id = _nested_request(tracker)
+
+        path = tracker.export_chrome_trace(f"session_{session_id}.json")
+
+        with open(path, encoding="utf-8") as f:
+            assert len(json.load(f)["traceEvents"]) > 4
@@ -0,0 +1,118 @@
+"""
+Tests pour progress_events - Diffusion des améliorations en cours d'optimisation.
+"""
+import json
+import threading
+import time
+
+from src.services.common.progress_events import (
+    progress_sink, progress_fields, emit_progress, count_progress, encode_event, stream_optimization,
+    OptimizationCancelled
+)
+from src.services.toll.result_manager import RouteResultManager
+
+
+def _route(cost, duration, toll_count):
+    return {"route": {"id": cost}, "cost": cost, "duration": duration, "toll_count": toll_count}
+
+
+class TestProgressSink:
+    """Tests pour l'abonnement aux événements."""
+
+    def test_emit_without_sink_is_noop(self):
+        """Test qu'une émission sans abonné ne fait rien."""
+        emit_progress("base", route={})
+
+    def test_sink_receives_events_with_fields(self):
+        """Test que l'abonné reçoit les événements enrichis des champs du bloc."""
+        events = []
+        with progress_sink(events.append):
+            emit_progress("base", cost=1)
+            with progress_fields(veh_class="c2"):
+                emit_progress("improvement", cost=0)
+        emit_progress("ignored")
+
+        assert events == [
+            {"event": "base", "cost": 1},
+            {"event": "improvement", "veh_class": "c2", "cost": 0},
+        ]
+
+    def test_result_manager_emits_improved_criteria(self):
+        """Test que le gestionnaire émet les critères améliorés uniquement."""
+        manager = RouteResultManager()
+        events = []
+        with progress_sink(events.append):
+            manager.update_with_route(_route(5.0, 100, 2), 10.0)
+            manager.update_with_route(_route(3.0, 200, 2), 10.0)
+            manager.update_with_route(_route(4.0, 300, 3), 10.0)
+
+        assert [e["criteria"] for e in events] == [["min_tolls", "cheapest", "fastest"], ["cheapest"]]
+        assert events[1]["route"]["cost"] == 3.0
+
+
+class TestStreamOptimization:
+    """Tests pour le flux d'événements."""
+
+    def test_encode_formats(self):
+        """Test de l'encodage SSE et NDJSON."""
+        event = {"event": "base", "cost": 1}
+        assert encode_event(event, "ndjson") == json.dumps(event) + "\n"
+        assert encode_event(event, "sse") == f"event: base\ndata: {json.dumps(event)}\n\n"
+
+    def test_stream_ends_with_result(self):
+        """Test que le flux se termine par le résumé final."""
+        def compute():
+            emit_progress("base", cost=9)
+            return {"status": "OK"}
+
+        events = [json.loads(line) for line in stream_optimization(compute, "ndjson")]
+
+        assert events == [{"event": "base", "cost": 9}, {"event": "result", "result": {"status": "OK"}}]
+
+    def test_stream_reports_errors(self):
+        """Test qu'une exception termine le flux par un événement d'erreur."""
+        def compute():
+            raise RuntimeError("ORS indisponible")
+
+        events = [json.loads(line) for line in stream_optimization(compute, "ndjson")]
+
+        assert events == [{"event": "error", "error": "ORS indisponible"}]
+
+    def test_closing_stream_cancels_optimization(self):
+        """Test qu'un client déconnecté (générateur fermé) arrête le calcul au prochain compteur."""
+        calls = []
+        finished = threading.Event()
+        outcome = {}
+
+        def compute():
+            emit_progress("base", cost=9)
+            try:
+                for _ in range(500):
+                    count_progress("ors_calls")
+                    calls.append(1)
+                    time.sleep(0.01)
+                outcome["status"] = "completed"
+            except OptimizationCancelled:
+                outcome["status"] = "cancelled"
+            finally:
+                finished.set()
+            return {"status": "OK"}
+
+        stream = stream_optimization(compute, "ndjson")
+        assert json.loads(next(stream))["event"] == "base"
+        stream.close()
+
+        assert finished.wait(5)
+        assert outcome["status"] == "cancelled"
+        assert len(calls) < 500
+
+    def test_sink_without_cancel_event_never_cancels(self):
+        """Test que les abonnés sans drapeau d'annulation ne sont pas affectés."""
+        received = []
+        counters = {}
+        with progress_sink(received.append, counters):
+            with progress_fields(veh_class="c2"):
+                emit_progress("base", cost=1)
+                count_progress("ors_calls")
+        assert received == [{"event": "base", "veh_class": "c2", "cost": 1}]
+        assert counters == {"ors_calls": 1}
@@ -0,0 +1,229 @@
+"""
+Tests pour RouteContext - Partage de l'analyse de la route de base pendant une requête.
+"""
+import threading
+
+import pytest
+
+from src.services.common.route_context import RouteContext, route_context, current_route_context
+from src.services.toll.route_calculator import RouteCalculator
+
+
+START, END = [7.7521, 48.5734], [4.8357, 45.7640]
+
+
+class Counter:
+    """Fonction de calcul comptant ses appels."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+class FakeORS:
+    """Service ORS minimal comptant les routes demandées."""
+
+    def __init__(self):
+        self.base_calls = 0
+        self.free_calls = 0
+
+    def get_base_route(self, coordinates):
+        self.base_calls += 1
+        return {"features": [{"geometry": {"coordinates": coordinates}}]}
+
+    def get_route_avoid_tollways(self, coordinates):
+        self.free_calls += 1
+        return {"features": [{"geometry": {"coordinates": coordinates}}]}
+
+
+class TestRouteContext:
+    """Tests pour le mémo du contexte."""
+
+    def test_memo_computes_once(self):
+        """Test qu'une valeur n'est calculée qu'une fois par contexte."""
+        context = RouteContext([START, END])
+        compute = Counter({"features": []})
+
+        first = context.base_route(compute)
+        second = context.base_route(compute)
+
+        assert first is second
+        assert compute.calls == 1
+        assert context.stats == {"hits": 1, "misses": 1, "prefetched": 0}
+
+    def test_failed_compute_is_not_memoized(self):
+        """Test qu'un calcul en échec est retenté à l'accès suivant."""
+        context = RouteContext([START, END])
+
+        def failing():
+            raise RuntimeError("ORS indisponible")
+
+        with pytest.raises(RuntimeError):
+            context.base_route(failing)
+
+        assert context.base_route(lambda: "route") == "route"
+
+    def test_costed_tolls_returns_copies(self):
+        """Test que les péages mémorisés ne sont pas modifiés par l'appelant."""
+        context = RouteContext([START, END])
+        route = context.base_route(lambda: {"features": []})
+        locate = Counter({"on_route": [{"id": "APRR_O034"}], "nearby": []})
+
+        tolls = context.costed_tolls(route, "c1", locate)
+        tolls["on_route"][0]["cost"] = 99
+        again = context.costed_tolls(route, "c1", locate)
+
+        assert again["on_route"][0]["cost"] == 0.8
+        assert "costs" not in again["on_route"][0]
+        assert locate.calls == 1
+
+    def test_costed_tolls_shared_between_vehicle_classes(self):
+        """Test que les péages sont localisés une fois et chiffrés pour toutes les classes du contexte."""
+        context = RouteContext([START, END], veh_classes=["c1", "c2"])
+        route = context.base_route(lambda: {"features": []})
+        locate = Counter({"on_route": [{"id": "APRR_O034"}], "nearby": []})
+
+        c1 = context.costed_tolls(route, "c1", locate)
+        c2 = context.costed_tolls(route, "c2", locate)
+
+        assert [t["cost"] for t in c1["on_route"]] == [0.8]
+        assert [t["cost"] for t in c2["on_route"]] == [1.2]
+        assert locate.calls == 1
+        assert context.stats["misses"] == 2  # route de base + péages
+
+    def test_costed_tolls_class_outside_context(self):
+        """Test qu'une classe hors de celles du contexte est chiffrée séparément."""
+        context = RouteContext([START, END], veh_classes=["c1"])
+        route = context.base_route(lambda: {"features": []})
+        locate = Counter({"on_route": [{"id": "APRR_O034"}], "nearby": []})
+
+        context.costed_tolls(route, "c1", locate)
+        c3 = context.costed_tolls(route, "c3", locate)
+
+        assert c3["on_route"][0]["cost"] == 1.8
+        assert locate.calls == 2
+
+    def test_alternative_route_memoized_by_geometry(self):
+        """Test qu'une alternative de même géométrie n'est localisée qu'une fois."""
+        context = RouteContext([START, END], veh_classes=["c1", "c2"])
+        locate = Counter({"on_route": [], "nearby": []})
+
+        context.costed_tolls({"features": [{"geometry": {"coordinates": [START, END]}}]}, "c1", locate)
+        context.costed_tolls({"features": [{"geometry": {"coordinates": [START, END]}}]}, "c2", locate)
+
+        assert locate.calls == 1
+
+    def test_route_without_geometry_is_computed_directly(self):
+        """Test qu'une route sans géométrie n'est pas mémorisée."""
+        context = RouteContext([START, END])
+        context.base_route(lambda: {"features": []})
+        locate = Counter({"on_route": [], "nearby": []})
+
+        context.costed_tolls({"features": []}, "c1", locate)
+        context.costed_tolls({"features": []}, "c1", locate)
+
+        assert locate.calls == 2
+
+
+class TestRouteContextPrefetch:
+    """Tests pour les appels ORS anticipés."""
+
+    def test_access_waits_for_running_prefetch(self):
+        """Test que le premier accès attend l'appel anticipé au lieu de le refaire."""
+        context = RouteContext([START, END])
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return "route"
+
+        context.prefetch({"base_route": slow_fetch})
+        assert started.wait(5)
+        release.set()
+        compute = Counter("direct")
+
+        assert context.base_route(compute) == "route"
+        assert compute.calls == 0
+        assert context.stats["prefetched"] == 1
+
+    def test_failed_prefetch_falls_back_to_direct_call(self):
+        """Test qu'un appel anticipé en échec est refait de façon synchrone."""
+        context = RouteContext([START, END])
+
+        def failing():
+            raise RuntimeError("ORS indisponible")
+
+        context.prefetch({"toll_free_route": failing})
+        compute = Counter("route")
+
+        assert context.toll_free_route(compute) == "route"
+        assert compute.calls == 1
+
+    def test_calculator_prefetches_both_routes(self):
+        """Test que le calculateur lance les deux routes et que les accès les réutilisent."""
+        ors = FakeORS()
+        calculator = RouteCalculator(ors)
+
+        with route_context([START, END]):
+            calculator.prefetch_routes([START, END])
+            calculator.get_base_route_with_tracking([START, END])
+            calculator.get_route_avoid_tollways_with_tracking([START, END])
+
+        assert (ors.base_calls, ors.free_calls) == (1, 1)
+
+    def test_invalid_coordinates_are_not_prefetched(self):
+        """Test qu'aucun appel n'est anticipé pour des coordonnées invalides ou hors contexte."""
+        ors = FakeORS()
+        calculator = RouteCalculator(ors)
+
+        calculator.prefetch_routes([START, END])
+        with route_context([START]):
+            calculator.prefetch_routes([START])
+
+        assert (ors.base_calls, ors.free_calls) == (0, 0)
+
+
+class TestRouteContextScope:
+    """Tests pour l'ouverture et la réutilisation du contexte."""
+
+    def test_no_context_outside_scope(self):
+        """Test qu'aucun contexte n'est actif hors d'un bloc route_context."""
+        assert current_route_context() is None
+
+    def test_nested_same_coordinates_reuses_context(self):
+        """Test qu'un bloc imbriqué sur les mêmes coordonnées réutilise le contexte."""
+        with route_context([START, END]) as outer:
+            with route_context([tuple(START), tuple(END)]) as inner:
+                assert inner is outer
+            assert current_route_context([START, END]) is outer
+        assert current_route_context() is None
+
+    def test_different_coordinates_open_new_context(self):
+        """Test que d'autres coordonnées ouvrent un nouveau contexte."""
+        with route_context([START, END]) as outer:
+            assert current_route_context([END, START]) is None
+            with route_context([END, START]) as inner:
+                assert inner is not outer
+            assert current_route_context() is outer
+
+    def test_calculator_fetches_base_route_once(self):
+        """Test que le calculateur ne refait pas l'appel ORS de base dans un contexte."""
+        ors = FakeORS()
+        calculator = RouteCalculator(ors)
+
+        with route_context([START, END]):
+            first = calculator.get_base_route_with_tracking([START, END])
+            second = calculator.get_base_route_with_tracking([START, END])
+            calculator.get_route_avoid_tollways_with_tracking([START, END])
+            calculator.get_route_avoid_tollways_with_tracking([START, END])
+
+        assert first is second
+        assert (ors.base_calls, ors.free_calls) == (1, 1)
+
+        calculator.get_base_route_with_tracking([START, END])
+        assert ors.base_calls == 2
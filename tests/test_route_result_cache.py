@@ -0,0 +1,200 @@
+"""
+Tests pour RouteResultCache - Cache inter-requêtes des résultats d'optimisation.
+"""
+import json
+import threading
+import time
+
+from src.services import route_result_cache
+from src.services.route_result_cache import RouteResultCache
+
+
+START, END = [7.7521, 48.5734], [4.8357, 45.7640]
+PARAMS = {"max_tolls": 2, "vehicle_class": "c1", "search": "exhaustive", "beam_width": 3}
+
+
+def _result(start=START, end=END, status="MULTI_TOLL_SUCCESS"):
+    """Résultat minimal avec une route dont la géométrie part de `start`."""
+    route = {"features": [{"geometry": {"coordinates": [start, end]}}]}
+    return {"fastest": {"route": route, "cost": 5.0}, "cheapest": None, "min_tolls": None, "status": status}
+
+
+class Counter:
+    """Fonction de calcul comptant ses appels."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+class TestRouteResultCache:
+    """Tests pour le cache des résultats."""
+
+    def test_hit_serves_same_bytes(self):
+        """Test qu'une requête identique est servie depuis le cache."""
+        cache = RouteResultCache()
+        compute = Counter(_result())
+
+        body, hit = cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+        again, hit_again = cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+
+        assert (hit, hit_again) == (False, True)
+        assert again == body
+        assert json.loads(body)["status"] == "MULTI_TOLL_SUCCESS"
+        assert compute.calls == 1
+
+    def test_parameters_are_part_of_key(self):
+        """Test que des paramètres différents ne partagent pas l'entrée."""
+        cache = RouteResultCache()
+        compute = Counter(_result())
+        cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+
+        _, hit = cache.get_or_compute("tolls", [START, END], {**PARAMS, "max_tolls": 3}, compute)
+
+        assert not hit
+        assert compute.calls == 2
+
+    def test_exact_coordinates_by_default(self):
+        """Test que, sans snapping explicite, un point voisin ne partage pas l'entrée."""
+        cache = RouteResultCache()
+        compute = Counter(_result())
+        cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+
+        nearby = [START[0] + 0.0001, START[1]]  # ~7 m, éventuellement sur l'autre chaussée
+        _, hit = cache.get_or_compute("tolls", [nearby, END], PARAMS, compute)
+
+        assert not hit
+        assert compute.calls == 2
+
+    def test_snapping_within_guard(self):
+        """Test qu'un point voisin du point accroché par ORS partage l'entrée."""
+        cache = RouteResultCache(snap_decimals=3, snap_guard_m=50)
+        cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+
+        nearby = [START[0] + 0.0001, START[1]]  # ~7 m
+        _, hit = cache.get_or_compute("tolls", [nearby, END], PARAMS, Counter(_result()))
+
+        assert hit
+
+    def test_snapping_guard_rejects_distant_point(self):
+        """Test qu'un point de la même cellule mais loin du point accroché n'est pas servi."""
+        cache = RouteResultCache(snap_decimals=3, snap_guard_m=50)
+        snapped = [START[0] + 0.0004, START[1]]  # ORS a accroché la route ~30 m plus loin
+        cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result(start=snapped)))
+
+        other = [START[0] - 0.0004, START[1]]  # même cellule, ~60 m du point accroché
+        _, hit = cache.get_or_compute("tolls", [other, END], PARAMS, Counter(_result()))
+
+        assert not hit
+        assert cache.get_stats()["snap_rejections"] == 1
+
+    def test_failures_are_not_cached(self):
+        """Test que les résultats en échec ne sont pas mis en cache."""
+        cache = RouteResultCache()
+        compute = Counter(_result(status="CRITICAL_ERROR"))
+        cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+        cache.get_or_compute("tolls", [START, END], PARAMS, compute)
+
+        assert compute.calls == 2
+
+    def test_size_eviction_and_ttl(self):
+        """Test de l'éviction par taille et de l'expiration."""
+        body_size = len(json.dumps(_result()).encode())
+        cache = RouteResultCache(max_bytes=body_size + 10)
+        cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        cache.get_or_compute("budget", [START, END], PARAMS, Counter(_result()))
+
+        assert cache.get_stats()["entries"] == 1
+        assert cache.get_stats()["evictions"] == 1
+
+        expired = RouteResultCache(ttl_seconds=-1)
+        expired.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        _, hit = expired.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        assert not hit
+
+    def test_invalid_coordinates_bypass_cache(self):
+        """Test que des coordonnées invalides contournent le cache."""
+        cache = RouteResultCache()
+        body, hit = cache.get_or_compute("tolls", None, PARAMS, Counter({"status": "CRITICAL_ERROR"}))
+
+        assert not hit
+        assert cache.get_stats()["entries"] == 0
+
+    def test_concurrent_identical_requests_compute_once(self):
+        """Test que des requêtes identiques simultanées partagent une seule optimisation."""
+        cache = RouteResultCache()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(2)
+            return _result()
+
+        outcomes = []
+        threads = [threading.Thread(target=lambda: outcomes.append(
+            cache.get_or_compute("tolls", [START, END], PARAMS, compute))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len({body for body, _ in outcomes}) == 1
+        assert sorted(hit for _, hit in outcomes) == [False, True, True, True]
+        assert cache.get_stats()["coalesced"] == 3
+
+    def test_concurrent_failure_is_shared_not_cached(self):
+        """Test que l'erreur de l'optimisation en cours est propagée aux requêtes en attente."""
+        cache = RouteResultCache()
+        release = threading.Event()
+
+        def failing():
+            release.wait(2)
+            raise RuntimeError("ORS indisponible")
+
+        errors = []
+
+        def request():
+            try:
+                cache.get_or_compute("tolls", [START, END], PARAMS, failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        body, hit = cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        assert not hit
+
+    def test_dataset_version_read_once_per_interval(self, monkeypatch):
+        """Test que la version des données n'est pas relue (os.stat) à chaque accès."""
+        reads = []
+
+        def fake_version():
+            reads.append(1)
+            return f"v{len(reads)}"
+
+        monkeypatch.setattr(route_result_cache, "dataset_version", fake_version)
+        cache = RouteResultCache(version_recheck_s=60)
+        cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        _, hit = cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+
+        assert hit
+        assert len(reads) == 1
+
+        cache.version_recheck_s = 0
+        _, hit = cache.get_or_compute("tolls", [START, END], PARAMS, Counter(_result()))
+        assert not hit  # nouvelle version des données : l'entrée précédente n'est plus servie
@@ -0,0 +1,67 @@
+"""
+Tests pour route_utils - Préfiltre géométrique des péages ouverts.
+"""
+import pytest
+
+from src.utils.route_utils import haversine_m, rank_tolls_by_detour
+
+
+STRASBOURG, LYON = [7.7521, 48.5734], [4.8357, 45.7640]
+
+
+def _toll(toll_id, lon, lat):
+    return {"id": toll_id, "longitude": lon, "latitude": lat}
+
+
+class TestHaversine:
+    """Tests pour la distance orthodromique."""
+
+    def test_known_distance(self):
+        """Test la distance Strasbourg → Lyon (~383 km à vol d'oiseau)."""
+        assert haversine_m(*STRASBOURG, *LYON) == pytest.approx(383000, rel=0.01)
+
+    def test_same_point_is_zero(self):
+        """Test qu'un point est à distance nulle de lui-même."""
+        assert haversine_m(*LYON, *LYON) == 0
+
+
+class TestRankTollsByDetour:
+    """Tests pour le classement des péages par borne de détour."""
+
+    TOLLS = [
+        _toll("paris_o", 2.35, 48.85),      # très à l'ouest : grand détour
+        _toll("dijon_o", 5.04, 47.32),      # léger détour
+        _toll("mulhouse_o", 7.34, 47.75),   # quasiment sur la ligne directe
+    ]
+
+    def test_ranked_by_detour(self):
+        """Test que les péages sont classés du plus direct au moins direct."""
+        ranked = rank_tolls_by_detour(self.TOLLS, STRASBOURG, LYON)
+
+        assert [t["id"] for t in ranked] == ["mulhouse_o", "dijon_o", "paris_o"]
+        assert ranked[0]["detour_factor"] >= 1.0
+
+    def test_implausible_tolls_discarded(self):
+        """Test que les péages au-delà du facteur maximal sont écartés."""
+        ranked = rank_tolls_by_detour(self.TOLLS, STRASBOURG, LYON, max_detour_factor=1.5)
+
+        assert "paris_o" not in [t["id"] for t in ranked]
+        assert len(ranked) == 2
+
+    def test_road_distance_as_reference(self):
+        """Test qu'une route directe plus longue que le vol d'oiseau assouplit la borne."""
+        ranked = rank_tolls_by_detour(
+            self.TOLLS, STRASBOURG, LYON, direct_distance_m=700000, max_detour_factor=1.5
+        )
+
+        assert len(ranked) == 3
+
+    def test_input_not_modified(self):
+        """Test que les péages d'entrée ne sont pas enrichis sur place."""
+        rank_tolls_by_detour(self.TOLLS, STRASBOURG, LYON)
+
+        assert all("detour_factor" not in t for t in self.TOLLS)
+
+    def test_empty_list(self):
+        """Test qu'une liste vide reste vide."""
+        assert rank_tolls_by_detour([], STRASBOURG, LYON) == []
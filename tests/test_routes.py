@@ -1,8 +1,14 @@
 import pytest
 import json
 from flask import Flask
+from benchmark.performance_tracker import performance_tracker
 from src.routes import register_routes
 
+@pytest.fixture(autouse=True)
+def performance_logs(tmp_path, monkeypatch):
+    """Sessions de mesure écrites dans un dossier temporaire, pas dans benchmark/logs."""
+    monkeypatch.setattr(performance_tracker, "log_dir", tmp_path)
+
 @pytest.fixture
 def app():
     app = Flask(__name__)
@@ -50,4 +56,245 @@ def test_geocode_search_missing_params(client):
 
 def test_geocode_autocomplete_missing_params(client):
     resp = client.get('/api/geocode/autocomplete')
-    assert resp.status_code == 400
\ No newline at end of file
+    assert resp.status_code == 400
+def test_smart_route_tolls_invalid_vehicle_class(client):
+    resp = client.post('/api/smart-route/tolls', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "vehicle_class": ["c1", "c9"]
+    })
+    assert resp.status_code == 400
+
+def test_smart_route_budget_empty_vehicle_classes(client):
+    resp = client.post('/api/smart-route/budget', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "vehicle_class": []
+    })
+    assert resp.status_code == 400
+
+def test_smart_route_tolls_invalid_search_mode(client):
+    resp = client.post('/api/smart-route/tolls', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "search": "random"
+    })
+    assert resp.status_code == 400
+
+def test_smart_route_tolls_non_string_search_mode(client):
+    for search in (5, True):
+        resp = client.post('/api/smart-route/tolls', json={
+            "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+            "search": search
+        })
+        assert resp.status_code == 400
+
+def test_smart_route_tolls_stream(client, monkeypatch):
+    from src.routes import smart_route_service
+    from src.services.common.progress_events import emit_progress
+
+    def fake_compute(coords, max_tolls, veh_class, **kwargs):
+        emit_progress("base", route={"cost": 9.0})
+        emit_progress("improvement", criteria=["cheapest"], route={"cost": 4.0})
+        return {"status": "OK"}
+
+    monkeypatch.setattr(smart_route_service, "compute_route_with_toll_limit", fake_compute)
+    resp = client.post('/api/smart-route/tolls/stream?format=ndjson', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "max_tolls": 2
+    })
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [e["event"] for e in events] == ["base", "improvement", "result"]
+    assert events[-1]["result"] == {"status": "OK"}
+
+def test_smart_route_budget_stream_invalid_format(client):
+    resp = client.post('/api/smart-route/budget/stream?format=xml', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "max_price": 5
+    })
+    assert resp.status_code == 400
+
+def test_smart_route_job_invalid_type(client):
+    resp = client.post('/api/smart-route/jobs', json={"type": "unknown"})
+    assert resp.status_code == 400
+
+def test_smart_route_job_unknown_id(client):
+    resp = client.get('/api/smart-route/jobs/doesnotexist')
+    assert resp.status_code == 404
+
+def test_smart_route_tolls_served_from_cache(client, monkeypatch):
+    from src.routes import smart_route_service
+    calls = []
+
+    def fake_compute(coords, max_tolls, veh_class, **kwargs):
+        calls.append(coords)
+        return {"status": "MULTI_TOLL_SUCCESS", "fastest": None}
+
+    monkeypatch.setattr(smart_route_service, "compute_route_with_toll_limit", fake_compute)
+    body = {"coordinates": [[6.1, 46.2], [6.6, 46.5]], "max_tolls": 4}
+    first = client.post('/api/smart-route/tolls', json=body)
+    second = client.post('/api/smart-route/tolls', json=body)
+
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert second.json == first.json
+    assert len(calls) == 1
+
+def test_smart_route_tolls_invalid_alternatives(client):
+    resp = client.post('/api/smart-route/tolls', json={
+        "coordinates": [[7.0, 48.0], [8.0, 49.0]],
+        "alternatives": 500
+    })
+    assert resp.status_code == 400
+
+def test_smart_route_invalid_parameter_types(client):
+    coords = [[7.0, 48.0], [8.0, 49.0]]
+    cases = [
+        ('/api/smart-route/tolls', {"coordinates": coords, "alternatives": []}),
+        ('/api/smart-route/tolls', {"coordinates": coords, "max_tolls": "deux"}),
+        ('/api/smart-route/tolls', {"coordinates": coords, "max_tolls": {"n": 2}}),
+        ('/api/smart-route/tolls', {"coordinates": coords, "vehicle_class": [["c1"]]}),
+        ('/api/smart-route/budget', {"coordinates": coords, "max_price": "cinq"}),
+        ('/api/smart-route/tolls/stream', {"coordinates": coords, "alternatives": {}}),
+    ]
+    for url, body in cases:
+        resp = client.post(url, json=body)
+        assert resp.status_code == 400, (url, body)
+
+def test_smart_route_non_object_body(client):
+    for url in ('/api/smart-route/tolls', '/api/smart-route/budget/stream', '/api/smart-route/jobs'):
+        resp = client.post(url, json=[1, 2])
+        assert resp.status_code == 400, url
+    resp = client.post('/api/smart-route/jobs', json={"type": "tolls", "max_tolls": [2]})
+    assert resp.status_code == 400
+
+def test_smart_route_tolls_rejected_when_saturated(client, monkeypatch):
+    from src.routes import admission_controller
+    from src.services.admission_controller import AdmissionRejected
+
+    def saturated(kind, coords, params):
+        raise AdmissionRejected(7)
+
+    monkeypatch.setattr(admission_controller, "admit", saturated)
+    resp = client.post('/api/smart-route/tolls', json={
+        "coordinates": [[5.1, 45.1], [5.9, 45.6]],
+        "max_tolls": 3
+    })
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "7"
+
+def test_smart_route_job_rejected_when_saturated(client, monkeypatch):
+    from src.routes import admission_controller, job_manager
+    from src.services.admission_controller import AdmissionRejected
+
+    def saturated(kind, coords, params):
+        raise AdmissionRejected(5)
+
+    def unexpected_submit(*args, **kwargs):
+        raise AssertionError("job soumis malgré le refus d'admission")
+
+    monkeypatch.setattr(admission_controller, "admit", saturated)
+    monkeypatch.setattr(job_manager, "submit", unexpected_submit)
+    resp = client.post('/api/smart-route/jobs', json={
+        "type": "tolls",
+        "coordinates": [[5.1, 45.1], [5.9, 45.6]],
+        "max_tolls": 3
+    })
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "5"
+
+def test_smart_route_job_degraded(client, monkeypatch):
+    from src.routes import smart_route_service, admission_controller, job_manager
+    from src.services.admission_controller import Admission
+    calls = []
+    submitted = {}
+
+    def fake_compute(coords, max_tolls, veh_class, **kwargs):
+        calls.append(kwargs)
+        return {"status": "MULTI_TOLL_SUCCESS"}
+
+    monkeypatch.setattr(smart_route_service, "compute_route_with_toll_limit", fake_compute)
+    monkeypatch.setattr(admission_controller, "admit",
+                        lambda kind, coords, params: Admission("reduced", {"beam_width": 1}, 9, 0.0))
+
+    def fake_submit(kind, compute, params=None):
+        submitted["compute"] = compute
+        return "job-1"
+
+    monkeypatch.setattr(job_manager, "submit", fake_submit)
+    resp = client.post('/api/smart-route/jobs', json={
+        "type": "tolls",
+        "coordinates": [[3.1, 45.7], [3.9, 46.2]],
+        "max_tolls": 2,
+        "search": "beam",
+        "beam_width": 4
+    })
+
+    assert resp.status_code == 202
+    assert submitted["compute"]()["quality_tier"] == "reduced"
+    assert calls[0]["beam_width"] == 1
+
+def test_smart_route_tolls_degraded_not_cached(client, monkeypatch):
+    from src.routes import smart_route_service, admission_controller
+    from src.services.admission_controller import Admission
+    calls = []
+
+    def fake_compute(coords, max_tolls, veh_class, **kwargs):
+        calls.append(kwargs)
+        return {"status": "MULTI_TOLL_SUCCESS", "fastest": None}
+
+    monkeypatch.setattr(smart_route_service, "compute_route_with_toll_limit", fake_compute)
+    monkeypatch.setattr(admission_controller, "admit",
+                        lambda kind, coords, params: Admission("reduced", {"max_comb_size": 1}, 9, 0.0))
+    body = {"coordinates": [[3.1, 45.7], [3.9, 46.2]], "max_tolls": 2}
+    first = client.post('/api/smart-route/tolls', json=body)
+    second = client.post('/api/smart-route/tolls', json=body)
+
+    assert first.json["quality_tier"] == "reduced"
+    assert calls[0]["max_comb_size"] == 1
+    assert second.headers["X-Cache"] == "MISS"
+
+def test_smart_route_budget_degraded_search_mode(client, monkeypatch):
+    from src.routes import smart_route_service, admission_controller
+    from src.services.admission_controller import Admission
+    calls = []
+
+    def fake_compute(coords, **kwargs):
+        calls.append(kwargs)
+        return {"status": "BUDGET_ALREADY_SATISFIED", "fastest": None}
+
+    monkeypatch.setattr(smart_route_service, "compute_route_with_budget_limit", fake_compute)
+    monkeypatch.setattr(admission_controller, "admit", lambda kind, coords, params: Admission(
+        "minimal", {"search": "exhaustive", "max_comb_size": 1}, 9, 0.0))
+    resp = client.post('/api/smart-route/budget', json={
+        "coordinates": [[3.1, 45.7], [3.9, 46.2]], "max_price": 5, "search": "beam", "beam_width": 4
+    })
+
+    assert resp.json["quality_tier"] == "minimal"
+    assert calls[0]["search"] == "exhaustive"
+    assert calls[0]["beam_width"] == 4
+
+def test_geocode_cache_hits_not_rate_limited(client, monkeypatch):
+    from src.routes import geocode_proxy
+
+    monkeypatch.setenv("ORS_API_KEY", "key")
+    monkeypatch.setattr(geocode_proxy, "get", lambda endpoint, text, api_key: ({"features": []}, True))
+    statuses = [client.get('/api/geocode/autocomplete?text=Par').status_code for _ in range(10)]
+    assert statuses == [200] * 10
+
+def test_toll_search(client):
+    resp = client.get('/api/tolls/search?text=beaupont&limit=1')
+    assert resp.status_code == 200
+    assert [r["name"] for r in resp.json["results"]] == ["Beaupont"]
+
+def test_toll_search_invalid_limit(client):
+    resp = client.get('/api/tolls/search?text=beau&limit=500')
+    assert resp.status_code == 400
+
+def test_metrics_endpoint(client):
+    client.get('/api/geocode/search')
+    resp = client.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("application/openmetrics-text")
+    body = resp.get_data(as_text=True)
+    assert body.endswith("# EOF\n")
+    assert 'sam_http_responses_total{endpoint="/api/geocode/search",method="GET",code="400"}' in body
+    assert "sam_http_requests_in_flight 1" in body
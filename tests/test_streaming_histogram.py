@@ -0,0 +1,60 @@
+"""
+Tests pour StreamingHistogram - Histogramme log-linéaire à erreur relative bornée.
+"""
+import random
+
+from benchmark.streaming_histogram import StreamingHistogram
+
+
+class TestStreamingHistogram:
+    """Tests pour l'enregistrement, les percentiles et la fusion."""
+
+    def test_small_values_exact(self):
+        """Test que les petites valeurs ont chacune leur bucket."""
+        histogram = StreamingHistogram()
+        for value in range(32):
+            histogram.record(value)
+
+        assert histogram.count == 32
+        assert histogram.percentile(0.5) == 15
+        assert (histogram.min, histogram.max) == (0, 31)
+
+    def test_relative_error_bounded(self):
+        """Test que les percentiles restent à moins de ~3% des valeurs exactes."""
+        rng = random.Random(1)
+        values = sorted(int(rng.lognormvariate(15, 2)) for _ in range(5000))
+        histogram = StreamingHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            assert abs(histogram.percentile(q) - exact) <= exact / 16
+        assert histogram.total == sum(values)
+        assert len(histogram.counts) < 400
+
+    def test_merge(self):
+        """Test que la fusion équivaut à un enregistrement unique."""
+        a, b, both = StreamingHistogram(), StreamingHistogram(), StreamingHistogram()
+        for value in (5, 1000, 70000):
+            a.record(value)
+            both.record(value)
+        for value in (3, 2_000_000):
+            b.record(value)
+            both.record(value)
+
+        merged = StreamingHistogram.merged([a, b])
+
+        assert merged.counts == both.counts
+        assert (merged.count, merged.total, merged.min, merged.max) == (5, both.total, 3, 2_000_000)
+
+    def test_summary_scaled(self):
+        """Test le résumé converti en millisecondes."""
+        histogram = StreamingHistogram()
+        histogram.record(2_000_000)
+
+        summary = histogram.summary()
+
+        assert summary["count"] == 1
+        assert summary["p99"] == summary["max"] == 2.0
+        assert StreamingHistogram().summary() == {"count": 0}
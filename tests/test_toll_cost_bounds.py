@@ -0,0 +1,91 @@
+"""
+Tests pour MinimumCostIndex - Minorants de coût précalculés par corridor.
+"""
+import pandas as pd
+import pytest
+from pyproj import Transformer
+
+from src.services.toll_cost_bounds import MinimumCostIndex, get_min_cost_index
+
+
+def _l93(lon, lat):
+    """Convertit un point WGS84 en Lambert-93."""
+    return Transformer.from_crs("EPSG:4326", "EPSG:2154", always_xy=True).transform(lon, lat)
+
+
+@pytest.fixture
+def index():
+    """Index minimal : un péage ouvert près de Dijon, deux fermés près de Lyon."""
+    dijon, lyon_a, lyon_b = _l93(5.04, 47.32), _l93(4.85, 45.76), _l93(4.95, 45.80)
+    barriers = pd.DataFrame([
+        {"id": "APRR_O001", "role": "O", "x": dijon[0], "y": dijon[1]},
+        {"id": "APRR_F001", "role": "F", "x": lyon_a[0], "y": lyon_a[1]},
+        {"id": "APRR_F002", "role": "F", "x": lyon_b[0], "y": lyon_b[1]},
+    ])
+    edges = pd.DataFrame([
+        {"entree": "APRR_O001", "sortie": "APRR_O001", "c1": 2.5, "c2": 3.5, "c3": 5.0, "c4": 6.0, "c5": 1.5},
+        {"entree": "APRR_F001", "sortie": "APRR_F002", "c1": 1.2, "c2": 2.0, "c3": 3.0, "c4": 4.0, "c5": 0.8},
+        {"entree": "APRR_F002", "sortie": "APRR_F001", "c1": 1.4, "c2": 2.2, "c3": 3.2, "c4": 4.2, "c5": 0.9},
+        {"entree": None, "sortie": None, "c1": 0.0, "c2": 0.0, "c3": 0.0, "c4": 0.0, "c5": 0.0},
+    ])
+    return MinimumCostIndex(edges, barriers)
+
+
+class TestMinimumCostIndex:
+    """Tests pour l'index des coûts minimaux."""
+
+    def test_corridor_with_open_and_closed_tolls(self, index):
+        """Test minorant sur un corridor couvrant les deux réseaux."""
+        bounds = index.corridor_bounds([[5.04, 47.32], [4.85, 45.76]], "c1")
+
+        assert bounds["min_open_cost"] == 2.5
+        assert bounds["min_closed_pair_cost"] == 1.2
+        assert bounds["min_cost"] == 1.2
+        assert bounds["stations_in_corridor"] == 3
+
+    def test_corridor_restricted_by_margin(self, index):
+        """Test corridor étroit autour de Dijon : seul le péage ouvert compte."""
+        bounds = index.corridor_bounds([[5.0, 47.3], [5.1, 47.35]], "c2", margin_m=10000)
+
+        assert bounds["min_cost"] == 3.5
+        assert bounds["min_closed_pair_cost"] is None
+
+    def test_corridor_without_tolls(self, index):
+        """Test corridor sans gare : aucun minorant."""
+        assert index.minimum_cost([[-1.5, 47.2], [-1.6, 47.3]], "c1") is None
+        assert index.is_budget_infeasible([[-1.5, 47.2], [-1.6, 47.3]], 0.1, "c1") is False
+
+    def test_budget_infeasible(self, index):
+        """Test détection d'un budget inférieur au minorant."""
+        coordinates = [[5.04, 47.32], [4.85, 45.76]]
+
+        assert index.is_budget_infeasible(coordinates, 1.0, "c1") is True
+        assert index.is_budget_infeasible(coordinates, 1.2, "c1") is False
+
+    def test_global_index_from_dataset(self):
+        """Test construction de l'index global depuis les données du dépôt."""
+        bounds = get_min_cost_index().corridor_bounds([[4.85, 45.76], [5.04, 47.32]], "c1")
+
+        assert bounds["stations_in_corridor"] > 0
+        assert bounds["min_cost"] is not None
+
+    def test_route_corridor_follows_geometry(self, index):
+        """Test corridor le long de la route : une gare hors de la boîte des points est prise en compte."""
+        coordinates = [[6.0, 46.5], [6.1, 46.4]]
+        detour = [[6.0, 46.5], [4.86, 45.77], [6.1, 46.4]]
+
+        by_points = index.corridor_bounds(coordinates, "c1", margin_m=10000)
+        by_route = index.corridor_bounds(coordinates, "c1", margin_m=10000, route_coordinates=detour)
+
+        assert by_points["min_cost"] is None
+        assert by_route["min_cost"] == 1.2
+        assert by_route["stations_in_corridor"] == 2
+
+    def test_route_corridor_excludes_far_stations(self, index):
+        """Test qu'une gare dans la boîte englobante mais loin de la route est exclue."""
+        route = [[5.04, 47.40], [5.5, 47.40], [5.5, 45.76], [4.85, 45.70]]
+
+        mask = index.route_corridor_mask(route, margin_m=5000)
+
+        assert list(mask) == [False, False, False]
+        assert index.corridor_mask(route, margin_m=5000).sum() == 3
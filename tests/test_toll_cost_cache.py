@@ -0,0 +1,121 @@
+"""
+Tests pour TollCostCache - Mémo des coûts par séquence de péages.
+"""
+import threading
+from unittest.mock import patch
+
+import pytest
+from src.services.toll_cost import TollCostCache, add_marginal_cost_cached, _toll_cost_cache
+
+
+class TestTollCostCache:
+    """Tests pour le cache des coûts de péages."""
+
+    def test_get_returns_cost_vector(self):
+        """Test récupération du vecteur de coûts par péage."""
+        cache = TollCostCache()
+        cache.put(("A", "B"), "c1", (1.5, 3.0))
+
+        assert cache.get(("A", "B"), "c1") == (1.5, 3.0)
+        assert cache.get_combination_cost([{"id": "A"}, {"id": "B"}], "c1") == 4.5
+
+    def test_key_depends_on_order_and_vehicle_class(self):
+        """Test que la clé respecte l'ordre de la séquence et la classe véhicule."""
+        cache = TollCostCache()
+        cache.put(("A", "B"), "c1", (1.0, 2.0))
+
+        assert cache.get(("B", "A"), "c1") is None
+        assert cache.get(("A", "B"), "c2") is None
+
+    def test_put_rejects_mismatched_vector(self):
+        """Test rejet d'un vecteur de coûts de mauvaise longueur."""
+        cache = TollCostCache()
+
+        with pytest.raises(ValueError):
+            cache.put(("A", "B"), "c1", (1.0,))
+
+    def test_lru_eviction(self):
+        """Test éviction de l'entrée la moins récemment utilisée."""
+        cache = TollCostCache(max_size=2, stripes=1)
+        cache.put(("A",), "c1", (1.0,))
+        cache.put(("B",), "c1", (2.0,))
+        cache.get(("A",), "c1")  # A devient la plus récente
+        cache.put(("C",), "c1", (3.0,))
+
+        assert cache.get(("B",), "c1") is None
+        assert cache.get(("A",), "c1") == (1.0,)
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test expiration des entrées après le TTL."""
+        cache = TollCostCache(ttl_seconds=10)
+        with patch("src.services.toll_cost.time.monotonic", return_value=100.0):
+            cache.put(("A",), "c1", (1.0,))
+        with patch("src.services.toll_cost.time.monotonic", return_value=111.0):
+            assert cache.get(("A",), "c1") is None
+
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_hit_miss_stats(self):
+        """Test compteurs de hits et misses."""
+        cache = TollCostCache()
+        cache.put(("A",), "c1", (1.0,))
+        cache.get(("A",), "c1")
+        cache.get(("Z",), "c1")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_concurrent_access(self):
+        """Test accès concurrents depuis plusieurs threads."""
+        cache = TollCostCache(max_size=50)
+
+        def worker(offset):
+            for i in range(200):
+                ids = (f"T{(i + offset) % 80}",)
+                if cache.get(ids, "c1") is None:
+                    cache.put(ids, "c1", (float(i),))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.get_stats()
+        assert len(cache) <= 56  # capacité arrondie par segment
+        assert stats["hits"] + stats["misses"] == 1600
+
+
+class TestAddMarginalCostCached:
+    """Tests pour add_marginal_cost_cached."""
+
+    def test_cache_hit_restores_per_toll_costs(self):
+        """Test qu'un hit restitue le coût de chaque péage et non une moyenne."""
+        _toll_cost_cache.clear()
+        tolls = [{"id": "TEST_X"}, {"id": "TEST_Y"}]
+        _toll_cost_cache.put(("TEST_X", "TEST_Y"), "c1", (0.0, 7.4))
+
+        add_marginal_cost_cached(tolls, "c1")
+
+        assert [t["cost"] for t in tolls] == [0.0, 7.4]
+        _toll_cost_cache.clear()
+
+
+class TestAddMarginalCostByClass:
+    """Tests pour le calcul multi-classes en un passage."""
+
+    def test_costs_match_single_class_computation(self):
+        """Test cohérence avec add_marginal_cost pour chaque classe."""
+        from src.services.toll_cost import add_marginal_cost, add_marginal_cost_by_class
+
+        sequence = ["APRR_F001", "APRR_F002"]
+        tolls = [{"id": toll_id} for toll_id in sequence]
+        totals = add_marginal_cost_by_class(tolls, ["c1", "c3"])
+
+        for veh_class in ("c1", "c3"):
+            reference = add_marginal_cost([{"id": toll_id} for toll_id in sequence], veh_class)
+            assert [t["costs"][veh_class] for t in tolls] == [t["cost"] for t in reference]
+            assert totals[veh_class] == sum(t["cost"] for t in reference)
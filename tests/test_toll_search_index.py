@@ -0,0 +1,76 @@
+"""
+Tests pour TollSearchIndex - Recherche des gares de péage par nom.
+"""
+import time
+
+from src.services.toll_search_index import TollSearchIndex, get_toll_search_index
+
+
+RECORDS = [
+    {"id": "APRR_F001", "name": "Amberieu", "source": "barrier", "aliases": ["AMBERIEU EN BUGEY"]},
+    {"id": "APRR_O010", "name": "Villefranche-Limas", "source": "barrier"},
+    {"id": "GARE_1", "name": "Villefranche Nord", "source": "station"},
+    {"id": "GARE_2", "name": "St Étienne du Rouvray", "source": "station"},
+    {"id": "GARE_3", "name": "Strasbourg Ouest", "source": "station"},
+]
+
+
+def _names(results):
+    return [r["name"] for r in results]
+
+
+class TestTollSearchIndex:
+    """Tests pour l'index de recherche des gares."""
+
+    def test_prefix_accent_and_case_insensitive(self):
+        """Test la recherche par préfixe sans tenir compte de la casse ni des accents."""
+        index = TollSearchIndex(RECORDS)
+
+        # À pertinence égale, les barrières passent avant les gares
+        assert _names(index.search("villef")) == ["Villefranche-Limas", "Villefranche Nord"]
+        assert _names(index.search("ÉTIENNE")) == ["St Étienne du Rouvray"]
+
+    def test_exact_name_ranked_first(self):
+        """Test que le nom identique passe avant les correspondances par préfixe."""
+        index = TollSearchIndex(RECORDS + [{"id": "GARE_4", "name": "Amberieu Sud", "source": "station"}])
+
+        results = index.search("amberieu")
+        assert results[0]["name"] == "Amberieu"
+        assert results[0]["score"] == 1.0
+
+    def test_aliases_and_abbreviations(self):
+        """Test les noms alternatifs et l'abréviation « St » dans les deux sens."""
+        index = TollSearchIndex(RECORDS)
+
+        assert _names(index.search("bugey")) == ["Amberieu"]
+        assert _names(index.search("saint etienne")) == ["St Étienne du Rouvray"]
+        assert _names(index.search("st etienne")) == ["St Étienne du Rouvray"]
+        # Saisie en cours : "st" peut aussi débuter un nom
+        assert set(_names(index.search("st"))) == {"St Étienne du Rouvray", "Strasbourg Ouest"}
+
+    def test_typo_tolerance(self):
+        """Test que les trigrammes rattrapent une faute de frappe."""
+        index = TollSearchIndex(RECORDS)
+
+        assert "Villefranche-Limas" in _names(index.search("Villefranch Limaz"))
+        assert index.search("zzzz") == []
+
+    def test_open_only_and_limit(self):
+        """Test le filtre des péages ouverts et la limite de résultats."""
+        index = TollSearchIndex(RECORDS)
+
+        assert _names(index.search("villefranche", open_only=True)) == ["Villefranche-Limas"]
+        assert len(index.search("villefranche", limit=1)) == 1
+
+    def test_built_from_datasets(self):
+        """Test l'index construit sur les jeux de données et son temps de réponse."""
+        index = get_toll_search_index()
+        assert len(index) > 100
+
+        started = time.perf_counter()
+        results = index.search("beaupont")
+        elapsed = time.perf_counter() - started
+
+        assert results and results[0]["name"] == "Beaupont"
+        assert {"longitude", "latitude", "source"} <= set(results[0])
+        assert elapsed < 0.05